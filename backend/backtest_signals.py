@@ -0,0 +1,118 @@
+"""
+Backtest de las señales de divergencia sobre las noticias y precios guardados.
+
+Recorre día por día la tabla diaria de sentimiento (services.daily_sentiment)
+y el histórico local de precios (prices.db) con las mismas reglas que
+/api/divergence, para toda la grilla umbral de sentimiento x umbral de
+precio x ventana, y muestra las mejores combinaciones por commodity:
+señales, tasa de acierto, retorno promedio a cada horizonte y drawdown.
+
+Con --synthetic DIAS no toca la base: genera DIAS días de noticias y precios
+al azar y mide cuánto tarda el barrido, para probar grillas grandes.
+
+Uso:
+    python backtest_signals.py [--commodity soja,maiz] [--years 5] [--top 10]
+    python backtest_signals.py --synthetic 1825 --windows 3,5,7,10,14,21,30
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import numpy as np
+
+from services.backtest import (
+    DEFAULT_HORIZONS, DEFAULT_PRICE_THRESHOLDS, DEFAULT_SENTIMENT_THRESHOLDS, DEFAULT_WINDOWS, DEFAULT_YEARS,
+    BacktestGrid, backtest_commodity, run_backtest
+)
+from services.market_data import COMMODITIES
+
+
+def _csv(values) -> str:
+    return ",".join(str(v) for v in values)
+
+
+def synthetic(days: int, seed: int = 7):
+    """Noticias diarias al azar y un precio que tiende a ir contra el sentimiento del día anterior."""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(3, size=(days, 2))
+    lean = (counts[:, 0] - counts[:, 1]) / np.maximum(counts.sum(axis=1), 1)
+    returns = rng.normal(scale=0.012, size=days) - 0.004 * np.roll(lean, 1)
+    closes = 1000 * np.cumprod(1 + returns)
+    labels = [f"d{i:05d}" for i in range(days)]
+    return labels, counts, closes
+
+
+def print_report(result, top: int, min_signals: int) -> None:
+    print(f"\n🌾 {result['commodity']} ({result['symbol']}): {result['days']} días, "
+          f"{result['priced_days']} con precio, {result['articles']} noticias")
+    for row in result["baseline"]:
+        print(f"   Base {row['horizon_days']:>3}d: sube {row['up_rate']} de las veces, promedio {row['avg_return_pct']}%")
+
+    rows = [r for r in result["results"] if r["signals"] >= min_signals and r["avg_return_pct"] is not None]
+    rows.sort(key=lambda r: r["avg_return_pct"], reverse=True)
+    if not rows:
+        print(f"   Ninguna combinación con al menos {min_signals} señales")
+        return
+    print(f"   {'sent':>5} {'precio':>6} {'vent':>4} {'horiz':>5} {'señales':>7} {'acierto':>7} "
+          f"{'prom %':>7} {'total %':>8} {'dd %':>6}")
+    for r in rows[:top]:
+        print(f"   {r['sentiment_threshold']:>5} {r['price_threshold']:>6} {r['window_days']:>4} {r['horizon_days']:>5} "
+              f"{r['signals']:>7} {r['hit_rate']:>7} {r['avg_return_pct']:>7} {r['total_return_pct']:>8} "
+              f"{r['max_drawdown_pct']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest de las señales de divergencia")
+    parser.add_argument("--commodity", default=",".join(COMMODITIES), help="Commodities separados por coma (default: todos)")
+    parser.add_argument("--sentiment", default=_csv(DEFAULT_SENTIMENT_THRESHOLDS), help="Umbrales de sentimiento a barrer")
+    parser.add_argument("--price", default=_csv(DEFAULT_PRICE_THRESHOLDS), help="Umbrales de precio (%%) a barrer")
+    parser.add_argument("--windows", default=_csv(DEFAULT_WINDOWS), help="Ventanas en días")
+    parser.add_argument("--horizons", default=_csv(DEFAULT_HORIZONS), help="Horizontes de retorno en días")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help=f"Años de historia (default: {DEFAULT_YEARS})")
+    parser.add_argument("--top", type=int, default=10, help="Combinaciones a mostrar por commodity (default: 10)")
+    parser.add_argument("--min-signals", type=int, default=10, help="Señales mínimas para listar una combinación (default: 10)")
+    parser.add_argument("--json", help="Guardar el resultado completo en este archivo")
+    parser.add_argument("--synthetic", type=int, metavar="DIAS", help="Usar DIAS días de datos al azar en vez de la base")
+    args = parser.parse_args()
+
+    commodities = [c.strip().lower() for c in args.commodity.split(",") if c.strip()]
+    unknown = [c for c in commodities if c not in COMMODITIES]
+    if unknown:
+        parser.error(f"Commodity desconocido: {', '.join(unknown)}. Válidos: {', '.join(COMMODITIES)}")
+    try:
+        grid = BacktestGrid.parse(args.sentiment, args.price, args.windows, args.horizons)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"🔬 Barriendo {grid.cells} combinaciones por commodity...")
+    started = time.perf_counter()
+    if args.synthetic:
+        results = [backtest_commodity(key, *synthetic(args.synthetic, seed=i), grid) for i, key in enumerate(commodities)]
+        output = {"synthetic_days": args.synthetic, "commodities": results}
+    else:
+        output = run_backtest(commodities, grid, args.years)
+        results = output["commodities"]
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        print_report(result, args.top, args.min_signals)
+    print(f"\n⏱️  {len(results)} commodities x {grid.cells} combinaciones en {elapsed:.2f}s")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(output, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Resultado guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
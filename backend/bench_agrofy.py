@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the Agrofy Pizarra parser on the agrofy_dump.html fixture.
+
+Compares AgrofyMarketScraper.parse_prices against the previous approach
+(BeautifulSoup with html.parser over the whole page, then every <tr> of
+every <table>), on the dump as checked in (the client-rendered shell, no
+tables) and on the dump with a Pizarra table injected where the page
+renders its grain widgets.
+
+Usage:
+    python bench_agrofy.py [--runs 20]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import time
+
+from scrapers.market_scraper import AgrofyMarketScraper
+from test_agrofy_parser import load_dump, with_table
+
+
+def soup_prices(html: str) -> dict:
+    """The previous parser: full BeautifulSoup parse, every row of every table."""
+    from bs4 import BeautifulSoup
+
+    results = {}
+    soup = BeautifulSoup(html, "html.parser")
+    for table in soup.find_all("table"):
+        for row in table.find_all("tr"):
+            cells = [c.get_text(strip=True) for c in row.find_all(["td", "th"])]
+            if not cells:
+                continue
+            row_text = " ".join(cells).lower()
+            if "pizarra" in row_text and "rosario" in row_text:
+                for commodity, key in AgrofyMarketScraper.MAPPING.items():
+                    if commodity.lower() in cells[0].lower():
+                        try:
+                            results[f"{key}_rosario"] = {
+                                "price": float(cells[3].replace("$", "").replace(".", "").replace(",", ".").strip()),
+                                "change_percent": float(cells[4].replace("%", "").replace(",", ".").strip()),
+                            }
+                        except Exception:
+                            pass
+    return results
+
+
+def best_ms(func, html: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de Pizarra de Agrofy")
+    parser.add_argument("--runs", type=int, default=20, help="Repeticiones por caso")
+    args = parser.parse_args()
+
+    dump = load_dump()
+    cases = {"dump as checked in": dump, "dump + Pizarra table": with_table(dump)}
+    try:
+        import bs4  # noqa: F401
+        baseline = soup_prices
+    except ImportError:
+        baseline = None
+        print("\n⚠️  beautifulsoup4 not installed, baseline skipped")
+
+    print(f"\n📊 Agrofy Pizarra parser (best of {args.runs}, {len(dump) / 1024:.0f} K chars)\n")
+    print(f"{'':24} {'bs4 (ms)':>10} {'fast (ms)':>10} {'rows':>6}")
+    for name, html in cases.items():
+        fast = best_ms(AgrofyMarketScraper.parse_prices, html, args.runs)
+        old = best_ms(baseline, html, args.runs) if baseline else float("nan")
+        rows = len(AgrofyMarketScraper.parse_prices(html))
+        if baseline:
+            assert rows == len(baseline(html))
+        print(f"{name:24} {old:>10.2f} {fast:>10.2f} {rows:>6}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
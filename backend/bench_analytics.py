@@ -0,0 +1,226 @@
+"""
+Analytics benchmark: per-row dict loops vs the columnar ArticleStore kernels.
+
+Fills a scratch SQLite database with synthetic classified articles spread
+over the last 60 days, then times, for each size:
+
+- loops: the row-by-row code the trends/summary/divergence endpoints ran
+  before the store (ISO parsing and label uppercasing per row), over rows
+  already fetched from the repository
+- kernels: ArticleStore.select plus the vectorized kernel, on a loaded store
+
+and the store's own cost: the initial load and an incremental refresh after
+1% of the rows are reclassified.
+
+Usage:
+    python bench_analytics.py [--sizes 10000,100000,1000000] [--runs 5]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from database import SQLiteNewsRepository
+from models.commodity import COMMODITIES
+from services.article_store import (
+    ArticleStore, bucket_sentiment_counts, bucket_weighted_scores,
+    source_sentiment_counts, sentiment_counts, commodity_counts
+)
+from services.bucketing import bucket_grid
+
+SENTIMENTS = ["ALCISTA", "BAJISTA", "NEUTRAL", None]
+
+# Columns each loop fetched
+DAILY_COLUMNS = ("published_at", "sentiment")
+TIMELINE_COLUMNS = ("published_at", "sentiment", "confidence")
+SOURCE_TREND_COLUMNS = ("source", "sentiment")
+
+
+# ----------------------------------------------------------------------
+# The loops the endpoints used to run
+# ----------------------------------------------------------------------
+
+def loop_daily(all_news, start_date):
+    daily_data = {}
+    for news in all_news:
+        if not news.get('published_at'):
+            continue
+        pub_date = datetime.fromisoformat(news['published_at'].replace('Z', '+00:00'))
+        if pub_date < start_date:
+            continue
+        date_key = pub_date.strftime('%Y-%m-%d')
+        if date_key not in daily_data:
+            daily_data[date_key] = {"date": date_key, "alcista": 0, "bajista": 0, "neutral": 0}
+        news_sentiment = (news.get('sentiment') or 'NEUTRAL').upper()
+        if news_sentiment == 'ALCISTA':
+            daily_data[date_key]['alcista'] += 1
+        elif news_sentiment == 'BAJISTA':
+            daily_data[date_key]['bajista'] += 1
+        else:
+            daily_data[date_key]['neutral'] += 1
+    return sorted(daily_data.values(), key=lambda x: x['date'])
+
+
+def loop_weighted(items):
+    alcista_items = [i for i in items if (i.get('sentiment') or '').upper() == 'ALCISTA']
+    bajista_items = [i for i in items if (i.get('sentiment') or '').upper() == 'BAJISTA']
+    weighted_alcista = sum(float(i.get('confidence', 0.5)) for i in alcista_items)
+    weighted_bajista = sum(float(i.get('confidence', 0.5)) for i in bajista_items)
+    total_weight = weighted_alcista + weighted_bajista
+    if total_weight == 0:
+        return 0.0
+    return (weighted_alcista - weighted_bajista) / total_weight
+
+
+def loop_timeline(all_news, start_date):
+    daily_news = {}
+    for news in all_news:
+        if not news.get('published_at'):
+            continue
+        pub_date = datetime.fromisoformat(news['published_at'].replace('Z', '+00:00'))
+        if pub_date < start_date:
+            continue
+        daily_news.setdefault(pub_date.strftime('%Y-%m-%d'), []).append(news)
+    timeline = [
+        {"date": key, "sentiment_score": round(loop_weighted(items), 2)}
+        for key, items in daily_news.items()
+    ]
+    timeline.sort(key=lambda x: x['date'])
+    return timeline
+
+
+def loop_by_source(all_news):
+    source_data = {}
+    for news in all_news:
+        news_source = news.get('source', 'Unknown')
+        if news_source not in source_data:
+            source_data[news_source] = {"source": news_source, "alcista": 0, "bajista": 0, "neutral": 0, "total": 0}
+        news_sentiment = (news.get('sentiment') or 'NEUTRAL').upper()
+        if news_sentiment == 'ALCISTA':
+            source_data[news_source]['alcista'] += 1
+        elif news_sentiment == 'BAJISTA':
+            source_data[news_source]['bajista'] += 1
+        else:
+            source_data[news_source]['neutral'] += 1
+        source_data[news_source]['total'] += 1
+    return list(source_data.values())
+
+
+def loop_summary(all_news):
+    alcista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'ALCISTA')
+    bajista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'BAJISTA')
+    neutral = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'NEUTRAL')
+    commodities = {}
+    for n in all_news:
+        for c in n.get('commodities') or ['GENERAL']:
+            commodities[c] = commodities.get(c, 0) + 1
+    return alcista, bajista, neutral, commodities
+
+
+# ----------------------------------------------------------------------
+
+def fill(repo: SQLiteNewsRepository, count: int) -> None:
+    """Insert `count` synthetic articles published over the last 60 days."""
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    batch = []
+    for i in range(count):
+        sentiment = rng.choice(SENTIMENTS)
+        batch.append({
+            "title": f"Titular sintético {i}",
+            "source": f"Fuente {rng.randrange(25)}",
+            "url": f"https://example.com/analytics/{i}",
+            "published_at": now - timedelta(seconds=rng.randrange(60 * 86400)),
+            "sentiment": sentiment,
+            "confidence": round(rng.uniform(0.5, 1.0), 2) if sentiment else None,
+            "commodity": ", ".join(rng.sample(COMMODITIES[:6], rng.choice((1, 1, 1, 2)))),
+        })
+        if len(batch) == 10000:
+            repo.create_batch(batch)
+            batch = []
+    if batch:
+        repo.create_batch(batch)
+
+
+def best_ms(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(count: int, runs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = SQLiteNewsRepository(Path(tmp) / "analytics.db")
+        start = time.perf_counter()
+        fill(repo, count)
+        print(f"\n📦 {count:,} articles (filled in {time.perf_counter() - start:.1f} s)")
+
+        # No overlap: the fill finished right before the load
+        store = ArticleStore(repo, refresh_seconds=3600, rebuild_seconds=3600, overlap=timedelta(0))
+        start = time.perf_counter()
+        store.refresh(full=True)
+        print(f"   store load: {time.perf_counter() - start:.2f} s, {len(store):,} rows held")
+
+        ids = [r["id"] for r in repo.get_all(limit=count // 100, columns=("id",))]
+        repo.bulk_update_sentiment([(news_id, "BAJISTA", 0.66, None) for news_id in ids])
+        start = time.perf_counter()
+        read = store.refresh()
+        print(f"   incremental refresh: {(time.perf_counter() - start) * 1000:.0f} ms ({read:,} rows read)")
+
+        # UTC days, like the loops; the grid starts at midnight so both see whole days
+        now = datetime.now(timezone.utc)
+        week_ago = (now - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+        rows = {
+            columns: repo.get_all(limit=count, columns=columns)
+            for columns in (DAILY_COLUMNS, TIMELINE_COLUMNS, SOURCE_TREND_COLUMNS, ("sentiment", "commodities"))
+        }
+
+        cases = [
+            ("/trends/daily",
+             lambda: loop_daily(rows[DAILY_COLUMNS], week_ago),
+             lambda: bucket_sentiment_counts(store.select(), bucket_grid(week_ago, now, "day", "UTC"))),
+            ("/trends/timeline",
+             lambda: loop_timeline(rows[TIMELINE_COLUMNS], week_ago),
+             lambda: bucket_weighted_scores(store.select(), bucket_grid(week_ago, now, "day", "UTC"))),
+            ("/trends/by-source",
+             lambda: loop_by_source(rows[SOURCE_TREND_COLUMNS]),
+             lambda: source_sentiment_counts(store.select())),
+            ("summary stats",
+             lambda: loop_summary(rows[("sentiment", "commodities")]),
+             lambda: (sentiment_counts(f := store.select()), commodity_counts(f))),
+        ]
+
+        assert cases[0][1]() == cases[0][2](), "daily counts differ"
+        assert cases[1][1]() == cases[1][2](), "timeline scores differ"
+
+        print(f"   {'endpoint':<20}{'loops':>12}{'kernels':>12}{'speedup':>10}")
+        for name, loop, kernel in cases:
+            loop_ms, kernel_ms = best_ms(loop, runs), best_ms(kernel, runs)
+            print(f"   {name:<20}{loop_ms:>10.1f}ms{kernel_ms:>10.2f}ms{loop_ms / kernel_ms:>9.0f}x")
+        repo.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated article counts")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per measurement (best is kept)")
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        bench(int(size), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Bulk ingest benchmark: PostgREST JSON upserts vs asyncpg binary COPY.
+
+Creates a scratch database on a local Postgres (same setup as
+explain_hot_queries.py), then upserts the same synthetic articles twice, once
+as fresh inserts and once as conflicting updates, through:
+
+- PostgREST path: batches serialized to JSON and sent as the statement
+  PostgREST generates for ``.upsert(rows, on_conflict="url")`` with
+  ``return=representation`` (json_populate_recordset + json_agg of the rows).
+  This is run over asyncpg too, so the comparison leaves out PostgREST's own
+  HTTP overhead and favours the old path.
+- COPY path: AsyncpgNewsRepository.bulk_upsert.
+
+Requires the ``psql`` client on PATH and asyncpg.
+
+Usage:
+    python bench_ingest.py --dsn postgresql://postgres@localhost:5432/postgres [--rows 50000] [--batch 1000]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from database.asyncpg_repository import AsyncpgNewsRepository
+from database.base import news_to_row
+from models.news import News
+from explain_hot_queries import SCRATCH_DB, with_database, psql, apply_migrations
+
+COLUMNS = ("title", "source", "url", "published_at", "sentiment", "confidence", "commodity", "commodities")
+
+# What PostgREST runs for a bulk upsert with Prefer: return=representation
+POSTGREST_UPSERT_SQL = f"""
+WITH pgrst_source AS (
+    INSERT INTO news ({", ".join(COLUMNS)})
+    SELECT {", ".join(COLUMNS)}
+    FROM json_populate_recordset(NULL::news, $1::json)
+    ON CONFLICT (url) DO UPDATE SET
+        {", ".join(f"{c} = EXCLUDED.{c}" for c in COLUMNS if c != "url")}
+    RETURNING news.*
+)
+SELECT coalesce(json_agg(pgrst_source), '[]')::text FROM pgrst_source
+"""
+
+
+def synthetic_rows(count: int, round_: int):
+    """Analyzer-shaped rows; `round_` changes the sentiment so updates do work."""
+    now = datetime.now(timezone.utc)
+    labels = ["SOJA", "MAÍZ", "TRIGO", "GIRASOL", "CEBADA", "SORGO", "GENERAL"]
+    sentiments = ["ALCISTA", "BAJISTA", "NEUTRAL"]
+    rows = []
+    for i in range(count):
+        news = News(
+            title=f"Titular sintético {i}",
+            source=f"Fuente {i % 12}",
+            url=f"https://example.com/bench/{i}",
+            published_at=now - timedelta(minutes=i),
+        )
+        rows.append(news_to_row(news, {
+            "sentiment": sentiments[(i + round_) % 3],
+            "confidence": 0.85,
+            "commodity": labels[i % 7],
+        }))
+    return rows
+
+
+async def postgrest_upsert(dsn: str, rows, batch: int) -> float:
+    """Upsert through the PostgREST-shaped JSON statement; returns seconds."""
+    conn = await asyncpg.connect(dsn)
+    try:
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch):
+            body = json.dumps(rows[i:i + batch], default=str)
+            json.loads(await conn.fetchval(POSTGREST_UPSERT_SQL, body))
+        return time.perf_counter() - start
+    finally:
+        await conn.close()
+
+
+def copy_upsert(repo: AsyncpgNewsRepository, rows) -> float:
+    """Upsert through binary COPY + one merge; returns seconds."""
+    start = time.perf_counter()
+    repo.bulk_upsert(rows, returning=())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest benchmark (PostgREST JSON vs COPY)")
+    parser.add_argument("--dsn", required=True, help="DSN of a local Postgres (maintenance database)")
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic articles to upsert")
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per PostgREST request")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🚚 AGROMATE - Bulk ingest benchmark")
+    print("=" * 80 + "\n")
+
+    psql(args.dsn, f"DROP DATABASE IF EXISTS {SCRATCH_DB};")
+    psql(args.dsn, f"CREATE DATABASE {SCRATCH_DB};")
+    scratch = with_database(args.dsn, SCRATCH_DB)
+
+    repo = None
+    try:
+        print("📄 Applying migrations...")
+        apply_migrations(scratch)
+        repo = AsyncpgNewsRepository(scratch)
+
+        results = {}
+        for path in ("postgrest", "copy"):
+            psql(scratch, "TRUNCATE news; TRUNCATE news_sources;")
+            for phase, round_ in (("insert", 0), ("update", 1)):
+                rows = synthetic_rows(args.rows, round_)
+                if path == "postgrest":
+                    elapsed = asyncio.run(postgrest_upsert(scratch, rows, args.batch))
+                else:
+                    elapsed = copy_upsert(repo, rows)
+                results[(path, phase)] = elapsed
+
+        count = psql(scratch, "SELECT COUNT(*) FROM news;", tuples_only=True).strip()
+        print(f"\n   rows in news: {count}\n")
+        print("-" * 80)
+        print(f"{'phase':<10} {'PostgREST JSON s':>18} {'COPY s':>10} {'rows/s COPY':>14} {'speedup':>9}")
+        print("-" * 80)
+        for phase in ("insert", "update"):
+            old, new = results[("postgrest", phase)], results[("copy", phase)]
+            print(f"{phase:<10} {old:>18.2f} {new:>10.2f} {args.rows / new:>14,.0f} {old / new:>8.1f}x")
+        print("-" * 80 + "\n")
+    finally:
+        if repo:
+            repo.close()
+        psql(args.dsn, f"DROP DATABASE IF EXISTS {SCRATCH_DB};")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure payload bytes and DB transfer time of the dashboard's repository calls.
+
+Compares the full-row projection (what ``select("*")`` used to return) against
+the minimal column set each endpoint now requests.
+
+Usage:
+    python bench_payload.py [--runs 5]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import json
+import time
+
+from database import get_supabase_client, NewsRepository, NEWS_COLUMNS
+
+
+def dashboard_calls(repo: NewsRepository):
+    """
+    Repository calls issued when the dashboard loads, keyed by endpoint.
+
+    Trends and divergence read the in-memory analytics store instead of
+    querying per request, so they are not listed.
+
+    Each entry is (endpoint, callable(columns), minimal columns).
+    """
+    return [
+        ("/api/news", lambda cols: repo.get_all(limit=50, columns=cols), NEWS_COLUMNS),
+        ("/api/news?fields=id,title,sentiment",
+         lambda cols: repo.get_all(limit=50, columns=cols), ("id", "title", "sentiment")),
+        ("/api/summary/daily (headlines)", lambda cols: repo.get_recent(hours=24, limit=10, columns=cols), ("title",)),
+    ]
+
+
+def measure(call, columns, runs: int):
+    """Return (payload bytes, best elapsed ms) for a repository call."""
+    best = float("inf")
+    payload = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = call(columns)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = min(best, elapsed)
+        payload = len(json.dumps(rows, default=str).encode("utf-8"))
+    return payload, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per call (best time is reported)")
+    args = parser.parse_args()
+
+    repo = NewsRepository(get_supabase_client())
+
+    print("\n" + "=" * 96)
+    print("📦 AGROMATE - Dashboard payload benchmark (full rows vs projection)")
+    print("=" * 96 + "\n")
+    print(f"{'endpoint':<40} {'full KB':>9} {'proj KB':>9} {'saved':>7} {'full ms':>9} {'proj ms':>9}")
+    print("-" * 96)
+
+    total_full = total_proj = 0
+    for endpoint, call, columns in dashboard_calls(repo):
+        full_bytes, full_ms = measure(call, NEWS_COLUMNS, args.runs)
+        proj_bytes, proj_ms = measure(call, columns, args.runs)
+        total_full += full_bytes
+        total_proj += proj_bytes
+        saved = (1 - proj_bytes / full_bytes) * 100 if full_bytes else 0.0
+        print(f"{endpoint:<40} {full_bytes / 1024:>9.1f} {proj_bytes / 1024:>9.1f} {saved:>6.0f}% "
+              f"{full_ms:>9.1f} {proj_ms:>9.1f}")
+
+    print("-" * 96)
+    saved = (1 - total_proj / total_full) * 100 if total_full else 0.0
+    print(f"{'TOTAL':<40} {total_full / 1024:>9.1f} {total_proj / 1024:>9.1f} {saved:>6.0f}%\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Compare the Yahoo chart client (services/yahoo_chart.py) against yfinance.
+
+Measures, in fresh interpreters:
+- import time and RSS after importing each client
+- fetch latency and peak RSS for the calls the API makes (5d quotes of the
+  three CBOT futures, a 3mo window, and a full backfill since 2000)
+
+Both clients are served the same recorded chart responses, so the numbers
+are parsing and framework overhead without network noise. Record real
+responses once with --record (needs network); without recordings, payloads
+of the same shape are generated (labelled "synthetic").
+
+Usage:
+    python bench_yahoo.py [--record] [--recordings DIR] [--runs 5]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+
+SYMBOLS = ["ZS=F", "ZC=F", "ZW=F"]
+SCENARIOS = {
+    "5d": {"range_": "5d", "period": "5d", "days": 5},
+    "3mo": {"range_": "3mo", "period": "3mo", "days": 63},
+    "backfill": {"start": "2000-01-01", "period": "max", "days": 6500},
+}
+DEFAULT_RECORDINGS = backend_dir / ".bench" / "yahoo"
+
+
+# ----------------------------------------------------------------------
+# Payloads
+# ----------------------------------------------------------------------
+
+def synthetic_chart(symbol: str, days: int) -> dict:
+    """A v8 chart response with `days` weekday bars ending today."""
+    rng = random.Random(symbol)
+    day = datetime.now(timezone.utc).replace(hour=5, minute=0, second=0, microsecond=0)
+    timestamps, closes = [], []
+    price = 1000.0
+    while len(timestamps) < days:
+        if day.weekday() < 5:
+            timestamps.append(int(day.timestamp()))
+            price *= 1 + rng.gauss(0, 0.012)
+            closes.append(round(price, 2))
+        day -= timedelta(days=1)
+    timestamps.reverse()
+    closes.reverse()
+    quote = {"open": closes, "high": closes, "low": closes, "close": closes, "volume": [1000] * days}
+    return {"chart": {"result": [{
+        "meta": {
+            "currency": "USX", "symbol": symbol, "exchangeName": "CBT", "instrumentType": "FUTURE",
+            "firstTradeDate": 967003200, "regularMarketTime": timestamps[-1], "gmtoffset": -18000,
+            "timezone": "CDT", "exchangeTimezoneName": "America/Chicago", "regularMarketPrice": closes[-1],
+            "chartPreviousClose": closes[0], "priceHint": 2, "dataGranularity": "1d", "range": "",
+            "validRanges": ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"],
+        },
+        "timestamp": timestamps,
+        "indicators": {"quote": [quote], "adjclose": [{"adjclose": closes}]},
+    }], "error": None}}
+
+
+def load_recordings(directory: Path) -> dict:
+    """{scenario: {symbol: payload bytes}}, synthetic where nothing is recorded."""
+    payloads = {}
+    for name, scenario in SCENARIOS.items():
+        payloads[name] = {}
+        for symbol in SYMBOLS:
+            path = directory / f"{name}_{symbol}.json"
+            if path.exists():
+                payloads[name][symbol] = path.read_bytes()
+            else:
+                payloads[name][symbol] = json.dumps(synthetic_chart(symbol, scenario["days"])).encode()
+    return payloads
+
+
+async def record(directory: Path) -> None:
+    """Save live chart responses for every scenario and symbol."""
+    import httpx
+    from services.yahoo_chart import CHART_URL, USER_AGENT
+
+    directory.mkdir(parents=True, exist_ok=True)
+    async with httpx.AsyncClient(timeout=30.0, headers={"User-Agent": USER_AGENT}) as client:
+        for name, scenario in SCENARIOS.items():
+            for symbol in SYMBOLS:
+                params = {"interval": "1d"}
+                if "start" in scenario:
+                    start = datetime.fromisoformat(scenario["start"]).replace(tzinfo=timezone.utc)
+                    params.update(period1=int(start.timestamp()), period2=int(time.time()))
+                else:
+                    params["range"] = scenario["range_"]
+                resp = await client.get(f"{CHART_URL}/{symbol}", params=params)
+                resp.raise_for_status()
+                (directory / f"{name}_{symbol}.json").write_bytes(resp.content)
+                print(f"   {name:9} {symbol}: {len(resp.content) / 1024:.0f} KB")
+
+
+# ----------------------------------------------------------------------
+# Workers (run in a fresh interpreter each)
+# ----------------------------------------------------------------------
+
+def rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def worker(client: str, directory: Path, runs: int) -> dict:
+    start = time.perf_counter()
+    if client == "chart":
+        import httpx
+        from services.yahoo_chart import YahooChartClient
+    else:
+        import yfinance as yf
+        from yfinance.data import YfData
+    import_ms = (time.perf_counter() - start) * 1000
+    import_rss = rss_mb()
+
+    payloads = load_recordings(directory)
+    current = {"scenario": "5d"}
+
+    def payload_for(url: str) -> bytes:
+        symbol = url.split("?")[0].rsplit("/", 1)[-1].replace("%3D", "=")
+        return payloads[current["scenario"]][symbol]
+
+    if client == "chart":
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=payload_for(str(request.url))))
+        chart_client = YahooChartClient(transport=transport)
+
+        async def fetch(scenario):
+            args = SCENARIOS[scenario]
+            return await chart_client.daily_closes_many(SYMBOLS, range_=args.get("range_", "5d"), start=args.get("start"))
+
+        def run(scenario):
+            return len(asyncio.run(fetch(scenario)))
+    else:
+        class Recorded:
+            def __init__(self, body):
+                self.text = body.decode()
+                self.status_code = 200
+                self.url = ""
+
+            def json(self):
+                return json.loads(self.text)
+
+        def replay(self, url, params=None, timeout=30):
+            return Recorded(payload_for(url))
+
+        YfData.get = YfData.cache_get = replay
+
+        def run(scenario):
+            frame = yf.download(" ".join(SYMBOLS), period=SCENARIOS[scenario]["period"],
+                                progress=False, group_by="ticker", threads=False)
+            return sum(1 for s in SYMBOLS if s in frame.columns.get_level_values(0))
+
+    fetch_ms = {}
+    for scenario in SCENARIOS:
+        current["scenario"] = scenario
+        best = float("inf")
+        for _ in range(runs):
+            t = time.perf_counter()
+            assert run(scenario) == len(SYMBOLS)
+            best = min(best, (time.perf_counter() - t) * 1000)
+        fetch_ms[scenario] = best
+
+    return {"import_ms": import_ms, "import_rss_mb": import_rss, "fetch_ms": fetch_ms, "peak_rss_mb": rss_mb()}
+
+
+def run_worker(client: str, directory: Path, runs: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", client, "--recordings", str(directory), "--runs", str(runs)],
+        capture_output=True, text=True, check=True, cwd=backend_dir
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del cliente de Yahoo vs yfinance")
+    parser.add_argument("--record", action="store_true", help="Grabar respuestas reales (requiere red)")
+    parser.add_argument("--recordings", type=Path, default=DEFAULT_RECORDINGS, help="Directorio de grabaciones")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por escenario")
+    parser.add_argument("--worker", choices=["chart", "yfinance"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.recordings, args.runs)))
+        return
+
+    if args.record:
+        print(f"\n🎙️  Grabando respuestas en {args.recordings}")
+        asyncio.run(record(args.recordings))
+
+    recorded = sum(1 for _ in args.recordings.glob("*.json")) if args.recordings.exists() else 0
+    source = f"{recorded} recorded responses" if recorded else "synthetic responses"
+    print(f"\n📊 Yahoo chart client vs yfinance ({source}, best of {args.runs})\n")
+
+    results = {name: run_worker(name, args.recordings, args.runs) for name in ("chart", "yfinance")}
+    rows = [("import (ms)", "import_ms"), ("RSS after import (MB)", "import_rss_mb"), ("peak RSS (MB)", "peak_rss_mb")]
+    print(f"{'':28} {'chart':>10} {'yfinance':>10}")
+    for label, key in rows:
+        print(f"{label:28} {results['chart'][key]:>10.1f} {results['yfinance'][key]:>10.1f}")
+    for scenario in SCENARIOS:
+        label = f"fetch {scenario} x{len(SYMBOLS)} (ms)"
+        print(f"{label:28} {results['chart']['fetch_ms'][scenario]:>10.1f} {results['yfinance']['fetch_ms'][scenario]:>10.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
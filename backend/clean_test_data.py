@@ -1,39 +1,52 @@
 """
-Script para limpiar datos de prueba de Supabase.
+Script para limpiar datos de prueba de la base.
 Elimina todas las noticias de "Test Source" y otras fuentes no productivas.
+
+Borra en lotes (ver services/maintenance.py): --dry-run para ver cuántas
+noticias se eliminarían, --chunk-size/--pause para limitar la carga y, si se
+interrumpe, la próxima corrida sigue desde el último lote.
 """
 
-import os
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
 from dotenv import load_dotenv
-from supabase import create_client
 
 load_dotenv()
 
-# Conectar a Supabase
-supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_ANON_KEY")
-)
+from database import get_news_repository
+from services.maintenance import add_job_arguments, job_from_args, print_distribution
+
+TEST_SOURCES = ["Test Source"]
+
+
+def main():
+    parser = add_job_arguments(argparse.ArgumentParser(description="Eliminar noticias de prueba"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-print("🗑️  Limpiando datos de prueba de Supabase...")
+    repo = get_news_repository()
 
-# Eliminar todas las noticias de "Test Source"
-result = supabase.table("news").delete().eq("source", "Test Source").execute()
-print(f"✅ Eliminadas {len(result.data)} noticias de 'Test Source'")
+    print("🗑️  Limpiando datos de prueba...")
 
-# Opcional: Eliminar TODAS las noticias para empezar limpio
-# Descomenta si querés borrar todo:
-# result = supabase.table("news").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
-# print(f"✅ Base de datos limpiada: {len(result.data)} noticias eliminadas")
+    for source in TEST_SOURCES:
+        name = "clean_test_data_" + source.lower().replace(" ", "_")
+        job = job_from_args(name, repo, args, filters={"source": source})
+        result = job.run()
+        if args.dry_run:
+            print(f"🔍 [dry-run] Se eliminarían {result['matched']} noticias de '{source}'")
+        else:
+            print(f"✅ Eliminadas {result['changed']} noticias de '{source}'")
 
-print("\n📊 Conteo actual por fuente:")
-result = supabase.table("news").select("source").execute()
-sources = {}
-for row in result.data:
-    source = row['source']
-    sources[source] = sources.get(source, 0) + 1
+    print("\n📊 Conteo actual por fuente:")
+    print_distribution(repo, "source")
 
-for source, count in sorted(sources.items()):
-    print(f"  {source}: {count} noticias")
 
-print(f"\n✅ Total: {len(result.data)} noticias en la base de datos")
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
-"""Database package for Supabase integration."""
+"""Database package: storage backends behind a common repository interface."""
 
 from .supabase_client import get_supabase_client
+from .base import BaseNewsRepository, NEWS_COLUMNS
 from .repositories import NewsRepository
+from .sqlite_repository import SQLiteNewsRepository
+from .cache import QueryCache, CachedNewsRepository
+from .factory import get_news_repository, reset_news_repository
 
-__all__ = ["get_supabase_client", "NewsRepository"]
+__all__ = [
+    "get_supabase_client",
+    "BaseNewsRepository",
+    "NewsRepository",
+    "SQLiteNewsRepository",
+    "QueryCache",
+    "CachedNewsRepository",
+    "get_news_repository",
+    "reset_news_repository",
+    "NEWS_COLUMNS",
+]
@@ -0,0 +1,617 @@
+"""Direct Postgres storage backend (asyncpg) for bulk ingest and reanalysis."""
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, List, Optional, Dict, Sequence, Union
+from uuid import UUID
+
+import asyncpg
+
+from models.news import News
+from models.commodity import COMMODITIES, parse_commodities
+from .base import (
+    BaseNewsRepository, NEWS_COLUMNS, ANALYTICS_COLUMNS, invalidate_sources_cache, cached_sources,
+    validate_columns, news_to_row, enriched_to_row,
+    SentimentUpdate, BULK_UPDATE_CHUNK_SIZE, apply_in_chunks,
+    GROUP_BY_COLUMNS, validate_maintenance_columns
+)
+
+logger = logging.getLogger(__name__)
+
+# Columns a write may set, in COPY order (id and timestamps come from defaults)
+WRITABLE_COLUMNS = (
+    "title", "source", "url", "published_at", "sentiment", "confidence", "commodity", "commodities",
+)
+
+# Binary COPY target. ord keeps the batch order so the last duplicate URL wins,
+# like consecutive PostgREST upserts would.
+STAGING_SQL = """
+CREATE TEMP TABLE news_staging (
+    ord INTEGER NOT NULL,
+    title TEXT,
+    source TEXT,
+    url TEXT,
+    published_at TIMESTAMPTZ,
+    sentiment TEXT,
+    confidence FLOAT8,
+    commodity TEXT,
+    commodities TEXT[]
+) ON COMMIT DROP
+"""
+
+COUNT_BY_SENTIMENT_SQL = "SELECT sentiment, COUNT(*) AS n FROM news GROUP BY sentiment"
+SOURCES_SQL = (
+    "SELECT source, article_count, last_seen_at FROM news_sources "
+    "WHERE article_count > 0 ORDER BY source"
+)
+UPDATE_SENTIMENT_SQL = "UPDATE news SET sentiment = $2, confidence = $3 WHERE id = $1 RETURNING {columns}"
+DELETE_SQL = "DELETE FROM news WHERE id = $1"
+SEARCH_SQL = "SELECT * FROM search_news($1, $2, $3, $4, $5, $6, $7)"
+GET_STATE_SQL = "SELECT value::text AS value FROM app_state WHERE key = $1"
+PUT_STATE_SQL = (
+    "INSERT INTO app_state (key, value, updated_at) VALUES ($1, $2::jsonb, NOW()) "
+    "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at"
+)
+
+# One statement per chunk: the updates travel as four parallel arrays
+BULK_UPDATE_SENTIMENT_SQL = """
+UPDATE news SET
+    sentiment = u.sentiment,
+    confidence = u.confidence,
+    commodity = COALESCE(u.commodity, news.commodity)
+FROM unnest($1::uuid[], $2::text[], $3::numeric[], $4::text[]) AS u(id, sentiment, confidence, commodity)
+WHERE news.id = u.id
+  AND (news.sentiment, news.confidence, news.commodity)
+      IS DISTINCT FROM (u.sentiment, round(u.confidence, 2), COALESCE(u.commodity, news.commodity))
+"""
+
+
+def to_datetime(value: Union[datetime, str, None]) -> Optional[datetime]:
+    """
+    Parse an ISO-8601 timestamp (or date) for a TIMESTAMPTZ parameter.
+
+    Naive values are taken as UTC, like the ISO strings PostgREST receives.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def range_where(filters: Dict[str, Any], after_id: Optional[str], last_id: Optional[str], params: List) -> str:
+    """
+    WHERE text for maintenance filters and a keyset id range.
+
+    Appends the parameter values to `params` (numbered after the ones
+    already there).
+    """
+    conditions = []
+    for column, value in filters.items():
+        if value is None:
+            conditions.append(f"{column} IS NULL")
+        else:
+            params.append(value)
+            conditions.append(f"{column} = ${len(params)}")
+    if after_id is not None:
+        params.append(UUID(after_id))
+        conditions.append(f"id > ${len(params)}")
+    if last_id is not None:
+        params.append(UUID(last_id))
+        conditions.append(f"id <= ${len(params)}")
+    return " AND ".join(conditions) or "TRUE"
+
+
+def record_to_dict(record: asyncpg.Record) -> Dict:
+    """Convert a result record to the same JSON-ready shape PostgREST returns."""
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        row[key] = value
+    return row
+
+
+class AsyncpgNewsRepository(BaseNewsRepository):
+    """
+    News repository talking to Postgres directly through an asyncpg pool.
+
+    Bulk writes are sent with binary COPY into a temporary staging table and
+    merged with one INSERT ... ON CONFLICT (url), so a backfill of tens of
+    thousands of rows is a handful of round trips instead of JSON requests.
+    Reads use fixed SQL texts, which asyncpg prepares once per connection and
+    reuses from its statement cache.
+
+    The pool lives on a private event loop thread and the public methods are
+    synchronous, matching the other backends.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10):
+        """
+        Connect the pool.
+
+        Args:
+            dsn: Postgres connection string (e.g. DATABASE_URL)
+            min_size: Minimum pool connections
+            max_size: Maximum pool connections
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="asyncpg-repository", daemon=True
+        )
+        self._thread.start()
+
+        self.pool = self._run(self._create_pool(dsn, min_size, max_size))
+        logger.info("asyncpg news repository ready")
+
+    @staticmethod
+    async def _create_pool(dsn: str, min_size: int, max_size: int) -> asyncpg.Pool:
+        return await asyncpg.create_pool(dsn, min_size=min_size, max_size=max_size)
+
+    def _run(self, coro):
+        """Run a coroutine on the pool's event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the pool and stop the event loop thread."""
+        self._run(self.pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    async def _fetch(self, sql: str, *params) -> List[Dict]:
+        async with self.pool.acquire() as conn:
+            return [record_to_dict(r) for r in await conn.fetch(sql, *params)]
+
+    def _select(self, columns: Sequence[str], where: str = "", order: bool = True) -> str:
+        """SELECT text for a projection; identical texts share a prepared statement."""
+        sql = f"SELECT {', '.join(validate_columns(columns))} FROM news"
+        if where:
+            sql += f" WHERE {where}"
+        if order:
+            sql += " ORDER BY published_at DESC"
+        return sql
+
+    # ------------------------------------------------------------------
+    # Bulk writes
+    # ------------------------------------------------------------------
+
+    async def _copy_merge(self, rows: List[Dict], upsert: bool, returning: Sequence[str]) -> List[Dict]:
+        """
+        COPY rows into the staging table and merge them into news.
+
+        Rows are grouped by the columns they carry so that, like a PostgREST
+        upsert, a conflict only overwrites the columns that were sent, and only
+        when one of them actually changes. Sets ``last_upsert_stats``.
+        """
+        groups: Dict[tuple, List[tuple]] = {}
+        for ord_, row in enumerate(rows):
+            columns = tuple(c for c in WRITABLE_COLUMNS if c in row)
+            values = tuple(
+                to_datetime(row[c]) if c == "published_at" else row[c]
+                for c in columns
+            )
+            groups.setdefault(columns, []).append((ord_,) + values)
+
+        written = []
+        written_count = 0
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(STAGING_SQL)
+
+                for columns, records in groups.items():
+                    await conn.copy_records_to_table(
+                        "news_staging", records=records, columns=("ord",) + columns
+                    )
+
+                    column_list = ", ".join(columns)
+                    sql = (
+                        f"INSERT INTO news ({column_list}) "
+                        f"SELECT DISTINCT ON (url) {column_list} FROM news_staging "
+                        f"ORDER BY url, ord DESC"
+                    )
+                    if upsert:
+                        updated = [c for c in columns if c != "url"]
+                        sql += (
+                            f" ON CONFLICT (url) DO UPDATE SET "
+                            f"{', '.join(f'{c} = EXCLUDED.{c}' for c in updated)} "
+                            # Skip rows the upsert would not change (no new tuple, no WAL)
+                            f"WHERE ({', '.join(f'news.{c}' for c in updated)}) "
+                            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in updated)})"
+                        )
+                    if returning:
+                        sql += f" RETURNING {', '.join(validate_columns(returning))}"
+                        records = await conn.fetch(sql)
+                        written_count += len(records)
+                        written.extend(record_to_dict(r) for r in records)
+                    else:
+                        status = await conn.execute(sql)   # "INSERT 0 <rows>"
+                        written_count += int(status.split()[-1])
+                    await conn.execute("TRUNCATE news_staging")
+
+        self.last_upsert_stats = {"written": written_count, "skipped": len(rows) - written_count}
+        return written
+
+    def bulk_upsert(self, rows: List[Dict], returning: Sequence[str] = ("id",)) -> List[Dict]:
+        """
+        Upsert news rows by URL through binary COPY.
+
+        Args:
+            rows: Row dicts as produced by news_to_row/enriched_to_row
+            returning: Columns to return for the written rows (empty for none)
+
+        Returns:
+            Written rows (only `returning` columns)
+        """
+        written = self._run(self._copy_merge(rows, upsert=True, returning=returning))
+        invalidate_sources_cache()
+        return written
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def create(self, news: News, sentiment: str = None, confidence: float = None) -> Dict:
+        """
+        Create a new news article in the database.
+
+        Raises:
+            asyncpg.UniqueViolationError: If the URL already exists
+        """
+        try:
+            row = news_to_row(news)
+            row["sentiment"] = sentiment
+            row["confidence"] = confidence
+            written = self._run(self._copy_merge([row], upsert=False, returning=NEWS_COLUMNS))
+
+            invalidate_sources_cache()
+            logger.info(f"Created news: {news.title[:50]}...")
+            return written[0] if written else None
+
+        except Exception as e:
+            logger.error(f"Failed to create news '{news.title}': {e}")
+            raise
+
+    def create_batch(self, enriched_news: List[Dict]) -> List[Dict]:
+        """Create multiple news articles with one COPY."""
+        try:
+            rows = [enriched_to_row(item) for item in enriched_news]
+            written = self._run(self._copy_merge(rows, upsert=False, returning=NEWS_COLUMNS))
+
+            invalidate_sources_cache()
+            logger.info(f"Created {len(written)} news articles in batch")
+            return written
+
+        except Exception as e:
+            logger.error(f"Failed to create batch: {e}")
+            raise
+
+    def upsert_news(self, news_list: List[News], sentiment_data: Dict[str, Dict] = None) -> List[Dict]:
+        """Upsert news articles by URL (see NewsRepository.upsert_news)."""
+        try:
+            rows = [news_to_row(news, (sentiment_data or {}).get(str(news.url))) for news in news_list]
+            written = self.bulk_upsert(rows, returning=NEWS_COLUMNS)
+
+            logger.info(
+                f"Upserted {self.last_upsert_stats['written']} news articles "
+                f"({self.last_upsert_stats['skipped']} unchanged skipped)"
+            )
+            return written
+
+        except Exception as e:
+            logger.error(f"Failed to upsert news: {e}")
+            raise
+
+    def search(
+        self,
+        query: str,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """Full-text search over headlines (see NewsRepository.search)."""
+        try:
+            rows = self._run(self._fetch(
+                SEARCH_SQL,
+                query,
+                list(source) if source else None,
+                sentiment.upper() if sentiment else None,
+                (parse_commodities(commodity) or [commodity.upper()]) if commodity else None,
+                to_datetime(date_from),
+                to_datetime(date_to),
+                limit
+            ))
+            return rows
+
+        except Exception as e:
+            logger.error(f"Failed to search news for '{query}': {e}")
+            return []
+
+    def get_changed_since(
+        self,
+        updated_after: Optional[str] = None,
+        after_id: Optional[str] = None,
+        published_after: Optional[str] = None,
+        limit: int = 1000,
+        columns: Sequence[str] = ANALYTICS_COLUMNS
+    ) -> List[Dict]:
+        """Rows written after (updated_after, after_id), ordered by (updated_at, id)."""
+        where, params = [], []
+        if published_after:
+            params.append(to_datetime(published_after))
+            where.append(f"published_at >= ${len(params)}")
+        if updated_after and after_id:
+            params.extend([to_datetime(updated_after), after_id])
+            where.append(f"(updated_at, id) > (${len(params) - 1}, ${len(params)}::uuid)")
+        elif updated_after:
+            params.append(to_datetime(updated_after))
+            where.append(f"updated_at > ${len(params)}")
+        params.append(limit)
+        sql = self._select(columns, " AND ".join(where), order=False)
+        return self._run(self._fetch(f"{sql} ORDER BY updated_at, id LIMIT ${len(params)}", *params))
+
+    def update_sentiment(self, news_id: str, sentiment: str, confidence: float) -> Dict:
+        """Update sentiment analysis for a news article."""
+        try:
+            rows = self._run(self._fetch(
+                UPDATE_SENTIMENT_SQL.format(columns=", ".join(NEWS_COLUMNS)),
+                UUID(news_id), sentiment, confidence
+            ))
+
+            logger.info(f"Updated sentiment for news {news_id}: {sentiment} ({confidence})")
+            # No row when the guard skipped an unchanged update
+            return rows[0] if rows else self.get_by_id(news_id)
+
+        except Exception as e:
+            logger.error(f"Failed to update sentiment for {news_id}: {e}")
+            raise
+
+    async def _bulk_update(self, chunk: Sequence[SentimentUpdate]) -> int:
+        ids, sentiments, confidences, commodities = zip(*chunk)
+        async with self.pool.acquire() as conn:
+            status = await conn.execute(
+                BULK_UPDATE_SENTIMENT_SQL,
+                [UUID(i) for i in ids], list(sentiments),
+                [None if c is None else Decimal(str(c)) for c in confidences], list(commodities)
+            )
+        return int(status.split()[-1])   # "UPDATE <rows>"
+
+    def bulk_update_sentiment(
+        self,
+        updates: Sequence[SentimentUpdate],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> Dict:
+        """Update many articles, one UPDATE ... FROM unnest() per chunk."""
+        report = apply_in_chunks(updates, chunk_size, lambda chunk: self._run(self._bulk_update(chunk)))
+        invalidate_sources_cache()
+        logger.info(
+            f"Bulk sentiment update: {report['updated']} updated, "
+            f"{report['unchanged']} unchanged, {report['failed']} failed"
+        )
+        return report
+
+    def delete(self, news_id: str) -> bool:
+        """Delete a news article."""
+        try:
+            self._run(self._fetch(DELETE_SQL, UUID(news_id)))
+
+            invalidate_sources_cache()
+            logger.info(f"Deleted news {news_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete news {news_id}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_by_id(self, news_id: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get a news article by ID."""
+        try:
+            rows = self._run(self._fetch(self._select(columns, "id = $1", order=False), UUID(news_id)))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Failed to get news by ID {news_id}: {e}")
+            return None
+
+    def get_by_url(self, url: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get a news article by URL."""
+        try:
+            rows = self._run(self._fetch(self._select(columns, "url = $1", order=False), url))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Failed to get news by URL: {e}")
+            return None
+
+    def get_all(self, limit: int = 100, offset: int = 0, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get all news articles with pagination, newest first."""
+        try:
+            return self._run(self._fetch(self._select(columns) + " LIMIT $1 OFFSET $2", limit, offset))
+
+        except Exception as e:
+            logger.error(f"Failed to get all news: {e}")
+            return []
+
+    def get_by_sentiment(self, sentiment: str, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get news articles by sentiment, newest first."""
+        try:
+            return self._run(self._fetch(
+                self._select(columns, "sentiment = $1") + " LIMIT $2", sentiment, limit
+            ))
+
+        except Exception as e:
+            logger.error(f"Failed to get news by sentiment {sentiment}: {e}")
+            return []
+
+    def get_unclassified(self, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get the newest articles still waiting for sentiment analysis."""
+        try:
+            return self._run(self._fetch(self._select(columns, "sentiment IS NULL") + " LIMIT $1", limit))
+
+        except Exception as e:
+            logger.error(f"Failed to get unclassified news: {e}")
+            return []
+
+    def get_recent(self, hours: int = 24, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get news articles published in the last N hours."""
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+            return self._run(self._fetch(
+                self._select(columns, "published_at >= $1") + " LIMIT $2", cutoff, limit
+            ))
+
+        except Exception as e:
+            logger.error(f"Failed to get recent news: {e}")
+            return []
+
+    def get_filtered(
+        self,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
+        """
+        Get news articles with multiple filters (see NewsRepository.get_filtered).
+
+        Known commodity labels are inlined as literals: a generic prepared plan
+        with a ``commodities @> $n`` parameter could not use the per-commodity
+        partial indexes.
+        """
+        try:
+            where, params = [], []
+
+            if source:
+                params.append([source] if isinstance(source, str) else list(source))
+                where.append(f"source = ANY(${len(params)}::text[])")
+
+            if sentiment:
+                params.append(sentiment.upper())
+                where.append(f"sentiment = ${len(params)}")
+
+            if commodity:
+                labels = parse_commodities(commodity)
+                if labels and all(label in COMMODITIES for label in labels):
+                    literal = ", ".join(f"'{label}'" for label in labels)
+                    where.append(f"commodities @> ARRAY[{literal}]::text[]")
+                else:
+                    # Unknown labels match nothing rather than silently dropping the filter
+                    params.append([commodity.upper()])
+                    where.append(f"commodities @> ${len(params)}::text[]")
+
+            if date_from:
+                params.append(to_datetime(date_from))
+                where.append(f"published_at >= ${len(params)}")
+
+            if date_to:
+                params.append(to_datetime(date_to))
+                where.append(f"published_at <= ${len(params)}")
+
+            params.append(limit)
+            sql = self._select(columns, " AND ".join(where)) + f" LIMIT ${len(params)}"
+            return self._run(self._fetch(sql, *params))
+
+        except Exception as e:
+            logger.error(f"Error getting filtered news: {e}")
+            return []
+
+    def scan_ids(self, filters: Dict[str, Any], after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """Next chunk of matching IDs (keyset pagination on the primary key)."""
+        validate_maintenance_columns(list(filters))
+        params: List = []
+        where = range_where(filters, after_id, None, params)
+        params.append(limit)
+        rows = self._run(self._fetch(f"SELECT id FROM news WHERE {where} ORDER BY id LIMIT ${len(params)}", *params))
+        return [row["id"] for row in rows]
+
+    def update_range(self, filters: Dict[str, Any], values: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Set `values` on the matching rows in (after_id, last_id]; returns rows changed."""
+        validate_maintenance_columns(list(filters) + list(values))
+        params = list(values.values())
+        assignments = ", ".join(f"{c} = ${i}" for i, c in enumerate(values, 1))
+        where = range_where(filters, after_id, last_id, params)
+        sql = f"UPDATE news SET {assignments} WHERE {where}"
+
+        async def execute() -> str:
+            async with self.pool.acquire() as conn:
+                return await conn.execute(sql, *params)
+
+        changed = int(self._run(execute()).split()[-1])   # "UPDATE <rows>"
+        invalidate_sources_cache()
+        return changed
+
+    def delete_range(self, filters: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Delete the matching rows in (after_id, last_id]; returns rows deleted."""
+        validate_maintenance_columns(list(filters))
+        params: List = []
+        sql = f"DELETE FROM news WHERE {range_where(filters, after_id, last_id, params)}"
+
+        async def execute() -> str:
+            async with self.pool.acquire() as conn:
+                return await conn.execute(sql, *params)
+
+        deleted = int(self._run(execute()).split()[-1])   # "DELETE <rows>"
+        invalidate_sources_cache()
+        return deleted
+
+    def count_by(self, column: str) -> Dict[str, int]:
+        """Article count per value of a GROUP_BY_COLUMNS column."""
+        if column not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Cannot group by '{column}'")
+        rows = self._run(self._fetch(f"SELECT {column}::text AS value, COUNT(*) AS n FROM news GROUP BY 1 ORDER BY 2 DESC"))
+        return {(row["value"] or "NULL"): row["n"] for row in rows}
+
+    def count_by_sentiment(self) -> Dict[str, int]:
+        """Get count of articles by sentiment (aggregated in SQL)."""
+        try:
+            counts = {"ALCISTA": 0, "BAJISTA": 0, "NEUTRAL": 0, "NULL": 0}
+            for row in self._run(self._fetch(COUNT_BY_SENTIMENT_SQL)):
+                sentiment = row["sentiment"] or "NULL"
+                if sentiment in counts:
+                    counts[sentiment] += row["n"]
+            return counts
+
+        except Exception as e:
+            logger.error(f"Failed to count by sentiment: {e}")
+            return {}
+
+    def get_sources(self) -> List[Dict]:
+        """Get every news source from the registry (cached in memory)."""
+        try:
+            return cached_sources(lambda: self._run(self._fetch(SOURCES_SQL)))
+
+        except Exception as e:
+            logger.error(f"Failed to get sources: {e}")
+            return []
+
+    def get_state(self, key: str) -> Optional[Dict]:
+        """JSON document stored under `key`, or None."""
+        rows = self._run(self._fetch(GET_STATE_SQL, key))
+        return json.loads(rows[0]["value"]) if rows else None
+
+    def put_state(self, key: str, value: Dict) -> None:
+        """Store (replace) the JSON document under `key`."""
+        async def execute() -> None:
+            async with self.pool.acquire() as conn:
+                await conn.execute(PUT_STATE_SQL, key, json.dumps(value))
+
+        self._run(execute())
@@ -0,0 +1,379 @@
+"""Storage-agnostic repository interface and shared helpers."""
+
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, List, Optional, Dict, Sequence, Tuple
+
+from models.news import News
+from models.commodity import parse_commodities
+
+# Column sets for projections. Each query asks the backend only for the
+# columns its caller reads instead of every column.
+NEWS_COLUMNS = (
+    "id", "title", "source", "url", "published_at",
+    "sentiment", "confidence", "commodity", "commodities", "created_at", "updated_at",
+)
+# Columns the in-memory analytics store keeps (services/article_store.py)
+ANALYTICS_COLUMNS = ("id", "source", "published_at", "sentiment", "confidence", "commodities", "updated_at")
+
+# Columns maintenance jobs may filter on, set or aggregate by (see
+# scan_ids/update_range/delete_range/count_by and migration 008).
+MAINTENANCE_COLUMNS = ("title", "source", "url", "sentiment", "confidence", "commodity")
+GROUP_BY_COLUMNS = ("source", "sentiment", "commodity")
+
+
+# In-memory copy of the news_sources registry, shared by every repository in
+# the process. Invalidated by writes; the TTL bounds staleness when another
+# process ingests.
+SOURCES_CACHE_TTL_SECONDS = 300
+_sources_cache: Optional[List[Dict]] = None
+_sources_cached_at = 0.0
+
+
+def invalidate_sources_cache() -> None:
+    """Drop the cached source registry (called after ingestion writes)."""
+    global _sources_cache
+    _sources_cache = None
+
+
+def cached_sources(loader: Callable[[], List[Dict]]) -> List[Dict]:
+    """
+    Return the cached source registry, calling `loader` on a miss.
+
+    Args:
+        loader: Backend query returning the registry rows
+
+    Returns:
+        List of {"source", "article_count", "last_seen_at"} rows
+    """
+    global _sources_cache, _sources_cached_at
+
+    if _sources_cache is not None and time.monotonic() - _sources_cached_at < SOURCES_CACHE_TTL_SECONDS:
+        return _sources_cache
+
+    _sources_cache = loader()
+    _sources_cached_at = time.monotonic()
+    return _sources_cache
+
+
+def validate_columns(columns: Sequence[str]) -> Sequence[str]:
+    """
+    Check that a projection only names known news columns.
+
+    Args:
+        columns: Column names, all of them part of NEWS_COLUMNS
+
+    Returns:
+        The same columns
+
+    Raises:
+        ValueError: If a column is not a known news column
+    """
+    unknown = [c for c in columns if c not in NEWS_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown news columns: {', '.join(unknown)}")
+    return columns
+
+
+def validate_maintenance_columns(columns: Sequence[str]) -> Sequence[str]:
+    """
+    Check that a maintenance filter or update only names plain news columns.
+
+    Raises:
+        ValueError: If a column is not in MAINTENANCE_COLUMNS
+    """
+    unknown = [c for c in columns if c not in MAINTENANCE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Columns not allowed in maintenance jobs: {', '.join(unknown)}")
+    return columns
+
+
+def content_hash(title: str, sentiment: Optional[str], confidence: Optional[float], commodity: Optional[str]) -> str:
+    """
+    Hash of an article's analyzable content (see migration 006).
+
+    Matches the news_content_hash() SQL function: confidence is formatted
+    as stored (two decimals, rounded half up).
+
+    Returns:
+        md5 hex digest of "title|sentiment|confidence|commodity"
+    """
+    if confidence is None:
+        confidence_text = ""
+    else:
+        confidence_text = str(Decimal(str(confidence)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    canonical = "|".join([title, sentiment or "", confidence_text, commodity or ""])
+    return hashlib.md5(canonical.encode("utf-8")).hexdigest()
+
+
+def news_to_row(news: News, sentiment_info: Optional[Dict] = None) -> Dict:
+    """
+    Convert a scraped News object (plus optional analysis) into a news row.
+
+    Args:
+        news: News dataclass
+        sentiment_info: Optional {"sentiment", "confidence", "commodity"} dict
+
+    Returns:
+        Row dict ready for insert/upsert (timestamps as ISO strings)
+    """
+    row = asdict(news)
+
+    # Convert URL to string if it's not already
+    row["url"] = str(row["url"])
+
+    # Convert datetime to ISO string if present
+    if row.get("published_at"):
+        row["published_at"] = row["published_at"].isoformat()
+
+    if sentiment_info:
+        row["sentiment"] = sentiment_info.get("sentiment")
+        row["confidence"] = sentiment_info.get("confidence")
+        row["commodity"] = sentiment_info.get("commodity", "GENERAL")
+        row["commodities"] = parse_commodities(row["commodity"])
+
+    return row
+
+
+def enriched_to_row(item: Dict) -> Dict:
+    """
+    Convert an analyzer output dict (news data + sentiment) into a news row.
+
+    Args:
+        item: Dict as produced by SentimentAnalyzer.analyze_news
+
+    Returns:
+        Row dict ready for insert
+    """
+    return {
+        "title": item["title"],
+        "source": item["source"],
+        "url": str(item["url"]),
+        "published_at": item["published_at"].isoformat() if item.get("published_at") else None,
+        "sentiment": item.get("sentiment"),
+        "confidence": item.get("confidence"),
+        "commodity": item.get("commodity", "GENERAL"),
+        "commodities": parse_commodities(item.get("commodity", "GENERAL"))
+    }
+
+
+# (news_id, sentiment, confidence, commodity or None to keep the current one)
+SentimentUpdate = Tuple[str, Optional[str], Optional[float], Optional[str]]
+BULK_UPDATE_CHUNK_SIZE = 500
+
+
+def apply_in_chunks(
+    updates: Sequence[SentimentUpdate],
+    chunk_size: int,
+    apply_chunk: Callable[[Sequence[SentimentUpdate]], int]
+) -> Dict:
+    """
+    Apply bulk updates chunk by chunk, recording each chunk's outcome.
+
+    A failing chunk is reported and the remaining chunks still run.
+
+    Args:
+        updates: Updates to apply
+        chunk_size: Updates per statement/request
+        apply_chunk: Backend call applying one chunk; returns rows changed
+
+    Returns:
+        {"updated", "unchanged", "failed", "chunks": [{"chunk", "rows",
+        "updated", "error"}]}; unchanged also counts unknown IDs
+    """
+    report = {"updated": 0, "unchanged": 0, "failed": 0, "chunks": []}
+    for index, start in enumerate(range(0, len(updates), max(chunk_size, 1))):
+        chunk = updates[start:start + chunk_size]
+        entry = {"chunk": index, "rows": len(chunk), "updated": 0, "error": None}
+        try:
+            entry["updated"] = apply_chunk(chunk)
+            report["updated"] += entry["updated"]
+            report["unchanged"] += len(chunk) - entry["updated"]
+        except Exception as e:
+            entry["error"] = str(e)
+            report["failed"] += len(chunk)
+        report["chunks"].append(entry)
+    return report
+
+
+class BaseNewsRepository(ABC):
+    """
+    Interface shared by every news storage backend.
+
+    Implementations return rows as plain dicts with the NEWS_COLUMNS keys
+    (timestamps as ISO-8601 strings, commodities as a list), so routers and
+    scripts work unchanged whichever backend is configured.
+
+    Upserts skip rows whose content did not change; after each upsert_news
+    call ``last_upsert_stats`` holds {"written": n, "skipped": m}.
+    """
+
+    last_upsert_stats: Optional[Dict[str, int]] = None
+
+    @abstractmethod
+    def create(self, news: News, sentiment: str = None, confidence: float = None) -> Dict:
+        """Insert a single article and return the created row."""
+        pass
+
+    @abstractmethod
+    def create_batch(self, enriched_news: List[Dict]) -> List[Dict]:
+        """Insert analyzer output dicts and return the created rows."""
+        pass
+
+    @abstractmethod
+    def upsert_news(self, news_list: List[News], sentiment_data: Dict[str, Dict] = None) -> List[Dict]:
+        """Insert or update articles by URL and return the written rows."""
+        pass
+
+    @abstractmethod
+    def get_by_id(self, news_id: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get an article by ID, or None."""
+        pass
+
+    @abstractmethod
+    def get_by_url(self, url: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get an article by URL, or None."""
+        pass
+
+    def exists(self, url: str) -> bool:
+        """Check if an article already exists by URL."""
+        return self.get_by_url(url, columns=("id",)) is not None
+
+    @abstractmethod
+    def get_all(self, limit: int = 100, offset: int = 0, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get the newest articles with pagination."""
+        pass
+
+    @abstractmethod
+    def get_by_sentiment(self, sentiment: str, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get the newest articles with a given sentiment."""
+        pass
+
+    @abstractmethod
+    def get_unclassified(self, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get the newest articles still waiting for sentiment analysis."""
+        pass
+
+    @abstractmethod
+    def get_recent(self, hours: int = 24, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get articles published in the last N hours."""
+        pass
+
+    @abstractmethod
+    def get_filtered(
+        self,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
+        """Get the newest articles matching every given filter."""
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Full-text search over headlines (Spanish stemming), best match first.
+
+        Takes the same filters as get_filtered. Rows carry every NEWS_COLUMNS
+        key plus "rank" (higher is better) and "headline" (the title with the
+        matched words wrapped in <b></b>).
+        """
+        pass
+
+    @abstractmethod
+    def get_changed_since(
+        self,
+        updated_after: Optional[str] = None,
+        after_id: Optional[str] = None,
+        published_after: Optional[str] = None,
+        limit: int = 1000,
+        columns: Sequence[str] = ANALYTICS_COLUMNS
+    ) -> List[Dict]:
+        """
+        Rows written after the keyset position (updated_after, after_id).
+
+        Ordered by (updated_at, id), so callers page through every insert and
+        update by passing the last row's updated_at and id back. Only articles
+        published at or after `published_after` are returned when it is given.
+        `columns` must include id and updated_at. Raises on backend errors.
+        """
+        pass
+
+    @abstractmethod
+    def update_sentiment(self, news_id: str, sentiment: str, confidence: float) -> Dict:
+        """Update the sentiment of one article and return the row."""
+        pass
+
+    @abstractmethod
+    def bulk_update_sentiment(
+        self,
+        updates: Sequence[SentimentUpdate],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> Dict:
+        """Update many articles, one statement per chunk; see apply_in_chunks."""
+        pass
+
+    @abstractmethod
+    def delete(self, news_id: str) -> bool:
+        """Delete an article; True on success."""
+        pass
+
+    # Maintenance primitives: keyset chunks over the primary key. `filters`
+    # maps MAINTENANCE_COLUMNS to values (None matches NULL); a chunk is the
+    # id range (after_id, last_id] of the rows matching them.
+
+    @abstractmethod
+    def scan_ids(self, filters: Dict[str, Any], after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """IDs of up to `limit` matching rows after `after_id`, in id order."""
+        pass
+
+    @abstractmethod
+    def update_range(self, filters: Dict[str, Any], values: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Set `values` on the matching rows of one chunk; returns rows changed."""
+        pass
+
+    @abstractmethod
+    def delete_range(self, filters: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Delete the matching rows of one chunk; returns rows deleted."""
+        pass
+
+    @abstractmethod
+    def count_by(self, column: str) -> Dict[str, int]:
+        """Article count per value of a GROUP_BY_COLUMNS column, aggregated server-side."""
+        pass
+
+    @abstractmethod
+    def count_by_sentiment(self) -> Dict[str, int]:
+        """Count articles per sentiment (NULL for unclassified)."""
+        pass
+
+    @abstractmethod
+    def get_sources(self) -> List[Dict]:
+        """List sources with article counts and last publication date."""
+        pass
+
+    @abstractmethod
+    def get_state(self, key: str) -> Optional[Dict]:
+        """JSON document stored under `key` in app_state, or None."""
+        pass
+
+    @abstractmethod
+    def put_state(self, key: str, value: Dict) -> None:
+        """Store (replace) the JSON document under `key` in app_state; raises on errors."""
+        pass
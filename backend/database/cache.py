@@ -0,0 +1,362 @@
+"""Read-through query cache wrapping a news repository."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, TYPE_CHECKING
+
+from models.news import News
+from models.commodity import parse_commodities
+from .base import BaseNewsRepository, NEWS_COLUMNS, ANALYTICS_COLUMNS, SentimentUpdate, BULK_UPDATE_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    from .invalidation import NewsChange
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 256
+
+# For caches keyed by data revisions: entries only go stale, the TTL just frees them
+REVISION_TTL_SECONDS = 6 * 3600.0
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and hit/miss/eviction counters.
+
+    Every invalidation bumps a generation counter; a value computed while an
+    invalidation happened is returned to its caller but not stored, so a read
+    racing a write can never put pre-write rows back in the cache.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttl_seconds: Lifetime of an entry
+            max_entries: Size bound; the least recently used entry is evicted
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` on a miss.
+
+        Cached values are shared between callers and must be treated as
+        read-only.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            predicate: Optional key filter; every entry is dropped when omitted
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            self._generation += 1
+            if predicate is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [k for k in self._entries if predicate(k)]
+                for k in keys:
+                    del self._entries[k]
+                dropped = len(keys)
+            self.invalidations += dropped
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def normalize_filters(
+    source=None, sentiment: str = None, commodity: str = None,
+    date_from: str = None, date_to: str = None
+) -> tuple:
+    """
+    Canonical, hashable form of get_filtered's filters.
+
+    Equivalent requests (source order, sentiment case, commodity spelling)
+    map to the same cache key.
+    """
+    if isinstance(source, str):
+        source = [source]
+    return (
+        ("source", tuple(sorted(set(source))) if source else None),
+        ("sentiment", sentiment.upper() if sentiment else None),
+        ("commodity", tuple(parse_commodities(commodity) or [commodity.upper()]) if commodity else None),
+        ("date_from", date_from or None),
+        ("date_to", date_to or None),
+    )
+
+
+class CachedNewsRepository(BaseNewsRepository):
+    """
+    Repository wrapper that serves repeated reads from a QueryCache.
+
+    Reads the dashboard repeats (lists, filters, stats) are cached under their
+    normalized parameters. Every write that goes through this wrapper clears
+    the cache once the backend call has returned, i.e. after the write
+    committed; a failed write leaves the cache untouched. Point lookups by URL
+    are not cached, so pipeline de-duplication always sees the database.
+    """
+
+    def __init__(self, inner: BaseNewsRepository, cache: QueryCache = None):
+        """
+        Args:
+            inner: Repository actually talking to the storage backend
+            cache: Cache to use (a default QueryCache if omitted)
+        """
+        self.inner = inner
+        self.cache = cache or QueryCache()
+
+    @property
+    def last_upsert_stats(self) -> Optional[Dict[str, int]]:
+        return self.inner.last_upsert_stats
+
+    def _cached(self, method: str, params: tuple, loader: Callable[[], Any]) -> Any:
+        return self.cache.get_or_load((method,) + params, loader)
+
+    def invalidate(self) -> int:
+        """Drop every cached query result."""
+        dropped = self.cache.invalidate()
+        logger.debug(f"Query cache invalidated ({dropped} entries)")
+        return dropped
+
+    def invalidate_change(self, change: "NewsChange") -> int:
+        """
+        Drop the cached results a write from another worker may have changed.
+
+        Filtered queries are kept when the change provably misses them (other
+        sources, commodities or publication days); every other cached query is
+        dropped. Subscribed to the InvalidationBus.
+        """
+        if change.is_everything:
+            return self.invalidate()
+
+        def affected(key) -> bool:
+            if key[0] not in ("get_filtered", "search"):
+                return True
+            filters = dict(key[1:6])
+            return (
+                change.touches_sources(filters["source"])
+                and change.touches_commodities(filters["commodity"])
+                and change.touches_range(filters["date_from"], filters["date_to"])
+            )
+
+        dropped = self.cache.invalidate(affected)
+        logger.debug(f"Query cache: {change.op} change dropped {dropped} entries")
+        return dropped
+
+    def close(self) -> None:
+        """Close the wrapped repository if it holds connections."""
+        if hasattr(self.inner, "close"):
+            self.inner.close()
+
+    # Writes: invalidate after the backend call returns
+
+    def create(self, news: News, sentiment: str = None, confidence: float = None) -> Dict:
+        result = self.inner.create(news, sentiment, confidence)
+        self.invalidate()
+        return result
+
+    def create_batch(self, enriched_news: List[Dict]) -> List[Dict]:
+        result = self.inner.create_batch(enriched_news)
+        self.invalidate()
+        return result
+
+    def upsert_news(self, news_list: List[News], sentiment_data: Dict[str, Dict] = None) -> List[Dict]:
+        result = self.inner.upsert_news(news_list, sentiment_data)
+        self.invalidate()
+        return result
+
+    def update_sentiment(self, news_id: str, sentiment: str, confidence: float) -> Dict:
+        result = self.inner.update_sentiment(news_id, sentiment, confidence)
+        self.invalidate()
+        return result
+
+    def bulk_update_sentiment(
+        self,
+        updates: Sequence[SentimentUpdate],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> Dict:
+        report = self.inner.bulk_update_sentiment(updates, chunk_size)
+        if report["updated"]:
+            self.invalidate()
+        return report
+
+    def update_range(self, filters: Dict[str, Any], values: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        changed = self.inner.update_range(filters, values, after_id, last_id)
+        if changed:
+            self.invalidate()
+        return changed
+
+    def delete_range(self, filters: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        deleted = self.inner.delete_range(filters, after_id, last_id)
+        if deleted:
+            self.invalidate()
+        return deleted
+
+    def delete(self, news_id: str) -> bool:
+        deleted = self.inner.delete(news_id)
+        if deleted:
+            self.invalidate()
+        return deleted
+
+    # Reads
+
+    def get_by_id(self, news_id: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        return self._cached(
+            "get_by_id", (news_id, tuple(columns)),
+            lambda: self.inner.get_by_id(news_id, columns=columns)
+        )
+
+    def get_by_url(self, url: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        return self.inner.get_by_url(url, columns=columns)
+
+    def get_all(self, limit: int = 100, offset: int = 0, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        return self._cached(
+            "get_all", (limit, offset, tuple(columns)),
+            lambda: self.inner.get_all(limit=limit, offset=offset, columns=columns)
+        )
+
+    def get_by_sentiment(self, sentiment: str, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        return self._cached(
+            "get_by_sentiment", (sentiment, limit, tuple(columns)),
+            lambda: self.inner.get_by_sentiment(sentiment, limit=limit, columns=columns)
+        )
+
+    def get_unclassified(self, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        return self._cached(
+            "get_unclassified", (limit, tuple(columns)),
+            lambda: self.inner.get_unclassified(limit=limit, columns=columns)
+        )
+
+    def get_recent(self, hours: int = 24, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        # The window is anchored when the entry is loaded; the TTL bounds the drift
+        return self._cached(
+            "get_recent", (hours, limit, tuple(columns)),
+            lambda: self.inner.get_recent(hours=hours, limit=limit, columns=columns)
+        )
+
+    def get_filtered(
+        self,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
+        filters = normalize_filters(source, sentiment, commodity, date_from, date_to)
+        return self._cached(
+            "get_filtered", filters + (limit, tuple(columns)),
+            lambda: self.inner.get_filtered(
+                source=source, sentiment=sentiment, commodity=commodity,
+                date_from=date_from, date_to=date_to, limit=limit, columns=columns
+            )
+        )
+
+    def search(
+        self,
+        query: str,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        filters = normalize_filters(source, sentiment, commodity, date_from, date_to)
+        return self._cached(
+            "search", filters + (" ".join(query.split()), limit),
+            lambda: self.inner.search(
+                query, source=source, sentiment=sentiment, commodity=commodity,
+                date_from=date_from, date_to=date_to, limit=limit
+            )
+        )
+
+    def get_changed_since(
+        self,
+        updated_after: Optional[str] = None,
+        after_id: Optional[str] = None,
+        published_after: Optional[str] = None,
+        limit: int = 1000,
+        columns: Sequence[str] = ANALYTICS_COLUMNS
+    ) -> List[Dict]:
+        # Change feeds must see the latest writes
+        return self.inner.get_changed_since(updated_after, after_id, published_after, limit, columns)
+
+    def count_by_sentiment(self) -> Dict[str, int]:
+        return self._cached("count_by_sentiment", (), self.inner.count_by_sentiment)
+
+    def scan_ids(self, filters: Dict[str, Any], after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        # Maintenance reads walk the table once; caching them would only evict hot entries
+        return self.inner.scan_ids(filters, after_id, limit)
+
+    def count_by(self, column: str) -> Dict[str, int]:
+        return self.inner.count_by(column)
+
+    def get_sources(self) -> List[Dict]:
+        # Already cached by the backends (see base.cached_sources)
+        return self.inner.get_sources()
+
+    # app_state documents are not news rows: read and written through
+    def get_state(self, key: str) -> Optional[Dict]:
+        return self.inner.get_state(key)
+
+    def put_state(self, key: str, value: Dict) -> None:
+        self.inner.put_state(key, value)
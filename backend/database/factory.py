@@ -0,0 +1,99 @@
+"""Storage backend selection."""
+
+import os
+import logging
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from .base import BaseNewsRepository
+from .cache import CachedNewsRepository, QueryCache, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+STORAGE_BACKENDS = ("supabase", "sqlite", "postgres")
+DEFAULT_SQLITE_PATH = Path(__file__).parent.parent / "agromate.db"
+
+# Global repository instance (lazy initialization)
+_repository: BaseNewsRepository = None
+_lock = threading.Lock()
+
+
+def create_news_repository(backend: str = None) -> BaseNewsRepository:
+    """
+    Build a news repository for the configured storage backend.
+
+    Args:
+        backend: "supabase", "sqlite" or "postgres". Defaults to the AGROMATE_STORAGE
+                 environment variable, then "supabase".
+
+    Returns:
+        New repository instance
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = (backend or os.getenv("AGROMATE_STORAGE") or "supabase").lower()
+
+    if backend == "supabase":
+        from .supabase_client import get_client
+        from .repositories import NewsRepository
+        return NewsRepository(get_client())
+
+    if backend == "sqlite":
+        from .sqlite_repository import SQLiteNewsRepository
+        return SQLiteNewsRepository(os.getenv("AGROMATE_SQLITE_PATH") or DEFAULT_SQLITE_PATH)
+
+    if backend == "postgres":
+        # Optional dependency: only needed for the direct Postgres backend
+        from .asyncpg_repository import AsyncpgNewsRepository
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            raise ValueError(
+                "DATABASE_URL not found in environment variables. "
+                "It is required when AGROMATE_STORAGE=postgres."
+            )
+        return AsyncpgNewsRepository(dsn)
+
+    raise ValueError(
+        f"Unknown AGROMATE_STORAGE '{backend}'. "
+        f"Expected one of: {', '.join(STORAGE_BACKENDS)}"
+    )
+
+
+def get_news_repository() -> BaseNewsRepository:
+    """
+    Get or create the shared news repository for the configured backend.
+
+    Reads are served through a CachedNewsRepository unless AGROMATE_CACHE_TTL
+    is 0.
+
+    Returns:
+        Shared repository instance
+    """
+    global _repository
+    if _repository is None:
+        with _lock:
+            if _repository is None:
+                repository = create_news_repository()
+                logger.info(f"News storage backend: {type(repository).__name__}")
+
+                ttl = float(os.getenv("AGROMATE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+                if ttl > 0:
+                    size = int(os.getenv("AGROMATE_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+                    repository = CachedNewsRepository(repository, QueryCache(ttl, size))
+                    logger.info(f"Query cache enabled (ttl={ttl:g}s, max_entries={size})")
+
+                _repository = repository
+    return _repository
+
+
+def reset_news_repository() -> None:
+    """Forget the shared repository (tests, backend switches)."""
+    global _repository
+    if _repository is not None and hasattr(_repository, "close"):
+        _repository.close()
+    _repository = None
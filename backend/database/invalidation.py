@@ -0,0 +1,280 @@
+"""Cross-worker invalidation bus (Postgres LISTEN/NOTIFY with a polling fallback)."""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "news_changes"
+REVISION_SQL = "SELECT revision FROM news_revision"
+
+DEFAULT_POLL_SECONDS = 5.0
+# While polling, how often to try LISTEN again
+DEFAULT_RELISTEN_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class NewsChange:
+    """
+    What a write touched, as sent by the news_changes trigger.
+
+    A None field means "unknown": matching treats it as touching every value.
+    ``days`` may contain None for articles without a publication date.
+    """
+
+    op: str
+    revision: Optional[int] = None
+    days: Optional[FrozenSet[Optional[str]]] = None
+    sources: Optional[FrozenSet[str]] = None
+    commodities: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def everything(cls, op: str = "all", revision: Optional[int] = None) -> "NewsChange":
+        """A change that matches every cached entry."""
+        return cls(op=op, revision=revision)
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "NewsChange":
+        """Parse a NOTIFY payload (falls back to everything on bad input)."""
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            logger.warning(f"Unreadable {CHANNEL} payload: {payload!r}")
+            return cls.everything()
+
+        if data.get("all"):
+            return cls.everything(data.get("op", "all"), data.get("revision"))
+
+        def as_set(key):
+            values = data.get(key)
+            return frozenset(values) if values is not None else None
+
+        return cls(
+            op=data.get("op", "unknown"),
+            revision=data.get("revision"),
+            days=as_set("days"),
+            sources=as_set("sources"),
+            commodities=as_set("commodities"),
+        )
+
+    @property
+    def is_everything(self) -> bool:
+        return self.days is None and self.sources is None and self.commodities is None
+
+    def touches_sources(self, sources) -> bool:
+        """True if rows of any of `sources` may have changed."""
+        return self.sources is None or not sources or bool(self.sources & set(sources))
+
+    def touches_commodities(self, commodities) -> bool:
+        """True if rows labelled with any of `commodities` may have changed."""
+        return self.commodities is None or not commodities or bool(self.commodities & set(commodities))
+
+    def touches_range(self, date_from: Optional[str], date_to: Optional[str]) -> bool:
+        """
+        True if a changed publication day falls in [date_from, date_to].
+
+        Bounds are widened by a day because the trigger reports UTC days while
+        callers may pass local dates or offsets.
+        """
+        if self.days is None or None in self.days or not (date_from or date_to):
+            return True
+        low = _shift_day(date_from, -1) if date_from else "0000-00-00"
+        high = _shift_day(date_to, 1) if date_to else "9999-99-99"
+        return any(low <= day <= high for day in self.days)
+
+
+def _shift_day(value: str, days: int) -> str:
+    """YYYY-MM-DD of an ISO timestamp/date shifted by `days` (unparsable: unbounded)."""
+    try:
+        day = datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+    except ValueError:
+        return "0000-00-00" if days < 0 else "9999-99-99"
+    return (day + timedelta(days=days)).isoformat()
+
+
+Subscriber = Callable[[NewsChange], None]
+
+
+class InvalidationBus:
+    """
+    Delivers NewsChange events from other workers to local subscribers.
+
+    Listens on the news_changes channel over a dedicated asyncpg connection.
+    When LISTEN is not possible (no direct connection, a transaction-mode
+    pooler, or the connection drops) it polls the news_revision counter every
+    ``poll_seconds`` instead and publishes an everything-change when it moves,
+    retrying LISTEN every ``relisten_seconds``. Runs on its own thread and
+    event loop; subscribers are called on that thread.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        revision_loader: Optional[Callable[[], int]] = None,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        relisten_seconds: float = DEFAULT_RELISTEN_SECONDS
+    ):
+        """
+        Args:
+            dsn: Direct Postgres DSN for LISTEN (and polling if no loader is given)
+            revision_loader: Optional callable returning news_revision.revision,
+                             used for polling (e.g. through PostgREST)
+            poll_seconds: Polling interval in fallback mode
+            relisten_seconds: How often to retry LISTEN while polling
+        """
+        if not dsn and revision_loader is None:
+            raise ValueError("InvalidationBus needs a dsn or a revision_loader")
+
+        self.dsn = dsn
+        self.revision_loader = revision_loader
+        self.poll_seconds = poll_seconds
+        self.relisten_seconds = relisten_seconds
+
+        self.mode = "stopped"
+        self.received = 0
+        self._subscribers: List[Subscriber] = []
+        self._revision: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Register a callback for every change."""
+        self._subscribers.append(callback)
+
+    def publish(self, change: NewsChange) -> None:
+        """Deliver a change to every subscriber (errors are logged, not raised)."""
+        self.received += 1
+        if change.revision is not None:
+            self._revision = max(self._revision or 0, change.revision)
+        for callback in self._subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Invalidation subscriber {callback!r} failed: {e}")
+
+    def start(self) -> "InvalidationBus":
+        """Start listening (or polling) on a background thread."""
+        if self._thread is not None:
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._stop = asyncio.Event()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._main(),),
+                                        name="invalidation-bus", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.mode = "stopped"
+
+    def stats(self) -> dict:
+        """Current mode, changes received and last known revision."""
+        return {"mode": self.mode, "received": self.received, "revision": self._revision}
+
+    async def _main(self) -> None:
+        while not self._stop.is_set():
+            if self.dsn:
+                try:
+                    await self._listen()
+                except Exception as e:
+                    logger.warning(f"LISTEN {CHANNEL} unavailable, polling instead: {e}")
+            if not self._stop.is_set():
+                await self._poll(self.relisten_seconds if self.dsn else None)
+
+    async def _listen(self) -> None:
+        """LISTEN until the connection is lost or the bus is stopped."""
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _conn: lost.set())
+        try:
+            await conn.add_listener(CHANNEL, lambda _c, _pid, _ch, payload: self.publish(
+                NewsChange.from_payload(payload)
+            ))
+            self.mode = "listen"
+            logger.info(f"Invalidation bus listening on {CHANNEL}")
+            # Changes may have been missed while not listening
+            self.publish(NewsChange.everything("resync"))
+
+            stop_wait = asyncio.ensure_future(self._stop.wait())
+            lost_wait = asyncio.ensure_future(lost.wait())
+            await asyncio.wait({stop_wait, lost_wait}, return_when=asyncio.FIRST_COMPLETED)
+            stop_wait.cancel()
+            lost_wait.cancel()
+            if lost.is_set():
+                logger.warning(f"LISTEN connection lost, polling {CHANNEL} revision")
+                self.publish(NewsChange.everything("resync"))
+        finally:
+            if not conn.is_closed():
+                await conn.close()
+
+    async def _load_revision(self) -> int:
+        if self.revision_loader is not None:
+            return await asyncio.get_running_loop().run_in_executor(None, self.revision_loader)
+
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        try:
+            return await conn.fetchval(REVISION_SQL)
+        finally:
+            await conn.close()
+
+    async def _poll(self, duration: Optional[float]) -> None:
+        """Poll the revision counter for `duration` seconds (forever if None)."""
+        self.mode = "poll"
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+
+        while not self._stop.is_set() and (deadline is None or loop.time() < deadline):
+            try:
+                revision = await self._load_revision()
+                if revision != self._revision:
+                    if self._revision is not None:
+                        self.publish(NewsChange.everything("poll", revision))
+                    self._revision = revision
+            except Exception as e:
+                logger.error(f"Failed to poll news revision: {e}")
+
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+def create_invalidation_bus() -> Optional[InvalidationBus]:
+    """
+    Build the bus from the environment.
+
+    DATABASE_URL enables LISTEN/NOTIFY (with polling fallback). Without it,
+    AGROMATE_INVALIDATION_POLL_SECONDS > 0 polls the revision counter through
+    Supabase/PostgREST. Returns None when neither is configured.
+    """
+    poll_seconds = float(os.getenv("AGROMATE_INVALIDATION_POLL_SECONDS", DEFAULT_POLL_SECONDS))
+    dsn = os.getenv("DATABASE_URL")
+    if dsn:
+        return InvalidationBus(dsn=dsn, poll_seconds=poll_seconds or DEFAULT_POLL_SECONDS)
+
+    if os.getenv("AGROMATE_INVALIDATION_POLL_SECONDS") and poll_seconds > 0:
+        from .supabase_client import get_client
+
+        def revision_loader() -> int:
+            response = get_client().table("news_revision").select("revision").execute()
+            return response.data[0]["revision"] if response.data else 0
+
+        return InvalidationBus(revision_loader=revision_loader, poll_seconds=poll_seconds)
+
+    return None
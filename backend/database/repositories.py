@@ -1,18 +1,63 @@
 """Data repositories for database operations."""
 
 import logging
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Sequence
 from datetime import datetime
 from supabase import Client
 
 from models.news import News
+from models.commodity import parse_commodities
+from .base import (
+    BaseNewsRepository, NEWS_COLUMNS, ANALYTICS_COLUMNS, invalidate_sources_cache,
+    cached_sources, validate_columns, news_to_row, enriched_to_row,
+    SentimentUpdate, BULK_UPDATE_CHUNK_SIZE, apply_in_chunks,
+    GROUP_BY_COLUMNS, validate_maintenance_columns
+)
 
 logger = logging.getLogger(__name__)
 
 
-class NewsRepository:
+def select_columns(columns: Sequence[str]) -> str:
     """
-    Repository for news articles CRUD operations with Supabase.
+    Build a PostgREST ``select`` string from a column set.
+    
+    Args:
+        columns: Column names, all of them part of NEWS_COLUMNS
+        
+    Returns:
+        Comma-separated projection (e.g. "id,title")
+        
+    Raises:
+        ValueError: If a column is not a known news column
+    """
+    return ",".join(validate_columns(columns))
+
+
+def filter_range(query, filters: Dict[str, Any], after_id: Optional[str] = None, last_id: Optional[str] = None):
+    """
+    Apply maintenance equality filters and a keyset id range to a query.
+    
+    Args:
+        query: PostgREST filter builder
+        filters: Column -> value (None matches NULL)
+        after_id: Exclusive lower id bound (None for the first chunk)
+        last_id: Inclusive upper id bound (None for no bound)
+        
+    Returns:
+        The filtered query
+    """
+    for column, value in filters.items():
+        query = query.is_(column, "null") if value is None else query.eq(column, value)
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    if last_id is not None:
+        query = query.lte("id", last_id)
+    return query
+
+
+class NewsRepository(BaseNewsRepository):
+    """
+    Repository for news articles CRUD operations with Supabase (PostgREST).
     """
     
     def __init__(self, client: Client):
@@ -24,6 +69,8 @@ class NewsRepository:
         """
         self.client = client
         self.table_name = "news"
+        self.sources_table_name = "news_sources"
+        self.state_table_name = "app_state"
     
     def create(self, news: News, sentiment: str = None, confidence: float = None) -> Dict:
         """
@@ -52,6 +99,7 @@ class NewsRepository:
             
             response = self.client.table(self.table_name).insert(data).execute()
             
+            invalidate_sources_cache()
             logger.info(f"Created news: {news.title[:50]}...")
             return response.data[0] if response.data else None
             
@@ -71,22 +119,12 @@ class NewsRepository:
         """
         try:
             # Prepare data for insertion
-            data_list = []
-            for item in enriched_news:
-                data = {
-                    "title": item["title"],
-                    "source": item["source"],
-                    "url": item["url"],
-                    "published_at": item["published_at"].isoformat() if item.get("published_at") else None,
-                    "sentiment": item.get("sentiment"),
-                    "confidence": item.get("confidence"),
-                    "commodity": item.get("commodity", "GENERAL")  # NUEVO
-                }
-                data_list.append(data)
+            data_list = [enriched_to_row(item) for item in enriched_news]
             
             # Insert batch
             response = self.client.table(self.table_name).insert(data_list).execute()
             
+            invalidate_sources_cache()
             logger.info(f"Created {len(data_list)} news articles in batch")
             return response.data
             
@@ -100,6 +138,8 @@ class NewsRepository:
         
         This method will insert new articles or update existing ones based on URL.
         Perfect for scraping operations where the same article might be scraped multiple times.
+        Rows whose content did not change are skipped by the database (see
+        migration 006); counts are left in ``last_upsert_stats``.
         
         Args:
             news_list: List of News dataclass objects to upsert
@@ -117,55 +157,44 @@ class NewsRepository:
             results = repo.upsert_news(news_list, sentiment_data)
         """
         try:
-            from dataclasses import asdict
-            
-            # Convert News dataclass objects to dictionaries
-            data_list = []
-            for news in news_list:
-                # Convert dataclass to dict
-                news_dict = asdict(news)
-                
-                # Convert URL to string if it's not already
-                news_dict["url"] = str(news_dict["url"])
-                
-                # Convert datetime to ISO string if present
-                if news_dict.get("published_at"):
-                    news_dict["published_at"] = news_dict["published_at"].isoformat()
-                
-                # Add sentiment data if provided
-                if sentiment_data and news_dict["url"] in sentiment_data:
-                    sentiment_info = sentiment_data[news_dict["url"]]
-                    news_dict["sentiment"] = sentiment_info.get("sentiment")
-                    news_dict["confidence"] = sentiment_info.get("confidence")
-                    news_dict["commodity"] = sentiment_info.get("commodity", "GENERAL")
-                
-                data_list.append(news_dict)
+            # Convert News dataclass objects to rows (with sentiment data if provided)
+            data_list = [
+                news_to_row(news, (sentiment_data or {}).get(str(news.url)))
+                for news in news_list
+            ]
             
             # Upsert with conflict resolution on URL
             response = self.client.table(self.table_name)\
                 .upsert(data_list, on_conflict="url")\
                 .execute()
             
-            logger.info(f"Upserted {len(data_list)} news articles (duplicates updated)")
+            # Unchanged rows are skipped by the news_content_hash_guard trigger
+            # and are not part of the returned representation
+            written = len(response.data)
+            self.last_upsert_stats = {"written": written, "skipped": len(data_list) - written}
+            
+            invalidate_sources_cache()
+            logger.info(f"Upserted {written} news articles ({len(data_list) - written} unchanged skipped)")
             return response.data
             
         except Exception as e:
             logger.error(f"Failed to upsert news: {e}")
             raise
     
-    def get_by_id(self, news_id: str) -> Optional[Dict]:
+    def get_by_id(self, news_id: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
         """
         Get a news article by ID.
         
         Args:
             news_id: UUID of the news article
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             News record as dict or None if not found
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(select_columns(columns))\
                 .eq("id", news_id)\
                 .execute()
             
@@ -175,19 +204,20 @@ class NewsRepository:
             logger.error(f"Failed to get news by ID {news_id}: {e}")
             return None
     
-    def get_by_url(self, url: str) -> Optional[Dict]:
+    def get_by_url(self, url: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
         """
         Get a news article by URL (useful for checking duplicates).
         
         Args:
             url: Article URL
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             News record as dict or None if not found
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(select_columns(columns))\
                 .eq("url", url)\
                 .execute()
             
@@ -197,32 +227,26 @@ class NewsRepository:
             logger.error(f"Failed to get news by URL: {e}")
             return None
     
-    def exists(self, url: str) -> bool:
-        """
-        Check if a news article already exists by URL.
-        
-        Args:
-            url: Article URL to check
-            
-        Returns:
-            True if exists, False otherwise
-        """
-        return self.get_by_url(url) is not None
-    
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[Dict]:
+    def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
         """
         Get all news articles with pagination.
         
         Args:
             limit: Maximum number of records to return
             offset: Number of records to skip
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             List of news records
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(select_columns(columns))\
                 .order("published_at", desc=True)\
                 .range(offset, offset + limit - 1)\
                 .execute()
@@ -233,20 +257,26 @@ class NewsRepository:
             logger.error(f"Failed to get all news: {e}")
             return []
     
-    def get_by_sentiment(self, sentiment: str, limit: int = 100) -> List[Dict]:
+    def get_by_sentiment(
+        self,
+        sentiment: str,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
         """
         Get news articles by sentiment.
         
         Args:
             sentiment: Sentiment to filter (ALCISTA/BAJISTA/NEUTRAL)
             limit: Maximum number of records
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             List of news records
         """
         try:
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(select_columns(columns))\
                 .eq("sentiment", sentiment)\
                 .order("published_at", desc=True)\
                 .limit(limit)\
@@ -258,13 +288,44 @@ class NewsRepository:
             logger.error(f"Failed to get news by sentiment {sentiment}: {e}")
             return []
     
-    def get_recent(self, hours: int = 24, limit: int = 100) -> List[Dict]:
+    def get_unclassified(self, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """
+        Get the newest articles still waiting for sentiment analysis.
+        
+        Args:
+            limit: Maximum number of records
+            columns: Columns to fetch (default: all news columns)
+            
+        Returns:
+            List of news records with sentiment IS NULL
+        """
+        try:
+            response = self.client.table(self.table_name)\
+                .select(select_columns(columns))\
+                .is_("sentiment", "null")\
+                .order("published_at", desc=True)\
+                .limit(limit)\
+                .execute()
+            
+            return response.data
+            
+        except Exception as e:
+            logger.error(f"Failed to get unclassified news: {e}")
+            return []
+    
+    def get_recent(
+        self,
+        hours: int = 24,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
         """
         Get recent news articles from the last N hours.
         
         Args:
             hours: Number of hours to look back
             limit: Maximum number of records
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             List of recent news records
@@ -275,7 +336,7 @@ class NewsRepository:
             cutoff = datetime.utcnow() - timedelta(hours=hours)
             
             response = self.client.table(self.table_name)\
-                .select("*")\
+                .select(select_columns(columns))\
                 .gte("published_at", cutoff.isoformat())\
                 .order("published_at", desc=True)\
                 .limit(limit)\
@@ -294,7 +355,8 @@ class NewsRepository:
         commodity: str = None,
         date_from: str = None,
         date_to: str = None,
-        limit: int = 100
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
     ) -> List[Dict]:
         """
         Get news articles with multiple filters.
@@ -302,10 +364,12 @@ class NewsRepository:
         Args:
             source: Filter by source names (list for multi-select, OR operation)
             sentiment: Filter by sentiment (ALCISTA/BAJISTA/NEUTRAL)
-            commodity: Filter by commodity (SOJA/MAÍZ/TRIGO/GIRASOL/CEBADA/SORGO/GENERAL)
+            commodity: Filter by commodity (SOJA/MAÍZ/TRIGO/GIRASOL/CEBADA/SORGO/GENERAL).
+                       Matches multi-commodity articles too (array containment).
             date_from: Filter articles published after this date (ISO format)
             date_to: Filter articles published before this date (ISO format)
             limit: Maximum number of records
+            columns: Columns to fetch (default: all news columns)
             
         Returns:
             List of filtered news records
@@ -314,7 +378,7 @@ class NewsRepository:
             query = (
                 self.client
                 .table(self.table_name)
-                .select("*")
+                .select(select_columns(columns))
             )
             
             # Apply filters
@@ -326,7 +390,8 @@ class NewsRepository:
                 query = query.eq("sentiment", sentiment.upper())
             
             if commodity:
-                query = query.eq("commodity", commodity.upper())
+                # Unknown labels match nothing rather than silently dropping the filter
+                query = query.contains("commodities", parse_commodities(commodity) or [commodity.upper()])
             
             if date_from:
                 query = query.gte("published_at", date_from)
@@ -348,6 +413,94 @@ class NewsRepository:
             logger.error(f"Error getting filtered news: {e}")
             return []
     
+    def search(
+        self,
+        query: str,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Full-text search over headlines through the search_news function.
+        
+        Matches the Spanish-stemmed search_vector column (GIN index,
+        migration 009) and ranks with ts_rank.
+        
+        Args:
+            query: Web search syntax: words, "phrases", OR, -excluded
+            source: Filter by source names
+            sentiment: Filter by sentiment
+            commodity: Filter by commodity (array containment)
+            date_from: Published at or after (ISO format)
+            date_to: Published at or before (ISO format)
+            limit: Maximum number of results
+            
+        Returns:
+            News records with "rank" and "headline", best match first
+        """
+        try:
+            params = {
+                "search_query": query,
+                "source_filter": list(source) if source else None,
+                "sentiment_filter": sentiment.upper() if sentiment else None,
+                "commodity_filter": (parse_commodities(commodity) or [commodity.upper()]) if commodity else None,
+                "date_from": date_from,
+                "date_to": date_to,
+                "max_results": limit,
+            }
+            response = self.client.rpc("search_news", params).execute()
+            return response.data
+            
+        except Exception as e:
+            logger.error(f"Failed to search news for '{query}': {e}")
+            return []
+    
+    def get_changed_since(
+        self,
+        updated_after: Optional[str] = None,
+        after_id: Optional[str] = None,
+        published_after: Optional[str] = None,
+        limit: int = 1000,
+        columns: Sequence[str] = ANALYTICS_COLUMNS
+    ) -> List[Dict]:
+        """
+        Get rows written after a keyset position, oldest write first.
+        
+        Args:
+            updated_after: updated_at of the last row already seen (None to start)
+            after_id: id of that row; rows with the same updated_at and a
+                      greater id still count as new
+            published_after: Only articles published at or after this date (ISO format)
+            limit: Page size
+            columns: Columns to fetch (must include id and updated_at)
+            
+        Returns:
+            Up to `limit` rows ordered by (updated_at, id)
+        """
+        query = self.client.table(self.table_name).select(select_columns(columns))
+        
+        if published_after:
+            query = query.gte("published_at", published_after)
+        
+        if updated_after and after_id:
+            query = query.or_(
+                f'updated_at.gt."{updated_after}",'
+                f'and(updated_at.eq."{updated_after}",id.gt.{after_id})'
+            )
+        elif updated_after:
+            query = query.gt("updated_at", updated_after)
+        
+        response = query\
+            .order("updated_at")\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        
+        return response.data
+    
     def update_sentiment(self, news_id: str, sentiment: str, confidence: float) -> Dict:
         """
         Update sentiment analysis for a news article.
@@ -367,12 +520,48 @@ class NewsRepository:
                 .execute()
             
             logger.info(f"Updated sentiment for news {news_id}: {sentiment} ({confidence})")
-            return response.data[0] if response.data else None
+            # No data when the guard skipped an unchanged row
+            return response.data[0] if response.data else self.get_by_id(news_id)
             
         except Exception as e:
             logger.error(f"Failed to update sentiment for {news_id}: {e}")
             raise
     
+    def bulk_update_sentiment(
+        self,
+        updates: Sequence[SentimentUpdate],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> Dict:
+        """
+        Update the sentiment of many articles, one RPC call per chunk.
+        
+        Uses the bulk_update_sentiment function (migration 007), which
+        applies a whole chunk in one UPDATE and skips unchanged rows.
+        
+        Args:
+            updates: (news_id, sentiment, confidence, commodity) tuples; a
+                None commodity keeps the current one
+            chunk_size: Updates per request
+            
+        Returns:
+            Report with updated/unchanged/failed counts and one entry per chunk
+        """
+        def apply_chunk(chunk: Sequence[SentimentUpdate]) -> int:
+            payload = [
+                {"id": news_id, "sentiment": sentiment, "confidence": confidence, "commodity": commodity}
+                for news_id, sentiment, confidence, commodity in chunk
+            ]
+            response = self.client.rpc("bulk_update_sentiment", {"updates": payload}).execute()
+            return int(response.data or 0)
+        
+        report = apply_in_chunks(updates, chunk_size, apply_chunk)
+        invalidate_sources_cache()
+        logger.info(
+            f"Bulk sentiment update: {report['updated']} updated, "
+            f"{report['unchanged']} unchanged, {report['failed']} failed"
+        )
+        return report
+    
     def delete(self, news_id: str) -> bool:
         """
         Delete a news article.
@@ -389,6 +578,7 @@ class NewsRepository:
                 .eq("id", news_id)\
                 .execute()
             
+            invalidate_sources_cache()
             logger.info(f"Deleted news {news_id}")
             return True
             
@@ -396,6 +586,75 @@ class NewsRepository:
             logger.error(f"Failed to delete news {news_id}: {e}")
             return False
     
+    def scan_ids(self, filters: Dict[str, Any], after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """
+        Get the next chunk of matching IDs (keyset pagination on the primary key).
+        
+        Args:
+            filters: Column -> value equality filters (None matches NULL)
+            after_id: Last ID of the previous chunk (None to start)
+            limit: Chunk size
+            
+        Returns:
+            Up to `limit` IDs in ascending order
+        """
+        validate_maintenance_columns(list(filters))
+        query = self.client.table(self.table_name).select("id")
+        response = filter_range(query, filters, after_id)\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        
+        return [row["id"] for row in response.data]
+    
+    def update_range(self, filters: Dict[str, Any], values: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """
+        Set `values` on the matching rows in (after_id, last_id].
+        
+        The filters are re-applied, so rows changed since the scan are left
+        alone; unchanged rows are skipped by the content hash guard.
+        
+        Returns:
+            Number of rows changed
+        """
+        validate_maintenance_columns(list(filters) + list(values))
+        query = self.client.table(self.table_name).update(values, count="exact", returning="minimal")
+        response = filter_range(query, filters, after_id, last_id).execute()
+        
+        invalidate_sources_cache()
+        return response.count or 0
+    
+    def delete_range(self, filters: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """
+        Delete the matching rows in (after_id, last_id].
+        
+        Returns:
+            Number of rows deleted
+        """
+        validate_maintenance_columns(list(filters))
+        query = self.client.table(self.table_name).delete(count="exact", returning="minimal")
+        response = filter_range(query, filters, after_id, last_id).execute()
+        
+        invalidate_sources_cache()
+        return response.count or 0
+    
+    def count_by(self, column: str) -> Dict[str, int]:
+        """
+        Count articles per value of a column, aggregated in the database.
+        
+        Uses the news_count_by function (migration 008).
+        
+        Args:
+            column: One of GROUP_BY_COLUMNS
+            
+        Returns:
+            {value: count} sorted by count descending ("NULL" for nulls)
+        """
+        if column not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Cannot group by '{column}'")
+        response = self.client.rpc("news_count_by", {"column_name": column}).execute()
+        return {(row["value"] or "NULL"): row["n"] for row in response.data}
+    
     def count_by_sentiment(self) -> Dict[str, int]:
         """
         Get count of articles by sentiment.
@@ -421,3 +680,61 @@ class NewsRepository:
         except Exception as e:
             logger.error(f"Failed to count by sentiment: {e}")
             return {}
+    
+    def get_sources(self) -> List[Dict]:
+        """
+        Get every news source with its article count and last publication date.
+        
+        Reads the trigger-maintained news_sources registry (one row per source)
+        instead of scanning articles. The result is cached in memory and
+        invalidated whenever this process writes news.
+        
+        Returns:
+            List of {"source", "article_count", "last_seen_at"} sorted by source
+        """
+        try:
+            return cached_sources(self._fetch_sources)
+            
+        except Exception as e:
+            logger.error(f"Failed to get sources: {e}")
+            return []
+    
+    def _fetch_sources(self) -> List[Dict]:
+        """Read the news_sources registry (uncached)."""
+        response = self.client.table(self.sources_table_name)\
+            .select("source,article_count,last_seen_at")\
+            .gt("article_count", 0)\
+            .order("source")\
+            .execute()
+        
+        return response.data
+    
+    def get_state(self, key: str) -> Optional[Dict]:
+        """
+        Read a JSON document from the app_state table.
+        
+        Args:
+            key: Document key
+            
+        Returns:
+            The stored document, or None if there is none
+        """
+        response = self.client.table(self.state_table_name)\
+            .select("value")\
+            .eq("key", key)\
+            .limit(1)\
+            .execute()
+        
+        return response.data[0]["value"] if response.data else None
+    
+    def put_state(self, key: str, value: Dict) -> None:
+        """
+        Store (replace) a JSON document in the app_state table.
+        
+        Args:
+            key: Document key
+            value: JSON-serializable document
+        """
+        self.client.table(self.state_table_name)\
+            .upsert({"key": key, "value": value, "updated_at": datetime.utcnow().isoformat()}, on_conflict="key")\
+            .execute()
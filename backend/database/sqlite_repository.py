@@ -0,0 +1,690 @@
+"""Embedded SQLite storage backend for offline development, CI and benchmarks."""
+
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, List, Optional, Dict, Sequence, Union
+
+from models.news import News
+from models.commodity import parse_commodities
+from .base import (
+    BaseNewsRepository, NEWS_COLUMNS, ANALYTICS_COLUMNS, invalidate_sources_cache, cached_sources,
+    validate_columns, news_to_row, enriched_to_row, content_hash,
+    SentimentUpdate, BULK_UPDATE_CHUNK_SIZE, apply_in_chunks,
+    GROUP_BY_COLUMNS, validate_maintenance_columns
+)
+from .text_search import SearchIndex, SearchQuery, highlight
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_FILE = Path(__file__).parent / "sqlite_schema.sql"
+
+# commodities lives in the news_commodities join table
+COMMODITIES_SQL = (
+    "(SELECT group_concat(c.commodity) FROM news_commodities c WHERE c.news_id = n.id) AS commodities"
+)
+
+# What the search index keeps per article
+SEARCH_INDEX_COLUMNS = ("id", "title", "source", "sentiment", "commodities", "published_at")
+
+# Columns a write may set (id and timestamps are managed here)
+WRITABLE_COLUMNS = ("title", "source", "url", "published_at", "sentiment", "confidence", "commodity")
+
+
+def to_utc_iso(value: Union[datetime, str, None]) -> Optional[str]:
+    """
+    Normalize a timestamp to the fixed-width UTC ISO form stored in SQLite.
+
+    Naive values are taken as UTC, matching how Postgres stores the ISO
+    strings the scrapers send.
+
+    Args:
+        value: datetime, ISO-8601 string (date only, 'Z' or offset) or None
+
+    Returns:
+        'YYYY-MM-DDTHH:MM:SS.ffffff+00:00' or None
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def utc_now_iso() -> str:
+    """Current time in the stored timestamp format."""
+    return to_utc_iso(datetime.now(timezone.utc))
+
+
+def range_where(filters: Dict[str, Any], after_id: Optional[str], last_id: Optional[str]) -> tuple:
+    """WHERE text and parameters for maintenance filters and a keyset id range."""
+    conditions, params = [], []
+    for column, value in filters.items():
+        conditions.append(f"{column} IS ?")
+        params.append(value)
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+    if last_id is not None:
+        conditions.append("id <= ?")
+        params.append(last_id)
+    return " AND ".join(conditions) or "1", params
+
+
+class SQLiteNewsRepository(BaseNewsRepository):
+    """
+    News repository backed by an embedded SQLite database.
+
+    Same schema, registry triggers and index shapes as the Supabase
+    migrations, so the API and pipeline run without a network service and
+    query logic can be benchmarked without WAN noise. A single connection is
+    shared behind a lock (FastAPI calls repositories from several threads).
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        Open (and create if needed) the SQLite database.
+
+        Args:
+            path: Database file path, or ":memory:" for a throwaway database
+        """
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._search_index: Optional[SearchIndex] = None
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.create_function("news_content_hash", 4, content_hash, deterministic=True)
+        self.conn.executescript(SCHEMA_FILE.read_text(encoding="utf-8"))
+        self._migrate()
+
+        logger.info(f"SQLite news repository ready: {self.path}")
+
+    def _migrate(self) -> None:
+        """Bring database files created by older schemas up to date."""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(news)")}
+        if "content_hash" not in columns:
+            self.conn.execute("ALTER TABLE news ADD COLUMN content_hash TEXT")
+            self.conn.execute(
+                "UPDATE news SET content_hash = news_content_hash(title, sentiment, confidence, commodity)"
+            )
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _projection(self, columns: Sequence[str]) -> str:
+        """SELECT list for `columns` (commodities via the join table)."""
+        validate_columns(columns)
+        return ", ".join(COMMODITIES_SQL if c == "commodities" else f"n.{c}" for c in columns)
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """Convert a result row to the API dict shape."""
+        record = dict(row)
+        if "commodities" in record:
+            record["commodities"] = parse_commodities(record["commodities"])
+        return record
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[Dict]:
+        """Run a SELECT and return dict rows."""
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def _fetch_by_ids(self, ids: List[str]) -> List[Dict]:
+        """Full rows for `ids`, in the given order."""
+        if not ids:
+            return []
+        placeholders = ", ".join("?" for _ in ids)
+        rows = self._query(
+            f"SELECT {self._projection(NEWS_COLUMNS)} FROM news n WHERE n.id IN ({placeholders})",
+            ids
+        )
+        by_id = {r["id"]: r for r in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def _reindex(self, ids: Sequence[str]) -> None:
+        """Refresh the search index entries of written or deleted articles."""
+        if self._search_index is None or not ids:
+            return
+        ids = list(ids)
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.extend(self._query(
+                f"SELECT {self._projection(SEARCH_INDEX_COLUMNS)} FROM news n "
+                f"WHERE n.id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ))
+        self._search_index.remove(set(ids) - {row["id"] for row in rows})
+        self._search_index.add(rows)
+
+    def _ensure_search_index(self) -> SearchIndex:
+        """Build the in-memory search index on first use."""
+        with self._lock:
+            if self._search_index is None:
+                index = SearchIndex()
+                index.add(self._query(f"SELECT {self._projection(SEARCH_INDEX_COLUMNS)} FROM news n"))
+                logger.info(f"Search index built: {len(index)} articles")
+                self._search_index = index
+            return self._search_index
+
+    def _set_commodities(self, news_id: str, commodities: List[str], published_at: Optional[str]) -> None:
+        """Replace the commodity labels of one article (caller holds the lock)."""
+        self.conn.execute("DELETE FROM news_commodities WHERE news_id = ?", (news_id,))
+        self.conn.executemany(
+            "INSERT INTO news_commodities (news_id, commodity, published_at) VALUES (?, ?, ?)",
+            [(news_id, c, published_at) for c in commodities]
+        )
+
+    def _write_rows(self, rows: List[Dict], upsert: bool) -> List[str]:
+        """
+        Insert (or upsert by URL) rows in one transaction.
+
+        Like a PostgREST upsert, only the columns present in a row are written
+        on conflict, and only when one of them changes; commodities default to
+        the parsed commodity label. Sets ``last_upsert_stats``.
+
+        Returns:
+            IDs of the written rows (unchanged rows are skipped)
+        """
+        ids = []
+        now = utc_now_iso()
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    values = {c: row[c] for c in WRITABLE_COLUMNS if c in row}
+                    values["published_at"] = to_utc_iso(values.get("published_at"))
+                    values["url"] = str(values["url"])
+
+                    new_hash = content_hash(
+                        values["title"], values.get("sentiment"), values.get("confidence"),
+                        values.get("commodity", "SOJA")
+                    )
+                    columns = list(values) + ["content_hash", "id", "created_at", "updated_at"]
+                    params = list(values.values()) + [new_hash, str(uuid.uuid4()), now, now]
+                    sql = (
+                        f"INSERT INTO news ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' for _ in columns)})"
+                    )
+                    if upsert:
+                        updated = [c for c in values if c != "url"]
+                        # Hash of the merged row: sent columns win, the rest are kept
+                        merged = ", ".join(
+                            f"excluded.{c}" if c in values else f"news.{c}"
+                            for c in ("title", "sentiment", "confidence", "commodity")
+                        )
+                        sql += (
+                            f" ON CONFLICT (url) DO UPDATE SET "
+                            f"{', '.join(f'{c} = excluded.{c}' for c in updated)}, "
+                            f"content_hash = news_content_hash({merged}), "
+                            f"updated_at = excluded.updated_at "
+                            # Skip rows the upsert would not change
+                            f"WHERE ({', '.join(f'news.{c}' for c in updated)}) "
+                            f"IS NOT ({', '.join(f'excluded.{c}' for c in updated)})"
+                        )
+                    sql += " RETURNING id, commodity, published_at"
+
+                    written = self.conn.execute(sql, params).fetchone()
+                    if written is None:
+                        continue
+                    has_labels = self.conn.execute(
+                        "SELECT 1 FROM news_commodities WHERE news_id = ?", (written["id"],)
+                    ).fetchone()
+                    if "commodity" in row or not has_labels:
+                        commodities = row.get("commodities") or parse_commodities(written["commodity"])
+                        self._set_commodities(written["id"], commodities, written["published_at"])
+                    ids.append(written["id"])
+
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        self.last_upsert_stats = {"written": len(ids), "skipped": len(rows) - len(ids)}
+        invalidate_sources_cache()
+        self._reindex(ids)
+        return ids
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def create(self, news: News, sentiment: str = None, confidence: float = None) -> Dict:
+        """
+        Create a new news article in the database.
+
+        Raises:
+            sqlite3.IntegrityError: If the URL already exists
+        """
+        try:
+            row = news_to_row(news)
+            row["sentiment"] = sentiment
+            row["confidence"] = confidence
+            ids = self._write_rows([row], upsert=False)
+
+            logger.info(f"Created news: {news.title[:50]}...")
+            return self._fetch_by_ids(ids)[0]
+
+        except Exception as e:
+            logger.error(f"Failed to create news '{news.title}': {e}")
+            raise
+
+    def create_batch(self, enriched_news: List[Dict]) -> List[Dict]:
+        """Create multiple news articles in one transaction."""
+        try:
+            ids = self._write_rows([enriched_to_row(item) for item in enriched_news], upsert=False)
+
+            logger.info(f"Created {len(ids)} news articles in batch")
+            return self._fetch_by_ids(ids)
+
+        except Exception as e:
+            logger.error(f"Failed to create batch: {e}")
+            raise
+
+    def upsert_news(self, news_list: List[News], sentiment_data: Dict[str, Dict] = None) -> List[Dict]:
+        """Upsert news articles by URL (see NewsRepository.upsert_news)."""
+        try:
+            rows = [news_to_row(news, (sentiment_data or {}).get(str(news.url))) for news in news_list]
+            ids = self._write_rows(rows, upsert=True)
+
+            logger.info(
+                f"Upserted {self.last_upsert_stats['written']} news articles "
+                f"({self.last_upsert_stats['skipped']} unchanged skipped)"
+            )
+            return self._fetch_by_ids(ids)
+
+        except Exception as e:
+            logger.error(f"Failed to upsert news: {e}")
+            raise
+
+    def search(
+        self,
+        query: str,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Full-text search over headlines through the in-process SearchIndex.
+
+        Same query syntax, stemming and filters as the Postgres search_news
+        function; rank is an idf score rather than ts_rank, so only the order
+        is comparable across backends.
+        """
+        try:
+            parsed = SearchQuery(query)
+            if not parsed:
+                return []
+            hits = self._ensure_search_index().search(
+                parsed,
+                source=[source] if isinstance(source, str) else source,
+                sentiment=sentiment,
+                commodity=(parse_commodities(commodity) or [commodity.upper()]) if commodity else None,
+                date_from=to_utc_iso(date_from),
+                date_to=to_utc_iso(date_to),
+                limit=limit
+            )
+            ranks = dict(hits)
+            rows = self._fetch_by_ids([news_id for news_id, _ in hits])
+            for row in rows:
+                row["rank"] = round(ranks[row["id"]], 6)
+                row["headline"] = highlight(row["title"], parsed.terms)
+            return rows
+
+        except Exception as e:
+            logger.error(f"Failed to search news for '{query}': {e}")
+            return []
+
+    def get_changed_since(
+        self,
+        updated_after: Optional[str] = None,
+        after_id: Optional[str] = None,
+        published_after: Optional[str] = None,
+        limit: int = 1000,
+        columns: Sequence[str] = ANALYTICS_COLUMNS
+    ) -> List[Dict]:
+        """Rows written after (updated_after, after_id), ordered by (updated_at, id)."""
+        where, params = [], []
+        if published_after:
+            where.append("n.published_at >= ?")
+            params.append(to_utc_iso(published_after))
+        if updated_after and after_id:
+            where.append("(n.updated_at, n.id) > (?, ?)")
+            params.extend([to_utc_iso(updated_after), after_id])
+        elif updated_after:
+            where.append("n.updated_at > ?")
+            params.append(to_utc_iso(updated_after))
+        sql = f"SELECT {self._projection(columns)} FROM news n"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._query(sql + " ORDER BY n.updated_at, n.id LIMIT ?", params + [limit])
+
+    def update_sentiment(self, news_id: str, sentiment: str, confidence: float) -> Dict:
+        """Update sentiment analysis for a news article."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "UPDATE news SET sentiment = ?, confidence = ?, updated_at = ?, "
+                    "content_hash = news_content_hash(title, ?, ?, commodity) "
+                    "WHERE id = ? AND (sentiment, confidence) IS NOT (?, round(?, 2))",
+                    (sentiment, confidence, utc_now_iso(), sentiment, confidence, news_id, sentiment, confidence)
+                )
+
+            self._reindex([news_id])
+            logger.info(f"Updated sentiment for news {news_id}: {sentiment} ({confidence})")
+            rows = self._fetch_by_ids([news_id])
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Failed to update sentiment for {news_id}: {e}")
+            raise
+
+    def _bulk_update(self, chunk: Sequence[SentimentUpdate]) -> int:
+        """Apply one chunk of sentiment updates in a single transaction."""
+        updated = []
+        now = utc_now_iso()
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for news_id, sentiment, confidence, commodity in chunk:
+                    row = self.conn.execute(
+                        "UPDATE news SET sentiment = ?1, confidence = ?2, "
+                        "commodity = COALESCE(?3, commodity), updated_at = ?4, "
+                        "content_hash = news_content_hash(title, ?1, ?2, COALESCE(?3, commodity)) "
+                        "WHERE id = ?5 AND (sentiment, confidence, commodity) "
+                        "IS NOT (?1, round(?2, 2), COALESCE(?3, commodity)) "
+                        "RETURNING published_at",
+                        (sentiment, confidence, commodity, now, news_id)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    if commodity is not None:
+                        self._set_commodities(news_id, parse_commodities(commodity), row["published_at"])
+                    updated.append(news_id)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        self._reindex(updated)
+        return len(updated)
+
+    def bulk_update_sentiment(
+        self,
+        updates: Sequence[SentimentUpdate],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE
+    ) -> Dict:
+        """Update many articles, one transaction per chunk."""
+        report = apply_in_chunks(updates, chunk_size, self._bulk_update)
+        invalidate_sources_cache()
+        logger.info(
+            f"Bulk sentiment update: {report['updated']} updated, "
+            f"{report['unchanged']} unchanged, {report['failed']} failed"
+        )
+        return report
+
+    def delete(self, news_id: str) -> bool:
+        """Delete a news article (its commodity labels cascade)."""
+        try:
+            with self._lock:
+                self.conn.execute("DELETE FROM news WHERE id = ?", (news_id,))
+
+            invalidate_sources_cache()
+            self._reindex([news_id])
+            logger.info(f"Deleted news {news_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete news {news_id}: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_by_id(self, news_id: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get a news article by ID."""
+        try:
+            rows = self._query(f"SELECT {self._projection(columns)} FROM news n WHERE n.id = ?", (news_id,))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Failed to get news by ID {news_id}: {e}")
+            return None
+
+    def get_by_url(self, url: str, columns: Sequence[str] = NEWS_COLUMNS) -> Optional[Dict]:
+        """Get a news article by URL."""
+        try:
+            rows = self._query(f"SELECT {self._projection(columns)} FROM news n WHERE n.url = ?", (url,))
+            return rows[0] if rows else None
+
+        except Exception as e:
+            logger.error(f"Failed to get news by URL: {e}")
+            return None
+
+    def get_all(self, limit: int = 100, offset: int = 0, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get all news articles with pagination, newest first."""
+        try:
+            return self._query(
+                f"SELECT {self._projection(columns)} FROM news n "
+                f"ORDER BY n.published_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get all news: {e}")
+            return []
+
+    def get_by_sentiment(self, sentiment: str, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get news articles by sentiment, newest first."""
+        try:
+            return self._query(
+                f"SELECT {self._projection(columns)} FROM news n "
+                f"WHERE n.sentiment = ? ORDER BY n.published_at DESC LIMIT ?",
+                (sentiment, limit)
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get news by sentiment {sentiment}: {e}")
+            return []
+
+    def get_unclassified(self, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get the newest articles still waiting for sentiment analysis."""
+        try:
+            return self._query(
+                f"SELECT {self._projection(columns)} FROM news n "
+                f"WHERE n.sentiment IS NULL ORDER BY n.published_at DESC LIMIT ?",
+                (limit,)
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get unclassified news: {e}")
+            return []
+
+    def get_recent(self, hours: int = 24, limit: int = 100, columns: Sequence[str] = NEWS_COLUMNS) -> List[Dict]:
+        """Get news articles published in the last N hours."""
+        try:
+            cutoff = to_utc_iso(datetime.now(timezone.utc) - timedelta(hours=hours))
+            return self._query(
+                f"SELECT {self._projection(columns)} FROM news n "
+                f"WHERE n.published_at >= ? ORDER BY n.published_at DESC LIMIT ?",
+                (cutoff, limit)
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get recent news: {e}")
+            return []
+
+    def get_filtered(
+        self,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 100,
+        columns: Sequence[str] = NEWS_COLUMNS
+    ) -> List[Dict]:
+        """
+        Get news articles with multiple filters (see NewsRepository.get_filtered).
+
+        A commodity filter drives the query from news_commodities so the
+        (commodity, published_at DESC) index gives rows already in order.
+        """
+        try:
+            where, params = [], []
+            from_sql = "news n"
+            order_column = "n.published_at"
+
+            if commodity:
+                labels = parse_commodities(commodity) or [commodity.upper()]
+                from_sql = "news_commodities c0 JOIN news n ON n.id = c0.news_id"
+                order_column = "c0.published_at"
+                where.append("c0.commodity = ?")
+                params.append(labels[0])
+                # Extra labels: the article must carry all of them (containment)
+                for label in labels[1:]:
+                    where.append(
+                        "EXISTS (SELECT 1 FROM news_commodities c WHERE c.news_id = n.id AND c.commodity = ?)"
+                    )
+                    params.append(label)
+
+            if source:
+                sources = [source] if isinstance(source, str) else list(source)
+                where.append(f"n.source IN ({', '.join('?' for _ in sources)})")
+                params.extend(sources)
+
+            if sentiment:
+                where.append("n.sentiment = ?")
+                params.append(sentiment.upper())
+
+            if date_from:
+                where.append(f"{order_column} >= ?")
+                params.append(to_utc_iso(date_from))
+
+            if date_to:
+                where.append(f"{order_column} <= ?")
+                params.append(to_utc_iso(date_to))
+
+            sql = f"SELECT {self._projection(columns)} FROM {from_sql}"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += f" ORDER BY {order_column} DESC LIMIT ?"
+            params.append(limit)
+
+            return self._query(sql, params)
+
+        except Exception as e:
+            logger.error(f"Error getting filtered news: {e}")
+            return []
+
+    def scan_ids(self, filters: Dict[str, Any], after_id: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """Next chunk of matching IDs (keyset pagination on the primary key)."""
+        validate_maintenance_columns(list(filters))
+        where, params = range_where(filters, after_id, None)
+        rows = self._query(f"SELECT id FROM news WHERE {where} ORDER BY id LIMIT ?", params + [limit])
+        return [row["id"] for row in rows]
+
+    def update_range(self, filters: Dict[str, Any], values: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Set `values` on the matching rows in (after_id, last_id]; returns rows changed."""
+        validate_maintenance_columns(list(filters) + list(values))
+        where, params = range_where(filters, after_id, last_id)
+        # SET expressions see the old row, so the hash takes new values as parameters
+        hashed = ", ".join("?" if c in values else c for c in ("title", "sentiment", "confidence", "commodity"))
+        hash_params = [values[c] for c in ("title", "sentiment", "confidence", "commodity") if c in values]
+        sql = (
+            f"UPDATE news SET {', '.join(f'{c} = ?' for c in values)}, updated_at = ?, "
+            f"content_hash = news_content_hash({hashed}) "
+            f"WHERE {where} AND ({', '.join(values)}) IS NOT ({', '.join('?' for _ in values)}) "
+            f"RETURNING id, commodity, published_at"
+        )
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                rows = self.conn.execute(
+                    sql, list(values.values()) + [utc_now_iso()] + hash_params + params + list(values.values())
+                ).fetchall()
+                if "commodity" in values:
+                    for row in rows:
+                        self._set_commodities(row["id"], parse_commodities(row["commodity"]), row["published_at"])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        invalidate_sources_cache()
+        self._reindex([row["id"] for row in rows])
+        return len(rows)
+
+    def delete_range(self, filters: Dict[str, Any], after_id: Optional[str], last_id: str) -> int:
+        """Delete the matching rows in (after_id, last_id]; returns rows deleted."""
+        validate_maintenance_columns(list(filters))
+        where, params = range_where(filters, after_id, last_id)
+        with self._lock:
+            deleted = [row["id"] for row in self.conn.execute(f"DELETE FROM news WHERE {where} RETURNING id", params)]
+
+        invalidate_sources_cache()
+        self._reindex(deleted)
+        return len(deleted)
+
+    def count_by(self, column: str) -> Dict[str, int]:
+        """Article count per value of a GROUP_BY_COLUMNS column."""
+        if column not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Cannot group by '{column}'")
+        rows = self._query(f"SELECT {column} AS value, COUNT(*) AS n FROM news GROUP BY 1 ORDER BY 2 DESC")
+        return {(row["value"] or "NULL"): row["n"] for row in rows}
+
+    def count_by_sentiment(self) -> Dict[str, int]:
+        """Get count of articles by sentiment (aggregated in SQL)."""
+        try:
+            counts = {"ALCISTA": 0, "BAJISTA": 0, "NEUTRAL": 0, "NULL": 0}
+            rows = self._query("SELECT sentiment, COUNT(*) AS n FROM news GROUP BY sentiment")
+            for row in rows:
+                sentiment = row["sentiment"] or "NULL"
+                if sentiment in counts:
+                    counts[sentiment] += row["n"]
+            return counts
+
+        except Exception as e:
+            logger.error(f"Failed to count by sentiment: {e}")
+            return {}
+
+    def get_sources(self) -> List[Dict]:
+        """Get every news source from the registry (cached in memory)."""
+        try:
+            return cached_sources(lambda: self._query(
+                "SELECT source, article_count, last_seen_at FROM news_sources "
+                "WHERE article_count > 0 ORDER BY source"
+            ))
+
+        except Exception as e:
+            logger.error(f"Failed to get sources: {e}")
+            return []
+
+    def get_state(self, key: str) -> Optional[Dict]:
+        """JSON document stored under `key`, or None."""
+        rows = self._query("SELECT value FROM app_state WHERE key = ?", (key,))
+        return json.loads(rows[0]["value"]) if rows else None
+
+    def put_state(self, key: str, value: Dict) -> None:
+        """Store (replace) the JSON document under `key`."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO app_state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, json.dumps(value), utc_now_iso())
+            )
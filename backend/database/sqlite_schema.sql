@@ -0,0 +1,109 @@
+-- Agromate embedded storage schema (SQLite)
+--
+-- Mirrors supabase/migrations: same columns, same source registry and the
+-- same index shapes. Timestamps are stored as fixed-width UTC ISO-8601
+-- strings so they sort and compare lexicographically. The commodities array
+-- is a join table with the article's published_at copied in, so per-commodity
+-- "newest N" queries are an ordered index range scan.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS news (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    source TEXT NOT NULL,
+    url TEXT UNIQUE NOT NULL,
+    published_at TEXT,
+
+    -- Sentiment analysis fields
+    sentiment TEXT,
+    confidence REAL,
+
+    -- Metadata
+    commodity TEXT DEFAULT 'SOJA',
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS news_commodities (
+    news_id TEXT NOT NULL REFERENCES news(id) ON DELETE CASCADE,
+    commodity TEXT NOT NULL,
+    published_at TEXT,
+    PRIMARY KEY (news_id, commodity)
+);
+
+CREATE TABLE IF NOT EXISTS news_sources (
+    source TEXT PRIMARY KEY,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    first_seen_at TEXT,
+    last_seen_at TEXT,
+    updated_at TEXT
+);
+
+-- Small JSON documents the API persists across restarts (011 migration)
+CREATE TABLE IF NOT EXISTS app_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+-- Same shapes as 001/003/004 migrations
+CREATE INDEX IF NOT EXISTS idx_news_published_at ON news (published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_news_created_at ON news (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_news_source_published_at ON news (source, published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_news_sentiment_published_at ON news (sentiment, published_at DESC);
+CREATE INDEX IF NOT EXISTS idx_news_unclassified ON news (published_at DESC) WHERE sentiment IS NULL;
+CREATE INDEX IF NOT EXISTS idx_news_commodities_published_at
+    ON news_commodities (commodity, published_at DESC);
+-- Change feed for the analytics store (010 migration)
+CREATE INDEX IF NOT EXISTS idx_news_updated_at_id ON news (updated_at, id);
+
+-- Keep the commodity join table's copy of published_at in sync
+CREATE TRIGGER IF NOT EXISTS news_commodities_published_at
+AFTER UPDATE OF published_at ON news
+BEGIN
+    UPDATE news_commodities SET published_at = NEW.published_at WHERE news_id = NEW.id;
+END;
+
+-- Source registry (002 migration)
+CREATE TRIGGER IF NOT EXISTS news_sources_insert
+AFTER INSERT ON news
+BEGIN
+    INSERT INTO news_sources (source, article_count, first_seen_at, last_seen_at, updated_at)
+    VALUES (NEW.source, 1, NEW.published_at, NEW.published_at, NEW.created_at)
+    ON CONFLICT (source) DO UPDATE SET
+        article_count = article_count + 1,
+        first_seen_at = CASE
+            WHEN first_seen_at IS NULL OR excluded.first_seen_at < first_seen_at
+            THEN COALESCE(excluded.first_seen_at, first_seen_at) ELSE first_seen_at END,
+        last_seen_at = CASE
+            WHEN last_seen_at IS NULL OR excluded.last_seen_at > last_seen_at
+            THEN COALESCE(excluded.last_seen_at, last_seen_at) ELSE last_seen_at END,
+        updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS news_sources_delete
+AFTER DELETE ON news
+BEGIN
+    UPDATE news_sources SET
+        article_count = (SELECT COUNT(*) FROM news WHERE source = OLD.source),
+        first_seen_at = (SELECT MIN(published_at) FROM news WHERE source = OLD.source),
+        last_seen_at = (SELECT MAX(published_at) FROM news WHERE source = OLD.source)
+    WHERE source = OLD.source;
+    DELETE FROM news_sources WHERE source = OLD.source AND article_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS news_sources_update
+AFTER UPDATE OF source, published_at ON news
+WHEN OLD.source IS NOT NEW.source OR OLD.published_at IS NOT NEW.published_at
+BEGIN
+    INSERT INTO news_sources (source, article_count) VALUES (NEW.source, 0)
+    ON CONFLICT (source) DO NOTHING;
+    UPDATE news_sources SET
+        article_count = (SELECT COUNT(*) FROM news n WHERE n.source = news_sources.source),
+        first_seen_at = (SELECT MIN(published_at) FROM news n WHERE n.source = news_sources.source),
+        last_seen_at = (SELECT MAX(published_at) FROM news n WHERE n.source = news_sources.source)
+    WHERE source IN (OLD.source, NEW.source);
+    DELETE FROM news_sources WHERE source = OLD.source AND article_count <= 0;
+END;
@@ -0,0 +1,496 @@
+"""
+In-process full-text search for the embedded backend.
+
+Mirrors the Postgres side of migration 009: headlines are tokenized, Spanish
+stop words dropped and the rest reduced with the Snowball Spanish stemmer
+(the algorithm behind the 'spanish' text search config), so a query matches
+the same articles here as through search_news.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from models.commodity import COMMODITY_BITS
+
+# Same list as Postgres' tsearch_data/spanish.stop
+STOP_WORDS: FrozenSet[str] = frozenset(
+    (Path(__file__).parent / "spanish.stop").read_text(encoding="utf-8").split()
+)
+
+WORD_RE = re.compile(r"[^\W_]+")
+QUERY_RE = re.compile(r'"([^"]*)"?|(-?)([^\s"]+)')
+
+# ---------------------------------------------------------------------------
+# Snowball Spanish stemmer (https://snowballstem.org/algorithms/spanish/stemmer.html)
+# ---------------------------------------------------------------------------
+
+VOWELS = frozenset("aeiouáéíóúü")
+ACCENTS = str.maketrans("áéíóú", "aeiou")
+
+PRONOUNS = ("selas", "selos", "sela", "selo", "las", "les", "los", "nos", "me", "se", "la", "le", "lo")
+PRONOUN_VERB_ENDINGS = {
+    "iéndo": "iendo", "ándo": "ando", "ár": "ar", "ér": "er", "ír": "ir",
+    "iendo": "iendo", "ando": "ando", "ar": "ar", "er": "er", "ir": "ir",
+}
+
+STANDARD_SUFFIXES = {
+    **dict.fromkeys((
+        "anza", "anzas", "ico", "ica", "icos", "icas", "ismo", "ismos", "able", "ables",
+        "ible", "ibles", "ista", "istas", "oso", "osa", "osos", "osas",
+        "amiento", "amientos", "imiento", "imientos",
+    ), "delete"),
+    **dict.fromkeys(("adora", "ador", "ación", "adoras", "adores", "aciones",
+                     "ante", "antes", "ancia", "ancias"), "delete_ic"),
+    **dict.fromkeys(("logía", "logías"), "log"),
+    **dict.fromkeys(("ución", "uciones"), "u"),
+    **dict.fromkeys(("encia", "encias"), "ente"),
+    "amente": "amente",
+    "mente": "mente",
+    **dict.fromkeys(("idad", "idades"), "idad"),
+    **dict.fromkeys(("iva", "ivo", "ivas", "ivos"), "iva"),
+}
+
+Y_VERB_SUFFIXES = ("ya", "ye", "yan", "yen", "yeron", "yendo", "yo", "yó", "yas", "yes", "yais", "yamos")
+
+VERB_SUFFIXES_GU = ("en", "es", "éis", "emos")
+VERB_SUFFIXES = (
+    "arían", "arías", "arán", "arás", "aríais", "aría", "aréis", "aríamos", "aremos", "ará", "aré",
+    "erían", "erías", "erán", "erás", "eríais", "ería", "eréis", "eríamos", "eremos", "erá", "eré",
+    "irían", "irías", "irán", "irás", "iríais", "iría", "iréis", "iríamos", "iremos", "irá", "iré",
+    "aba", "ada", "ida", "ía", "ara", "iera", "ad", "ed", "id", "ase", "iese", "aste", "iste",
+    "an", "aban", "ían", "aran", "ieran", "asen", "iesen", "aron", "ieron", "ado", "ido",
+    "ando", "iendo", "ió", "ar", "er", "ir", "as", "abas", "adas", "idas", "ías", "aras", "ieras",
+    "ases", "ieses", "ís", "áis", "abais", "íais", "arais", "ierais", "aseis", "ieseis",
+    "asteis", "isteis", "ados", "idos", "amos", "ábamos", "íamos", "imos", "áramos",
+    "iéramos", "iésemos", "ásemos",
+) + VERB_SUFFIXES_GU
+
+RESIDUAL_SUFFIXES = ("os", "a", "o", "á", "í", "ó", "e", "é")
+
+
+def _by_length(suffixes: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted(suffixes, key=len, reverse=True))
+
+
+_PRONOUNS = _by_length(PRONOUNS)
+_PRONOUN_VERB_ENDINGS = _by_length(PRONOUN_VERB_ENDINGS)
+_STANDARD_SUFFIXES = _by_length(STANDARD_SUFFIXES)
+_Y_VERB_SUFFIXES = _by_length(Y_VERB_SUFFIXES)
+_VERB_SUFFIXES = _by_length(VERB_SUFFIXES)
+_RESIDUAL_SUFFIXES = _by_length(RESIDUAL_SUFFIXES)
+
+
+def _longest(word: str, suffixes: Sequence[str], start: int = 0) -> Optional[str]:
+    """Longest suffix of `word` (lying at or after `start`) among `suffixes`."""
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= start:
+            return suffix
+    return None
+
+
+def _regions(word: str) -> Tuple[int, int, int]:
+    """Start offsets of the RV, R1 and R2 regions."""
+    n = len(word)
+    rv = n
+    if n >= 2:
+        if word[1] not in VOWELS:
+            rv = next((i + 1 for i in range(2, n) if word[i] in VOWELS), n)
+        elif word[0] in VOWELS:
+            rv = next((i + 1 for i in range(2, n) if word[i] not in VOWELS), n)
+        else:
+            rv = min(3, n)
+
+    r1 = next((i + 1 for i in range(1, n) if word[i] not in VOWELS and word[i - 1] in VOWELS), n)
+    r2 = next((i + 1 for i in range(r1 + 1, n) if word[i] not in VOWELS and word[i - 1] in VOWELS), n)
+    return rv, r1, r2
+
+
+def _standard_suffix(word: str, r1: int, r2: int) -> Optional[str]:
+    """Step 1; returns the new word, or None when no suffix was removed."""
+    suffix = _longest(word, _STANDARD_SUFFIXES)
+    if suffix is None:
+        return None
+    start = len(word) - len(suffix)
+    action = STANDARD_SUFFIXES[suffix]
+
+    def drop(stem: str, endings: Sequence[str]) -> str:
+        ending = _longest(stem, endings)
+        return stem[:-len(ending)] if ending and len(stem) - len(ending) >= r2 else stem
+
+    if action == "amente":
+        if start < r1:
+            return None
+        stem = word[:start]
+        ending = _longest(stem, ("iv", "os", "ic", "ad"))
+        if ending and len(stem) - len(ending) >= r2:
+            stem = stem[:-len(ending)]
+            if ending == "iv":
+                stem = drop(stem, ("at",))
+        return stem
+
+    if start < r2:
+        return None
+    stem = word[:start]
+    if action == "delete":
+        return stem
+    if action == "delete_ic":
+        return drop(stem, ("ic",))
+    if action == "mente":
+        return drop(stem, ("ante", "able", "ible"))
+    if action == "idad":
+        return drop(stem, ("abil", "ic", "iv"))
+    if action == "iva":
+        return drop(stem, ("at",))
+    return stem + action    # log, u, ente
+
+
+def spanish_stem(word: str) -> str:
+    """
+    Stem a lowercase Spanish word (Snowball algorithm, accents removed).
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stem as Postgres' spanish_stem dictionary produces it
+    """
+    rv, r1, r2 = _regions(word)
+
+    # Step 0: attached pronoun (haciéndola -> haciendo)
+    pronoun = _longest(word, _PRONOUNS)
+    if pronoun:
+        stem = word[:-len(pronoun)]
+        ending = _longest(stem, _PRONOUN_VERB_ENDINGS + ("yendo",))
+        if ending and len(stem) - len(ending) >= rv:
+            if ending != "yendo":
+                word = stem[:-len(ending)] + PRONOUN_VERB_ENDINGS[ending]
+            elif stem[:-len(ending)].endswith("u"):
+                word = stem
+
+    # Step 1, else step 2a, else step 2b
+    stemmed = _standard_suffix(word, r1, r2)
+    if stemmed is not None:
+        word = stemmed
+    else:
+        suffix = _longest(word, _Y_VERB_SUFFIXES, rv)
+        if suffix and word[:-len(suffix)].endswith("u"):
+            word = word[:-len(suffix)]
+        else:
+            suffix = _longest(word, _VERB_SUFFIXES, rv)
+            if suffix:
+                word = word[:-len(suffix)]
+                if suffix in VERB_SUFFIXES_GU and word.endswith("gu"):
+                    word = word[:-1]
+
+    # Step 3: residual suffix
+    suffix = _longest(word, _RESIDUAL_SUFFIXES, rv)
+    if suffix:
+        word = word[:-len(suffix)]
+        if suffix in ("e", "é") and word.endswith("gu") and len(word) - 1 >= rv:
+            word = word[:-1]
+
+    return word.translate(ACCENTS)
+
+
+# ---------------------------------------------------------------------------
+# Tokenizing, queries and snippets
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=200_000)
+def _lexeme(token: str) -> Optional[str]:
+    """Lexeme for a lowercase token, or None for stop words (cached: headline vocabularies are small)."""
+    if token in STOP_WORDS:
+        return None
+    return token if token.isdigit() else spanish_stem(token)
+
+
+def lexemes(text: str) -> List[str]:
+    """Lexemes of a text in order (what to_tsvector('spanish', text) keeps)."""
+    text = unicodedata.normalize("NFC", text.lower())
+    return [lexeme for lexeme in map(_lexeme, WORD_RE.findall(text)) if lexeme]
+
+
+class SearchQuery:
+    """
+    Parsed web-search query, as websearch_to_tsquery reads it.
+
+    Words are ANDed, ``or`` separates alternatives, ``-word`` excludes and
+    ``"quoted words"`` must appear next to each other.
+    """
+
+    def __init__(self, text: str):
+        # Each alternative: (required lexemes, excluded lexemes, phrases)
+        self.alternatives: List[Tuple[List[str], List[str], List[List[str]]]] = []
+        required: List[str] = []
+        excluded: List[str] = []
+        phrases: List[List[str]] = []
+
+        for phrase, negated, word in QUERY_RE.findall(text):
+            if word.lower() == "or" and not negated:
+                if required or phrases:
+                    self.alternatives.append((required, excluded, phrases))
+                required, excluded, phrases = [], [], []
+                continue
+            terms = lexemes(phrase if phrase else word)
+            if negated:
+                excluded.extend(terms)
+            elif phrase and len(terms) > 1:
+                phrases.append(terms)
+                required.extend(terms)
+            else:
+                required.extend(terms)
+        if required or phrases:
+            self.alternatives.append((required, excluded, phrases))
+
+    @property
+    def terms(self) -> Set[str]:
+        """Every lexeme that makes a document match (for ranking and snippets)."""
+        return {t for required, _, _ in self.alternatives for t in required}
+
+    def __bool__(self) -> bool:
+        return bool(self.alternatives)
+
+
+def has_phrase(text: str, phrase: Sequence[str]) -> bool:
+    """True if the lexemes of `phrase` appear consecutively in `text`."""
+    tokens = lexemes(text)
+    n = len(phrase)
+    return any(tokens[i:i + n] == list(phrase) for i in range(len(tokens) - n + 1))
+
+
+def highlight(text: str, terms: Set[str], start: str = "<b>", stop: str = "</b>") -> str:
+    """Wrap the words of `text` that match `terms` (like ts_headline's default)."""
+    def mark(match: re.Match) -> str:
+        lexeme = _lexeme(unicodedata.normalize("NFC", match.group(0).lower()))
+        return f"{start}{match.group(0)}{stop}" if lexeme in terms else match.group(0)
+    return WORD_RE.sub(mark, text)
+
+
+# ---------------------------------------------------------------------------
+# Inverted index
+# ---------------------------------------------------------------------------
+
+# Sentiment filter codes of the index; 0 is unclassified (unlike the analytics store's codes)
+SEARCH_SENTIMENT_CODES = {None: 0, "ALCISTA": 1, "BAJISTA": 2, "NEUTRAL": 3}
+
+
+def _timestamp(value: Optional[str]) -> float:
+    """Epoch seconds of an ISO timestamp (naive values are UTC); -inf for None."""
+    if not value:
+        return float("-inf")
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class SearchIndex:
+    """
+    Inverted index over headlines plus the columns search results filter on.
+
+    Postings map a lexeme to ascending document ordinals. Per-document
+    source, sentiment, commodity labels and publication time live in compact
+    arrays; a query intersects postings and filters and ranks the candidates
+    with vectorized numpy operations over zero-copy views of those arrays,
+    so it never touches SQLite. Updating a document appends a new ordinal and
+    tombstones the old one; the index compacts itself once half of it is dead.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._postings: Dict[str, array] = {}
+        self._ids: List[Optional[str]] = []
+        self._ordinal: Dict[str, int] = {}
+        self._titles: List[Optional[str]] = []
+        self._alive = bytearray()
+        self._sources = array("H")
+        self._source_codes: Dict[str, int] = {}
+        self._sentiments = bytearray()
+        self._commodities = bytearray()
+        self._published = array("d")
+
+    def __len__(self) -> int:
+        return len(self._ordinal)
+
+    def add(self, rows: Iterable[Dict]) -> None:
+        """
+        Index (or re-index) articles.
+
+        Args:
+            rows: Dicts with id, title, source, sentiment, commodities, published_at
+        """
+        with self._lock:
+            for row in rows:
+                self._remove(row["id"])
+                ordinal = len(self._ids)
+                self._ids.append(row["id"])
+                self._titles.append(row["title"])
+                self._ordinal[row["id"]] = ordinal
+                self._alive.append(1)
+                self._sources.append(self._source_codes.setdefault(row["source"], len(self._source_codes)))
+                self._sentiments.append(SEARCH_SENTIMENT_CODES.get(row.get("sentiment"), 0))
+                self._commodities.append(
+                    sum(COMMODITY_BITS.get(c, 0) for c in set(row.get("commodities") or []))
+                )
+                self._published.append(_timestamp(row.get("published_at")))
+                for lexeme in set(lexemes(row["title"])):
+                    self._postings.setdefault(lexeme, array("i")).append(ordinal)
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Drop articles from the index."""
+        with self._lock:
+            for news_id in ids:
+                self._remove(news_id)
+            if len(self._ids) > 2 * len(self._ordinal):
+                self._compact()
+
+    def _remove(self, news_id: str) -> None:
+        ordinal = self._ordinal.pop(news_id, None)
+        if ordinal is not None:
+            self._ids[ordinal] = None
+            self._titles[ordinal] = None
+            self._alive[ordinal] = 0
+
+    def _compact(self) -> None:
+        """Renumber the live documents and drop tombstoned ordinals."""
+        live = sorted(self._ordinal.values())
+        remap = {old: new for new, old in enumerate(live)}
+        postings = {}
+        for lexeme, ordinals in self._postings.items():
+            kept = array("i", (remap[o] for o in ordinals if o in remap))
+            if kept:
+                postings[lexeme] = kept
+        self._postings = postings
+        self._ids = [self._ids[o] for o in live]
+        self._titles = [self._titles[o] for o in live]
+        self._alive = bytearray(b"\x01" * len(live))
+        self._sources = array("H", (self._sources[o] for o in live))
+        self._sentiments = bytearray(self._sentiments[o] for o in live)
+        self._commodities = bytearray(self._commodities[o] for o in live)
+        self._published = array("d", (self._published[o] for o in live))
+        self._ordinal = {news_id: o for o, news_id in enumerate(self._ids)}
+
+    def _docs(self, lexeme: str) -> np.ndarray:
+        """Ordinals containing a lexeme, ascending."""
+        postings = self._postings.get(lexeme)
+        # Copied: a live view would keep the array from growing on the next add()
+        return np.frombuffer(postings, dtype=np.int32).copy() if postings else np.empty(0, dtype=np.int32)
+
+    def search(
+        self,
+        query: SearchQuery,
+        source: List[str] = None,
+        sentiment: str = None,
+        commodity: List[str] = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = 50
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank the articles matching a query and the filters.
+
+        The score sums the idf of the query lexemes each article contains
+        (log(1 + N/df)); ties go to the most recent article.
+
+        Returns:
+            Up to `limit` (news_id, score) pairs, best first
+        """
+        sentiment_code = SEARCH_SENTIMENT_CODES.get(sentiment.upper()) if sentiment else None
+        commodity_mask = sum(COMMODITY_BITS.get(c, 0) for c in commodity or [])
+        if (sentiment and not sentiment_code) or (commodity and not commodity_mask):
+            return []   # unknown labels match nothing, like the other backends
+
+        with self._lock:
+            if not self._ids or not query:
+                return []
+
+            matched = np.zeros(len(self._ids), dtype=bool) if len(query.alternatives) > 1 else None
+            for required, excluded, _ in query.alternatives:
+                found = None
+                for term in sorted(set(required), key=lambda t: len(self._postings.get(t, ()))):
+                    docs = self._docs(term)
+                    found = docs if found is None else np.intersect1d(found, docs, assume_unique=True)
+                for term in excluded:
+                    found = np.setdiff1d(found, self._docs(term), assume_unique=True)
+                if matched is None:
+                    matches = found
+                else:
+                    matched[found] = True
+            if matched is not None:
+                matches = np.flatnonzero(matched)
+
+            published = np.frombuffer(self._published, dtype=np.float64)[matches]
+            keep = np.frombuffer(self._alive, dtype=np.uint8)[matches].astype(bool)
+            if source:
+                codes = [self._source_codes[s] for s in source if s in self._source_codes]
+                keep &= np.isin(np.frombuffer(self._sources, dtype=np.uint16)[matches], codes)
+            if sentiment_code is not None:
+                keep &= np.frombuffer(self._sentiments, dtype=np.uint8)[matches] == sentiment_code
+            if commodity_mask:
+                labels = np.frombuffer(self._commodities, dtype=np.uint8)[matches]
+                keep &= (labels & commodity_mask) == commodity_mask
+            if date_from:
+                keep &= published >= _timestamp(date_from)
+            if date_to:
+                keep &= published <= _timestamp(date_to)
+            candidates, published = matches[keep], published[keep]
+
+            total = max(len(self._ordinal), 1)
+            weights = {
+                term: math.log(1 + total / len(self._postings[term]))
+                for term in query.terms if term in self._postings
+            }
+            phrases = any(ps for _, _, ps in query.alternatives)
+
+            if len(query.alternatives) == 1:
+                # Every match contains the same query lexemes: rank by recency
+                scores = np.full(len(candidates), sum(weights.values()))
+                if not phrases and len(candidates) > limit:
+                    newest = np.argpartition(published, len(published) - limit)[-limit:]
+                    top = newest[np.argsort(published[newest], kind="stable")]
+                else:
+                    top = np.argsort(published, kind="stable")
+            else:
+                dense = np.zeros(len(self._ids))
+                for term, weight in weights.items():
+                    dense[self._docs(term)] += weight
+                scores = dense[candidates]
+                # Best score group(s) first; only those are sorted by recency
+                order = np.argsort(scores, kind="stable")
+                if not phrases and len(candidates) > limit:
+                    cutoff = scores[order[-limit]]
+                    order = order[scores[order] >= cutoff]
+                top = order[np.lexsort((published[order], scores[order]))]
+
+            results: List[Tuple[str, float]] = []
+            for i in top[::-1].tolist():
+                ordinal = int(candidates[i])
+                if phrases and not self._matches_phrases(ordinal, query):
+                    continue
+                results.append((self._ids[ordinal], float(scores[i])))
+                if len(results) == limit:
+                    break
+            return results
+
+    def _matches_phrases(self, ordinal: int, query: SearchQuery) -> bool:
+        """True if some alternative the document matches has all its phrases in order."""
+        title = self._titles[ordinal]
+        title_lexemes = set(lexemes(title))
+        for required, excluded, phrases in query.alternatives:
+            if not set(required) <= title_lexemes or title_lexemes & set(excluded):
+                continue
+            if all(has_phrase(title, p) for p in phrases):
+                return True
+        return False
@@ -0,0 +1,207 @@
+"""
+EXPLAIN ANALYZE harness for the repository's hot queries.
+
+Creates a scratch database on a local Postgres, applies every migration in
+supabase/migrations, seeds synthetic news, and checks that each hot query is
+answered by an index (range) scan on the expected index rather than a
+sequential scan plus sort.
+
+Requires the ``psql`` client on PATH.
+
+Usage:
+    python explain_hot_queries.py --dsn postgresql://postgres@localhost:5432/postgres [--rows 200000] [--keep]
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import json
+import subprocess
+from urllib.parse import urlsplit, urlunsplit
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "supabase" / "migrations"
+SCRATCH_DB = "agromate_explain"
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# (name, SQL as PostgREST/asyncpg would send it, expected index)
+HOT_QUERIES = [
+    (
+        "get_all (newest 50)",
+        "SELECT id, title, source, published_at, sentiment FROM news "
+        "ORDER BY published_at DESC LIMIT 50",
+        "idx_news_published_at",
+    ),
+    (
+        "get_recent (24h)",
+        "SELECT id, title, published_at FROM news "
+        "WHERE published_at >= now() - interval '24 hours' "
+        "ORDER BY published_at DESC LIMIT 100",
+        "idx_news_published_at",
+    ),
+    (
+        "get_filtered(commodity)",
+        "SELECT id, title, published_at FROM news WHERE commodities @> ARRAY['CEBADA'] "
+        "ORDER BY published_at DESC LIMIT 500",
+        "idx_news_cebada_published_at",
+    ),
+    (
+        "get_filtered(commodity, date_from) / divergence",
+        "SELECT sentiment FROM news WHERE commodities @> ARRAY['TRIGO'] "
+        "AND published_at >= now() - interval '7 days' "
+        "ORDER BY published_at DESC LIMIT 500",
+        "idx_news_trigo_published_at",
+    ),
+    (
+        "get_filtered(source)",
+        "SELECT id, title, published_at FROM news WHERE source = 'Fuente 3' "
+        "ORDER BY published_at DESC LIMIT 100",
+        "idx_news_source_published_at",
+    ),
+    (
+        "get_by_sentiment",
+        "SELECT id, title, published_at FROM news WHERE sentiment = 'ALCISTA' "
+        "ORDER BY published_at DESC LIMIT 100",
+        "idx_news_sentiment_published_at",
+    ),
+    (
+        "get_unclassified (backlog)",
+        "SELECT id, title FROM news WHERE sentiment IS NULL "
+        "ORDER BY published_at DESC LIMIT 100",
+        "idx_news_unclassified",
+    ),
+    (
+        "get_by_url / exists",
+        "SELECT id FROM news WHERE url = 'https://example.com/news/4242'",
+        "news_url_key",
+    ),
+]
+
+SEED_SQL = """
+INSERT INTO news (title, source, url, published_at, sentiment, confidence, commodity)
+SELECT
+    'Titular sintético ' || g,
+    'Fuente ' || (g % 12),
+    'https://example.com/news/' || g,
+    now() - (g % 730) * interval '1 day' - (g % 1440) * interval '1 minute',
+    CASE WHEN g % 50 = 0 THEN NULL
+         ELSE (ARRAY['ALCISTA', 'BAJISTA', 'NEUTRAL'])[1 + g % 3] END,
+    CASE WHEN g % 50 = 0 THEN NULL ELSE round((0.5 + (g % 50) / 100.0)::numeric, 2) END,
+    CASE WHEN g % 5 = 0
+         THEN (ARRAY['SOJA', 'MAÍZ', 'TRIGO'])[1 + g % 3] || ', ' || (ARRAY['GIRASOL', 'CEBADA', 'SORGO'])[1 + g % 3]
+         ELSE (ARRAY['SOJA', 'MAÍZ', 'TRIGO', 'GIRASOL', 'CEBADA', 'SORGO', 'GENERAL'])[1 + g % 7] END
+FROM generate_series(1, {rows}) AS g;
+ANALYZE news;
+"""
+
+UUID_SHIM_SQL = """
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+EXCEPTION WHEN OTHERS THEN
+    -- Minimal Postgres builds ship without contrib; gen_random_uuid is core since 13
+    CREATE OR REPLACE FUNCTION uuid_generate_v4() RETURNS uuid
+        AS 'SELECT gen_random_uuid()' LANGUAGE sql;
+END
+$$;
+"""
+
+
+def with_database(dsn: str, database: str) -> str:
+    """Return `dsn` pointing at another database on the same server."""
+    parts = urlsplit(dsn)
+    return urlunsplit((parts.scheme, parts.netloc, f"/{database}", parts.query, parts.fragment))
+
+
+def psql(dsn: str, sql: str, tuples_only: bool = False) -> str:
+    """Run SQL through psql and return stdout (raises on error)."""
+    args = ["psql", dsn, "-X", "-q", "-v", "ON_ERROR_STOP=1"]
+    if tuples_only:
+        args += ["-A", "-t"]
+    result = subprocess.run(args, input=sql, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def apply_migrations(dsn: str) -> None:
+    """Apply every migration in filename order."""
+    psql(dsn, UUID_SHIM_SQL)
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        sql = migration.read_text(encoding="utf-8")
+        # The extension is handled by UUID_SHIM_SQL above
+        sql = "\n".join(line for line in sql.splitlines() if "uuid-ossp" not in line)
+        psql(dsn, sql)
+        print(f"   ✅ {migration.name}")
+
+
+def plan_nodes(node: dict):
+    """Yield every node of an EXPLAIN JSON plan tree."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(dsn: str, sql: str) -> dict:
+    """Return the root plan node and execution time of EXPLAIN ANALYZE."""
+    output = psql(dsn, f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql};", tuples_only=True)
+    result = json.loads(output)[0]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE harness for hot news queries")
+    parser.add_argument("--dsn", required=True, help="DSN of a local Postgres (maintenance database)")
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic articles to seed")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 80)
+    print("🔍 AGROMATE - Hot query index check")
+    print("=" * 80 + "\n")
+
+    psql(args.dsn, f"DROP DATABASE IF EXISTS {SCRATCH_DB};")
+    psql(args.dsn, f"CREATE DATABASE {SCRATCH_DB};")
+    scratch = with_database(args.dsn, SCRATCH_DB)
+
+    failures = 0
+    try:
+        print("📄 Applying migrations...")
+        apply_migrations(scratch)
+
+        print(f"\n🌱 Seeding {args.rows:,} synthetic articles...")
+        psql(scratch, SEED_SQL.format(rows=args.rows))
+
+        print("\n" + "-" * 80)
+        for name, sql, expected_index in HOT_QUERIES:
+            result = explain(scratch, sql)
+            nodes = list(plan_nodes(result["Plan"]))
+            scans = [n for n in nodes if n.get("Relation Name") == "news" or n.get("Index Name")]
+            seq_scans = [n for n in scans if n["Node Type"] == "Seq Scan"]
+            index_hits = [
+                n for n in scans
+                if n["Node Type"] in INDEX_SCANS and n.get("Index Name") == expected_index
+            ]
+            ok = bool(index_hits) and not seq_scans
+            failures += not ok
+
+            used = ", ".join(f"{n['Node Type']} on {n.get('Index Name', n.get('Relation Name'))}" for n in scans)
+            print(f"{'✅' if ok else '❌'} {name}")
+            print(f"   plan: {used}")
+            print(f"   expected: {expected_index}   time: {result['Execution Time']:.2f} ms")
+    finally:
+        if not args.keep:
+            psql(args.dsn, f"DROP DATABASE IF EXISTS {SCRATCH_DB};")
+
+    print("-" * 80)
+    print(f"\n{'✅ All hot queries use their index' if not failures else f'❌ {failures} queries missed their index'}\n")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
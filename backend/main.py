@@ -11,7 +11,19 @@ from fastapi.responses import JSONResponse
 from routers import news_router
 from routers.trends import router as trends_router
 from schemas import HealthResponse
-from database import get_supabase_client
+from database import get_news_repository, CachedNewsRepository
+from database.base import invalidate_sources_cache
+from database.invalidation import create_invalidation_bus
+from services.article_store import get_article_store
+from services.backtest import backtest_cache_stats
+from services.correlation import correlation_cache_stats
+from services.daily_sentiment import get_daily_sentiment
+from services.divergence import board_cache_stats
+from services.sentiment_index import get_sentiment_index
+from services.market_data import get_market_providers
+from services.market_snapshot import get_market_snapshot
+from services.price_store import get_price_updater
+from services.yahoo_chart import get_yahoo_client
 
 # Configure logging
 logging.basicConfig(
@@ -32,14 +44,40 @@ async def lifespan(app: FastAPI):
     
     # Test database connection
     try:
-        client = get_supabase_client()
-        logger.info(f"✅ Connected to Supabase: {client.supabase_url}")
+        repo = get_news_repository()
+        logger.info(f"✅ Connected to storage: {type(repo).__name__}")
     except Exception as e:
         logger.error(f"❌ Failed to connect to database: {e}")
+        repo = None
+    
+    # Invalidate this worker's caches when other workers write news
+    bus = create_invalidation_bus()
+    if bus and repo is not None:
+        if isinstance(repo, CachedNewsRepository):
+            bus.subscribe(repo.invalidate_change)
+        bus.subscribe(lambda change: invalidate_sources_cache())
+        bus.subscribe(get_article_store().notify)
+        bus.subscribe(get_sentiment_index().notify)
+        bus.start()
+        logger.info("✅ Invalidation bus started")
+    app.state.invalidation_bus = bus
+    
+    # Keep market quotes in memory; /api/market/latest never waits on upstreams
+    get_market_snapshot().start()
+    
+    # Backfill once, then append daily closes for /api/market/history
+    get_price_updater().start()
     
     yield
     
     # Shutdown
+    await get_market_snapshot().stop()
+    await get_price_updater().stop()
+    await get_yahoo_client().aclose()
+    if bus:
+        bus.stop()
+    if repo is not None:
+        get_sentiment_index().save()
     logger.info("👋 Agromate API shutting down...")
 
 
@@ -85,6 +123,10 @@ from routers.history import router as history_router
 app.include_router(history_router)
 from routers.divergence import router as divergence_router
 app.include_router(divergence_router)
+from routers.analytics import router as analytics_router
+app.include_router(analytics_router)
+from routers.sentiment import router as sentiment_router
+app.include_router(sentiment_router)
 
 
 @app.get("/", tags=["root"])
@@ -99,7 +141,9 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "health": "/health",
+            "cache_stats": "/api/cache/stats",
             "news": "/api/news",
+            "search": "/api/search",
             "stats": "/api/stats",
             "recent": "/api/recent",
             "pipeline": "/api/pipeline/run",
@@ -110,7 +154,12 @@ async def root():
             "summary_daily": "/api/summary/daily",
             "market_latest": "/api/market/latest",
             "market_history": "/api/market/history",
-            "divergence": "/api/divergence"
+            "divergence": "/api/divergence",
+            "divergence_all": "/api/divergence/all",
+            "divergence_history": "/api/divergence/history",
+            "correlation": "/api/analytics/correlation",
+            "backtest": "/api/analytics/backtest",
+            "sentiment_index": "/api/sentiment/index"
         }
     }
 
@@ -125,7 +174,7 @@ async def health_check():
     """
     try:
         # Test database connection
-        client = get_supabase_client()
+        get_news_repository()
         db_status = "connected"
         
     except Exception as e:
@@ -139,6 +188,38 @@ async def health_check():
     )
 
 
+@app.get("/api/cache/stats", tags=["health"])
+async def cache_stats():
+    """
+    Query cache metrics (hits, misses, evictions, invalidations), the
+    cross-worker invalidation bus mode (listen/poll), the size of the
+    in-memory analytics store, the sentiment index counters, the market
+    snapshot refresh state, the market provider caches, the price history
+    coverage, the daily sentiment table and the divergence, correlation
+    and backtest caches.
+    
+    Returns:
+        Cache counters, or enabled=False when the cache is turned off
+    """
+    repo = get_news_repository()
+    bus = getattr(app.state, "invalidation_bus", None)
+    bus_stats = bus.stats() if bus else None
+    analytics = {
+        "analytics_store": get_article_store().stats(),
+        "sentiment_index": get_sentiment_index().stats(),
+        "market_snapshot": get_market_snapshot().stats(),
+        "market_providers": get_market_providers().stats(),
+        "price_history": get_price_updater().stats(),
+        "daily_sentiment": get_daily_sentiment().stats(),
+        "divergence_boards": board_cache_stats(),
+        "correlation": correlation_cache_stats(),
+        "backtest": backtest_cache_stats(),
+    }
+    if not isinstance(repo, CachedNewsRepository):
+        return {"enabled": False, "invalidation_bus": bus_stats, **analytics}
+    return {"enabled": True, **repo.cache.stats(), "invalidation_bus": bus_stats, **analytics}
+
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -1,5 +1,6 @@
 """Models package for Agromate."""
 
 from .news import News
+from .commodity import COMMODITIES, parse_commodities, format_commodities
 
-__all__ = ["News"]
+__all__ = ["News", "COMMODITIES", "parse_commodities", "format_commodities"]
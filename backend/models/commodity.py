@@ -0,0 +1,58 @@
+"""Commodity labels and normalization for multi-commodity articles."""
+
+from typing import Iterable, List, Union
+
+# Canonical commodity labels, in display order
+COMMODITIES = ["SOJA", "MAÍZ", "TRIGO", "GIRASOL", "CEBADA", "SORGO", "GENERAL"]
+
+# Bit of each label in the commodity bitmasks of the analytics store and the search index
+COMMODITY_BITS = {label: 1 << i for i, label in enumerate(COMMODITIES)}
+
+# Spellings returned by the LLM or used in query strings (e.g. ?commodity=maiz)
+COMMODITY_ALIASES = {
+    "MAIZ": "MAÍZ", "SOYBEAN": "SOJA", "WHEAT": "TRIGO",
+    "CORN": "MAÍZ", "SUNFLOWER": "GIRASOL", "SORGHUM": "SORGO",
+    "BARLEY": "CEBADA",
+}
+
+
+def parse_commodities(value: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Normalize a commodity value into a sorted, de-duplicated list of labels.
+
+    Accepts the legacy comma-separated form ("MAÍZ, TRIGO"), a single label
+    in any case or spelling ("maiz") or an iterable of labels. Unknown labels
+    are dropped.
+
+    Args:
+        value: Commodity string or iterable of strings
+
+    Returns:
+        List of canonical labels in COMMODITIES order (may be empty)
+    """
+    if not value:
+        return []
+
+    parts = value.split(",") if isinstance(value, str) else value
+
+    found = set()
+    for part in parts:
+        label = part.strip().upper()
+        label = COMMODITY_ALIASES.get(label, label)
+        if label in COMMODITIES:
+            found.add(label)
+
+    return [c for c in COMMODITIES if c in found]
+
+
+def format_commodities(commodities: Iterable[str]) -> str:
+    """
+    Render a commodity list as the display string stored in ``news.commodity``.
+
+    Args:
+        commodities: Canonical labels (as returned by parse_commodities)
+
+    Returns:
+        Comma-separated labels, or "GENERAL" for an empty list
+    """
+    return ", ".join(commodities) or "GENERAL"
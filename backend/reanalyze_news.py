@@ -1,60 +1,106 @@
 """
 Re-analizar todas las noticias existentes con el nuevo prompt mejorado de Groq.
 Esto permite ver las llamadas a Groq y verificar la mejora en la categorización.
+
+Los resultados se guardan con actualizaciones masivas (bulk_update_sentiment)
+cada --batch noticias en lugar de un UPDATE por noticia, y lo pendiente se
+guarda igual si el script se corta. Las noticias que el modelo marca como
+IRRELEVANT conservan su commodity.
 """
 
-import os
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
 from dotenv import load_dotenv
-from supabase import create_client
-from sentiment.llm_client import get_llm_client
 
 load_dotenv()
 
-# Conectar a Supabase
-supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_ANON_KEY")
-)
+from database import get_news_repository
+from sentiment.llm_client import get_llm_client
+
+
+def save(repo, updates, totals):
+    """Guardar un lote de resultados y sumar el reporte a `totals`."""
+    if not updates:
+        return
+    report = repo.bulk_update_sentiment(updates, chunk_size=len(updates))
+    for chunk in report["chunks"]:
+        if chunk["error"]:
+            print(f"❌ Lote de {chunk['rows']} noticias: {chunk['error']}")
+    for key in ("updated", "unchanged", "failed"):
+        totals[key] += report[key]
+    updates.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analizar noticias con Groq")
+    parser.add_argument("--limit", type=int, default=10, help="Noticias a re-analizar (default: 10)")
+    parser.add_argument("--batch", type=int, default=500, help="Noticias por actualización (default: 500)")
+    args = parser.parse_args()
+
+    repo = get_news_repository()
 
-# Get Groq client
-llm_client = get_llm_client(use_mock=False)
+    # Get Groq client
+    llm_client = get_llm_client(use_mock=False)
 
-print("🔄 Re-analizando noticias con el nuevo prompt de Groq...")
-print("⚠️  ESTO HARÁ LLAMADAS REALES A GROQ API\n")
+    print("🔄 Re-analizando noticias con el nuevo prompt de Groq...")
+    print("⚠️  ESTO HARÁ LLAMADAS REALES A GROQ API\n")
 
-# Obtener primeras 10 noticias para re-analizar
-result = supabase.table("news").select("*").limit(10).execute()
-news_items = result.data
+    news_items = repo.get_all(limit=args.limit, columns=("id", "title", "source", "sentiment"))
+    total = len(news_items)
 
-print(f"📊 Analizando {len(news_items)} noticias...\n")
+    print(f"📊 Analizando {total} noticias...\n")
 
-for i, news in enumerate(news_items, 1):
+    updates = []
+    totals = {"updated": 0, "unchanged": 0, "failed": 0}
     try:
-        title = news['title']
-        source = news['source']
-        old_sentiment = news['sentiment']
-        
-        # Re-analizar con Groq
-        analysis = llm_client.analyze(title, source)
-        new_sentiment = analysis['sentiment']
-        new_confidence = analysis['confidence']
-        reasoning = analysis.get('reasoning', 'N/A')
-        
-        # Actualizar en BD
-        supabase.table("news").update({
-            'sentiment': new_sentiment,
-            'confidence': new_confidence
-        }).eq('id', news['id']).execute()
-        
-        # Mostrar resultado
-        change_indicator = "✅" if old_sentiment == new_sentiment else "🔄"
-        print(f"{change_indicator} [{i}/10] {source}")
-        print(f"   {old_sentiment} → {new_sentiment} ({new_confidence})")
-        print(f"   \"{title[:80]}...\"")
-        print(f"   Razón: {reasoning}\n")
-        
-    except Exception as e:
-        print(f"❌ Error en noticia {i}: {e}\n")
-
-print("\n✅ Re-análisis completado!")
-print("🔍 Revisá el dashboard de Groq - deberías ver ~10 llamadas nuevas")
+        reanalyze(news_items, llm_client, repo, updates, totals, args.batch)
+    finally:
+        # Lo ya analizado se guarda aunque se corte (Ctrl-C o error)
+        save(repo, updates, totals)
+
+    print(f"\n💾 {totals['updated']} actualizadas, {totals['unchanged']} sin cambios, {totals['failed']} con error")
+    print("\n✅ Re-análisis completado!")
+    print(f"🔍 Revisá el dashboard de Groq - deberías ver ~{total} llamadas nuevas")
+
+
+def reanalyze(news_items, llm_client, repo, updates, totals, batch):
+    """Re-analizar cada noticia, guardando cada `batch` resultados."""
+    total = len(news_items)
+    for i, news in enumerate(news_items, 1):
+        try:
+            title = news['title']
+            source = news['source']
+            old_sentiment = news['sentiment']
+
+            # Re-analizar con Groq
+            analysis = llm_client.analyze(title, source)
+            new_sentiment = analysis['sentiment']
+            new_confidence = analysis['confidence']
+            reasoning = analysis.get('reasoning', 'N/A')
+
+            # IRRELEVANT no es un commodity: None conserva el que tiene
+            commodity = analysis.get('commodity')
+            updates.append((news['id'], new_sentiment, new_confidence, None if commodity == "IRRELEVANT" else commodity))
+
+            # Mostrar resultado
+            change_indicator = "✅" if old_sentiment == new_sentiment else "🔄"
+            print(f"{change_indicator} [{i}/{total}] {source}")
+            print(f"   {old_sentiment} → {new_sentiment} ({new_confidence})")
+            print(f"   \"{title[:80]}...\"")
+            print(f"   Razón: {reasoning}\n")
+
+        except Exception as e:
+            print(f"❌ Error en noticia {i}: {e}\n")
+
+        if len(updates) >= batch:
+            save(repo, updates, totals)
+
+
+if __name__ == "__main__":
+    main()
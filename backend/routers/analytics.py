@@ -0,0 +1,89 @@
+"""Analytics router: how news sentiment relates to prices, and backtests of the signals."""
+
+import logging
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+
+from services.backtest import (
+    DEFAULT_HORIZONS, DEFAULT_PRICE_THRESHOLDS, DEFAULT_SENTIMENT_THRESHOLDS, DEFAULT_WINDOWS, DEFAULT_YEARS,
+    BacktestGrid, run_backtest
+)
+from services.correlation import (
+    DEFAULT_MAX_LAG, DEFAULT_MONTHS, DEFAULT_WINDOW, MAX_LAG, sentiment_price_correlation
+)
+from services.divergence import MAX_HISTORY_MONTHS
+from services.market_data import COMMODITIES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+def _commodities(commodity: str) -> List[str]:
+    """Deduplicated COMMODITIES keys of a comma-separated list (400 on unknown ones)."""
+    commodities = [c.strip().lower() for c in commodity.split(",") if c.strip()]
+    unknown = [c for c in commodities if c not in COMMODITIES]
+    if not commodities or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown commodity '{','.join(unknown)}'. Valid: {', '.join(COMMODITIES)}")
+    return list(dict.fromkeys(commodities))
+
+
+def _csv(values) -> str:
+    return ",".join(str(v) for v in values)
+
+
+@router.get("/correlation")
+async def get_correlation(
+    commodity: str = Query(default="soja,maiz,trigo", description="Comma-separated commodity list"),
+    max_lag: int = Query(default=DEFAULT_MAX_LAG, ge=0, le=MAX_LAG, description="Largest lag in days, both ways"),
+    window: int = Query(default=DEFAULT_WINDOW, ge=10, le=365, description="Rolling correlation window in days"),
+    months: int = Query(default=DEFAULT_MONTHS, ge=1, le=MAX_HISTORY_MONTHS, description="Months of history"),
+    rolling_lag: int = Query(default=0, ge=-MAX_LAG, le=MAX_LAG, description="Lag of the rolling correlation")
+):
+    """
+    Lagged cross-correlation between the daily news sentiment score and the
+    daily return of the CBOT future, per commodity.
+    
+    Lag k pairs the sentiment of day t with the return of day t + k, so a
+    strong correlation at k > 0 means sentiment moved first. Also returns
+    the rolling correlation over `window` days at `rolling_lag`. Cached
+    until new daily news or prices arrive.
+    """
+    commodities = _commodities(commodity)
+    try:
+        return sentiment_price_correlation(commodities, max_lag, window, months, rolling_lag)
+    except Exception as e:
+        logger.error(f"Error calculating correlation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/backtest")
+async def get_backtest(
+    commodity: str = Query(default="soja,maiz,trigo", description="Comma-separated commodity list"),
+    sentiment_thresholds: str = Query(default=_csv(DEFAULT_SENTIMENT_THRESHOLDS), description="Sentiment thresholds to sweep"),
+    price_thresholds: str = Query(default=_csv(DEFAULT_PRICE_THRESHOLDS), description="Price thresholds (%) to sweep"),
+    windows: str = Query(default=_csv(DEFAULT_WINDOWS), description="Window lengths in days"),
+    horizons: str = Query(default=_csv(DEFAULT_HORIZONS), description="Forward return horizons in days"),
+    years: int = Query(default=DEFAULT_YEARS, ge=1, le=10, description="Years of history (bounded by the daily table)")
+):
+    """
+    Backtest of the /api/divergence signals over the stored news and prices.
+    
+    Replays every day through the divergence rules for each combination of
+    sentiment threshold x price threshold x window, going long after a
+    bullish divergence and short after a bearish one. Per combination and
+    horizon: signals, hit rate and average signed forward return, plus the
+    total return and max drawdown of holding each signal for a day. Cached
+    until new daily news or prices arrive.
+    """
+    commodities = _commodities(commodity)
+    try:
+        grid = BacktestGrid.parse(sentiment_thresholds, price_thresholds, windows, horizons)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return run_backtest(commodities, grid, years)
+    except Exception as e:
+        logger.error(f"Error running backtest: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
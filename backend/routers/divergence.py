@@ -6,13 +6,70 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
-from database import get_supabase_client, NewsRepository
+from services.article_store import get_article_store, sentiment_counts
+from services.divergence import (
+    DEFAULT_WINDOWS, DIVERGENCE_TYPES, MAX_HISTORY_MONTHS, MAX_WINDOW_DAYS,
+    classify_divergence, describe_divergence, divergence_board, divergence_history, no_news_message
+)
+from services.market_data import COMMODITIES, get_market_providers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["divergence"])
 
 
+@router.get("/divergence/all")
+async def get_divergence_all(
+    windows: str = Query(
+        default=",".join(map(str, DEFAULT_WINDOWS)),
+        description=f"Comma-separated windows in days (1-{MAX_WINDOW_DAYS})"
+    )
+):
+    """
+    Divergence of every commodity over several windows in one request.
+    
+    Same entries as /api/divergence, one per (commodity, window), computed
+    from one news selection and one CBOT fetch for all futures. Cached
+    until new articles are ingested or futures are refetched.
+    """
+    try:
+        days = [int(w) for w in windows.split(",") if w.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid windows '{windows}' (expected e.g. 3,7,30)")
+    if not days or any(not 1 <= d <= MAX_WINDOW_DAYS for d in days):
+        raise HTTPException(status_code=400, detail=f"Windows must be between 1 and {MAX_WINDOW_DAYS} days")
+    
+    try:
+        return await divergence_board(days)
+    except Exception as e:
+        logger.error(f"Error calculating divergence board: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/divergence/history")
+async def get_divergence_history(
+    commodity: str = Query(default="soja", description="Commodity to analyze (soja, maiz, trigo)"),
+    window: int = Query(default=7, ge=1, le=MAX_WINDOW_DAYS, description="Sliding window in days"),
+    months: int = Query(default=6, ge=1, le=MAX_HISTORY_MONTHS, description="Months of history")
+):
+    """
+    Daily divergence series: for every day, the sentiment score of the
+    news of the last `window` days, the CBOT price change over the same
+    days and the resulting classification (same rules as /api/divergence),
+    plus the episodes where a divergence lasted several days.
+    
+    Prices come from the local price store (/api/market/history); days
+    before the first stored close have price_change_pct null.
+    """
+    if commodity.lower() not in COMMODITIES:
+        raise HTTPException(status_code=400, detail=f"Unknown commodity '{commodity}'. Valid: {', '.join(COMMODITIES)}")
+    try:
+        return divergence_history(commodity, window, months)
+    except Exception as e:
+        logger.error(f"Error calculating divergence history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/divergence")
 async def get_divergence(
     commodity: str = Query(default="soja", description="Commodity to analyze"),
@@ -29,22 +86,18 @@ async def get_divergence(
     """
     try:
         # 1. Calculate sentiment score for the period
-        client = get_supabase_client()
-        repo = NewsRepository(client)
-        
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
         
-        all_news = repo.get_filtered(
-            commodity=commodity.upper() if commodity.upper() != "GENERAL" else None,
-            date_from=start_date.isoformat(),
-            limit=500
+        articles = get_article_store().select(
+            commodity=commodity if commodity.upper() != "GENERAL" else None,
+            date_from=start_date
         )
         
-        if not all_news:
+        if not len(articles):
             return {
                 "divergence_type": "NONE",
-                "message": f"No hay suficientes noticias sobre {commodity.upper()} en los últimos {days} días.",
+                "message": no_news_message(commodity, days),
                 "sentiment_score": 0.0,
                 "price_change_pct": 0.0,
                 "signal_strength": 0,
@@ -52,80 +105,33 @@ async def get_divergence(
             }
         
         # Calculate weighted sentiment
-        alcista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'ALCISTA')
-        bajista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'BAJISTA')
+        counts = sentiment_counts(articles)
+        alcista = counts["ALCISTA"]
+        bajista = counts["BAJISTA"]
         
         sentiment_score = 0.0
         if alcista + bajista > 0:
             sentiment_score = (alcista - bajista) / (alcista + bajista)
         
-        # 2. Get price change from Yahoo Finance
-        ticker_map = {
-            "soja": "ZS=F",
-            "maiz": "ZC=F",
-            "trigo": "ZW=F",
-        }
-        
-        symbol = ticker_map.get(commodity.lower())
+        # 2. Get price change of the CBOT future (cached by the provider hub)
+        info = COMMODITIES.get(commodity.lower())
         price_change_pct = 0.0
         
-        if symbol:
-            try:
-                import yfinance as yf
-                
-                period = "1mo" if days <= 7 else "3mo"
-                data = yf.download(symbol, period=period, progress=False)
-                
-                if len(data) >= 2:
-                    recent = data["Close"].dropna()
-                    if len(recent) >= days:
-                        start_price = float(recent.iloc[-days])
-                        end_price = float(recent.iloc[-1])
-                        price_change_pct = ((end_price - start_price) / start_price) * 100
-                    elif len(recent) >= 2:
-                        start_price = float(recent.iloc[0])
-                        end_price = float(recent.iloc[-1])
-                        price_change_pct = ((end_price - start_price) / start_price) * 100
-            except Exception as e:
-                logger.warning(f"Yahoo Finance error for divergence: {e}")
+        if info:
+            period = "1mo" if days <= 7 else "3mo"
+            result = await get_market_providers().get("yahoo", period)
+            if result.error:
+                logger.warning(f"Yahoo Finance error for divergence: {result.error}")
+            recent = (result.value or {}).get(info["symbol"])
+            if recent:
+                # Change over the last `days` sessions (or all of them)
+                price_change_pct = recent.change_pct(lookback=days - 1)
         
         # 3. Detect divergence
-        divergence_type = "NONE"
-        description = ""
-        signal_strength = 0  # 0-3 scale
-        
-        SENTIMENT_THRESHOLD = 0.25
-        PRICE_THRESHOLD = 1.5  # percent
-        
-        if sentiment_score > SENTIMENT_THRESHOLD and price_change_pct < -PRICE_THRESHOLD:
-            divergence_type = "BULLISH_DIVERGENCE"
-            signal_strength = min(3, int(abs(sentiment_score * 3) + abs(price_change_pct / 3)))
-            description = (
-                f"⚠️ Las noticias sobre {commodity.upper()} son mayormente alcistas (score: {sentiment_score:.2f}), "
-                f"pero el precio en Chicago BAJÓ {abs(price_change_pct):.1f}% en {days} días. "
-                f"Esto puede indicar un sesgo mediático: el mercado no acompaña el optimismo de las noticias."
-            )
-        elif sentiment_score < -SENTIMENT_THRESHOLD and price_change_pct > PRICE_THRESHOLD:
-            divergence_type = "BEARISH_DIVERGENCE"
-            signal_strength = min(3, int(abs(sentiment_score * 3) + abs(price_change_pct / 3)))
-            description = (
-                f"⚠️ Las noticias sobre {commodity.upper()} son mayormente bajistas (score: {sentiment_score:.2f}), "
-                f"pero el precio en Chicago SUBIÓ {price_change_pct:.1f}% en {days} días. "
-                f"El mercado ignora el pesimismo mediático, posible oportunidad."
-            )
-        elif abs(sentiment_score) > SENTIMENT_THRESHOLD and abs(price_change_pct) < PRICE_THRESHOLD:
-            divergence_type = "NEUTRAL_PRICE"
-            description = (
-                f"Las noticias sobre {commodity.upper()} muestran un sesgo "
-                f"{'alcista' if sentiment_score > 0 else 'bajista'} "
-                f"(score: {sentiment_score:.2f}), pero el precio se mantuvo estable "
-                f"({price_change_pct:+.1f}%). Sin divergencia significativa."
-            )
-        else:
-            description = (
-                f"Sentimiento y precio de {commodity.upper()} están alineados. "
-                f"Score: {sentiment_score:.2f}, Precio: {price_change_pct:+.1f}%."
-            )
+        kind, strength = classify_divergence(sentiment_score, price_change_pct)
+        divergence_type = DIVERGENCE_TYPES[kind]
+        signal_strength = int(strength)  # 0-3 scale
+        description = describe_divergence(divergence_type, commodity, sentiment_score, price_change_pct, days)
         
         return {
             "divergence_type": divergence_type,
@@ -133,7 +139,7 @@ async def get_divergence(
             "sentiment_score": round(sentiment_score, 2),
             "price_change_pct": round(price_change_pct, 2),
             "signal_strength": signal_strength,
-            "news_count": len(all_news),
+            "news_count": len(articles),
             "alcista_count": alcista,
             "bajista_count": bajista,
             "days_analyzed": days,
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from services.market_data import MarketDataService
+from services.market_snapshot import get_market_snapshot
 
 router = APIRouter(
     prefix="/api/market",
@@ -10,12 +11,16 @@ router = APIRouter(
 async def get_market_data():
     """
     Get latest market prices for commodities.
+    
+    Served from the in-memory snapshot, refreshed in the background; each
+    field reports its age and whether it is stale. Mock data is only
+    returned while no upstream call has ever succeeded.
     """
-    # Use real data service
-    data = await MarketDataService.get_latest_prices()
+    snapshot = get_market_snapshot()
+    data = await snapshot.get()
     
-    # Simple fallback check
-    if "error" in data:
+    # Nothing fetched yet (cold start with upstreams down)
+    if not snapshot.has_data:
         return MarketDataService.get_mock_data()
         
     return data
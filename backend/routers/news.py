@@ -7,11 +7,17 @@ from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 
-from database import get_supabase_client, NewsRepository
-from schemas import NewsResponse, NewsListResponse, SentimentStats, PipelineResponse
+from database import get_news_repository, NEWS_COLUMNS
+from schemas import (
+    NewsResponse, NewsListResponse, SearchResult, SearchResponse, SentimentStats, PipelineResponse,
+    sparse_news_model
+)
 from scrapers import RSScraper, RSS_SOURCES
 from sentiment import SentimentAnalyzer, MockLLMClient
+from services.article_store import get_article_store
+from services.sentiment_index import get_sentiment_index
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +25,7 @@ router = APIRouter(prefix="/api", tags=["news"])
 
 # Track pipeline runs in memory (reset on restart)
 _last_pipeline_run = None
-_last_pipeline_articles = 0
+_last_pipeline_stats = {"written": 0, "skipped": 0}
 
 
 def dict_to_news_response(news_dict: dict) -> NewsResponse:
@@ -41,11 +47,57 @@ def dict_to_news_response(news_dict: dict) -> NewsResponse:
         sentiment=news_dict.get("sentiment"),
         confidence=news_dict.get("confidence"),
         commodity=news_dict.get("commodity", "SOJA"),
+        commodities=news_dict.get("commodities") or [],
         created_at=news_dict["created_at"],
         updated_at=news_dict["updated_at"]
     )
 
 
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """
+    Parse a ``fields=`` query parameter into a sparse fieldset.
+    
+    The ``id`` column is always included so clients can key the articles.
+    
+    Args:
+        fields: Comma-separated field names (e.g. "title,sentiment")
+        
+    Returns:
+        Tuple of columns in NEWS_COLUMNS order, or None for the full record
+        
+    Raises:
+        HTTPException: 400 if a field name is unknown
+    """
+    if not fields:
+        return None
+    
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(NEWS_COLUMNS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Valid fields: {', '.join(NEWS_COLUMNS)}"
+        )
+    
+    requested.add("id")
+    return tuple(c for c in NEWS_COLUMNS if c in requested)
+
+
+def sparse_articles(news_list: list, fields: tuple) -> list:
+    """
+    Serialize news records through the sparse NewsResponse model for `fields`.
+    
+    Args:
+        news_list: News records from database (already projected to `fields`)
+        fields: Sparse fieldset returned by parse_fields
+        
+    Returns:
+        List of JSON-ready dicts with only the requested fields
+    """
+    model = sparse_news_model(fields)
+    return [jsonable_encoder(model(**news)) for news in news_list]
+
+
 @router.get("/news", response_model=NewsListResponse)
 async def get_news(
     limit: int = Query(default=50, ge=1, le=200, description="Maximum number of articles to return"),
@@ -53,7 +105,8 @@ async def get_news(
     source: Optional[List[str]] = Query(default=None, description="Filter by source names (multi-select)"),  # Cambiado a List[str]
     commodity: Optional[str] = Query(default=None, description="Filter by commodity (SOJA/MAÍZ/TRIGO/GIRASOL/CEBADA/SORGO/GENERAL)"),
     date_from: Optional[str] = Query(default=None, description="Filter from date (ISO format: YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(default=None, description="Filter to date (ISO format: YYYY-MM-DD)")
+    date_to: Optional[str] = Query(default=None, description="Filter to date (ISO format: YYYY-MM-DD)"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return (e.g. id,title,sentiment)")
 ):
     """
     Get a list of news articles with optional filters.
@@ -65,13 +118,15 @@ async def get_news(
         - **commodity**: Optional filter by commodity (SOJA/MAÍZ/TRIGO/GIRASOL/CEBADA/SORGO/GENERAL)
         - **date_from**: Optional start date filter (YYYY-MM-DD)
         - **date_to**: Optional end date filter (YYYY-MM-DD)
+        - **fields**: Optional sparse fieldset; narrows both the DB projection and the response
         
     Returns:
         List of news articles with sentiment analysis
     """
+    columns = parse_fields(fields)
+    
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
         # Check if any filter is applied
         has_filters = any([sentiment, source, commodity, date_from, date_to])
@@ -83,10 +138,15 @@ async def get_news(
                 commodity=commodity,
                 date_from=date_from,
                 date_to=date_to,
-                limit=limit
+                limit=limit,
+                columns=columns or NEWS_COLUMNS
             )
         else:
-            news_list = repo.get_all(limit=limit)
+            news_list = repo.get_all(limit=limit, columns=columns or NEWS_COLUMNS)
+        
+        if columns:
+            articles = sparse_articles(news_list, columns)
+            return JSONResponse(content={"total": len(articles), "articles": articles})
         
         # Convert to NewsResponse schema
         articles = [dict_to_news_response(news) for news in news_list]
@@ -101,26 +161,84 @@ async def get_news(
         raise HTTPException(status_code=500, detail=f"Failed to fetch news: {str(e)}")
 
 
+@router.get("/search", response_model=SearchResponse)
+async def search_news(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms (\"phrase\", OR and -word supported)"),
+    limit: int = Query(default=20, ge=1, le=200, description="Maximum number of results to return"),
+    sentiment: Optional[str] = Query(default=None, description="Filter by sentiment (ALCISTA/BAJISTA/NEUTRAL)"),
+    source: Optional[List[str]] = Query(default=None, description="Filter by source names (multi-select)"),
+    commodity: Optional[str] = Query(default=None, description="Filter by commodity (SOJA/MAÍZ/TRIGO/GIRASOL/CEBADA/SORGO/GENERAL)"),
+    date_from: Optional[str] = Query(default=None, description="Filter from date (ISO format: YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(default=None, description="Filter to date (ISO format: YYYY-MM-DD)")
+):
+    """
+    Full-text search over news headlines.
+    
+    Words are stemmed in Spanish ("heladas" also matches "helada") and accents
+    are ignored. All words must match unless joined with OR; "quoted phrases"
+    match in order and -word excludes.
+    
+    Parameters:
+        - **q**: Search terms
+        - **limit**: Maximum number of results (default: 20, max: 200)
+        - **sentiment**, **source**, **commodity**, **date_from**, **date_to**: Same filters as /api/news
+        
+    Returns:
+        Matching articles ranked by relevance (newest first on ties), with the
+        matched terms highlighted in `headline`
+    """
+    try:
+        repo = get_news_repository()
+        rows = repo.search(
+            q,
+            source=source,
+            sentiment=sentiment,
+            commodity=commodity,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit
+        )
+        
+        results = [
+            SearchResult(**dict_to_news_response(row).model_dump(), rank=row["rank"], headline=row["headline"])
+            for row in rows
+        ]
+        
+        return SearchResponse(query=q, total=len(results), results=results)
+        
+    except Exception as e:
+        logger.error(f"Error searching news: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to search news: {str(e)}")
+
+
 @router.get("/news/{news_id}", response_model=NewsResponse)
-async def get_news_by_id(news_id: str):
+async def get_news_by_id(
+    news_id: str,
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return (e.g. id,title,sentiment)")
+):
     """
     Get a single news article by ID.
     
     Parameters:
         - **news_id**: UUID of the news article
+        - **fields**: Optional sparse fieldset; narrows both the DB projection and the response
         
     Returns:
         Single news article with sentiment analysis
     """
+    columns = parse_fields(fields)
+    
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
-        news = repo.get_by_id(news_id)
+        news = repo.get_by_id(news_id, columns=columns or NEWS_COLUMNS)
         
         if not news:
             raise HTTPException(status_code=404, detail=f"News article {news_id} not found")
         
+        if columns:
+            return JSONResponse(content=sparse_articles([news], columns)[0])
+        
         return dict_to_news_response(news)
         
     except HTTPException:
@@ -139,8 +257,7 @@ async def get_sentiment_stats():
         Aggregate statistics of sentiment distribution
     """
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
         # Get counts
         counts = repo.count_by_sentiment()
@@ -175,6 +292,7 @@ async def get_sentiment_stats():
 async def run_pipeline_task():
     """Background task to run the complete pipeline."""
     logger.info("Starting pipeline task in background...")
+    _last_pipeline_stats.update({"written": 0, "skipped": 0})
     
     try:
         # Step 1: Scrape news
@@ -199,8 +317,7 @@ async def run_pipeline_task():
         logger.info(f"Total scraped: {len(all_news)} articles")
         
         # Step 2: Filter out articles already in DB to save tokens
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
         new_news = []
         for article in all_news:
@@ -237,8 +354,18 @@ async def run_pipeline_task():
         valid_news_objects = [n for n in new_news if str(n.url) in valid_urls]
         
         if valid_news_objects:
-             results = repo.upsert_news(valid_news_objects, sentiment_data)
-             logger.info(f"Pipeline completed: {len(results)} articles saved")
+             repo.upsert_news(valid_news_objects, sentiment_data)
+             get_article_store().mark_stale()
+             try:
+                 get_sentiment_index().refresh()
+             except Exception as e:
+                 logger.error(f"Sentiment index update failed: {e}")
+             stats = repo.last_upsert_stats or {"written": 0, "skipped": 0}
+             _last_pipeline_stats.update(stats)
+             logger.info(
+                 f"Pipeline completed: {stats['written']} articles saved, "
+                 f"{stats['skipped']} unchanged skipped"
+             )
         else:
              logger.info("Pipeline completed: No valid articles to save")
         
@@ -278,13 +405,13 @@ async def run_pipeline(background_tasks: BackgroundTasks):
 async def get_pipeline_status():
     """
     Get the status of the last pipeline run.
-    Returns last run timestamp and article count.
+    Returns last run timestamp and counts of articles written and skipped
+    as unchanged.
     """
     try:
         # Try to get the most recent article date from DB as a proxy
-        client = get_supabase_client()
-        repo = NewsRepository(client)
-        recent = repo.get_recent(hours=24*30, limit=1)  # last 30 days
+        repo = get_news_repository()
+        recent = repo.get_recent(hours=24*30, limit=1, columns=("created_at", "published_at"))  # last 30 days
         
         last_article_date = None
         if recent:
@@ -293,34 +420,43 @@ async def get_pipeline_status():
         return {
             "last_pipeline_run": _last_pipeline_run,
             "last_article_date": last_article_date,
-            "articles_in_last_run": _last_pipeline_articles
+            "articles_in_last_run": _last_pipeline_stats["written"],
+            "articles_skipped_in_last_run": _last_pipeline_stats["skipped"]
         }
     except Exception as e:
         return {
             "last_pipeline_run": _last_pipeline_run,
             "last_article_date": None,
-            "articles_in_last_run": 0
+            "articles_in_last_run": _last_pipeline_stats["written"],
+            "articles_skipped_in_last_run": _last_pipeline_stats["skipped"]
         }
 
 
 @router.get("/recent", response_model=NewsListResponse)
 async def get_recent_news(
-    hours: int = Query(default=24, ge=1, le=168, description="Number of hours to look back")
+    hours: int = Query(default=24, ge=1, le=168, description="Number of hours to look back"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return (e.g. id,title,sentiment)")
 ):
     """
     Get recent news articles from the last N hours.
     
     Parameters:
         - **hours**: Number of hours to look back (default: 24, max: 168/7 days)
+        - **fields**: Optional sparse fieldset; narrows both the DB projection and the response
         
     Returns:
         List of recent news articles
     """
+    columns = parse_fields(fields)
+    
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
-        news_list = repo.get_recent(hours=hours, limit=100)
+        news_list = repo.get_recent(hours=hours, limit=100, columns=columns or NEWS_COLUMNS)
+        
+        if columns:
+            articles = sparse_articles(news_list, columns)
+            return JSONResponse(content={"total": len(articles), "articles": articles})
         
         # Convert to NewsResponse schema
         articles = [dict_to_news_response(news) for news in news_list]
@@ -341,17 +477,18 @@ async def get_available_sources():
     Get list of available news sources.
     
     Returns:
-        List of unique source names
+        List of unique source names, plus per-source article counts and
+        last publication timestamps
     """
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
         
-        all_news = repo.get_all(limit=1000)
-        sources = list(set(news.get('source', 'Unknown') for news in all_news))
-        sources.sort()
+        registry = repo.get_sources()
         
-        return {"sources": sources}
+        return {
+            "sources": [row["source"] for row in registry],
+            "details": registry
+        }
         
     except Exception as e:
         logger.error(f"Error fetching sources: {e}")
@@ -0,0 +1,36 @@
+"""Streaming sentiment index (exponentially decayed, per commodity and source)."""
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from services.sentiment_index import get_sentiment_index
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/sentiment", tags=["sentiment"])
+
+
+@router.get("/index")
+async def get_sentiment_index_endpoint(
+    commodity: Optional[str] = Query(default=None, description="Only this commodity"),
+    source: Optional[str] = Query(default=None, description="Only this source")
+):
+    """
+    Confidence-weighted sentiment index per half-life (1d, 7d, 30d by default).
+    
+    Each article weighs its confidence, halved every half-life as it ages;
+    the score is (alcista - bajista) / (alcista + bajista) over those
+    weights, from -1 (all bajista) to +1 (all alcista). Counts are the
+    articles of the last N days (Buenos Aires calendar days).
+    
+    The index is maintained incrementally as articles are stored, so this
+    endpoint does not scan news.
+    """
+    try:
+        return get_sentiment_index().read(commodity=commodity, source=source)
+        
+    except Exception as e:
+        logger.error(f"Error getting sentiment index: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
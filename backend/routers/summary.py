@@ -5,7 +5,8 @@ from datetime import datetime, timezone, timedelta
 
 from fastapi import APIRouter, HTTPException
 
-from database import get_supabase_client, NewsRepository
+from database import get_news_repository
+from services.article_store import get_article_store, sentiment_counts, commodity_counts
 
 logger = logging.getLogger(__name__)
 
@@ -19,50 +20,52 @@ async def get_daily_summary():
     
     Takes today's news, calculates stats, and asks Groq to produce
     a 2-3 sentence market overview for Argentine agricultural producers.
+    Without news in the last 24 hours it falls back to the newest 50 held
+    by the analytics store (AGROMATE_ANALYTICS_DAYS); "period" says which.
     """
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
+        repo = get_news_repository()
+        store = get_article_store()
         
-        # Get news from the last 24 hours
-        all_news = repo.get_recent(hours=24, limit=200)
+        # News from the last 24 hours
+        articles = store.select(date_from=datetime.now(timezone.utc) - timedelta(hours=24))
+        headlines = repo.get_recent(hours=24, limit=10, columns=("title",))
+        period = "24h"
         
-        if not all_news:
-            # Fall back to most recent news regardless of date
-            all_news = repo.get_all(limit=50)
+        if not len(articles):
+            # Fall back to the most recent news the store holds
+            articles = store.select().newest(50)
+            headlines = repo.get_recent(hours=store.horizon_days * 24, limit=10, columns=("title",))
+            period = f"{store.horizon_days}d"
         
-        if not all_news:
+        if not len(articles):
             return {
-                "summary": "No hay noticias disponibles para generar un resumen. Ejecutá 'Actualizar Análisis' para obtener datos.",
+                "summary": f"No hay noticias de los últimos {store.horizon_days} días para generar un resumen. "
+                           "Ejecutá 'Actualizar Análisis' para obtener datos.",
+                "period": period,
                 "sentiment_score": 0.0,
                 "stats": {"alcista": 0, "bajista": 0, "neutral": 0, "total": 0},
                 "generated_at": datetime.now(timezone.utc).isoformat()
             }
         
         # Calculate stats
-        alcista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'ALCISTA')
-        bajista = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'BAJISTA')
-        neutral = sum(1 for n in all_news if (n.get('sentiment') or '').upper() == 'NEUTRAL')
-        total = len(all_news)
+        counts = sentiment_counts(articles)
+        alcista = counts["ALCISTA"]
+        bajista = counts["BAJISTA"]
+        neutral = counts["NEUTRAL"]
+        total = len(articles)
         
         # Calculate weighted score
         score = 0.0
         if alcista + bajista > 0:
             score = (alcista - bajista) / (alcista + bajista)
         
-        # Collect commodity mentions
-        commodities = {}
-        for n in all_news:
-            c = n.get('commodity', 'GENERAL')
-            if c and c != 'IRRELEVANT':
-                commodities[c] = commodities.get(c, 0) + 1
-        
-        top_commodities = sorted(commodities.items(), key=lambda x: x[1], reverse=True)[:3]
+        # Multi-commodity articles count once for each of their commodities
+        top_commodities = list(commodity_counts(articles).items())[:3]
         commodity_text = ", ".join(f"{c} ({n})" for c, n in top_commodities) if top_commodities else "sin datos"
         
         # Collect some example headlines
-        headlines = [n.get('title', '') for n in all_news[:10]]
-        headlines_text = "\n".join(f"- {h}" for h in headlines if h)
+        headlines_text = "\n".join(f"- {h['title']}" for h in headlines if h.get('title'))
         
         # Generate summary via Groq
         summary_text = await _generate_summary_with_groq(
@@ -77,6 +80,7 @@ async def get_daily_summary():
         
         return {
             "summary": summary_text,
+            "period": period,
             "sentiment_score": round(score, 2),
             "stats": {
                 "alcista": alcista,
@@ -3,123 +3,113 @@ Trends router for historical sentiment data visualization.
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 import logging
 
-from database import get_supabase_client, NewsRepository
+from services.article_store import (
+    ArticleFrame, ArticleStore, get_article_store, bucket_sentiment_counts, bucket_weighted_scores,
+    source_sentiment_counts
+)
+from services.bucketing import (
+    BucketGrid, GRANULARITIES, DEFAULT_GRANULARITY, DEFAULT_TIMEZONE, Timestamp, bucket_grid
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/trends", tags=["trends"])
 
+GRANULARITY_DESCRIPTION = f"Bucket size: {', '.join(GRANULARITIES)}"
+TIMEZONE_DESCRIPTION = "IANA timezone for bucket boundaries"
+FILL_GAPS_DESCRIPTION = "Include buckets without articles"
 
-def calculate_weighted_sentiment(items):
+
+def time_grid(
+    granularity: str,
+    tz: str,
+    date_from: Optional[str],
+    date_to: Optional[str],
+    default_days: int
+) -> BucketGrid:
     """
-    Calcula un score de sentimiento ponderado por la confianza.
-    Retorna un valor entre -1 (Totalmente Bajista) y 1 (Totalmente Alcista).
+    Buckets for a trends request: date_from (or `default_days` ago) until date_to (or now).
     
-    Args:
-        items: Lista de noticias con 'sentiment' y 'confidence'
-        
-    Returns:
-        float: Score ponderado entre -1 y 1
+    Raises:
+        HTTPException: 400 for an unknown granularity/timezone, a malformed
+            date or a range with too many buckets
     """
-    if not items:
-        return 0.0
-    
-    # Filtramos por sentimiento
-    alcista_items = [i for i in items if (i.get('sentiment') or '').upper() == 'ALCISTA']
-    bajista_items = [i for i in items if (i.get('sentiment') or '').upper() == 'BAJISTA']
-    
-    # Sumamos la confianza (Confidence Mass)
-    # Si no hay 'confidence', asumimos 0.5 por defecto
-    weighted_alcista = sum(float(i.get('confidence', 0.5)) for i in alcista_items)
-    weighted_bajista = sum(float(i.get('confidence', 0.5)) for i in bajista_items)
-    
-    total_weight = weighted_alcista + weighted_bajista
+    now = datetime.now(timezone.utc)
+    try:
+        return bucket_grid(date_from or now - timedelta(days=default_days), date_to or now, granularity, tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def select_articles(
+    store: ArticleStore,
+    source: Optional[str],
+    sentiment: Optional[str],
+    date_from: Timestamp,
+    date_to: Optional[str]
+) -> ArticleFrame:
+    """
+    Articles for a trends request; ranges older than the store's horizon are read from the repository.
     
-    if total_weight == 0:
-        return 0.0
-        
-    # Fórmula: (Peso Alcista - Peso Bajista) / Peso Total
-    return (weighted_alcista - weighted_bajista) / total_weight
+    Raises:
+        HTTPException: 400 for a malformed date
+    """
+    try:
+        return store.select_history(source=source, sentiment=sentiment, date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def grid_start(grid: BucketGrid) -> datetime:
+    """Start of the first bucket, so a widened bucket counts all its articles."""
+    return datetime.fromtimestamp(int(grid.edges[0]), timezone.utc)
+
+
+def period(days: int, grid: BucketGrid, date_from: Optional[str], date_to: Optional[str]) -> Optional[str]:
+    """"7d" for the N-day window, else the first and last bucket of the explicit range."""
+    if not (date_from or date_to):
+        return f"{days}d"
+    return f"{grid.labels[0]}/{grid.labels[-1]}" if len(grid) else None
 
 
 @router.get("/daily")
 async def get_daily_trends(
-    days: int = Query(default=7, ge=1, le=30),
+    days: int = Query(default=7, ge=1, le=3660),
+    granularity: str = Query(default=DEFAULT_GRANULARITY, description=GRANULARITY_DESCRIPTION),
+    tz: str = Query(default=DEFAULT_TIMEZONE, description=TIMEZONE_DESCRIPTION),
+    fill_gaps: bool = Query(default=False, description=FILL_GAPS_DESCRIPTION),
     source: Optional[str] = Query(default=None, description="Filter by source name"),
     sentiment: Optional[str] = Query(default=None, description="Filter by sentiment"),
     date_from: Optional[str] = Query(default=None, description="Filter from date (ISO format)"),
     date_to: Optional[str] = Query(default=None, description="Filter to date (ISO format)")
 ):
     """
-    Get daily sentiment trends for the last N days.
+    Get sentiment trends for the last N days.
     
-    Returns count of ALCISTA, BAJISTA, NEUTRAL per day.
-    Supports filtering by source, sentiment, and date range.
+    Returns count of ALCISTA, BAJISTA, NEUTRAL per bucket (hour, day, week
+    or month in `tz`, Buenos Aires by default). date_from/date_to replace
+    the N-day window. Supports filtering by source, sentiment, and date range.
+    Ranges older than the analytics store's horizon are read from the
+    repository.
     """
+    store = get_article_store()
+    grid = time_grid(granularity, tz, date_from, date_to, days)
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
-        
-        # Get date range (use UTC timezone to match DB timestamps)
-        from datetime import timezone
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=days)
-        
-        # Use filtered query if filters provided
-        has_filters = source or sentiment or date_from or date_to
-        if has_filters:
-            all_news = repo.get_filtered(
-                source=source,
-                sentiment=sentiment,
-                date_from=date_from,
-                date_to=date_to,
-                limit=1000
-            )
-        else:
-            all_news = repo.get_all(limit=1000)
-        
-        # Filter by date and group by day
-        daily_data = {}
-        
-        for news in all_news:
-            if not news.get('published_at'):
-                continue
-                
-            pub_date = datetime.fromisoformat(news['published_at'].replace('Z', '+00:00'))
-            
-            if pub_date < start_date:
-                continue
-                
-            date_key = pub_date.strftime('%Y-%m-%d')
-            
-            if date_key not in daily_data:
-                daily_data[date_key] = {
-                    "date": date_key,
-                    "alcista": 0,
-                    "bajista": 0,
-                    "neutral": 0
-                }
-            
-            news_sentiment = (news.get('sentiment') or 'NEUTRAL').upper()
-            if news_sentiment == 'ALCISTA':
-                daily_data[date_key]['alcista'] += 1
-            elif news_sentiment == 'BAJISTA':
-                daily_data[date_key]['bajista'] += 1
-            else:
-                daily_data[date_key]['neutral'] += 1
-        
-        # Convert to sorted list
-        result = sorted(daily_data.values(), key=lambda x: x['date'])
+        articles = select_articles(store, source, sentiment, date_from or grid_start(grid), date_to)
         
         return {
-            "period": f"{days}d",
-            "data": result
+            "period": period(days, grid, date_from, date_to),
+            "granularity": grid.granularity,
+            "timezone": grid.timezone,
+            "data": bucket_sentiment_counts(articles, grid, fill_gaps=fill_gaps)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting daily trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -127,6 +117,9 @@ async def get_daily_trends(
 
 @router.get("/by-source")
 async def get_trends_by_source(
+    granularity: Optional[str] = Query(default=None, description=f"{GRANULARITY_DESCRIPTION} (adds a per-source series)"),
+    tz: str = Query(default=DEFAULT_TIMEZONE, description=TIMEZONE_DESCRIPTION),
+    fill_gaps: bool = Query(default=False, description=FILL_GAPS_DESCRIPTION),
     source: Optional[str] = Query(default=None, description="Filter by source name"),
     sentiment: Optional[str] = Query(default=None, description="Filter by sentiment"),
     date_from: Optional[str] = Query(default=None, description="Filter from date (ISO format)"),
@@ -135,54 +128,22 @@ async def get_trends_by_source(
     """
     Get sentiment distribution by news source.
     
-    Returns count of ALCISTA, BAJISTA, NEUTRAL per source.
-    Supports filtering.
+    Returns count of ALCISTA, BAJISTA, NEUTRAL per source over the articles
+    published in the last AGROMATE_ANALYTICS_DAYS (the analytics store's
+    horizon) or since date_from. With a granularity, each source also gets
+    a "series" of counts per bucket over that period. Supports filtering.
     """
+    store = get_article_store()
+    grid = time_grid(granularity, tz, date_from, date_to, store.horizon_days) if granularity else None
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
-        
-        # Use filtered query if filters provided
-        has_filters = source or sentiment or date_from or date_to
-        if has_filters:
-            all_news = repo.get_filtered(
-                source=source,
-                sentiment=sentiment,
-                date_from=date_from,
-                date_to=date_to,
-                limit=1000
-            )
-        else:
-            all_news = repo.get_all(limit=1000)
-        
-        source_data = {}
-        
-        for news in all_news:
-            news_source = news.get('source', 'Unknown')
-            
-            if news_source not in source_data:
-                source_data[news_source] = {
-                    "source": news_source,
-                    "alcista": 0,
-                    "bajista": 0,
-                    "neutral": 0,
-                    "total": 0
-                }
-            
-            news_sentiment = (news.get('sentiment') or 'NEUTRAL').upper()
-            if news_sentiment == 'ALCISTA':
-                source_data[news_source]['alcista'] += 1
-            elif news_sentiment == 'BAJISTA':
-                source_data[news_source]['bajista'] += 1
-            else:
-                source_data[news_source]['neutral'] += 1
-            
-            source_data[news_source]['total'] += 1
+        articles = select_articles(store, source, sentiment, date_from, date_to)
         
         return {
-            "data": list(source_data.values())
+            "data": source_sentiment_counts(articles, grid, fill_gaps=fill_gaps)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting source trends: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -190,7 +151,10 @@ async def get_trends_by_source(
 
 @router.get("/timeline")
 async def get_sentiment_timeline(
-    days: int = Query(default=7, ge=1, le=30),
+    days: int = Query(default=7, ge=1, le=3660),
+    granularity: str = Query(default=DEFAULT_GRANULARITY, description=GRANULARITY_DESCRIPTION),
+    tz: str = Query(default=DEFAULT_TIMEZONE, description=TIMEZONE_DESCRIPTION),
+    fill_gaps: bool = Query(default=False, description=FILL_GAPS_DESCRIPTION),
     source: Optional[str] = Query(default=None, description="Filter by source name"),
     sentiment: Optional[str] = Query(default=None, description="Filter by sentiment"),
     date_from: Optional[str] = Query(default=None, description="Filter from date (ISO format)"),
@@ -199,71 +163,29 @@ async def get_sentiment_timeline(
     """
     Get sentiment score timeline with confidence weighting.
     
-    Calculates a weighted sentiment score (-1 to +1) per day where:
+    Calculates a weighted sentiment score (-1 to +1) per bucket where:
     - +1 = all ALCISTA (weighted by confidence)
     - -1 = all BAJISTA (weighted by confidence)
     - 0 = balanced or all NEUTRAL
     
-    News with higher confidence have more impact on the score.
+    News with higher confidence have more impact on the score. Buckets
+    follow the same rules as /daily; filled gaps score null.
     Supports filtering by source, sentiment, and date range.
     """
+    store = get_article_store()
+    grid = time_grid(granularity, tz, date_from, date_to, days)
     try:
-        client = get_supabase_client()
-        repo = NewsRepository(client)
-        
-        from datetime import timezone
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=days)
-        
-        # Use filtered query if filters provided
-        has_filters = source or sentiment or date_from or date_to
-        if has_filters:
-            all_news = repo.get_filtered(
-                source=source,
-                sentiment=sentiment,
-                date_from=date_from,
-                date_to=date_to,
-                limit=1000
-            )
-        else:
-            all_news = repo.get_all(limit=1000)
-        
-        # Group news by date
-        daily_news = {}
-        
-        for news in all_news:
-            if not news.get('published_at'):
-                continue
-                
-            pub_date = datetime.fromisoformat(news['published_at'].replace('Z', '+00:00'))
-            
-            if pub_date < start_date:
-                continue
-                
-            date_key = pub_date.strftime('%Y-%m-%d')
-            
-            if date_key not in daily_news:
-                daily_news[date_key] = []
-            
-            daily_news[date_key].append(news)
-        
-        # Calculate weighted scores for each day
-        timeline = []
-        for date_key, items in daily_news.items():
-            score = calculate_weighted_sentiment(items)
-            
-            timeline.append({
-                "date": date_key,
-                "sentiment_score": round(score, 2)
-            })
-        
-        timeline.sort(key=lambda x: x['date'])
+        articles = select_articles(store, source, sentiment, date_from or grid_start(grid), date_to)
         
         return {
-            "period": f"{days}d",
-            "data": timeline
+            "period": period(days, grid, date_from, date_to),
+            "granularity": grid.granularity,
+            "timezone": grid.timezone,
+            "data": bucket_weighted_scores(articles, grid, fill_gaps=fill_gaps)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting timeline: {e}")
         raise HTTPException(status_code=500, detail=str(e))
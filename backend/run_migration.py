@@ -19,15 +19,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_migration():
-    """Execute the database migration SQL."""
+MIGRATIONS_DIR = Path(__file__).parent.parent / "supabase" / "migrations"
+
+
+def run_migrations(names=None):
+    """
+    Execute migrations in filename order.
+    
+    Args:
+        names: Optional list of migration filenames; defaults to every
+               .sql file in supabase/migrations
+    """
+    files = [MIGRATIONS_DIR / n for n in names] if names else sorted(MIGRATIONS_DIR.glob("*.sql"))
+    for migration_file in files:
+        run_migration(migration_file)
+
+
+def run_migration(migration_file: Path = MIGRATIONS_DIR / "001_create_news_table.sql"):
+    """Execute a single database migration SQL file."""
     print("\n" + "="*80)
     print("🗄️  AGROMATE - Running Database Migration")
     print("="*80 + "\n")
     
-    # Read migration SQL
-    migration_file = Path(__file__).parent.parent / "supabase" / "migrations" / "001_create_news_table.sql"
-    
     print(f"📄 Reading migration file: {migration_file.name}\n")
     
     try:
@@ -70,7 +83,7 @@ def run_migration():
         print("\nOPTION 1: Supabase Dashboard")
         print("-" * 80)
         print("1. Go to: https://supabase.com/dashboard/project/ctzrzelnfjcrefuqerow/editor/sql")
-        print("2. Paste the SQL from: supabase/migrations/001_create_news_table.sql")
+        print(f"2. Paste the SQL from: supabase/migrations/{migration_file.name}")
         print("3. Click 'Run'\n")
         
         print("OPTION 2: SQL Code")
@@ -93,4 +106,4 @@ def run_migration():
 
 
 if __name__ == "__main__":
-    run_migration()
+    run_migrations(sys.argv[1:] or None)
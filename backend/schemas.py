@@ -1,8 +1,9 @@
 """Pydantic schemas (DTOs) for API request/response serialization."""
 
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, create_model
 
 
 class NewsResponse(BaseModel):
@@ -23,6 +24,7 @@ class NewsResponse(BaseModel):
     
     # Metadata
     commodity: Optional[str] = Field("SOJA", description="Related commodity")
+    commodities: List[str] = Field(default_factory=list, description="Normalized commodity labels")
     created_at: datetime = Field(..., description="Record creation timestamp")
     updated_at: datetime = Field(..., description="Record update timestamp")
     
@@ -38,18 +40,53 @@ class NewsResponse(BaseModel):
                 "sentiment": "ALCISTA",
                 "confidence": 0.92,
                 "commodity": "SOJA",
+                "commodities": ["SOJA"],
                 "created_at": "2026-01-31T18:00:00Z",
                 "updated_at": "2026-01-31T18:00:00Z"
             }
         }
 
 
+@lru_cache(maxsize=64)
+def sparse_news_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Build a NewsResponse variant restricted to a sparse fieldset.
+    
+    Used by endpoints that accept ``fields=``. Field types and descriptions are
+    copied from NewsResponse; models are cached per fieldset.
+    
+    Args:
+        fields: Ordered NewsResponse field names to keep
+        
+    Returns:
+        Pydantic model class with only the requested fields
+    """
+    definitions = {
+        name: (NewsResponse.model_fields[name].annotation, NewsResponse.model_fields[name])
+        for name in fields
+    }
+    return create_model("SparseNewsResponse", **definitions)
+
+
 class NewsListResponse(BaseModel):
     """Response model for a list of news articles."""
     total: int = Field(..., description="Total number of articles returned")
     articles: list[NewsResponse] = Field(..., description="List of news articles")
 
 
+class SearchResult(NewsResponse):
+    """A news article matched by /api/search."""
+    rank: float = Field(..., description="Relevance score (higher is better)")
+    headline: str = Field(..., description="Title with matched terms wrapped in <b>...</b>")
+
+
+class SearchResponse(BaseModel):
+    """Response model for a headline search."""
+    query: str = Field(..., description="Search query as received")
+    total: int = Field(..., description="Number of results returned")
+    results: list[SearchResult] = Field(..., description="Matches, best first")
+
+
 class SentimentStats(BaseModel):
     """Response model for sentiment statistics."""
     total: int = Field(..., description="Total number of articles")
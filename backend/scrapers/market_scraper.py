@@ -1,15 +1,66 @@
+import hashlib
 import logging
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
 import httpx
-from bs4 import BeautifulSoup
-from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Where the grain tables start; nothing before it is parsed
+TABLE_START = re.compile(r"<table", re.IGNORECASE)
+
+# Characters fed to the parser at a time (it stops between chunks)
+FEED_CHUNK = 16384
+
+
+class _PizarraParser(HTMLParser):
+    """
+    Collects the cells of table rows and hands each row to `on_row`.
+
+    Only text inside <td>/<th> of a <table> is kept, so the rest of the
+    page costs a tag callback and nothing else.
+    """
+
+    def __init__(self, on_row):
+        super().__init__(convert_charrefs=True)
+        self.on_row = on_row
+        self._tables = 0
+        self._cells: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._tables += 1
+        elif tag == "tr" and self._tables:
+            self._cells = []
+        elif tag in ("td", "th") and self._cells is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._cells.append("".join(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._cells is not None:
+            if self._cells:
+                self.on_row(self._cells)
+            self._cells = None
+        elif tag == "table" and self._tables:
+            self._tables -= 1
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            text = data.strip()
+            if text:
+                self._cell.append(text)
+
+
 class AgrofyMarketScraper:
     """Scraper for Agrofy News market data (Granos)."""
-    
+
     URL = "https://news.agrofy.com.ar/granos"
-    
+
     # Mapping of commodity names to our internal keys
     MAPPING = {
         "Soja": "soja",
@@ -18,94 +69,91 @@ class AgrofyMarketScraper:
         "Girasol": "girasol"
     }
 
+    # httpx transport override (tests)
+    transport: Optional[httpx.AsyncBaseTransport] = None
+
+    # Last answer, reused while the page does not change (ETag / body digest)
+    _etag: Optional[str] = None
+    _digest: Optional[str] = None
+    _cached: Dict[str, Any] = {}
+
+    @classmethod
+    def parse_prices(cls, html: str) -> Dict[str, Any]:
+        """
+        Extract the Pizarra Rosario rows from the granos page.
+
+        Rows look like [Grano, Mercado, Plaza, Cotización, Variación, ...],
+        e.g. ['Soja', 'Pizarra', 'Rosario', '$ 470.000', '-1,26 %']. Parsing
+        starts at the first <table> and stops as soon as every grain in
+        MAPPING has its row; pages without tables or without "pizarra"
+        are not parsed at all.
+        """
+        results: Dict[str, Any] = {}
+        start = TABLE_START.search(html)
+        if start is None or "pizarra" not in html.lower():
+            return results
+
+        names = [(commodity, commodity.lower(), key) for commodity, key in cls.MAPPING.items()]
+
+        def on_row(cells: List[str]) -> None:
+            row_text = " ".join(cells).lower()
+            if "pizarra" not in row_text or "rosario" not in row_text:
+                return
+            first = cells[0].lower()
+            for commodity, name, key in names:
+                if name in first and f"{key}_rosario" not in results:
+                    try:
+                        results[f"{key}_rosario"] = {
+                            "price": cls._number(cells[3].replace(".", "")),     # "$ 470.000"
+                            "currency": "ARS",  # Pizarra Rosario is usually ARS
+                            "change_percent": cls._number(cells[4]),            # "-1,26 %"
+                            "symbol": "Rosario",
+                            "name": f"{commodity} Rosario"
+                        }
+                    except Exception as e:
+                        logger.warning(f"Error parsing row for {commodity}: {e}")
+
+        parser = _PizarraParser(on_row)
+        for offset in range(start.start(), len(html), FEED_CHUNK):
+            parser.feed(html[offset:offset + FEED_CHUNK])
+            if len(results) == len(names):
+                break
+        return results
+
+    @staticmethod
+    def _number(raw: str) -> float:
+        return float(raw.replace("$", "").replace("%", "").replace(",", ".").strip())
+
     @classmethod
     async def get_prices(cls) -> Dict[str, Any]:
         """
         Scrape Pizarra Rosario prices from Agrofy.
+
+        The page is requested with the last ETag, and an unchanged body
+        (304 or same digest) returns the previous result without parsing.
         """
-        results = {}
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(cls.URL)
-                response.raise_for_status()
-                
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # The structure is a table-like layout
-            # We look for rows containing our target commodities AND "Pizarra" AND "Rosario"
-            
-            # Note: This selector strategy is based on the provided text structure. 
-            # Real HTML structure might vary, so we'll look for specific text containers.
-            # Usually tables or card grids.
-            
-            # Implementation strategy: Find rows/cards
-            rows = soup.find_all('tr') # Assuming standard table
-            
-            if not rows:
-                 # Fallback: maybe it's not a table but a div grid. 
-                 # Let's try to be generic or look for specific classes if we knew them.
-                 # For now, let's assume standard table search or text based parsing if table fails.
-                 pass
-
-            # Since we don't know the exact HTML class names without seeing the source code, 
-            # we will attempt a robust text-based search in the soup or standard table parsing.
-            # Based on common Agrofy structure:
-            
-            tables = soup.find_all('table')
-            for table in tables:
-                for row in table.find_all('tr'):
-                    cells = row.find_all(['td', 'th'])
-                    text_content = [c.get_text(strip=True) for c in cells]
-                    
-                    if not text_content:
-                        continue
-                        
-                    # Target Format: [Grano, Mercado, Posición, Cotización, Variación, ...]
-                    # Example: ['Soja', 'Pizarra', 'Rosario', '$ 470.000', '-1,26 %', ...]
-                    
-                    # Heurstic: Check if row has "Pizarra" and "Rosario"
-                    row_text = " ".join(text_content).lower()
-                    
-                    if "pizarra" in row_text and "rosario" in row_text:
-                        for commodity, key in cls.MAPPING.items():
-                            if commodity.lower() in text_content[0].lower(): # First cell is usually Commodity Name
-                                # Found a match!
-                                # Price is usually in the 4th column (index 3) based on user example
-                                # Soja | Pizarra | Rosario | $ 470.000
-                                try:
-                                    price_raw = text_content[3] # "$ 470.000"
-                                    change_raw = text_content[4] # "-1,26 %"
-                                    
-                                    # Clean Price
-                                    # "$ 470.000" -> 470000.0
-                                    price_clean = price_raw.replace('$', '').replace('.', '').replace(',', '.').strip()
-                                    price_val = float(price_clean)
-                                    
-                                    # Clean Change
-                                    # "-1,26 %" -> -1.26
-                                    change_clean = change_raw.replace('%', '').replace(',', '.').strip()
-                                    change_val = float(change_clean)
-                                    
-                                    results[f"{key}_rosario"] = {
-                                        "price": price_val,
-                                        "currency": "ARS", # Pizarra Rosario is usually ARS
-                                        "change_percent": change_val,
-                                        "symbol": "Rosario",
-                                        "name": f"{commodity} Rosario"
-                                    }
-                                except Exception as e:
-                                    logger.warning(f"Error parsing row for {commodity}: {e}")
-
-            # Fallback/Mock if scraping totally fails (for stability during dev)
-            # if not results:
-            #     return cls.get_mock_agrofy_data()
-                
-            return results
+            headers = {"If-None-Match": cls._etag} if cls._etag and cls._cached else {}
+            async with httpx.AsyncClient(timeout=10.0, transport=cls.transport) as client:
+                response = await client.get(cls.URL, headers=headers)
+            if response.status_code == 304:
+                return dict(cls._cached)
+            response.raise_for_status()
+
+            digest = hashlib.sha1(response.content).hexdigest()
+            if digest == cls._digest and cls._cached:
+                return dict(cls._cached)
+
+            results = cls.parse_prices(response.text)
+            cls._etag = response.headers.get("etag")
+            cls._digest = digest
+            cls._cached = results
+            return dict(results)
 
         except Exception as e:
             logger.error(f"Failed to scrape Agrofy: {e}")
             return {}
-            
+
     @staticmethod
     def get_mock_agrofy_data():
         """Mock data matching Agrofy structure."""
@@ -11,6 +11,8 @@ import logging
 from typing import Dict, Literal, Optional
 from abc import ABC, abstractmethod
 
+from models.commodity import parse_commodities, format_commodities
+
 logger = logging.getLogger(__name__)
 
 SentimentType = Literal["ALCISTA", "BAJISTA", "NEUTRAL"]
@@ -67,28 +69,10 @@ class AgroSentimentResponse(BaseModel):
         if "IRRELEVANT" in v:
             return "IRRELEVANT"
             
-        # Allow multi-commodity (comma separated)
-        parts = [p.strip() for p in v.split(",") if p.strip()]
-        valid_list = ["SOJA", "MAÍZ", "TRIGO", "GIRASOL", "CEBADA", "SORGO", "GENERAL"]
-        mapping = {
-            "MAIZ": "MAÍZ", "SOYBEAN": "SOJA", "WHEAT": "TRIGO", 
-            "CORN": "MAÍZ", "SUNFLOWER": "GIRASOL", "SORGHUM": "SORGO",
-            "BARLEY": "CEBADA"
-        }
-        
-        cleaned_parts = []
-        for p in parts:
-            if p in mapping:
-                cleaned_parts.append(mapping[p])
-            elif p in valid_list:
-                cleaned_parts.append(p)
-            # If part is not valid, ignore or map to GENERAL if it's the only one?
-            # Let's be permissive: if it contains valid ones, keep them.
-        
-        if not cleaned_parts:
-            return "GENERAL" # Fallback if no valid commodity found
-            
-        return ", ".join(list(set(cleaned_parts))) # Remove duplicates
+        # Allow multi-commodity (comma separated). Invalid parts are dropped;
+        # falls back to GENERAL if no valid commodity is found. Labels come
+        # back in a stable order so the stored display string is deterministic.
+        return format_commodities(parse_commodities(v))
 
 class GroqLLMClient(BaseLLMClient):
     """
@@ -0,0 +1,665 @@
+"""
+Columnar in-memory store of recent articles for the analytics endpoints.
+
+Trends, summary and divergence only need six small columns of the articles
+published in the last few weeks. The store keeps them as NumPy arrays
+(timestamps as int64 epoch seconds, sentiment/source/commodities as codes,
+confidence as float32) and answers with vectorized kernels instead of
+re-parsing ISO strings and uppercasing labels row by row on every request.
+
+It stays current by paging through rows written since its last refresh
+(get_changed_since) and rebuilds from scratch periodically or when the
+invalidation bus reports a delete, since deleted rows leave no trace in a
+change feed.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+from database import get_news_repository
+from database.base import BaseNewsRepository, ANALYTICS_COLUMNS
+from database.cache import QueryCache
+from models.commodity import COMMODITY_BITS, parse_commodities
+from services.bucketing import BucketGrid, Timestamp, epoch_seconds
+
+if TYPE_CHECKING:
+    from database.invalidation import NewsChange
+
+logger = logging.getLogger(__name__)
+
+# Sentiment codes; NULL and unknown labels share the last one
+SENTIMENTS = ("ALCISTA", "BAJISTA", "NEUTRAL")
+UNCLASSIFIED = len(SENTIMENTS)
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENTS)}
+
+NO_DATE = np.iinfo(np.int64).min
+
+# Confidence assumed for classified articles without one
+DEFAULT_CONFIDENCE = 0.5
+
+DEFAULT_HORIZON_DAYS = 90
+DEFAULT_REFRESH_SECONDS = 30.0
+DEFAULT_REBUILD_SECONDS = 900.0
+PAGE_SIZE = 5000
+
+# updated_at is the writing transaction's start time, so a transaction still
+# open during a refresh commits rows older than what that refresh saw. The
+# next refresh re-reads writes from this long before the previous one
+# started; re-applying a row is harmless.
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+# Scans of the repository for ranges older than a store's horizon. Rewrites
+# of those old rows don't move the store's revision, so the TTL matches the
+# periodic rebuild that bounds how long the store itself can miss them.
+ARCHIVE_CACHE_TTL_SECONDS = DEFAULT_REBUILD_SECONDS
+ARCHIVE_CACHE_ENTRIES = 4
+
+# What a full reload replaces (restored if it fails)
+STATE_FIELDS = (
+    "_size", "_published", "_sentiment", "_confidence", "_source", "_commodities", "_alive",
+    "_ids", "_position", "_source_codes", "_source_names", "_watermark", "_started",
+)
+COLUMN_FIELDS = ("_published", "_sentiment", "_confidence", "_source", "_commodities", "_alive")
+
+
+@dataclass(frozen=True)
+class ArticleFrame:
+    """
+    A filtered copy of the store's columns, safe to read without locks.
+
+    Attributes:
+        published: int64 epoch seconds (NO_DATE when unknown)
+        sentiment: int8 index into SENTIMENTS (UNCLASSIFIED for NULL)
+        confidence: float32, NaN when unknown
+        source: int16 index into ``sources``
+        commodities: uint8 bitmask over COMMODITIES (0 for none)
+        sources: Source names by code
+    """
+
+    published: np.ndarray
+    sentiment: np.ndarray
+    confidence: np.ndarray
+    source: np.ndarray
+    commodities: np.ndarray
+    sources: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.published)
+
+    def take(self, index: np.ndarray) -> "ArticleFrame":
+        """Rows selected by a boolean mask or index array."""
+        return ArticleFrame(
+            self.published[index], self.sentiment[index], self.confidence[index],
+            self.source[index], self.commodities[index], self.sources
+        )
+
+    def newest(self, n: int) -> "ArticleFrame":
+        """The `n` most recently published rows (newest first)."""
+        if len(self) <= n:
+            order = np.argsort(-self.published, kind="stable")
+        else:
+            top = np.argpartition(-self.published, n - 1)[:n]
+            order = top[np.argsort(-self.published[top], kind="stable")]
+        return self.take(order)
+
+
+class ArticleStore:
+    """
+    Recent articles (published within ``horizon_days``) as parallel arrays.
+
+    Rows live at fixed positions; updates overwrite in place, removals leave
+    a tombstone until the arrays are compacted. Reads refresh first when the
+    data is older than ``refresh_seconds`` (or the bus flagged a change), so
+    the store behaves like a cache with incremental reloads.
+    """
+
+    def __init__(
+        self,
+        repo: Optional[BaseNewsRepository] = None,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        rebuild_seconds: float = DEFAULT_REBUILD_SECONDS,
+        page_size: int = PAGE_SIZE,
+        overlap: timedelta = REFRESH_OVERLAP
+    ):
+        """
+        Args:
+            repo: News repository (default: the shared one)
+            horizon_days: How far back, by publication date, articles are kept
+            refresh_seconds: Maximum age of the data before a read pulls changes
+            rebuild_seconds: Maximum time between full reloads (picks up deletes)
+            page_size: Rows per get_changed_since call
+            overlap: How far before the previous refresh writes are re-read
+        """
+        self._repo = repo
+        self.horizon_days = horizon_days
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.page_size = page_size
+        self.overlap = overlap
+
+        self._lock = threading.RLock()
+        self._clear()
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+        self._stale = False
+        self._needs_rebuild = True
+
+        self.refreshes = 0
+        self.rebuilds = 0
+        self.revision = 0
+        self._history = QueryCache(ttl_seconds=ARCHIVE_CACHE_TTL_SECONDS, max_entries=ARCHIVE_CACHE_ENTRIES)
+
+    @property
+    def repo(self) -> BaseNewsRepository:
+        return self._repo or get_news_repository()
+
+    def _clear(self) -> None:
+        self._size = 0
+        self._published = np.empty(0, dtype=np.int64)
+        self._sentiment = np.empty(0, dtype=np.int8)
+        self._confidence = np.empty(0, dtype=np.float32)
+        self._source = np.empty(0, dtype=np.int16)
+        self._commodities = np.empty(0, dtype=np.uint8)
+        self._alive = np.empty(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._position: Dict[str, int] = {}
+        self._source_codes: Dict[str, int] = {}
+        self._source_names: List[str] = []
+        self._watermark: Optional[Tuple[str, str]] = None
+        self._started: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    # ------------------------------------------------------------------
+    # Change tracking
+    # ------------------------------------------------------------------
+
+    def mark_stale(self) -> None:
+        """Pull changes on the next read (this process wrote articles)."""
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """Reload everything on the next read."""
+        self._needs_rebuild = True
+
+    def notify(self, change: "NewsChange") -> None:
+        """
+        Invalidation bus subscriber: deletes force a reload, other writes a refresh.
+
+        In polling mode every change arrives as op "poll", so deletes made by
+        other processes show up at the next periodic rebuild.
+        """
+        if change.op in ("delete", "truncate"):
+            self.invalidate()
+        else:
+            self.mark_stale()
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Pull rows written since the last refresh (or everything when `full`).
+
+        A failed full reload leaves the previous data in place.
+
+        Returns:
+            Number of rows read from the repository
+        """
+        with self._lock:
+            # Flags raised by the bus while this runs must survive it
+            self._stale = False
+            if full:
+                self._needs_rebuild = False
+                previous = {name: getattr(self, name) for name in STATE_FIELDS}
+                self._clear()
+
+            started = datetime.now(timezone.utc)
+            published_after = (started - timedelta(days=self.horizon_days)).isoformat()
+
+            updated_after, after_id = self._watermark or (None, None)
+            if self._watermark:
+                # Re-read what transactions in flight at the previous refresh may have committed since
+                recheck = self._started - self.overlap
+                if recheck < datetime.fromisoformat(updated_after.replace("Z", "+00:00")):
+                    updated_after, after_id = recheck.isoformat(), None
+
+            read = changed = 0
+            try:
+                while True:
+                    rows = self.repo.get_changed_since(
+                        updated_after, after_id, published_after, self.page_size, ANALYTICS_COLUMNS
+                    )
+                    if not rows:
+                        break
+                    changed += self._apply(rows)
+                    read += len(rows)
+                    # Pages come in (updated_at, id) order, so the last row is the newest write
+                    updated_after, after_id = rows[-1]["updated_at"], rows[-1]["id"]
+                    self._watermark = (updated_after, after_id)
+                    if len(rows) < self.page_size:
+                        break
+            except Exception:
+                if full:
+                    for name, value in previous.items():
+                        setattr(self, name, value)
+                    self._needs_rebuild = True
+                raise
+
+            evicted = self._evict(epoch_seconds(published_after))
+            if changed or evicted or full:
+                self.revision += 1
+
+            self._started = started
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+            if full:
+                self._rebuilt_at = self._refreshed_at
+                self.rebuilds += 1
+            return read
+
+    def _refresh_if_due(self) -> None:
+        now = time.monotonic()
+        full = self._needs_rebuild or now - self._rebuilt_at > self.rebuild_seconds
+        if not (full or self._stale or now - self._refreshed_at > self.refresh_seconds):
+            return
+        try:
+            read = self.refresh(full=full)
+            logger.debug(f"Article store {'reloaded' if full else 'refreshed'}: {read} rows read, {len(self)} held")
+        except Exception as e:
+            if self._rebuilt_at == 0.0:
+                raise
+            # Keep serving the previous data; the next read retries
+            logger.error(f"Article store refresh failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _reserve(self, size: int) -> None:
+        """Grow the arrays (doubling) to hold `size` rows."""
+        capacity = len(self._published)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        for name in COLUMN_FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _apply(self, rows: Sequence[Dict]) -> int:
+        """
+        Insert or overwrite rows (caller holds the lock).
+
+        Returns:
+            How many rows were new or differ from what was held (rows
+            re-read because of the refresh overlap usually do not)
+        """
+        positions = np.empty(len(rows), dtype=np.int64)
+        published = np.empty(len(rows), dtype=np.int64)
+        sentiment = np.empty(len(rows), dtype=np.int8)
+        confidence = np.empty(len(rows), dtype=np.float32)
+        source = np.empty(len(rows), dtype=np.int16)
+        commodities = np.empty(len(rows), dtype=np.uint8)
+
+        size = self._size
+        for i, row in enumerate(rows):
+            position = self._position.get(row["id"])
+            if position is None:
+                position = size
+                size += 1
+                self._position[row["id"]] = position
+                self._ids.append(row["id"])
+            positions[i] = position
+
+            ts = epoch_seconds(row.get("published_at"))
+            published[i] = NO_DATE if ts is None else ts
+            sentiment[i] = SENTIMENT_CODES.get((row.get("sentiment") or "").upper(), UNCLASSIFIED)
+            value = row.get("confidence")
+            confidence[i] = np.nan if value is None else float(value)
+            name = row.get("source") or "Unknown"
+            code = self._source_codes.get(name)
+            if code is None:
+                code = self._source_codes[name] = len(self._source_names)
+                self._source_names.append(name)
+            source[i] = code
+            commodities[i] = sum(COMMODITY_BITS.get(c, 0) for c in set(row.get("commodities") or ()))
+
+        # Rows already held, unchanged in every column
+        held = positions < self._size
+        same = np.zeros(len(rows), dtype=bool)
+        old = positions[held]
+        old_confidence = self._confidence[old]
+        same[held] = (
+            self._alive[old]
+            & (self._published[old] == published[held])
+            & (self._sentiment[old] == sentiment[held])
+            & ((old_confidence == confidence[held]) | (np.isnan(old_confidence) & np.isnan(confidence[held])))
+            & (self._source[old] == source[held])
+            & (self._commodities[old] == commodities[held])
+        )
+
+        self._reserve(size)
+        self._size = size
+        self._published[positions] = published
+        self._sentiment[positions] = sentiment
+        self._confidence[positions] = confidence
+        self._source[positions] = source
+        self._commodities[positions] = commodities
+        self._alive[positions] = True
+        return int(len(rows) - np.count_nonzero(same))
+
+    def _evict(self, cutoff: int) -> int:
+        """Drop rows published before `cutoff`; compact when most rows are dead."""
+        n = self._size
+        expired = np.flatnonzero(self._alive[:n] & (self._published[:n] < cutoff))
+        for position in expired:
+            del self._position[self._ids[position]]
+            self._ids[position] = None
+        self._alive[expired] = False
+
+        if n > 1024 and len(self._position) < n // 2:
+            keep = np.flatnonzero(self._alive[:n])
+            for name in COLUMN_FIELDS:
+                setattr(self, name, getattr(self, name)[keep].copy())
+            self._ids = [self._ids[p] for p in keep]
+            self._position = {news_id: p for p, news_id in enumerate(self._ids)}
+            self._size = len(keep)
+        return len(expired)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def current_revision(self) -> int:
+        """
+        Data revision after pulling due changes.
+
+        It changes whenever a refresh adds, updates or evicts rows, so
+        results derived from the store can be cached under it.
+        """
+        with self._lock:
+            self._refresh_if_due()
+            return self.revision
+
+    def select(
+        self,
+        source: Union[str, Iterable[str], None] = None,
+        sentiment: Optional[str] = None,
+        commodity: Optional[str] = None,
+        date_from: Timestamp = None,
+        date_to: Timestamp = None
+    ) -> ArticleFrame:
+        """
+        Articles matching every given filter (same semantics as get_filtered).
+
+        Args:
+            source: Source name or names
+            sentiment: ALCISTA/BAJISTA/NEUTRAL (any case)
+            commodity: Commodity label(s); multi-commodity articles must carry all
+            date_from: Published at or after (ISO string or datetime)
+            date_to: Published at or before
+
+        Returns:
+            ArticleFrame copy of the matching rows
+        """
+        with self._lock:
+            self._refresh_if_due()
+            n = self._size
+            mask = self._alive[:n].copy()
+
+            if source:
+                names = [source] if isinstance(source, str) else list(source)
+                codes = [self._source_codes[s] for s in names if s in self._source_codes]
+                mask &= np.isin(self._source[:n], codes)
+
+            if sentiment:
+                mask &= self._sentiment[:n] == SENTIMENT_CODES.get(sentiment.upper(), -1)
+
+            if commodity:
+                # Unknown labels match nothing, like get_filtered
+                labels = parse_commodities(commodity)
+                bits = sum(COMMODITY_BITS[c] for c in labels)
+                mask &= ((self._commodities[:n] & bits) == bits) if labels else False
+
+            ts_from, ts_to = epoch_seconds(date_from), epoch_seconds(date_to)
+            if ts_from is not None:
+                mask &= self._published[:n] >= ts_from
+            if ts_to is not None:
+                mask &= (self._published[:n] <= ts_to) & (self._published[:n] != NO_DATE)
+
+            index = np.flatnonzero(mask)
+            return ArticleFrame(
+                self._published[index], self._sentiment[index], self._confidence[index],
+                self._source[index], self._commodities[index], tuple(self._source_names)
+            )
+
+    def select_history(
+        self,
+        source: Union[str, Iterable[str], None] = None,
+        sentiment: Optional[str] = None,
+        commodity: Optional[str] = None,
+        date_from: Timestamp = None,
+        date_to: Timestamp = None
+    ) -> ArticleFrame:
+        """
+        Like select, but a date_from before the horizon is served too.
+
+        Those ranges come from a throwaway store that pages through the
+        repository back to date_from's day, cached per day and revision so
+        dashboards reading years back don't rescan on every request.
+
+        Raises:
+            ValueError: Malformed date
+        """
+        now, ts_from = time.time(), epoch_seconds(date_from)
+        if ts_from is None or ts_from >= now - self.horizon_days * 86400:
+            return self.select(source, sentiment, commodity, date_from, date_to)
+        days = math.ceil((now - ts_from) / 86400) + 1
+
+        def scan() -> ArticleStore:
+            archive = ArticleStore(self.repo, horizon_days=days, refresh_seconds=math.inf, rebuild_seconds=math.inf)
+            archive.current_revision()
+            logger.info(f"Article store: scanned {len(archive)} articles of the last {days} days")
+            return archive
+
+        archive = self._history.get_or_load((days, self.current_revision()), scan)
+        return archive.select(source, sentiment, commodity, date_from, date_to)
+
+    def stats(self) -> Dict:
+        """Size and refresh counters."""
+        return {
+            "articles": len(self),
+            "capacity": len(self._published),
+            "horizon_days": self.horizon_days,
+            "refreshes": self.refreshes,
+            "rebuilds": self.rebuilds,
+            "revision": self.revision,
+            "watermark": self._watermark[0] if self._watermark else None,
+        }
+
+
+# ----------------------------------------------------------------------
+# Kernels
+# ----------------------------------------------------------------------
+
+def _group_sentiment(keys: np.ndarray, sentiment: np.ndarray, groups: int) -> np.ndarray:
+    """(groups, 4) matrix of article counts per group and sentiment code."""
+    counts = np.bincount(keys.astype(np.int64) * (UNCLASSIFIED + 1) + sentiment, minlength=groups * (UNCLASSIFIED + 1))
+    return counts.reshape(groups, UNCLASSIFIED + 1)
+
+
+def _buckets(frame: ArticleFrame, grid: BucketGrid) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket index of the rows inside the grid, and the mask selecting those rows."""
+    index = grid.assign(frame.published)
+    keep = index >= 0
+    return index[keep], keep
+
+
+def sentiment_counts(frame: ArticleFrame) -> Dict[str, int]:
+    """Article count per sentiment label ("NULL" for unclassified)."""
+    counts = np.bincount(frame.sentiment, minlength=UNCLASSIFIED + 1)
+    return {**{label: int(counts[code]) for code, label in enumerate(SENTIMENTS)}, "NULL": int(counts[UNCLASSIFIED])}
+
+
+def weighted_score(alcista_weight: np.ndarray, bajista_weight: np.ndarray) -> np.ndarray:
+    """(alcista - bajista) / (alcista + bajista), 0 where both are 0."""
+    total = alcista_weight + bajista_weight
+    return np.divide(alcista_weight - bajista_weight, total, out=np.zeros_like(total), where=total > 0)
+
+
+def bucket_sentiment_counts(frame: ArticleFrame, grid: BucketGrid, fill_gaps: bool = False) -> List[Dict]:
+    """
+    Articles per time bucket and sentiment, oldest bucket first.
+
+    Unclassified articles count as neutral; rows outside the grid (or
+    undated) are skipped. Empty buckets are left out unless `fill_gaps`.
+    """
+    index, keep = _buckets(frame, grid)
+    counts = _group_sentiment(index, frame.sentiment[keep], len(grid))
+    neutral = counts[:, SENTIMENT_CODES["NEUTRAL"]] + counts[:, UNCLASSIFIED]
+    present = counts.sum(axis=1) > 0
+    return [
+        {"date": grid.labels[i], "alcista": int(counts[i, 0]), "bajista": int(counts[i, 1]), "neutral": int(neutral[i])}
+        for i in range(len(grid)) if fill_gaps or present[i]
+    ]
+
+
+def bucket_weighted_scores(frame: ArticleFrame, grid: BucketGrid, fill_gaps: bool = False) -> List[Dict]:
+    """
+    Confidence-weighted sentiment score (-1..1) per time bucket.
+
+    ALCISTA confidence counts positive, BAJISTA negative; neutral and
+    unclassified articles add no weight, so such buckets score 0. Buckets
+    without articles are left out, or scored None when `fill_gaps`.
+    """
+    index, keep = _buckets(frame, grid)
+    present = np.bincount(index, minlength=len(grid)) > 0
+
+    # Confidence mass per (bucket, ALCISTA|BAJISTA) in one pass over the classified rows
+    sentiment = frame.sentiment[keep]
+    weighted = sentiment <= SENTIMENT_CODES["BAJISTA"]
+    confidence = frame.confidence[keep][weighted]
+    mass = np.bincount(
+        index[weighted] * 2 + sentiment[weighted],
+        np.where(np.isnan(confidence), DEFAULT_CONFIDENCE, confidence),
+        minlength=2 * len(grid)
+    ).reshape(-1, 2)
+    scores = weighted_score(mass[:, 0], mass[:, 1])
+    return [
+        {"date": grid.labels[i], "sentiment_score": round(float(scores[i]), 2) if present[i] else None}
+        for i in range(len(grid)) if fill_gaps or present[i]
+    ]
+
+
+def source_sentiment_counts(
+    frame: ArticleFrame,
+    grid: Optional[BucketGrid] = None,
+    fill_gaps: bool = False
+) -> List[Dict]:
+    """
+    Articles per source and sentiment, largest source first (unclassified count as neutral).
+
+    With a `grid`, each source also gets a "series" of per-bucket counts
+    (same shape as bucket_sentiment_counts) over the rows inside the grid.
+    """
+    counts = _group_sentiment(frame.source, frame.sentiment, len(frame.sources))
+    totals = counts.sum(axis=1)
+
+    if grid is not None:
+        index, keep = _buckets(frame, grid)
+        series = _group_sentiment(
+            frame.source[keep].astype(np.int64) * len(grid) + index,
+            frame.sentiment[keep],
+            len(frame.sources) * len(grid)
+        ).reshape(len(frame.sources), len(grid), UNCLASSIFIED + 1)
+
+    result = []
+    for code in sorted(range(len(frame.sources)), key=lambda c: (-totals[c], frame.sources[c])):
+        if totals[code]:
+            row = counts[code]
+            entry = {
+                "source": frame.sources[code],
+                "alcista": int(row[0]),
+                "bajista": int(row[1]),
+                "neutral": int(row[2] + row[UNCLASSIFIED]),
+                "total": int(totals[code]),
+            }
+            if grid is not None:
+                buckets = series[code]
+                entry["series"] = [
+                    {"date": grid.labels[i], "alcista": int(b[0]), "bajista": int(b[1]), "neutral": int(b[2] + b[UNCLASSIFIED])}
+                    for i, b in enumerate(buckets) if fill_gaps or b.any()
+                ]
+            result.append(entry)
+    return result
+
+
+def commodity_window_counts(frame: ArticleFrame, labels: Sequence[str], cutoffs: Sequence[int]) -> np.ndarray:
+    """
+    (labels, cutoffs, 4) matrix of article counts per sentiment code.
+
+    Cell [i, j] counts the articles tagged with ``labels[i]`` and published
+    at or after ``cutoffs[j]`` (epoch seconds), the same rows as
+    select(commodity=labels[i], date_from=cutoffs[j]) on the frame.
+    """
+    bits = np.array([COMMODITY_BITS[label] for label in labels], dtype=np.uint8)
+    tagged = (frame.commodities[None, :] & bits[:, None]) != 0
+    recent = frame.published[None, :] >= np.asarray(cutoffs, dtype=np.int64)[:, None]
+    sentiment = np.eye(UNCLASSIFIED + 1, dtype=np.int64)[frame.sentiment.astype(np.int64)]
+    return np.einsum("ln,wn,ns->lws", tagged.astype(np.int64), recent.astype(np.int64), sentiment)
+
+
+def commodity_counts(frame: ArticleFrame) -> Dict[str, int]:
+    """
+    Articles per commodity label, most mentioned first.
+
+    Multi-commodity articles count once for each label; articles without
+    labels count as GENERAL.
+    """
+    counts = {
+        label: int(np.count_nonzero(frame.commodities & bit))
+        for label, bit in COMMODITY_BITS.items()
+    }
+    counts["GENERAL"] += int(np.count_nonzero(frame.commodities == 0))
+    return dict(sorted(((k, v) for k, v in counts.items() if v), key=lambda item: -item[1]))
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_store: Optional[ArticleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """
+    Get or create the process-wide store over the shared news repository.
+
+    AGROMATE_ANALYTICS_DAYS sets the horizon, AGROMATE_ANALYTICS_REFRESH the
+    refresh interval in seconds.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArticleStore(
+                    horizon_days=int(os.getenv("AGROMATE_ANALYTICS_DAYS", DEFAULT_HORIZON_DAYS)),
+                    refresh_seconds=float(os.getenv("AGROMATE_ANALYTICS_REFRESH", DEFAULT_REFRESH_SECONDS)),
+                )
+    return _store
+
+
+def reset_article_store() -> None:
+    """Forget the shared store (tests, backend switches)."""
+    global _store
+    _store = None
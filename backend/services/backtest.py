@@ -0,0 +1,283 @@
+"""
+Backtests of the divergence signals over stored news and prices.
+
+/api/divergence calls a BULLISH_DIVERGENCE (bullish news while the price
+fell) or a BEARISH_DIVERGENCE (bearish news while it rose) a possible
+opportunity. This module checks that claim on history: every day of the
+daily sentiment table (services.daily_sentiment) and the local price store
+is replayed through classify_divergence with the sliding-window score and
+price change of /api/divergence/history, for a whole grid of sentiment
+thresholds x price thresholds x windows at once.
+
+A signal bets on the price turning back: long after a bullish divergence,
+short after a bearish one. For each grid cell and forward horizon it
+reports how many signals fired, the hit rate (signed forward return above
+zero), the average signed forward return, and the total return and maximum
+drawdown of holding the signal's side on each day after a signal day.
+
+Everything is array arithmetic over (thresholds, windows, days): years of
+days and hundreds of cells take milliseconds, so the endpoint and the CLI
+(backtest_signals.py) can sweep freely.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from database.cache import REVISION_TTL_SECONDS, QueryCache
+from services.article_store import SENTIMENT_CODES
+from services.daily_sentiment import get_daily_sentiment
+from services.divergence import DIVERGENCE_TYPES, classify_divergence, daily_closes, window_stats
+from services.market_data import COMMODITIES
+from services.price_store import get_price_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SENTIMENT_THRESHOLDS = (0.15, 0.25, 0.35, 0.5)
+DEFAULT_PRICE_THRESHOLDS = (0.5, 1.0, 1.5, 2.5)
+DEFAULT_WINDOWS = (3, 7, 14, 30)
+DEFAULT_HORIZONS = (5, 10, 20)
+DEFAULT_YEARS = 5
+
+# Upper bound on cells (thresholds x windows x horizons) per request
+MAX_GRID_CELLS = 5000
+MAX_WINDOW_DAYS = 90
+MAX_HORIZON_DAYS = 120
+
+ALCISTA, BAJISTA = SENTIMENT_CODES["ALCISTA"], SENTIMENT_CODES["BAJISTA"]
+
+# Side taken per DIVERGENCE_TYPES code: long after a bullish divergence, short after a bearish one
+DIRECTIONS = np.array([0, 1, -1, 0], dtype=np.int8)
+
+
+def _values(raw: str, kind: type, name: str) -> Tuple:
+    try:
+        values = tuple(sorted({kind(v) for v in raw.split(",") if v.strip()}))
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{raw}' (expected a comma-separated list)")
+    if not values:
+        raise ValueError(f"No {name} given")
+    return values
+
+
+@dataclass(frozen=True)
+class BacktestGrid:
+    """
+    Parameters swept by a backtest.
+
+    Attributes:
+        sentiment_thresholds: Values of classify_divergence's sentiment_threshold
+        price_thresholds: Values of its price_threshold (percent)
+        windows: Sliding window lengths in days
+        horizons: Forward return horizons in days
+    """
+
+    sentiment_thresholds: Tuple[float, ...] = DEFAULT_SENTIMENT_THRESHOLDS
+    price_thresholds: Tuple[float, ...] = DEFAULT_PRICE_THRESHOLDS
+    windows: Tuple[int, ...] = DEFAULT_WINDOWS
+    horizons: Tuple[int, ...] = DEFAULT_HORIZONS
+
+    @classmethod
+    def parse(cls, sentiment: str, price: str, windows: str, horizons: str) -> "BacktestGrid":
+        """
+        Grid from comma-separated lists ("0.15,0.25", "1,1.5", "3,7", "5,10").
+
+        Raises:
+            ValueError: Malformed list, value out of range or too many cells
+        """
+        grid = cls(
+            _values(sentiment, float, "sentiment thresholds"),
+            _values(price, float, "price thresholds"),
+            _values(windows, int, "windows"),
+            _values(horizons, int, "horizons"),
+        )
+        if not all(0 <= s < 1 for s in grid.sentiment_thresholds):
+            raise ValueError("Sentiment thresholds must be between 0 and 1")
+        if not all(p >= 0 for p in grid.price_thresholds):
+            raise ValueError("Price thresholds must not be negative")
+        if not all(1 <= w <= MAX_WINDOW_DAYS for w in grid.windows):
+            raise ValueError(f"Windows must be between 1 and {MAX_WINDOW_DAYS} days")
+        if not all(1 <= h <= MAX_HORIZON_DAYS for h in grid.horizons):
+            raise ValueError(f"Horizons must be between 1 and {MAX_HORIZON_DAYS} days")
+        if grid.cells > MAX_GRID_CELLS:
+            raise ValueError(f"Grid too large: {grid.cells} cells (max {MAX_GRID_CELLS})")
+        return grid
+
+    @property
+    def cells(self) -> int:
+        return len(self.sentiment_thresholds) * len(self.price_thresholds) * len(self.windows) * len(self.horizons)
+
+
+def forward_returns(closes: np.ndarray, horizons: Sequence[int]) -> np.ndarray:
+    """(horizons, days) return from each day's close to the close `h` days later, NaN past the end."""
+    returns = np.full((len(horizons), len(closes)), np.nan)
+    for i, h in enumerate(horizons):
+        if h < len(closes):
+            np.divide(closes[h:], closes[:-h], out=returns[i, :-h], where=closes[:-h] > 0)
+            returns[i, :-h] -= 1
+    return returns
+
+
+def backtest(counts: np.ndarray, closes: np.ndarray, grid: BacktestGrid) -> Dict[str, np.ndarray]:
+    """
+    Replay every day of one commodity through the divergence rules for every grid cell.
+
+    Args:
+        counts: (days, 2+) alcista and bajista articles per day (more columns are ignored)
+        closes: Close of each day, forward-filled (NaN before the first)
+        grid: Parameters to sweep
+
+    Returns:
+        Arrays shaped (sentiment thresholds, price thresholds, windows[, horizons]):
+        bullish/bearish signal days, and per horizon the signals with a
+        forward return, hits, average signed return; per cell without
+        horizon the total return, max drawdown and exposure of the strategy
+    """
+    days = len(closes)
+    prefix = np.zeros((days + 1, 2), dtype=np.int64)
+    np.cumsum(counts[:, :2], axis=0, out=prefix[1:])
+    t = np.arange(days)
+    stats = [window_stats(prefix, closes, t, window) for window in grid.windows]
+    scores = np.stack([score for score, _ in stats])                              # (windows, days)
+    changes = np.stack([change for _, change in stats])
+
+    sentiment = np.asarray(grid.sentiment_thresholds)[:, None, None, None]
+    price = np.asarray(grid.price_thresholds)[None, :, None, None]
+    kinds, _ = classify_divergence(scores[None, None], changes[None, None], sentiment, price)
+    direction = DIRECTIONS[kinds]                                                 # (S, P, W, days)
+
+    fired = direction != 0
+    signals, hits, mean = [], [], []
+    for forward in forward_returns(closes, grid.horizons):
+        valid = fired & np.isfinite(forward)
+        signed = np.where(valid, direction * np.nan_to_num(forward), 0.0)
+        n = valid.sum(axis=-1)
+        signals.append(n)
+        hits.append((signed > 0).sum(axis=-1))
+        mean.append(np.divide(signed.sum(axis=-1), n, out=np.full(n.shape, np.nan), where=n > 0))
+
+    # Strategy: hold the signal's side over the day after each signal day
+    daily = np.zeros(days)
+    if days > 1:
+        np.divide(closes[1:], closes[:-1], out=daily[1:], where=closes[:-1] > 0)
+        daily[1:] = np.where(daily[1:] > 0, daily[1:] - 1, 0.0)
+    strategy = direction[..., :-1] * daily[1:]
+    equity = np.cumprod(1 + strategy, axis=-1) if days > 1 else np.ones(direction.shape[:-1] + (1,))
+    drawdown = (1 - equity / np.maximum(np.maximum.accumulate(equity, axis=-1), 1.0)).max(axis=-1, initial=0.0)
+
+    return {
+        "bullish": (direction == 1).sum(axis=-1),
+        "bearish": (direction == -1).sum(axis=-1),
+        "signals": np.stack(signals, axis=-1),
+        "hits": np.stack(hits, axis=-1),
+        "mean_return": np.stack(mean, axis=-1),
+        "total_return": equity[..., -1] - 1,
+        "max_drawdown": drawdown,
+        "exposure": fired[..., :-1].mean(axis=-1) if days > 1 else np.zeros(direction.shape[:-1]),
+    }
+
+
+def _pct(value: float) -> Any:
+    return None if np.isnan(value) else round(float(value) * 100, 2)
+
+
+def report_rows(result: Dict[str, np.ndarray], grid: BacktestGrid) -> List[Dict[str, Any]]:
+    """One row per grid cell and horizon."""
+    rows = []
+    for i, s in enumerate(grid.sentiment_thresholds):
+        for j, p in enumerate(grid.price_thresholds):
+            for k, w in enumerate(grid.windows):
+                for h, horizon in enumerate(grid.horizons):
+                    n = int(result["signals"][i, j, k, h])
+                    rows.append({
+                        "sentiment_threshold": s,
+                        "price_threshold": p,
+                        "window_days": w,
+                        "horizon_days": horizon,
+                        "bullish_days": int(result["bullish"][i, j, k]),
+                        "bearish_days": int(result["bearish"][i, j, k]),
+                        "signals": n,
+                        "hit_rate": round(int(result["hits"][i, j, k, h]) / n, 3) if n else None,
+                        "avg_return_pct": _pct(result["mean_return"][i, j, k, h]),
+                        "total_return_pct": _pct(result["total_return"][i, j, k]),
+                        "max_drawdown_pct": _pct(result["max_drawdown"][i, j, k]),
+                        "exposure": round(float(result["exposure"][i, j, k]), 3),
+                    })
+    return rows
+
+
+def baseline(closes: np.ndarray, horizons: Sequence[int]) -> List[Dict[str, Any]]:
+    """How often and how much the price rose over each horizon, signal or not."""
+    rows = []
+    for horizon, forward in zip(horizons, forward_returns(closes, horizons)):
+        valid = forward[np.isfinite(forward)]
+        rows.append({
+            "horizon_days": horizon,
+            "days": len(valid),
+            "up_rate": round(float((valid > 0).mean()), 3) if len(valid) else None,
+            "avg_return_pct": _pct(valid.mean()) if len(valid) else None,
+        })
+    return rows
+
+
+def backtest_commodity(key: str, days: Sequence[str], counts: np.ndarray, closes: np.ndarray, grid: BacktestGrid) -> Dict[str, Any]:
+    """Backtest and report of one commodity."""
+    priced = np.isfinite(closes)
+    return {
+        "commodity": key.upper(),
+        "symbol": COMMODITIES[key]["symbol"],
+        "first_day": days[0] if days else None,
+        "last_day": days[-1] if days else None,
+        "days": len(days),
+        "priced_days": int(priced.sum()),
+        "articles": int(counts[:, :2].sum()),
+        "baseline": baseline(closes, grid.horizons),
+        "results": report_rows(backtest(counts, closes, grid), grid),
+    }
+
+
+_results = QueryCache(ttl_seconds=REVISION_TTL_SECONDS, max_entries=32)
+
+
+def run_backtest(commodities: Sequence[str], grid: BacktestGrid, years: int = DEFAULT_YEARS) -> Dict[str, Any]:
+    """
+    Backtest each COMMODITIES key over the last `years` years of the daily
+    table, cached until the table or the price store changes.
+    """
+    table = get_daily_sentiment().table()
+    prices = get_price_store()
+
+    def load() -> Dict[str, Any]:
+        first = max(0, len(table) - years * 365)
+        days = table.days[first:]
+        results = []
+        for key in commodities:
+            symbol = COMMODITIES[key]["symbol"]
+            columns = table.commodity(key)[first:]
+            counts = np.stack([columns[:, ALCISTA], columns[:, BAJISTA]], axis=1)
+            if days:
+                price_days, series = prices.table([symbol], table.days[0], days[-1])
+                closes = daily_closes(days, price_days, series.get(symbol, []))
+            else:
+                closes = np.zeros(0)
+            results.append(backtest_commodity(key, days, counts, closes, grid))
+        return {
+            "years": years,
+            "signal_types": list(DIVERGENCE_TYPES[1:3]),
+            "grid": {
+                "sentiment_thresholds": list(grid.sentiment_thresholds),
+                "price_thresholds": list(grid.price_thresholds),
+                "windows": list(grid.windows),
+                "horizons": list(grid.horizons),
+            },
+            "commodities": results,
+        }
+
+    return _results.get_or_load((tuple(commodities), grid, years, table.revision, prices.revision), load)
+
+
+def backtest_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the backtest cache."""
+    return _results.stats()
@@ -0,0 +1,175 @@
+"""
+Time bucketing for the analytics kernels.
+
+A BucketGrid is the list of bucket boundaries (epoch seconds) between two
+instants for one granularity and timezone. Boundaries follow the local wall
+clock, so a "day" in Buenos Aires starts at 03:00 UTC and a DST day in a
+zone that has it lasts 23 or 25 hours. Grids are built once per
+(range, granularity, timezone) and cached; assigning rows to buckets is a
+single vectorized pass over the int64 timestamps, with no per-row datetime.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+GRANULARITIES = ("hour", "day", "week", "month")
+DEFAULT_GRANULARITY = "day"
+DEFAULT_TIMEZONE = "America/Argentina/Buenos_Aires"
+
+# Upper bound on buckets per grid (about 5.7 years of hours)
+MAX_BUCKETS = 50000
+
+# Shortest possible bucket per granularity, to bound the grid size up front
+_MIN_SECONDS = {"hour": 3600, "day": 23 * 3600, "week": 7 * 86400 - 3600, "month": 28 * 86400 - 3600}
+
+Timestamp = Union[datetime, str, None]
+
+
+def epoch_seconds(value: Timestamp) -> Optional[int]:
+    """Epoch seconds of a datetime or ISO-8601 string (naive values are UTC)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass(frozen=True)
+class BucketGrid:
+    """
+    Consecutive time buckets covering [edges[0], edges[-1]).
+
+    Attributes:
+        granularity: hour, day, week or month
+        timezone: IANA name the boundaries follow
+        edges: int64 epoch seconds; bucket i is [edges[i], edges[i + 1])
+        labels: Bucket names ("2024-03-05T14:00-03:00", "2024-03-05" (weeks
+            by their Monday), "2024-03")
+        width: Bucket length in seconds when all are equal, else 0
+    """
+
+    granularity: str
+    timezone: str
+    edges: np.ndarray
+    labels: Tuple[str, ...]
+    width: int
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def assign(self, timestamps: np.ndarray) -> np.ndarray:
+        """Bucket index of each epoch-second timestamp, -1 outside the grid."""
+        if not len(self):
+            return np.full(len(timestamps), -1, dtype=np.int64)
+        start, end = self.edges[0], self.edges[-1]
+        if self.width:
+            index = (timestamps - start) // self.width
+        else:
+            index = np.searchsorted(self.edges, timestamps, side="right") - 1
+        index[(timestamps < start) | (timestamps >= end)] = -1
+        return index
+
+
+def _floor(local: datetime, granularity: str) -> datetime:
+    """Start of the bucket holding a local wall-clock time."""
+    if granularity == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next(start: int, local: datetime, granularity: str, zone: ZoneInfo) -> int:
+    """Epoch start of the bucket after the one starting at `start` (local time `local`)."""
+    if granularity == "hour":
+        # Whole-hour offsets keep UTC hours aligned with local ones across DST
+        return start + 3600
+    if granularity == "month":
+        year, month = divmod(local.month, 12)
+        following = datetime(local.year + year, month + 1, 1, tzinfo=zone)
+    else:
+        date = local.date() + timedelta(days=7 if granularity == "week" else 1)
+        following = datetime(date.year, date.month, date.day, tzinfo=zone)
+    return int(following.timestamp())
+
+
+def _label(local: datetime, granularity: str) -> str:
+    if granularity == "hour":
+        return local.isoformat(timespec="minutes")
+    if granularity == "month":
+        return local.strftime("%Y-%m")
+    return local.strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=128)
+def _build(start: int, end: int, granularity: str, tz: str) -> BucketGrid:
+    zone = ZoneInfo(tz)
+    edges, labels = [], []
+    edge = start
+    while edge < end:
+        local = datetime.fromtimestamp(edge, zone)
+        edges.append(edge)
+        labels.append(_label(local, granularity))
+        edge = _next(edge, local, granularity, zone)
+    edges.append(edge)
+
+    edges = np.array(edges, dtype=np.int64)
+    widths = np.diff(edges)
+    width = int(widths[0]) if len(widths) and (widths == widths[0]).all() else 0
+    edges.flags.writeable = False
+    return BucketGrid(granularity, tz, edges, tuple(labels), width)
+
+
+def bucket_grid(
+    start: Timestamp,
+    end: Timestamp,
+    granularity: str = DEFAULT_GRANULARITY,
+    tz: str = DEFAULT_TIMEZONE
+) -> BucketGrid:
+    """
+    Buckets covering [start, end), widened to whole buckets.
+
+    Widening keeps the cache key stable: every request within the same
+    bucket gets the same grid object.
+
+    Args:
+        start: First instant to cover (datetime or ISO string)
+        end: Instant after the last one to cover
+        granularity: hour, day, week or month
+        tz: IANA timezone for the boundaries
+
+    Returns:
+        BucketGrid (empty when end <= start)
+
+    Raises:
+        ValueError: Unknown granularity or timezone, bad timestamp, or more
+            than MAX_BUCKETS buckets
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Valid: {', '.join(GRANULARITIES)}")
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{tz}'")
+
+    ts_start, ts_end = epoch_seconds(start), epoch_seconds(end)
+    if ts_start is None or ts_end is None:
+        raise ValueError("Bucket range needs a start and an end")
+    if (ts_end - ts_start) // _MIN_SECONDS[granularity] + 2 > MAX_BUCKETS:
+        raise ValueError(f"Range too long for {granularity} buckets (max {MAX_BUCKETS})")
+    if ts_end <= ts_start:
+        return _build(ts_start, ts_start, granularity, tz)
+
+    first = int(_floor(datetime.fromtimestamp(ts_start, zone), granularity).timestamp())
+    last = int(_floor(datetime.fromtimestamp(ts_end - 1, zone), granularity).timestamp())
+    return _build(first, last + 1, granularity, tz)
@@ -0,0 +1,223 @@
+"""
+Does news sentiment lead CBOT prices? Lagged and rolling correlations.
+
+For each COMMODITIES grain the daily sentiment score (alcista - bajista
+over the classified articles of the day, from services.daily_sentiment)
+is aligned on the calendar with the daily return of its future (close over
+the previous stored close, from the local price store). Days without
+classified news or without a close are missing and every correlation uses
+the days where both sides are present.
+
+- lagged_correlations: Pearson correlation of sentiment on day t with the
+  return on day t + lag, for every lag at once from a (lags, days) matrix
+  of shifted returns. A positive lag with a strong correlation means the
+  news moved before the price.
+- rolling_correlation: the same over a trailing window for every day, from
+  prefix sums of x, y, xy, x², y² and the pair count, so each window is a
+  handful of subtractions.
+
+Results are cached under the daily table and price store revisions, so
+they are recomputed only when new daily data arrives.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database.cache import REVISION_TTL_SECONDS, QueryCache
+from services.article_store import SENTIMENT_CODES
+from services.daily_sentiment import get_daily_sentiment
+from services.market_data import COMMODITIES
+from services.price_store import get_price_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_LAG = 10
+MAX_LAG = 30
+DEFAULT_WINDOW = 60
+DEFAULT_MONTHS = 24
+
+# Fewer pairs than this give no correlation (null)
+MIN_OBSERVATIONS = 10
+
+ALCISTA, BAJISTA = SENTIMENT_CODES["ALCISTA"], SENTIMENT_CODES["BAJISTA"]
+
+
+def daily_scores(counts: np.ndarray) -> np.ndarray:
+    """(alcista - bajista) / (alcista + bajista) per day, NaN without classified news."""
+    alcista, bajista = counts[:, ALCISTA].astype(np.float64), counts[:, BAJISTA].astype(np.float64)
+    total = alcista + bajista
+    scores = np.full(len(counts), np.nan)
+    np.divide(alcista - bajista, total, out=scores, where=total > 0)
+    return scores
+
+
+def daily_returns(days: Sequence[str], price_days: Sequence[str], values: Sequence[Optional[float]]) -> np.ndarray:
+    """Return of each day's close over the previous stored close, NaN on days without one."""
+    known = [(day, value) for day, value in zip(price_days, values) if value]
+    returns = np.full(len(days), np.nan)
+    if len(known) < 2:
+        return returns
+    closes = np.array([value for _, value in known], dtype=np.float64)
+    known_days = np.array([day for day, _ in known[1:]])
+    calendar = np.array(days)
+    index = np.searchsorted(calendar, known_days)
+    inside = (index < len(days)) & (calendar[np.minimum(index, len(days) - 1)] == known_days)
+    returns[index[inside]] = (closes[1:] / closes[:-1] - 1)[inside]
+    return returns
+
+
+def shift(y: np.ndarray, lag: int) -> np.ndarray:
+    """y[t + lag] at position t, NaN past either end."""
+    shifted = np.full(len(y), np.nan)
+    if lag >= 0 and lag < len(y):
+        shifted[:len(y) - lag] = y[lag:]
+    elif lag < 0 and -lag < len(y):
+        shifted[-lag:] = y[:lag]
+    return shifted
+
+
+def _pearson(x: np.ndarray, y: np.ndarray, axis: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+    """Correlation over the positions where both are finite, and the pair count."""
+    mask = np.isfinite(x) & np.isfinite(y)
+    n = mask.sum(axis=axis)
+    safe_n = np.maximum(n, 1)
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    dx = np.where(mask, xm - np.expand_dims(xm.sum(axis=axis) / safe_n, axis), 0.0)
+    dy = np.where(mask, ym - np.expand_dims(ym.sum(axis=axis) / safe_n, axis), 0.0)
+    cov, vx, vy = (dx * dy).sum(axis=axis), (dx * dx).sum(axis=axis), (dy * dy).sum(axis=axis)
+    corr = np.full(np.shape(cov), np.nan)
+    np.divide(cov, np.sqrt(vx * vy), out=corr, where=(n >= MIN_OBSERVATIONS) & (vx > 0) & (vy > 0))
+    return corr, n
+
+
+def lagged_correlations(x: np.ndarray, y: np.ndarray, lags: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correlation of x[t] with y[t + lag] for each lag.
+
+    Returns:
+        (correlations, pair counts), one per lag; NaN below MIN_OBSERVATIONS
+    """
+    lags = np.asarray(lags, dtype=np.int64)
+    pad = int(np.abs(lags).max()) if len(lags) else 0
+    padded = np.concatenate([np.full(pad, np.nan), y, np.full(pad, np.nan)])
+    shifted = padded[np.arange(len(x))[None, :] + pad + lags[:, None]]       # (lags, days)
+    return _pearson(np.broadcast_to(x, shifted.shape), shifted, axis=1)
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correlation over the trailing `window` days ending at each day.
+
+    Returns:
+        (correlations, pair counts) per day; NaN below MIN_OBSERVATIONS
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    xm, ym = np.where(mask, x, 0.0), np.where(mask, y, 0.0)
+    columns = np.stack([mask.astype(np.float64), xm, ym, xm * ym, xm * xm, ym * ym], axis=1)
+    prefix = np.vstack([np.zeros((1, 6)), np.cumsum(columns, axis=0)])
+    t = np.arange(1, len(x) + 1)
+    n, sx, sy, sxy, sxx, syy = (prefix[t] - prefix[np.maximum(0, t - window)]).T
+
+    safe_n = np.maximum(n, 1)
+    cov = sxy - sx * sy / safe_n
+    vx = sxx - sx * sx / safe_n
+    vy = syy - sy * sy / safe_n
+    corr = np.full(len(x), np.nan)
+    # Rounding can leave a tiny variance where the window is constant
+    valid = (n >= MIN_OBSERVATIONS) & (vx > 1e-12 * np.maximum(sxx, 1e-300)) & (vy > 1e-12 * np.maximum(syy, 1e-300))
+    np.divide(cov, np.sqrt(np.abs(vx * vy)), out=corr, where=valid)
+    return np.clip(corr, -1.0, 1.0), n.astype(np.int64)
+
+
+def _value(x: float) -> Optional[float]:
+    return None if np.isnan(x) else round(float(x), 4)
+
+
+def commodity_correlation(
+    key: str,
+    days: Sequence[str],
+    scores: np.ndarray,
+    returns: np.ndarray,
+    max_lag: int,
+    window: int,
+    rolling_lag: int
+) -> Dict[str, Any]:
+    """Lag profile, best lag and rolling series of one commodity."""
+    lags = list(range(-max_lag, max_lag + 1))
+    correlations, counts = lagged_correlations(scores, returns, lags)
+    profile = [
+        {
+            "lag": lag,
+            "correlation": _value(c),
+            "n": int(n),
+            # Two-sided 95% band of a zero correlation
+            "significant": bool(not np.isnan(c) and abs(c) > 1.96 / np.sqrt(n)),
+        }
+        for lag, c, n in zip(lags, correlations, counts)
+    ]
+    best = int(np.nanargmax(np.abs(correlations))) if not np.isnan(correlations).all() else None
+
+    # Rolling correlation of sentiment with the return `rolling_lag` days later
+    rolling, rolling_n = rolling_correlation(scores, shift(returns, rolling_lag), window)
+
+    return {
+        "commodity": key.upper(),
+        "symbol": COMMODITIES[key]["symbol"],
+        "sentiment_days": int(np.isfinite(scores).sum()),
+        "return_days": int(np.isfinite(returns).sum()),
+        "lags": profile,
+        "best_lag": profile[best] if best is not None else None,
+        "rolling": [
+            {"date": days[t], "correlation": _value(rolling[t]), "n": int(rolling_n[t])}
+            for t in range(len(days))
+        ],
+    }
+
+
+_results = QueryCache(ttl_seconds=REVISION_TTL_SECONDS, max_entries=64)
+
+
+def sentiment_price_correlation(
+    commodities: Sequence[str],
+    max_lag: int = DEFAULT_MAX_LAG,
+    window: int = DEFAULT_WINDOW,
+    months: int = DEFAULT_MONTHS,
+    rolling_lag: int = 0
+) -> Dict[str, Any]:
+    """
+    Correlations of each COMMODITIES key over the last `months` months,
+    cached until the daily table or the price store changes.
+    """
+    table = get_daily_sentiment().table()
+    prices = get_price_store()
+
+    def load() -> Dict[str, Any]:
+        first = max(0, len(table) - months * 30)
+        days = table.days[first:]
+        results = []
+        if days:
+            symbols = [COMMODITIES[key]["symbol"] for key in commodities]
+            # From the table's first day, so the first returned day has a previous close
+            price_days, columns = prices.table(symbols, table.days[0], days[-1])
+            for key, symbol in zip(commodities, symbols):
+                scores = daily_scores(table.commodity(key)[first:])
+                returns = daily_returns(days, price_days, columns.get(symbol, []))
+                results.append(commodity_correlation(key, days, scores, returns, max_lag, window, rolling_lag))
+        return {
+            "max_lag": max_lag,
+            "window": window,
+            "months": months,
+            "rolling_lag": rolling_lag,
+            "commodities": results,
+        }
+
+    key = (tuple(commodities), max_lag, window, months, rolling_lag, table.revision, prices.revision)
+    return _results.get_or_load(key, load)
+
+
+def correlation_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the correlation cache."""
+    return _results.stats()
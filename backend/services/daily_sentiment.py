@@ -0,0 +1,228 @@
+"""
+Article counts per local day, commodity and sentiment over years of news.
+
+The divergence history, the sentiment/price correlation and the backtests
+need one row per day going back further than the analytics store keeps
+(AGROMATE_ANALYTICS_DAYS). The table has two parts:
+
+- the archive: days older than the store horizon, counted once from a scan
+  of the repository (get_changed_since, published after the first day) and
+  rebuilt when the horizon moves past it, at most once a day
+- the recent days, recounted from the analytics store whenever its
+  revision changes, so new and reclassified articles show up at once
+
+Days follow the Buenos Aires wall clock (services.bucketing) and the first
+day is fixed when the table is created, so row i is the same day for the
+life of the process and callers can update derived series incrementally.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from database.base import BaseNewsRepository
+from models.commodity import COMMODITIES, parse_commodities
+from services.article_store import (
+    COMMODITY_BITS, UNCLASSIFIED, ArticleFrame, ArticleStore, get_article_store
+)
+from services.bucketing import DEFAULT_TIMEZONE, BucketGrid, bucket_grid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DAYS = 1830
+
+# Days just inside the store horizon that stay out of the archive, so the
+# store still holds them whole until the next archive rebuild
+ARCHIVE_MARGIN_DAYS = 2
+
+
+@dataclass(frozen=True)
+class DailyCounts:
+    """
+    Counts table, oldest day first.
+
+    Attributes:
+        days: Local dates ("2024-03-05")
+        counts: int64 (days, COMMODITIES, 4) articles per sentiment code
+            (SENTIMENTS order, unclassified last); multi-commodity articles
+            count for each of their labels
+        revision: Changes whenever any count changes or a day is added
+    """
+
+    days: Tuple[str, ...]
+    counts: np.ndarray
+    revision: int
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def commodity(self, commodity: str) -> np.ndarray:
+        """
+        (days, 4) counts of one commodity (any spelling, e.g. "maiz").
+
+        Raises:
+            ValueError: Unknown commodity
+        """
+        labels = parse_commodities(commodity)
+        if not labels:
+            raise ValueError(f"Unknown commodity '{commodity}'")
+        return self.counts[:, COMMODITIES.index(labels[0])]
+
+
+def day_counts(frame: ArticleFrame, grid: BucketGrid) -> np.ndarray:
+    """(len(grid), COMMODITIES, 4) article counts per day, label and sentiment code."""
+    index = grid.assign(frame.published)
+    keep = index >= 0
+    bits = np.array([COMMODITY_BITS[label] for label in COMMODITIES], dtype=np.uint8)
+    rows, labels = np.nonzero((frame.commodities[keep, None] & bits[None, :]) != 0)
+    keys = (index[keep][rows] * len(COMMODITIES) + labels) * (UNCLASSIFIED + 1) + frame.sentiment[keep][rows]
+    counts = np.bincount(keys, minlength=len(grid) * len(COMMODITIES) * (UNCLASSIFIED + 1))
+    return counts.reshape(len(grid), len(COMMODITIES), UNCLASSIFIED + 1)
+
+
+class DailySentiment:
+    """
+    Daily counts from ``history_days`` ago until today (see module docstring).
+
+    table() is cheap while neither the store revision nor the day changed.
+    """
+
+    def __init__(
+        self,
+        repo: Optional[BaseNewsRepository] = None,
+        store: Optional[ArticleStore] = None,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        tz: str = DEFAULT_TIMEZONE
+    ):
+        """
+        Args:
+            repo: News repository for the archive (default: the store's)
+            store: Analytics store for the recent days (default: the shared one)
+            history_days: How many days back the table starts
+            tz: IANA timezone of the day boundaries
+        """
+        self._repo = repo
+        self._store = store
+        self.history_days = history_days
+        self.tz = tz
+        self.start = int(bucket_grid(datetime.now(timezone.utc) - timedelta(days=history_days),
+                                     datetime.now(timezone.utc), "day", tz).edges[0])
+
+        self._lock = threading.Lock()
+        self._archive: Optional[np.ndarray] = None
+        self._archive_days: Tuple[str, ...] = ()
+        self._archive_end: Optional[int] = None
+        self._table: Optional[DailyCounts] = None
+        self._key: Optional[Tuple] = None
+
+        self.archive_builds = 0
+        self.archive_rows = 0
+        self.updates = 0
+
+    @property
+    def store(self) -> ArticleStore:
+        return self._store if self._store is not None else get_article_store()
+
+    @property
+    def repo(self) -> BaseNewsRepository:
+        return self._repo if self._repo is not None else self.store.repo
+
+    def _horizon_end(self, now: float) -> int:
+        """First day start the store will hold whole for at least another day."""
+        cutoff = datetime.fromtimestamp(now, timezone.utc) - timedelta(days=self.store.horizon_days - ARCHIVE_MARGIN_DAYS)
+        return max(self.start, int(bucket_grid(cutoff, cutoff + timedelta(seconds=1), "day", self.tz).edges[0]))
+
+    def _build_archive(self, end: int) -> None:
+        """Count the days in [start, end) from a full scan of the repository."""
+        grid = bucket_grid(datetime.fromtimestamp(self.start, timezone.utc), datetime.fromtimestamp(end, timezone.utc), "day", self.tz)
+        if not len(grid):
+            self._archive, self._archive_days = np.zeros((0, len(COMMODITIES), UNCLASSIFIED + 1), dtype=np.int64), ()
+        else:
+            # A throwaway store pages through get_changed_since like the shared one
+            scan = ArticleStore(self.repo, horizon_days=math.ceil((time.time() - self.start) / 86400) + 1,
+                                refresh_seconds=math.inf, rebuild_seconds=math.inf)
+            frame = scan.select(date_from=datetime.fromtimestamp(self.start, timezone.utc),
+                                date_to=datetime.fromtimestamp(end - 1, timezone.utc))
+            self._archive, self._archive_days = day_counts(frame, grid), grid.labels
+            self.archive_rows = len(frame)
+        self._archive_end = end
+        self.archive_builds += 1
+        logger.info(f"Daily sentiment archive built: {len(self._archive_days)} days, {self.archive_rows} articles")
+
+    def table(self) -> DailyCounts:
+        """Counts up to today, rebuilding the parts that changed."""
+        with self._lock:
+            now = time.time()
+            end = self._horizon_end(now)
+            if self._archive_end != end:
+                self._build_archive(end)
+
+            revision = self.store.current_revision()
+            today = bucket_grid(datetime.fromtimestamp(now, timezone.utc), datetime.fromtimestamp(now + 1, timezone.utc), "day", self.tz).labels
+            key = (self.archive_builds, revision, today)
+            if key == self._key:
+                return self._table
+
+            start = datetime.fromtimestamp(end, timezone.utc)
+            grid = bucket_grid(start, datetime.fromtimestamp(now + 1, timezone.utc), "day", self.tz)
+            recent = day_counts(self.store.select(date_from=start), grid)
+            days = self._archive_days + grid.labels
+            counts = np.concatenate([self._archive, recent])
+
+            previous = self._table
+            changed = previous is None or previous.days != days or not np.array_equal(previous.counts, counts)
+            counts.flags.writeable = False
+            self._table = DailyCounts(days, counts, (previous.revision + changed) if previous else 1)
+            self._key = key
+            self.updates += 1
+            return self._table
+
+    def stats(self) -> Dict:
+        """Coverage and rebuild counters."""
+        table = self._table
+        return {
+            "first_day": table.days[0] if table and len(table) else None,
+            "days": len(table) if table else 0,
+            "archive_days": len(self._archive_days),
+            "archive_articles": self.archive_rows,
+            "archive_builds": self.archive_builds,
+            "updates": self.updates,
+            "revision": table.revision if table else 0,
+        }
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_daily: Optional[DailySentiment] = None
+_daily_lock = threading.Lock()
+
+
+def get_daily_sentiment() -> DailySentiment:
+    """
+    Get or create the process-wide table over the shared store.
+
+    AGROMATE_SENTIMENT_HISTORY_DAYS sets how far back it starts.
+    """
+    global _daily
+    if _daily is None:
+        with _daily_lock:
+            if _daily is None:
+                _daily = DailySentiment(
+                    history_days=int(os.getenv("AGROMATE_SENTIMENT_HISTORY_DAYS", DEFAULT_HISTORY_DAYS))
+                )
+    return _daily
+
+
+def reset_daily_sentiment() -> None:
+    """Forget the shared table (tests, backend switches)."""
+    global _daily
+    _daily = None
@@ -0,0 +1,382 @@
+"""
+Sentiment vs price divergence, for one commodity or all of them at once.
+
+/api/divergence evaluates one commodity and one window per request; the
+frontend used to call it once per commodity, each call selecting its own
+articles and fetching its own futures. divergence_board evaluates every
+COMMODITIES grain over several windows from one article frame and one
+Yahoo fetch of all futures: article counts come from a single grouped
+kernel (commodity_window_counts) and price changes from one indexing pass
+per series, and the thresholds are applied to the whole grid at once.
+
+Boards are cached under the article store revision and the time the
+futures were fetched, so a new ingestion or a price refresh produces a new
+board and nothing else does.
+
+divergence_history rolls the same rules over every day of the daily
+sentiment table (services.daily_sentiment) and the local price store: one
+prefix sum per count column makes each window a subtraction, and each
+(commodity, window) series is kept and recomputed only from the first day
+whose counts or closes changed.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database.cache import QueryCache
+from models.commodity import parse_commodities
+from services.article_store import SENTIMENT_CODES, commodity_window_counts, get_article_store, weighted_score
+from services.daily_sentiment import get_daily_sentiment
+from services.market_data import COMMODITIES, get_market_providers
+from services.price_store import get_price_store
+from services.yahoo_chart import DailyCloses
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_THRESHOLD = 0.25
+PRICE_THRESHOLD = 1.5  # percent
+
+# Codes returned by classify_divergence
+DIVERGENCE_TYPES = ("NONE", "BULLISH_DIVERGENCE", "BEARISH_DIVERGENCE", "NEUTRAL_PRICE")
+
+DEFAULT_WINDOWS = (3, 7, 30)
+MAX_WINDOW_DAYS = 30
+
+# Yahoo range covering MAX_WINDOW_DAYS of sessions
+BOARD_RANGE = "3mo"
+
+# Windows are relative to the request time, so boards also expire
+BOARD_TTL_SECONDS = 300.0
+
+MAX_HISTORY_MONTHS = 60
+
+ALCISTA, BAJISTA = SENTIMENT_CODES["ALCISTA"], SENTIMENT_CODES["BAJISTA"]
+
+
+def classify_divergence(
+    scores,
+    changes,
+    sentiment_threshold=SENTIMENT_THRESHOLD,
+    price_threshold=PRICE_THRESHOLD
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divergence type and signal strength of sentiment scores vs price changes.
+
+    Works elementwise on scalars or arrays; the thresholds may be arrays
+    too and broadcast against them (the backtests sweep them this way). A
+    NaN price change classifies as NONE.
+
+    Args:
+        scores: Sentiment scores (-1..1)
+        changes: Price changes in percent
+        sentiment_threshold: |score| above which the news lean one way
+        price_threshold: |change| in percent above which the price moved
+
+    Returns:
+        (index into DIVERGENCE_TYPES, signal strength 0-3) arrays
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    changes = np.asarray(changes, dtype=np.float64)
+    bullish = (scores > sentiment_threshold) & (changes < -price_threshold)
+    bearish = (scores < -sentiment_threshold) & (changes > price_threshold)
+    neutral = (np.abs(scores) > sentiment_threshold) & (np.abs(changes) < price_threshold)
+    kind = np.select([bullish, bearish, neutral], [1, 2, 3], 0)
+    # NaN changes (no price) never diverge; keep them out of the int cast
+    strength = np.minimum(3, (np.abs(scores * 3) + np.abs(np.nan_to_num(changes) / 3)).astype(np.int64))
+    return kind, np.where(bullish | bearish, strength, 0)
+
+
+def describe_divergence(kind: str, commodity: str, score: float, change: float, days: int) -> str:
+    """Explanation shown next to a divergence of type `kind`."""
+    name = commodity.upper()
+    if kind == "BULLISH_DIVERGENCE":
+        return (
+            f"⚠️ Las noticias sobre {name} son mayormente alcistas (score: {score:.2f}), "
+            f"pero el precio en Chicago BAJÓ {abs(change):.1f}% en {days} días. "
+            f"Esto puede indicar un sesgo mediático: el mercado no acompaña el optimismo de las noticias."
+        )
+    if kind == "BEARISH_DIVERGENCE":
+        return (
+            f"⚠️ Las noticias sobre {name} son mayormente bajistas (score: {score:.2f}), "
+            f"pero el precio en Chicago SUBIÓ {change:.1f}% en {days} días. "
+            f"El mercado ignora el pesimismo mediático, posible oportunidad."
+        )
+    if kind == "NEUTRAL_PRICE":
+        return (
+            f"Las noticias sobre {name} muestran un sesgo "
+            f"{'alcista' if score > 0 else 'bajista'} "
+            f"(score: {score:.2f}), pero el precio se mantuvo estable "
+            f"({change:+.1f}%). Sin divergencia significativa."
+        )
+    return (
+        f"Sentimiento y precio de {name} están alineados. "
+        f"Score: {score:.2f}, Precio: {change:+.1f}%."
+    )
+
+
+def no_news_message(commodity: str, days: int) -> str:
+    return f"No hay suficientes noticias sobre {commodity.upper()} en los últimos {days} días."
+
+
+def window_changes(series: Optional[DailyCloses], windows: Sequence[int]) -> np.ndarray:
+    """
+    Price change in percent over the last `w` sessions for each window,
+    the same as series.change_pct(lookback=w - 1); zeros without data.
+    """
+    changes = np.zeros(len(windows))
+    if not series or len(series.closes) < 2:
+        return changes
+    closes = np.frombuffer(series.closes, dtype=np.float64)
+    base = closes[np.maximum(0, len(closes) - np.asarray(windows, dtype=np.int64))]
+    np.divide((closes[-1] - base) * 100, base, out=changes, where=base != 0)
+    return changes
+
+
+def compute_board(
+    frame,
+    charts: Optional[Dict[str, DailyCloses]],
+    windows: Sequence[int],
+    now: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Divergence of every COMMODITIES grain over every window.
+
+    Args:
+        frame: ArticleFrame holding at least the last max(windows) days
+        charts: Yahoo daily closes by symbol (missing symbols count as flat)
+        windows: Window lengths in days
+        now: Epoch seconds the windows end at (default: now)
+
+    Returns:
+        One entry per (commodity, window), shaped like /api/divergence
+    """
+    now = time.time() if now is None else now
+    keys = list(COMMODITIES)
+    labels = [parse_commodities(key)[0] for key in keys]
+    cutoffs = [int(now) - days * 86400 for days in windows]
+
+    counts = commodity_window_counts(frame, labels, cutoffs)          # (commodity, window, sentiment)
+    alcista, bajista = counts[..., ALCISTA], counts[..., BAJISTA]
+    scores = weighted_score(alcista.astype(np.float64), bajista.astype(np.float64))
+    changes = np.stack([window_changes((charts or {}).get(COMMODITIES[key]["symbol"]), windows) for key in keys])
+    kinds, strengths = classify_divergence(scores, changes)
+    totals = counts.sum(axis=2)
+
+    board = []
+    for i, key in enumerate(keys):
+        for j, days in enumerate(windows):
+            score, change = float(scores[i, j]), float(changes[i, j])
+            kind = DIVERGENCE_TYPES[kinds[i, j]] if totals[i, j] else "NONE"
+            board.append({
+                "divergence_type": kind,
+                "commodity": key.upper(),
+                "sentiment_score": round(score, 2),
+                "price_change_pct": round(change, 2),
+                "signal_strength": int(strengths[i, j]) if totals[i, j] else 0,
+                "news_count": int(totals[i, j]),
+                "alcista_count": int(alcista[i, j]),
+                "bajista_count": int(bajista[i, j]),
+                "days_analyzed": days,
+                "description": describe_divergence(kind, key, score, change, days) if totals[i, j] else no_news_message(key, days),
+            })
+    return board
+
+
+_boards = QueryCache(ttl_seconds=BOARD_TTL_SECONDS, max_entries=16)
+
+
+async def divergence_board(windows: Sequence[int] = DEFAULT_WINDOWS) -> Dict[str, Any]:
+    """
+    Divergence of all commodities over `windows`, from one futures fetch
+    and one article selection, cached until new articles or prices arrive.
+    """
+    windows = tuple(sorted(set(windows)))
+    prices = await get_market_providers().get("yahoo", BOARD_RANGE)
+    if prices.error:
+        logger.warning(f"Yahoo Finance error for divergence: {prices.error}")
+    store = get_article_store()
+
+    def load() -> Dict[str, Any]:
+        now = time.time()
+        frame = store.select(date_from=datetime.fromtimestamp(now - max(windows) * 86400, timezone.utc))
+        return {
+            "windows": list(windows),
+            "generated_at": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+            "prices_fetched_at": datetime.fromtimestamp(prices.fetched_at, timezone.utc).isoformat() if prices.fetched_at else None,
+            "price_error": prices.error,
+            "results": compute_board(frame, prices.value, windows, now),
+        }
+
+    return _boards.get_or_load((windows, store.current_revision(), prices.fetched_at), load)
+
+
+# ----------------------------------------------------------------------
+# Rolling history
+# ----------------------------------------------------------------------
+
+def daily_closes(days: Sequence[str], price_days: Sequence[str], values: Sequence[Optional[float]]) -> np.ndarray:
+    """Last close on or before each day (NaN before the first one)."""
+    known = [(day, value) for day, value in zip(price_days, values) if value is not None]
+    if not known:
+        return np.full(len(days), np.nan)
+    known_days = np.array([day for day, _ in known])
+    known_values = np.array([value for _, value in known], dtype=np.float64)
+    index = np.searchsorted(known_days, np.array(days), side="right") - 1
+    return np.where(index >= 0, known_values[np.maximum(index, 0)], np.nan)
+
+
+def window_stats(prefix: np.ndarray, closes: np.ndarray, t: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sentiment score and price change (percent) of the windows ending at days `t`.
+
+    Args:
+        prefix: (days + 1, 2+) running sums of [alcista, bajista, ...] counts
+        closes: Close of each day (forward-filled, NaN before the first)
+        t: Last day of each window
+        window: Window length in days
+
+    Returns:
+        (scores, changes); the change is NaN when the day before the window
+        has no close
+    """
+    sums = prefix[t + 1] - prefix[np.maximum(0, t + 1 - window)]
+    scores = weighted_score(sums[:, 0].astype(np.float64), sums[:, 1].astype(np.float64))
+    base = np.where(t >= window, closes[np.maximum(0, t - window)], np.nan)
+    changes = np.full(len(t), np.nan)
+    np.divide((closes[t] - base) * 100, base, out=changes, where=~np.isnan(base) & (base != 0))
+    return scores, changes
+
+
+class RollingDivergence:
+    """
+    Divergence of one commodity over a sliding window of days.
+
+    Row t covers days t - window + 1 .. t: its sentiment score comes from
+    the article counts of those days and its price change compares the
+    close of day t with the close of the day before the window.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.days: Tuple[str, ...] = ()
+        self.counts = np.zeros((0, 3), dtype=np.int64)       # alcista, bajista, all articles
+        self.closes = np.zeros(0)
+        self.prefix = np.zeros((1, 3), dtype=np.int64)       # prefix[t] = counts[:t].sum(axis=0)
+        self.scores = np.zeros(0)
+        self.changes = np.zeros(0)
+        self.kinds = np.zeros(0, dtype=np.int64)
+        self.strengths = np.zeros(0, dtype=np.int64)
+        self.key: Optional[Tuple] = None
+
+    def update(self, days: Tuple[str, ...], counts: np.ndarray, closes: np.ndarray) -> int:
+        """
+        Take new inputs and recompute rows from the first changed day.
+
+        Returns:
+            Number of rows recomputed
+        """
+        n = min(len(self.days), len(days))
+        if self.days[:1] != days[:1]:
+            n = 0
+        changed = (self.counts[:n] != counts[:n]).any(axis=1)
+        changed |= ~((self.closes[:n] == closes[:n]) | (np.isnan(self.closes[:n]) & np.isnan(closes[:n])))
+        first = int(np.argmax(changed)) if changed.any() else n
+
+        prefix = np.empty((len(days) + 1, 3), dtype=np.int64)
+        prefix[:first + 1] = self.prefix[:first + 1]
+        np.cumsum(counts[first:], axis=0, out=prefix[first + 1:])
+        prefix[first + 1:] += prefix[first]
+
+        t = np.arange(first, len(days))
+        scores, changes = window_stats(prefix, closes, t, self.window)
+        kinds, strengths = classify_divergence(scores, changes)
+
+        self.days, self.counts, self.closes, self.prefix = days, counts, closes, prefix
+        self.scores = np.concatenate([self.scores[:first], scores])
+        self.changes = np.concatenate([self.changes[:first], changes])
+        self.kinds = np.concatenate([self.kinds[:first], kinds])
+        self.strengths = np.concatenate([self.strengths[:first], strengths])
+        return len(t)
+
+    def news_counts(self) -> np.ndarray:
+        """Articles in each row's window."""
+        t = np.arange(len(self.days))
+        return self.prefix[t + 1, 2] - self.prefix[np.maximum(0, t + 1 - self.window), 2]
+
+    def report(self, first: int) -> Dict[str, Any]:
+        """Rows from `first` on, and the divergence episodes among them."""
+        news = self.news_counts()
+        data = [
+            {
+                "date": self.days[t],
+                "sentiment_score": round(float(self.scores[t]), 2),
+                "price_change_pct": None if np.isnan(self.changes[t]) else round(float(self.changes[t]), 2),
+                "news_count": int(news[t]),
+                "divergence_type": DIVERGENCE_TYPES[self.kinds[t]],
+                "signal_strength": int(self.strengths[t]),
+            }
+            for t in range(first, len(self.days))
+        ]
+
+        # Runs of consecutive days with the same divergence
+        kinds = self.kinds[first:]
+        diverging = (kinds == 1) | (kinds == 2)
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], np.where(diverging, kinds, 0), [0]])))
+        episodes = []
+        for start, end in zip(edges[:-1], edges[1:]):
+            if diverging[start]:
+                episodes.append({
+                    "divergence_type": DIVERGENCE_TYPES[kinds[start]],
+                    "start": self.days[first + start],
+                    "end": self.days[first + end - 1],
+                    "days": int(end - start),
+                    "max_strength": int(self.strengths[first + start:first + end].max()),
+                })
+        return {"data": data, "episodes": episodes}
+
+
+_histories: Dict[Tuple[str, int], RollingDivergence] = {}
+_histories_lock = threading.Lock()
+_history_counters = {"hits": 0, "updates": 0, "rows_recomputed": 0}
+
+
+def divergence_history(commodity: str, window: int, months: int) -> Dict[str, Any]:
+    """
+    Daily divergence of a COMMODITIES grain over the last `months` months.
+
+    Raises:
+        KeyError: Unknown commodity
+    """
+    key = commodity.lower()
+    symbol = COMMODITIES[key]["symbol"]
+    table = get_daily_sentiment().table()
+    prices = get_price_store()
+
+    with _histories_lock:
+        rolling = _histories.get((key, window))
+        if rolling is None:
+            rolling = _histories[(key, window)] = RollingDivergence(window)
+        version = (table.revision, prices.revision)
+        if rolling.key == version:
+            _history_counters["hits"] += 1
+        else:
+            counts = table.commodity(key)
+            counts = np.stack([counts[:, ALCISTA], counts[:, BAJISTA], counts.sum(axis=1)], axis=1)
+            price_days, columns = prices.table([symbol], table.days[0], table.days[-1]) if len(table) else ([], {})
+            closes = daily_closes(table.days, price_days, columns.get(symbol, []))
+            _history_counters["rows_recomputed"] += rolling.update(table.days, counts, closes)
+            _history_counters["updates"] += 1
+            rolling.key = version
+
+        report = rolling.report(max(0, len(rolling.days) - months * 30))
+    return {"commodity": key.upper(), "window_days": window, "months": months, **report}
+
+
+def board_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the board cache and the rolling histories."""
+    return {**_boards.stats(), "histories": {"series": len(_histories), **_history_counters}}
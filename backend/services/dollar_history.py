@@ -0,0 +1,153 @@
+"""
+Daily dollar quotes (oficial, blue, MEP, CCL) and the brecha series.
+
+Quotes come from a pluggable provider: ArgentinaDatos over HTTP in
+production, or a local file in the same format for tests and offline
+development (AGROMATE_DOLLAR_HISTORY_FILE). They are stored in the price
+store next to the CBOT closes, and after every update the brecha of each
+parallel rate against the official one is precomputed as its own series,
+so /api/market/history only joins columns on the date index.
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import httpx
+
+from services.price_store import Close, HistorySource, PriceStore, UPSTREAM_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Stored series (ARS per USD, "venta") -> ArgentinaDatos "casa"
+DOLLAR_SERIES = {
+    "dolar_oficial": "oficial",
+    "dolar_blue": "blue",
+    "dolar_mep": "bolsa",
+    "dolar_ccl": "contadoconliqui",
+}
+
+# Brecha series (% over the official rate) -> the rate it compares
+BRECHA_SERIES = {
+    "brecha_pct": "dolar_blue",
+    "brecha_mep_pct": "dolar_mep",
+    "brecha_ccl_pct": "dolar_ccl",
+}
+
+ARGENTINADATOS_URL = "https://api.argentinadatos.com/v1/cotizaciones/dolares"
+
+
+def parse_quotes(items: Iterable[Dict[str, Any]], since: Optional[str]) -> List[Close]:
+    """(fecha, venta) of ArgentinaDatos-style records from `since` on."""
+    return [
+        (item["fecha"], float(item["venta"]))
+        for item in items
+        if item.get("venta") is not None and (since is None or item["fecha"] >= since)
+    ]
+
+
+class DollarHistoryProvider(ABC):
+    """Source of daily dollar quotes per casa."""
+
+    name = "provider"
+
+    @abstractmethod
+    async def history(self, casas: Sequence[str], since: Optional[str]) -> Dict[str, List[Close]]:
+        """
+        Daily quotes of each casa.
+
+        Args:
+            casas: ArgentinaDatos casa names ("oficial", "blue", ...)
+            since: First day to return (None: the full history)
+
+        Returns:
+            {casa: [(day, venta), ...]}
+        """
+
+
+class ArgentinaDatosProvider(DollarHistoryProvider):
+    """ArgentinaDatos REST API (full history per casa, one request each)."""
+
+    name = "argentinadatos"
+
+    def __init__(self, base_url: str = ARGENTINADATOS_URL):
+        self.base_url = base_url.rstrip("/")
+
+    async def history(self, casas: Sequence[str], since: Optional[str]) -> Dict[str, List[Close]]:
+        result = {}
+        async with httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT_SECONDS) as client:
+            for casa in casas:
+                resp = await client.get(f"{self.base_url}/{casa}")
+                resp.raise_for_status()
+                result[casa] = parse_quotes(resp.json(), since)
+        return result
+
+
+class LocalDollarProvider(DollarHistoryProvider):
+    """
+    Stand-in serving records held in memory or read from a JSON file.
+
+    The file is a list of ArgentinaDatos records
+    ({"casa", "fecha", "venta", ...}), as returned by /cotizaciones/dolares.
+    """
+
+    name = "local"
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.records = list(records)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "LocalDollarProvider":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    async def history(self, casas: Sequence[str], since: Optional[str]) -> Dict[str, List[Close]]:
+        return {
+            casa: parse_quotes((r for r in self.records if r.get("casa") == casa), since)
+            for casa in casas
+        }
+
+
+def brecha_closes(store: PriceStore, since: Optional[str]) -> Dict[str, List[Close]]:
+    """
+    Brecha of each parallel rate over the official one, on the days both
+    are stored (from `since` on).
+    """
+    days, columns = store.table(["dolar_oficial", *BRECHA_SERIES.values()], since or "", "9999-12-31")
+    oficial = columns.get("dolar_oficial")
+    result = {}
+    for brecha, series in BRECHA_SERIES.items():
+        rate = columns.get(series)
+        if oficial is None or rate is None:
+            continue
+        result[brecha] = [
+            (day, round(((rate[i] - oficial[i]) / oficial[i]) * 100, 2))
+            for i, day in enumerate(days)
+            if oficial[i] and rate[i] is not None
+        ]
+    return result
+
+
+def dollar_source(provider: DollarHistoryProvider) -> HistorySource:
+    """Price store source for DOLLAR_SERIES, deriving BRECHA_SERIES."""
+    async def fetch(since: Optional[str]) -> Dict[str, List[Close]]:
+        quotes = await provider.history(list(DOLLAR_SERIES.values()), since)
+        return {series: quotes.get(casa, []) for series, casa in DOLLAR_SERIES.items()}
+
+    return HistorySource("dollar", tuple(DOLLAR_SERIES), fetch, derive=brecha_closes)
+
+
+def get_dollar_provider() -> DollarHistoryProvider:
+    """
+    Provider for the shared updater.
+
+    AGROMATE_DOLLAR_HISTORY_FILE serves quotes from a local JSON file
+    instead of ArgentinaDatos.
+    """
+    path = os.getenv("AGROMATE_DOLLAR_HISTORY_FILE")
+    if path:
+        logger.info(f"Dollar history from local file: {path}")
+        return LocalDollarProvider.from_file(path)
+    return ArgentinaDatosProvider()
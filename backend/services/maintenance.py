@@ -0,0 +1,165 @@
+"""Chunked maintenance jobs (data fixes and cleanups) over the news table."""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from database.base import BaseNewsRepository
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = Path(__file__).parent.parent / ".maintenance"
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class MaintenanceJob:
+    """
+    Update or delete every article matching equality filters, chunk by chunk.
+
+    Rows are walked with keyset pagination on the primary key and each chunk
+    is one bounded request (the id range of the rows just scanned), so the
+    job never holds a full result set or sends one unbounded write. Progress
+    is saved to a checkpoint file after every chunk; an interrupted job
+    resumes where it stopped. In dry-run mode only the scan runs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        repo: BaseNewsRepository,
+        filters: Dict[str, Any],
+        values: Optional[Dict[str, Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pause_seconds: float = 0.0,
+        dry_run: bool = False,
+        checkpoint_dir: Path = CHECKPOINT_DIR
+    ):
+        """
+        Args:
+            name: Job name (also the checkpoint file name)
+            repo: News repository
+            filters: Column -> value the affected rows match (None matches NULL)
+            values: Columns to set; the matching rows are deleted when omitted
+            chunk_size: Rows per chunk
+            pause_seconds: Sleep between chunks to leave room for live traffic
+            dry_run: Only count the rows that would change
+            checkpoint_dir: Directory for checkpoint files
+        """
+        self.name = name
+        self.repo = repo
+        self.filters = filters
+        self.values = values
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.dry_run = dry_run
+        self.checkpoint_path = Path(checkpoint_dir) / f"{name}.json"
+
+    @property
+    def action(self) -> str:
+        return "delete" if self.values is None else "update"
+
+    def _signature(self) -> Dict:
+        """What a checkpoint must match to be resumed."""
+        return {"job": self.name, "action": self.action, "filters": self.filters, "values": self.values}
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        if self.dry_run or not self.checkpoint_path.exists():
+            return None
+        state = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        if {k: state.get(k) for k in self._signature()} != self._signature():
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}: job definition changed")
+            return None
+        return state
+
+    def _save_checkpoint(self, state: Dict) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.checkpoint_path)
+
+    def reset(self) -> None:
+        """Forget saved progress so the next run starts from the beginning."""
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def run(self) -> Dict:
+        """
+        Run (or resume) the job.
+
+        Returns:
+            {"job", "action", "dry_run", "resumed", "matched", "changed", "chunks"}
+            where matched counts scanned rows and changed the rows written
+        """
+        checkpoint = self._load_checkpoint()
+        state = checkpoint or {**self._signature(), "after_id": None, "matched": 0, "changed": 0, "chunks": 0}
+        if checkpoint:
+            logger.info(f"[{self.name}] resuming after {state['after_id']} ({state['matched']} rows done)")
+
+        while True:
+            ids = self.repo.scan_ids(self.filters, after_id=state["after_id"], limit=self.chunk_size)
+            if not ids:
+                break
+
+            if not self.dry_run:
+                if self.values is None:
+                    changed = self.repo.delete_range(self.filters, state["after_id"], ids[-1])
+                else:
+                    changed = self.repo.update_range(self.filters, self.values, state["after_id"], ids[-1])
+                state["changed"] += changed
+
+            state["after_id"] = ids[-1]
+            state["matched"] += len(ids)
+            state["chunks"] += 1
+            if not self.dry_run:
+                self._save_checkpoint(state)
+            logger.info(f"[{self.name}] chunk {state['chunks']}: {state['matched']} rows scanned")
+
+            if len(ids) < self.chunk_size:
+                break
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+
+        if not self.dry_run:
+            self.reset()
+
+        return {
+            "job": self.name,
+            "action": self.action,
+            "dry_run": self.dry_run,
+            "resumed": checkpoint is not None,
+            "matched": state["matched"],
+            "changed": state["changed"],
+            "chunks": state["chunks"],
+        }
+
+
+def add_job_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Add the common --dry-run/--chunk-size/--pause/--restart options."""
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin modificar datos")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Filas por lote (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--pause", type=float, default=0.0, help="Segundos de pausa entre lotes")
+    parser.add_argument("--restart", action="store_true", help="Ignorar el checkpoint y empezar de cero")
+    return parser
+
+
+def job_from_args(name: str, repo: BaseNewsRepository, args: argparse.Namespace, **kwargs) -> MaintenanceJob:
+    """Build a MaintenanceJob from add_job_arguments options."""
+    job = MaintenanceJob(
+        name, repo,
+        chunk_size=args.chunk_size, pause_seconds=args.pause, dry_run=args.dry_run,
+        **kwargs
+    )
+    if args.restart:
+        job.reset()
+    return job
+
+
+def print_distribution(repo: BaseNewsRepository, column: str) -> None:
+    """Print the article count per value of `column` (aggregated server-side)."""
+    counts = repo.count_by(column)
+    for value, count in counts.items():
+        print(f"  {value}: {count} noticias")
+    print(f"\n✅ Total: {sum(counts.values())} noticias en la base de datos")
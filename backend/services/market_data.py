@@ -1,111 +1,315 @@
-"""Service to fetch market data from public APIs (DolarAPI + Yahoo Finance)."""
+"""
+Market data providers (DolarAPI, Yahoo Finance, Agrofy Pizarra Rosario).
 
+Every upstream is a MarketProvider behind one MarketProviders hub, which
+gives all of them the same behaviour:
+
+- a TTL cache per provider and key ("latest", a Yahoo range, ...)
+- request coalescing: concurrent callers of a key share one upstream call
+- a deadline per provider, so a slow upstream cannot hold a fan-out
+- one fallback rule: a failed call returns the last good value with the
+  error attached, or no value if there never was one
+
+The market snapshot (/api/market/latest), the price history backfill
+(/api/market/history) and /api/divergence all fetch through the shared hub,
+and COMMODITIES is the only ticker map.
+"""
+
+import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, Any
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import httpx
 
+from services.yahoo_chart import DailyCloses, get_yahoo_client
+
 logger = logging.getLogger(__name__)
 
+# Grains: Yahoo Finance CBOT future (cents/bushel) and bushels per metric ton
+COMMODITIES = {
+    "soja": {"symbol": "ZS=F", "name": "Soja (CBOT)", "bushels_per_ton": 36.744},
+    "maiz": {"symbol": "ZC=F", "name": "Maíz (CBOT)", "bushels_per_ton": 39.368},
+    "trigo": {"symbol": "ZW=F", "name": "Trigo (CBOT)", "bushels_per_ton": 36.744},
+}
 
-class MarketDataService:
-    """Service to fetch real market data for agricultural commodities."""
+# Used to convert grains to ARS when no dollar quote is available
+FALLBACK_DOLAR_PRICE = 1200
+
+LATEST = "latest"
+
+# Above this many cached keys, expired ones are dropped
+MAX_CACHED_KEYS = 256
+
+Quotes = Dict[str, Dict[str, Any]]
 
-    # DolarAPI endpoints (free, no auth, instant updates)
-    DOLAR_API = "https://dolarapi.com/v1/dolares"
 
-    @classmethod
-    async def get_latest_prices(cls) -> Dict[str, Any]:
+class ProviderError(Exception):
+    """A provider call failed (the message carries the upstream error)."""
+
+
+class MarketProvider(ABC):
+    """
+    One upstream.
+
+    Attributes:
+        name: Provider name, the hub key ("dolarapi", "yahoo", "agrofy")
+        ttl: Seconds a fetched value is served from the cache
+        deadline: Seconds a fetch may take before it counts as failed
+    """
+
+    name = "provider"
+    ttl = 60.0
+    deadline = 10.0
+
+    @abstractmethod
+    async def fetch(self, key: str) -> Any:
         """
-        Fetch latest prices from real APIs:
-        - Dollar: DolarAPI (oficial, blue, MEP)
-        - Grains: Yahoo Finance futures (converted to ARS)
+        Fetch `key` from the upstream.
+
+        Returns:
+            The value; an empty one counts as a failure
+
+        Raises:
+            Any exception on failure (the hub catches it)
         """
-        results = {}
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # 1. Fetch Dollar rates from DolarAPI (reliable, always works)
-            try:
-                resp = await client.get(cls.DOLAR_API)
-                resp.raise_for_status()
-                dolar_data = resp.json()
-
-                for item in dolar_data:
-                    casa = item.get("casa", "").lower()
-                    if casa == "oficial":
-                        results["dolar"] = {
-                            "price": float(item.get("venta", 0)),
-                            "currency": "ARS",
-                            "change_percent": 0.0,
-                            "symbol": "USD/ARS",
-                            "name": "Dólar Oficial"
-                        }
-                    elif casa == "blue":
-                        results["dolar_blue"] = {
-                            "price": float(item.get("venta", 0)),
-                            "currency": "ARS",
-                            "change_percent": 0.0,
-                            "symbol": "USD/ARS Blue",
-                            "name": "Dólar Blue"
-                        }
-            except Exception as e:
-                logger.error(f"DolarAPI error: {e}")
-                results["dolar"] = {"error": "unavailable", "symbol": "USD/ARS"}
-
-            # 2. Fetch Grain futures from Yahoo Finance (international ref)
-            try:
-                import yfinance as yf
-                import pandas as pd
-
-                tickers = {
-                    "soja": {"symbol": "ZS=F", "name": "Soja (CBOT)"},
-                    "maiz": {"symbol": "ZC=F", "name": "Maíz (CBOT)"},
-                    "trigo": {"symbol": "ZW=F", "name": "Trigo (CBOT)"},
+
+class DolarApiProvider(MarketProvider):
+    """Dollar rates from DolarAPI (free, no auth). Keys: "latest"."""
+
+    name = "dolarapi"
+    ttl = 60.0
+    deadline = 10.0
+
+    URL = "https://dolarapi.com/v1/dolares"
+
+    # DolarAPI casa -> (field, symbol, name)
+    CASAS = {
+        "oficial": ("dolar", "USD/ARS", "Dólar Oficial"),
+        "blue": ("dolar_blue", "USD/ARS Blue", "Dólar Blue"),
+    }
+
+    async def fetch(self, key: str) -> Quotes:
+        async with httpx.AsyncClient(timeout=self.deadline) as client:
+            resp = await client.get(self.URL)
+            resp.raise_for_status()
+
+        results = {}
+        for item in resp.json():
+            casa = self.CASAS.get(item.get("casa", "").lower())
+            if casa:
+                results[casa[0]] = {
+                    "price": float(item.get("venta", 0)),
+                    "currency": "ARS",
+                    "change_percent": 0.0,
+                    "symbol": casa[1],
+                    "name": casa[2]
                 }
+        return results
+
+
+class YahooFuturesProvider(MarketProvider):
+    """
+    Daily closes of the COMMODITIES futures, {symbol: DailyCloses}.
+
+    Keys: "latest" (last 5 days), a Yahoo range ("1mo", "3mo", ...) or a
+    first day ("2000-01-01") to fetch up to today.
+    """
+
+    name = "yahoo"
+    ttl = 300.0
+    deadline = 30.0
+
+    async def fetch(self, key: str) -> Dict[str, DailyCloses]:
+        symbols = [info["symbol"] for info in COMMODITIES.values()]
+        if key == LATEST:
+            return await get_yahoo_client().daily_closes_many(symbols, range_="5d")
+        try:
+            start = date.fromisoformat(key).isoformat()
+        except ValueError:
+            return await get_yahoo_client().daily_closes_many(symbols, range_=key)
+        return await get_yahoo_client().daily_closes_many(symbols, start=start)
+
+
+class AgrofyPizarraProvider(MarketProvider):
+    """Pizarra Rosario prices scraped from Agrofy News. Keys: "latest"."""
+
+    name = "agrofy"
+    ttl = 900.0
+    deadline = 15.0
 
-                symbols = " ".join(t["symbol"] for t in tickers.values())
-                data = yf.download(symbols, period="5d", progress=False, group_by="ticker")
+    async def fetch(self, key: str) -> Quotes:
+        from scrapers.market_scraper import AgrofyMarketScraper
 
-                dolar_price = results.get("dolar", {}).get("price", 1200)
+        return await AgrofyMarketScraper.get_prices()
 
-                for key, info in tickers.items():
-                    try:
-                        sym = info["symbol"]
-                        if sym in data.columns.get_level_values(0):
-                            series = data[sym]["Close"].dropna()
-                        else:
-                            series = data["Close"].dropna()
 
-                        if len(series) > 0:
-                            usd_cents = float(series.iloc[-1])
-                            usd_price = usd_cents / 100  # CBOT quotes in cents/bushel
-                            ars_price = round(usd_price * dolar_price, 2)
+@dataclass
+class ProviderResult:
+    """
+    Answer of the hub for one provider key.
 
-                            prev_cents = float(series.iloc[-2]) if len(series) > 1 else usd_cents
-                            change = ((usd_cents - prev_cents) / prev_cents) * 100
+    Attributes:
+        value: Fetched value, the last good one after a failure, or None
+        fetched_at: Epoch seconds of `value`'s fetch
+        error: Why the last fetch failed (None when `value` is fresh)
+    """
 
-                            results[f"{key}_rosario"] = {
-                                "price": ars_price,
-                                "currency": "ARS",
-                                "change_percent": round(change, 2),
-                                "symbol": sym,
-                                "name": info["name"]
-                            }
-                    except Exception as e:
-                        logger.warning(f"Error parsing {key}: {e}")
+    value: Any
+    fetched_at: Optional[float]
+    error: Optional[str] = None
 
-            except Exception as e:
-                logger.error(f"Yahoo Finance error: {e}")
+    def value_or_raise(self) -> Any:
+        """The value if the last fetch succeeded (ProviderError otherwise)."""
+        if self.error is not None:
+            raise ProviderError(self.error)
+        return self.value
 
-        # Fallback if nothing worked
-        if not results:
-            return cls.get_mock_data()
 
+@dataclass
+class _Entry:
+    value: Any = None
+    fetched_at: Optional[float] = None
+    loaded_at: float = 0.0              # monotonic
+    task: Optional[asyncio.Task] = None
+
+
+@dataclass
+class _Counters:
+    hits: int = 0
+    fetches: int = 0
+    coalesced: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    last_error: Optional[str] = None
+    last_success: Optional[float] = None
+
+
+class MarketProviders:
+    """
+    TTL cache, request coalescing, deadlines and fallbacks over providers.
+
+    Runs on the event loop; callers of a key that is being fetched await
+    the same task instead of starting another upstream call.
+    """
+
+    def __init__(self, providers: Sequence[MarketProvider]):
+        self.providers = {p.name: p for p in providers}
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._counters = {p.name: _Counters() for p in providers}
+
+    async def get(self, name: str, key: str = LATEST, max_age: Optional[float] = None) -> ProviderResult:
+        """
+        Value of a provider key, from the cache while younger than the
+        provider TTL (or `max_age`).
+
+        Raises:
+            KeyError: If no provider has that name
+        """
+        provider = self.providers[name]
+        counters = self._counters[name]
+        entry = self._entries.get((name, key))
+        if entry is None:
+            self._prune()
+            entry = self._entries[(name, key)] = _Entry()
+
+        ttl = provider.ttl if max_age is None else max_age
+        if entry.fetched_at is not None and time.monotonic() - entry.loaded_at < ttl:
+            counters.hits += 1
+            return ProviderResult(entry.value, entry.fetched_at)
+
+        if entry.task is not None and not entry.task.done():
+            counters.coalesced += 1
+        else:
+            entry.task = asyncio.get_running_loop().create_task(self._load(provider, key, entry))
+        return await asyncio.shield(entry.task)
+
+    async def get_many(self, requests: Sequence[Tuple[str, str]]) -> List[ProviderResult]:
+        """Fetch several (provider, key) pairs concurrently, in order."""
+        return list(await asyncio.gather(*(self.get(name, key) for name, key in requests)))
+
+    async def _load(self, provider: MarketProvider, key: str, entry: _Entry) -> ProviderResult:
+        counters = self._counters[provider.name]
+        counters.fetches += 1
+        try:
+            value = await asyncio.wait_for(provider.fetch(key), provider.deadline)
+            if not value:
+                raise ValueError("empty answer")
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                counters.timeouts += 1
+                message = f"timeout after {provider.deadline:.0f}s"
+            else:
+                message = f"{type(e).__name__}: {e}"
+            counters.failures += 1
+            counters.last_error = message
+            logger.error(f"Market provider {provider.name} ({key}) failed: {message}")
+            return ProviderResult(entry.value, entry.fetched_at, message)
+
+        entry.value, entry.fetched_at, entry.loaded_at = value, time.time(), time.monotonic()
+        counters.last_success, counters.last_error = entry.fetched_at, None
+        return ProviderResult(value, entry.fetched_at)
+
+    def _prune(self) -> None:
+        if len(self._entries) < MAX_CACHED_KEYS:
+            return
+        now = time.monotonic()
+        for (name, key), entry in list(self._entries.items()):
+            if (entry.task is None or entry.task.done()) and now - entry.loaded_at > self.providers[name].ttl:
+                del self._entries[(name, key)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider cache and upstream counters."""
         return {
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": results
+            name: {
+                "ttl_seconds": self.providers[name].ttl,
+                "deadline_seconds": self.providers[name].deadline,
+                "cached_keys": sum(1 for n, _ in self._entries if n == name),
+                "hits": c.hits,
+                "fetches": c.fetches,
+                "coalesced": c.coalesced,
+                "failures": c.failures,
+                "timeouts": c.timeouts,
+                "last_success": datetime.fromtimestamp(c.last_success, timezone.utc).isoformat() if c.last_success else None,
+                "last_error": c.last_error,
+            }
+            for name, c in self._counters.items()
+        }
+
+
+def grain_quotes(charts: Optional[Dict[str, DailyCloses]], pizarra: Optional[Quotes], dolar_price: float) -> Quotes:
+    """
+    Grain quotes for the snapshot.
+
+    "<grain>_cbot" is the CBOT future in ARS/bushel; "<grain>_rosario" is
+    Agrofy's Pizarra Rosario price when available and falls back to the
+    CBOT quote otherwise. Grains Agrofy lists beyond COMMODITIES (girasol)
+    are passed through.
+    """
+    results = dict(pizarra or {})
+    for key, info in COMMODITIES.items():
+        series = (charts or {}).get(info["symbol"])
+        if not series:
+            continue
+        usd_price = series.closes[-1] / 100  # CBOT quotes in cents/bushel
+        cbot = {
+            "price": round(usd_price * dolar_price, 2),
+            "currency": "ARS",
+            "change_percent": round(series.change_pct(), 2),
+            "symbol": info["symbol"],
+            "name": info["name"]
         }
+        results[f"{key}_cbot"] = cbot
+        results.setdefault(f"{key}_rosario", cbot)
+    return results
+
+
+class MarketDataService:
+    """Fallback market data for when no upstream ever answered."""
 
     @staticmethod
     def get_mock_data() -> Dict[str, Any]:
@@ -119,3 +323,18 @@ class MarketDataService:
                 "dolar": {"price": 1200, "currency": "ARS", "change_percent": 0.0, "symbol": "USD/ARS", "name": "Dólar Oficial"}
             }
         }
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_providers: Optional[MarketProviders] = None
+
+
+def get_market_providers() -> MarketProviders:
+    """Get or create the process-wide provider hub."""
+    global _providers
+    if _providers is None:
+        _providers = MarketProviders([DolarApiProvider(), YahooFuturesProvider(), AgrofyPizarraProvider()])
+    return _providers
@@ -0,0 +1,300 @@
+"""
+In-memory market snapshot refreshed in the background.
+
+/api/market/latest used to call DolarAPI and download Yahoo Finance futures
+on every request. The snapshot keeps the last good quote of every field and
+refreshes each upstream group (dollar, grains) on its own schedule from a
+background task, through the provider hub of services.market_data.
+Requests read memory; when a group is due they trigger an asynchronous
+refresh and still answer immediately with what is held
+(stale-while-revalidate). An upstream failure keeps the previous values and
+is reported, instead of replacing them with mock data.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.market_data import FALLBACK_DOLAR_PRICE, LATEST, ProviderError, get_market_providers, grain_quotes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 60.0
+DOLLAR_TTL_SECONDS = 60.0
+GRAINS_TTL_SECONDS = 300.0
+
+# A field is stale once this many TTLs pass without a successful refresh
+STALE_AFTER_TTLS = 3
+
+# How long the very first request waits for the initial refresh
+INITIAL_WAIT_SECONDS = 15.0
+
+# Fetches one group's quotes given the current fields (grains need the dollar)
+Fetcher = Callable[[Dict[str, Dict[str, Any]]], Awaitable[Dict[str, Dict[str, Any]]]]
+
+
+@dataclass
+class SnapshotGroup:
+    """
+    Fields fetched together from one upstream.
+
+    Attributes:
+        name: Group name ("dollar", "grains")
+        fetch: Coroutine function returning {field: quote}
+        ttl: Seconds before the group is due for a refresh
+    """
+
+    name: str
+    fetch: Fetcher
+    ttl: float
+    attempted_at: float = 0.0
+    succeeded_at: Optional[float] = None
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class SnapshotField:
+    """Last good quote of one field and when it was fetched (epoch seconds)."""
+
+    quote: Dict[str, Any]
+    group: str
+    updated_at: float
+    updated_iso: str = field(init=False)
+
+    def __post_init__(self):
+        self.updated_iso = datetime.fromtimestamp(self.updated_at, timezone.utc).isoformat()
+
+
+async def fetch_dollar(current: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """DolarAPI quotes."""
+    result = await get_market_providers().get("dolarapi")
+    return result.value_or_raise()
+
+
+async def fetch_grains(current: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    CBOT futures converted with the snapshot's dollar quote, and Agrofy's
+    Pizarra Rosario, fetched concurrently. Fails only if both fail.
+    """
+    dolar = current.get("dolar", {}).get("price") or FALLBACK_DOLAR_PRICE
+    yahoo, agrofy = await get_market_providers().get_many([("yahoo", LATEST), ("agrofy", LATEST)])
+    if yahoo.error and agrofy.error:
+        raise ProviderError(f"yahoo: {yahoo.error}; agrofy: {agrofy.error}")
+    return grain_quotes(
+        yahoo.value if not yahoo.error else None,
+        agrofy.value if not agrofy.error else None,
+        dolar
+    )
+
+
+def default_groups() -> List[SnapshotGroup]:
+    """Dollar first: the grain conversion reads its latest quote."""
+    return [
+        SnapshotGroup("dollar", fetch_dollar, DOLLAR_TTL_SECONDS),
+        SnapshotGroup("grains", fetch_grains, GRAINS_TTL_SECONDS),
+    ]
+
+
+class MarketSnapshot:
+    """
+    Last good market quotes, refreshed per group in the background.
+
+    All methods run on the event loop; refreshes are serialized by an
+    asyncio lock so a burst of requests triggers at most one upstream call
+    per group.
+    """
+
+    def __init__(self, groups: Optional[List[SnapshotGroup]] = None, refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        """
+        Args:
+            groups: Upstream groups, refreshed in order (default: dollar, grains)
+            refresh_seconds: How often the background task checks for due groups
+        """
+        self.groups = groups if groups is not None else default_groups()
+        self.refresh_seconds = refresh_seconds
+        self._fields: Dict[str, SnapshotField] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._pending: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.background_refreshes = 0
+
+    # ------------------------------------------------------------------
+    # Refreshing
+    # ------------------------------------------------------------------
+
+    def _due(self, group: SnapshotGroup, now: float) -> bool:
+        return now - group.attempted_at >= group.ttl
+
+    async def refresh(self, force: bool = False) -> List[str]:
+        """
+        Fetch the groups that are due (all of them when `force`).
+
+        A failing group keeps its previous fields; fields missing from a
+        partial answer keep theirs too.
+
+        Returns:
+            Names of the groups that were refreshed successfully
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            refreshed = []
+            for group in self.groups:
+                now = time.monotonic()
+                if not (force or self._due(group, now)):
+                    continue
+                group.attempted_at = now
+                try:
+                    quotes = await group.fetch({k: f.quote for k, f in self._fields.items()})
+                    if not quotes:
+                        raise ValueError("no quotes in the response")
+                except Exception as e:
+                    group.failures += 1
+                    group.last_error = f"{type(e).__name__}: {e}"
+                    logger.error(f"Market snapshot: {group.name} refresh failed, keeping last values ({e})")
+                    continue
+
+                updated_at = time.time()
+                for key, quote in quotes.items():
+                    self._fields[key] = SnapshotField(quote, group.name, updated_at)
+                group.succeeded_at = updated_at
+                group.last_error = None
+                refreshed.append(group.name)
+            self.refreshes += 1
+            return refreshed
+
+    def _refresh_in_background(self) -> None:
+        """Start a refresh unless one is already running (stale-while-revalidate)."""
+        if self._pending is not None and not self._pending.done():
+            return
+        self.background_refreshes += 1
+        self._pending = asyncio.get_running_loop().create_task(self.refresh())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Market snapshot loop error: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Run the refresh loop on the current event loop (app startup)."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresh loop and any pending refresh (app shutdown)."""
+        for task in (self._loop_task, self._pending):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = self._pending = None
+        self._lock = None       # bound to this loop
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @property
+    def has_data(self) -> bool:
+        return bool(self._fields)
+
+    async def get(self) -> Dict[str, Any]:
+        """
+        The current snapshot, refreshing due groups in the background.
+
+        Only a snapshot that never held data waits, for at most
+        INITIAL_WAIT_SECONDS, for the first refresh.
+
+        Returns:
+            {"timestamp", "age_seconds", "stale", "data": {field: quote with
+            updated_at/age_seconds/stale}, "errors": {group: message}}
+        """
+        now = time.monotonic()
+        if any(self._due(g, now) for g in self.groups):
+            self._refresh_in_background()
+        if not self._fields and self._pending is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._pending), INITIAL_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                pass  # answer with what is held; the refresh keeps running
+            except Exception as e:
+                logger.error(f"Market snapshot: initial refresh failed ({e})")
+        return self.view()
+
+    def view(self) -> Dict[str, Any]:
+        """The snapshot as held, with ages computed now (no I/O)."""
+        now = time.time()
+        ttls = {g.name: g.ttl for g in self.groups}
+        data = {}
+        for key, f in self._fields.items():
+            age = now - f.updated_at
+            data[key] = {
+                **f.quote,
+                "updated_at": f.updated_iso,
+                "age_seconds": round(age, 1),
+                "stale": age > STALE_AFTER_TTLS * ttls.get(f.group, 0),
+            }
+        newest = max((f.updated_at for f in self._fields.values()), default=None)
+        oldest = min((f.updated_at for f in self._fields.values()), default=None)
+        return {
+            "timestamp": datetime.fromtimestamp(newest, timezone.utc).isoformat() if newest else None,
+            "age_seconds": round(now - oldest, 1) if oldest else None,
+            "stale": any(item["stale"] for item in data.values()),
+            "data": data,
+            "errors": {g.name: g.last_error for g in self.groups if g.last_error},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-group refresh state."""
+        return {
+            "fields": len(self._fields),
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "groups": {
+                g.name: {
+                    "ttl_seconds": g.ttl,
+                    "last_success": datetime.fromtimestamp(g.succeeded_at, timezone.utc).isoformat() if g.succeeded_at else None,
+                    "failures": g.failures,
+                    "last_error": g.last_error,
+                }
+                for g in self.groups
+            },
+        }
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_snapshot: Optional[MarketSnapshot] = None
+
+
+def get_market_snapshot() -> MarketSnapshot:
+    """
+    Get or create the process-wide snapshot.
+
+    AGROMATE_MARKET_REFRESH sets the background check interval in seconds.
+    """
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = MarketSnapshot(
+            refresh_seconds=float(os.getenv("AGROMATE_MARKET_REFRESH", DEFAULT_REFRESH_SECONDS))
+        )
+    return _snapshot
+
+
+def reset_market_snapshot() -> None:
+    """Forget the shared snapshot (tests)."""
+    global _snapshot
+    _snapshot = None
@@ -0,0 +1,378 @@
+"""
+Local daily price history (CBOT grain futures and dollar rates).
+
+/api/market/history used to download one to three months of futures from
+Yahoo Finance on every request. Daily closes (and the dollar series of
+services.dollar_history) now live in a small SQLite file:
+a background job backfills every series once and then appends the latest
+days on a schedule, and the endpoint only reads the file. Ranges of several
+years answer in milliseconds and keep working while the upstreams are down.
+
+Run `python -m services.price_store` from backend/ for a one-off backfill or
+update outside the API.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from services.market_data import COMMODITIES, get_market_providers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRICE_DB = Path(__file__).parent.parent / "prices.db"
+
+# First day of a backfill (Yahoo's continuous CBOT futures start in 2000)
+BACKFILL_START = "2000-01-01"
+
+DEFAULT_UPDATE_SECONDS = 6 * 3600.0
+
+# Re-fetch the last days on every update: Yahoo revises closes after settlement
+OVERLAP_DAYS = 5
+
+UPSTREAM_TIMEOUT_SECONDS = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_closes (
+    series TEXT NOT NULL,
+    day TEXT NOT NULL,              -- YYYY-MM-DD
+    close REAL NOT NULL,
+    PRIMARY KEY (series, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS series_updates (
+    series TEXT PRIMARY KEY,
+    updated_at TEXT NOT NULL
+);
+"""
+
+Close = Tuple[str, float]
+
+# Fetches {series: [(day, close), ...]} from `since` (None: the full history)
+HistoryFetcher = Callable[[Optional[str]], Awaitable[Dict[str, List[Close]]]]
+
+
+class PriceStore:
+    """
+    Daily closes per series in SQLite.
+
+    A single connection is shared behind a lock, like SQLiteNewsRepository.
+    Reads are served from an in-memory copy aligned on the union of days
+    (a few thousand rows per series), rebuilt after every append; the
+    history endpoint then only slices lists.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """
+        Args:
+            path: Database file path, or ":memory:" for a throwaway store
+        """
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._days: Optional[List[str]] = None
+        self._columns: Dict[str, List[Optional[float]]] = {}
+        # Bumped by every append, for caches of results derived from the closes
+        self.revision = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def append(self, series: str, closes: Iterable[Close]) -> int:
+        """
+        Insert or replace closes of one series.
+
+        Returns:
+            Number of rows written
+        """
+        rows = [(series, day, float(value)) for day, value in closes]
+        if not rows:
+            return 0
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO daily_closes (series, day, close) VALUES (?, ?, ?)", rows
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO series_updates (series, updated_at) VALUES (?, ?)", (series, now)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._days = None
+            self.revision += 1
+        return len(rows)
+
+    def last_day(self, series: str) -> Optional[str]:
+        """Most recent stored day of a series (None when empty)."""
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(day) FROM daily_closes WHERE series = ?", (series,)).fetchone()
+        return row[0]
+
+    def _load(self) -> Tuple[List[str], Dict[str, List[Optional[float]]]]:
+        with self._lock:
+            if self._days is None:
+                rows = self.conn.execute("SELECT day, series, close FROM daily_closes").fetchall()
+                days = sorted({day for day, _, _ in rows})
+                position = {day: i for i, day in enumerate(days)}
+                columns: Dict[str, List[Optional[float]]] = {}
+                for day, series, value in rows:
+                    column = columns.get(series)
+                    if column is None:
+                        column = columns[series] = [None] * len(days)
+                    column[position[day]] = value
+                self._days, self._columns = days, columns
+            return self._days, self._columns
+
+    def table(self, series: Sequence[str], start: str, end: str) -> Tuple[List[str], Dict[str, List[Optional[float]]]]:
+        """
+        Closes of `series` between two days (inclusive), aligned by day.
+
+        Returns:
+            (days, {series: closes}); a close is None on days the series
+            has no data (and every day holds at least one series of the store)
+        """
+        days, columns = self._load()
+        lo, hi = bisect.bisect_left(days, start), bisect.bisect_right(days, end)
+        return days[lo:hi], {s: columns[s][lo:hi] for s in series if s in columns}
+
+    def closes(self, series: Sequence[str], start: str, end: str) -> List[Tuple[str, str, float]]:
+        """
+        Closes of `series` between two days (inclusive), ordered by day.
+
+        Returns:
+            (day, series, close) rows
+        """
+        days, columns = self.table(series, start, end)
+        return [
+            (day, s, columns[s][i])
+            for i, day in enumerate(days) for s in series
+            if s in columns and columns[s][i] is not None
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Row count, first/last day and last write per series."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT c.series, COUNT(*), MIN(c.day), MAX(c.day), u.updated_at "
+                "FROM daily_closes c LEFT JOIN series_updates u ON u.series = c.series "
+                "GROUP BY c.series ORDER BY c.series"
+            ).fetchall()
+        return {
+            name: {"rows": count, "first_day": first, "last_day": last, "updated_at": updated}
+            for name, count, first, last, updated in rows
+        }
+
+
+# ----------------------------------------------------------------------
+# Upstreams
+# ----------------------------------------------------------------------
+
+async def fetch_grain_history(since: Optional[str]) -> Dict[str, List[Close]]:
+    """Daily CBOT closes (cents/bushel) keyed by Yahoo symbol."""
+    result = await get_market_providers().get("yahoo", since or BACKFILL_START)
+    return {symbol: list(series.items()) for symbol, series in result.value_or_raise().items()}
+
+
+@dataclass
+class HistorySource:
+    """
+    Series fetched together from one upstream.
+
+    Attributes:
+        name: Source name ("grains", "dollar")
+        series: Series the source writes
+        fetch: Coroutine function returning {series: [(day, close)]}
+        derive: Computes extra series from the store after each update
+            (from the same `since`)
+    """
+
+    name: str
+    series: Tuple[str, ...]
+    fetch: HistoryFetcher
+    derive: Optional[Callable[["PriceStore", Optional[str]], Dict[str, List[Close]]]] = None
+    succeeded_at: Optional[float] = None
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+def default_sources() -> List[HistorySource]:
+    from services.dollar_history import dollar_source, get_dollar_provider
+
+    return [
+        HistorySource("grains", tuple(info["symbol"] for info in COMMODITIES.values()), fetch_grain_history),
+        dollar_source(get_dollar_provider()),
+    ]
+
+
+class PriceHistoryUpdater:
+    """
+    Backfills and appends the price store from the upstreams.
+
+    A source with an empty series is fetched in full; otherwise only from
+    OVERLAP_DAYS before its oldest last day, so every answer overlaps what
+    is stored and an empty one is an error. A failing source is retried on
+    the next run and never touches stored rows.
+    """
+
+    def __init__(
+        self,
+        store: PriceStore,
+        sources: Optional[List[HistorySource]] = None,
+        update_seconds: float = DEFAULT_UPDATE_SECONDS
+    ):
+        """
+        Args:
+            store: Price store to fill
+            sources: Upstream sources (default: grains, dollar)
+            update_seconds: Seconds between scheduled updates
+        """
+        self.store = store
+        self.sources = sources if sources is not None else default_sources()
+        self.update_seconds = update_seconds
+        self._loop_task: Optional[asyncio.Task] = None
+        self.updates = 0
+
+    def _since(self, source: HistorySource) -> Optional[str]:
+        last_days = [self.store.last_day(s) for s in source.series]
+        if any(d is None for d in last_days):
+            return None
+        start = date.fromisoformat(min(last_days)) - timedelta(days=OVERLAP_DAYS)
+        return start.isoformat()
+
+    async def update(self) -> Dict[str, int]:
+        """
+        Fetch and store the missing days of every source.
+
+        Returns:
+            Rows written per series
+        """
+        written = {}
+        for source in self.sources:
+            since = self._since(source)
+            try:
+                history = await source.fetch(since)
+                if not any(history.values()):
+                    raise ValueError("no closes in the response")
+            except Exception as e:
+                source.failures += 1
+                source.last_error = f"{type(e).__name__}: {e}"
+                logger.error(f"Price history: {source.name} update failed ({e})")
+                continue
+            for series in source.series:
+                written[series] = self.store.append(series, history.get(series, []))
+            if source.derive is not None:
+                for series, closes in source.derive(self.store, since).items():
+                    written[series] = self.store.append(series, closes)
+            source.succeeded_at = time.time()
+            source.last_error = None
+            logger.info(f"Price history: {source.name} {'appended' if since else 'backfilled'} "
+                        f"{sum(written[s] for s in source.series)} rows")
+        self.updates += 1
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.update()
+            except Exception as e:
+                logger.error(f"Price history loop error: {e}")
+            await asyncio.sleep(self.update_seconds)
+
+    def start(self) -> None:
+        """Run the update loop on the current event loop (app startup)."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the update loop (app shutdown)."""
+        if self._loop_task is not None and not self._loop_task.done():
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+        self._loop_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-source update state and per-series coverage."""
+        return {
+            "updates": self.updates,
+            "update_seconds": self.update_seconds,
+            "sources": {
+                s.name: {
+                    "last_success": datetime.fromtimestamp(s.succeeded_at, timezone.utc).isoformat() if s.succeeded_at else None,
+                    "failures": s.failures,
+                    "last_error": s.last_error,
+                }
+                for s in self.sources
+            },
+            "series": self.store.stats(),
+        }
+
+
+# ----------------------------------------------------------------------
+# Shared instances
+# ----------------------------------------------------------------------
+
+_store: Optional[PriceStore] = None
+_updater: Optional[PriceHistoryUpdater] = None
+
+
+def get_price_store() -> PriceStore:
+    """
+    Get or create the process-wide price store.
+
+    AGROMATE_PRICE_DB sets the database file (default: backend/prices.db).
+    """
+    global _store
+    if _store is None:
+        _store = PriceStore(os.getenv("AGROMATE_PRICE_DB") or DEFAULT_PRICE_DB)
+    return _store
+
+
+def get_price_updater() -> PriceHistoryUpdater:
+    """
+    Get or create the process-wide updater.
+
+    AGROMATE_HISTORY_REFRESH sets the update interval in seconds.
+    """
+    global _updater
+    if _updater is None:
+        _updater = PriceHistoryUpdater(
+            get_price_store(),
+            update_seconds=float(os.getenv("AGROMATE_HISTORY_REFRESH", DEFAULT_UPDATE_SECONDS))
+        )
+    return _updater
+
+
+def reset_price_store() -> None:
+    """Forget the shared store and updater (tests)."""
+    global _store, _updater
+    if _store is not None:
+        _store.close()
+    _store = _updater = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    updater = get_price_updater()
+    print(asyncio.run(updater.update()))
+    for name, info in updater.store.stats().items():
+        print(f"{name:15} {info['rows']:6} filas  {info['first_day']} → {info['last_day']}")
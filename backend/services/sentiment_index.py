@@ -0,0 +1,572 @@
+"""
+Streaming sentiment index per commodity and per source.
+
+Each classified article adds its confidence, decayed exponentially with its
+age, to a bullish or bearish mass for every half-life (1d, 7d and 30d by
+default); the index is (bullish - bearish) / (bullish + bearish), the same
+formula as the trends timeline. Alongside it, a ring of daily slots keeps
+the article counts of the last days. Folding an article in touches a fixed
+number of floats, so the index is kept up to date from the change feed
+(get_changed_since) instead of being recomputed per request.
+
+The state is saved to the app_state table and restored on startup. What the
+change feed cannot express (deletes, updates of articles this process has
+not seen) triggers a rebuild, which replays the last REPLAY_HALF_LIVES
+longest half-lives of articles in a background thread.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from database import get_news_repository
+from database.base import BaseNewsRepository, ANALYTICS_COLUMNS
+from models.commodity import parse_commodities
+from services.article_store import DEFAULT_CONFIDENCE, PAGE_SIZE, SENTIMENT_CODES
+from services.bucketing import DEFAULT_TIMEZONE, epoch_seconds
+
+if TYPE_CHECKING:
+    from database.invalidation import NewsChange
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = "sentiment_index"
+STATE_VERSION = 1
+
+# created_at tells inserts (created_at == updated_at) from updates
+INDEX_COLUMNS = ANALYTICS_COLUMNS + ("created_at",)
+
+DEFAULT_HALF_LIVES = ("1d", "7d", "30d")
+DEFAULT_REFRESH_SECONDS = 30.0
+DEFAULT_SNAPSHOT_SECONDS = 60.0
+DEFAULT_REBUILD_HOURS = 24.0
+
+# A rebuild replays this many longest half-lives (older articles weigh < 0.1%)
+REPLAY_HALF_LIVES = 10
+
+DURATION_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400}
+
+ALCISTA, BAJISTA, NEUTRAL = (SENTIMENT_CODES[label] for label in ("ALCISTA", "BAJISTA", "NEUTRAL"))
+
+OVERALL = ("overall", "ALL")
+
+# (published epoch seconds, sentiment code, confidence, local day ordinal, series keys)
+Contribution = Tuple[int, int, float, int, Tuple[Tuple[str, str], ...]]
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Exact datetime of an ISO string or datetime (epoch_seconds drops the microseconds)."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def duration_seconds(label: str) -> int:
+    """
+    Seconds in a duration label such as "12h", "7d" or "2w".
+
+    Raises:
+        ValueError: Malformed label
+    """
+    try:
+        amount, unit = int(label[:-1]), DURATION_UNITS[label[-1]]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Invalid duration '{label}' (expected e.g. 12h, 7d, 2w)")
+    if amount <= 0:
+        raise ValueError(f"Invalid duration '{label}'")
+    return amount * unit
+
+
+class IndexSeries:
+    """
+    Decayed sentiment mass and daily counts of one scope (a commodity, a source or everything).
+
+    ``bull``/``bear`` hold one mass per half-life, decayed to ``as_of``.
+    ``days``/``counts`` are a ring of daily slots: slot ``day % len(days)``
+    holds the [alcista, bajista, neutral] counts of local day ``day``.
+    """
+
+    __slots__ = ("bull", "bear", "as_of", "days", "counts")
+
+    def __init__(self, width: int, ring: int):
+        self.bull = [0.0] * width
+        self.bear = [0.0] * width
+        self.as_of = 0
+        self.days: List[Optional[int]] = [None] * ring
+        self.counts = [[0, 0, 0] for _ in range(ring)]
+
+    def fold(self, item: Contribution, sign: int, rates: Sequence[float]) -> None:
+        """Add (sign=1) or remove (sign=-1) one article."""
+        ts, code, confidence, day, _ = item
+        if code != NEUTRAL:
+            if ts > self.as_of:
+                for i, rate in enumerate(rates):
+                    decay = math.exp(-rate * (ts - self.as_of))
+                    self.bull[i] *= decay
+                    self.bear[i] *= decay
+                self.as_of = ts
+            mass = self.bull if code == ALCISTA else self.bear
+            for i, rate in enumerate(rates):
+                mass[i] = max(0.0, mass[i] + sign * confidence * math.exp(-rate * (self.as_of - ts)))
+
+        slot = day % len(self.days)
+        if self.days[slot] != day:
+            if sign < 0 or (self.days[slot] is not None and self.days[slot] > day):
+                return          # older than the ring
+            self.days[slot] = day
+            self.counts[slot] = [0, 0, 0]
+        self.counts[slot][code] = max(0, self.counts[slot][code] + sign)
+
+    def read(self, now: int, today: int, labels: Sequence[str], rates: Sequence[float], windows: Sequence[int]) -> Dict:
+        """Score, decayed weight and windowed counts per half-life, as of `now`."""
+        score, weight, counts = {}, {}, {}
+        for i, label in enumerate(labels):
+            total = self.bull[i] + self.bear[i]
+            score[label] = round((self.bull[i] - self.bear[i]) / total, 4) if total > 0 else None
+            weight[label] = round(total * math.exp(-rates[i] * max(0, now - self.as_of)), 3)
+            window = [0, 0, 0]
+            for day, slot in zip(self.days, self.counts):
+                if day is not None and today - windows[i] < day <= today:
+                    window = [a + b for a, b in zip(window, slot)]
+            counts[label] = {"alcista": window[0], "bajista": window[1], "neutral": window[2]}
+        return {"score": score, "weight": weight, "counts": counts}
+
+    def to_list(self) -> list:
+        return [self.bull, self.bear, self.as_of, self.days, self.counts]
+
+    @classmethod
+    def from_list(cls, data: list) -> "IndexSeries":
+        series = cls(0, 0)
+        series.bull, series.bear, series.as_of, series.days, series.counts = data
+        return series
+
+
+class SentimentIndex:
+    """
+    Exponentially decayed, confidence-weighted sentiment per commodity and source.
+
+    Reads serve the in-memory state; they pull new writes from the change
+    feed when the state is older than ``refresh_seconds`` (or the bus
+    flagged a write), never waiting for a rebuild.
+    """
+
+    def __init__(
+        self,
+        repo: Optional[BaseNewsRepository] = None,
+        half_lives: Sequence[str] = DEFAULT_HALF_LIVES,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        snapshot_seconds: float = DEFAULT_SNAPSHOT_SECONDS,
+        rebuild_hours: float = DEFAULT_REBUILD_HOURS,
+        page_size: int = PAGE_SIZE,
+        tz: str = DEFAULT_TIMEZONE,
+        background: bool = True
+    ):
+        """
+        Args:
+            repo: News repository (default: the shared one)
+            half_lives: Duration labels ("1d", "7d", ...), shortest first
+            refresh_seconds: Maximum age of the state before a read pulls writes
+            snapshot_seconds: Minimum time between saves to app_state
+            rebuild_hours: Time between reconciling rebuilds
+            page_size: Rows per get_changed_since call
+            tz: Timezone of the daily count slots
+            background: Run rebuilds in a thread (False: inline, for scripts and tests)
+
+        Raises:
+            ValueError: Invalid half-life label
+        """
+        self._repo = repo
+        seconds = sorted((duration_seconds(h), h) for h in half_lives)
+        if not seconds:
+            raise ValueError("At least one half-life is required")
+        self.half_lives = tuple(label for _, label in seconds)
+        self._rates = [math.log(2) / s for s, _ in seconds]
+        self._windows = [max(1, math.ceil(s / 86400)) for s, _ in seconds]
+        self._ring = max(self._windows)
+        self._replay_seconds = REPLAY_HALF_LIVES * seconds[-1][0]
+        self.tz = tz
+        self._zone = ZoneInfo(tz)
+        self.refresh_seconds = refresh_seconds
+        self.snapshot_seconds = snapshot_seconds
+        self.rebuild_hours = rebuild_hours
+        self.page_size = page_size
+        self.background = background
+
+        self._lock = threading.RLock()
+        self._series: Dict[Tuple[str, str], IndexSeries] = {}
+        self._tracked: Dict[str, Optional[Contribution]] = {}
+        self._watermark: Optional[Tuple[str, str]] = None
+        self._rebuilt_at = 0.0
+        self._loaded = False
+        self._stale = False
+        self._dirty = False
+        self._needs_rebuild = False
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._refreshed_at = 0.0
+        self._saved_at = 0.0
+
+        self.articles = 0
+        self.refreshes = 0
+        self.rebuilds = 0
+
+    @property
+    def repo(self) -> BaseNewsRepository:
+        return self._repo or get_news_repository()
+
+    # ------------------------------------------------------------------
+    # Folding
+    # ------------------------------------------------------------------
+
+    def _contribution(self, row: Dict, now: int) -> Optional[Contribution]:
+        """What a row adds to the index (None: unclassified or undated)."""
+        code = SENTIMENT_CODES.get((row.get("sentiment") or "").upper())
+        ts = epoch_seconds(row.get("published_at"))
+        if code is None or ts is None:
+            return None
+        ts = min(ts, now)            # future-dated articles count as published now
+        confidence = row.get("confidence")
+        keys = (OVERALL, ("source", row.get("source") or "Unknown")) + tuple(
+            ("commodity", label) for label in (row.get("commodities") or ("GENERAL",))
+        )
+        return (
+            ts, code, DEFAULT_CONFIDENCE if confidence is None else float(confidence),
+            datetime.fromtimestamp(ts, self._zone).toordinal(), keys
+        )
+
+    def _fold(
+        self,
+        series: Dict[Tuple[str, str], IndexSeries],
+        item: Optional[Contribution],
+        sign: int
+    ) -> None:
+        if item is None:
+            return
+        for key in item[4]:
+            target = series.get(key)
+            if target is None:
+                target = series[key] = IndexSeries(len(self._rates), self._ring)
+            target.fold(item, sign, self._rates)
+
+    def _apply(
+        self,
+        rows: Sequence[Dict],
+        series: Dict[Tuple[str, str], IndexSeries],
+        tracked: Dict[str, Optional[Contribution]],
+        now: int
+    ) -> bool:
+        """
+        Fold rows from the change feed into `series`.
+
+        Returns:
+            False if a row updated an article of the replay window with an
+            unknown contribution (only a rebuild can account for it)
+        """
+        consistent = True
+        for row in rows:
+            item = self._contribution(row, now)
+            if row["id"] in tracked:
+                previous = tracked[row["id"]]
+                if previous == item:
+                    continue
+                self._fold(series, previous, -1)
+            elif parse_timestamp(row.get("created_at")) != parse_timestamp(row.get("updated_at")):
+                # Before the replay window an article weighs next to nothing and
+                # a rebuild would not read it either, so only newer ones need one
+                published = epoch_seconds(row.get("published_at"))
+                if published is not None and published >= now - self._replay_seconds:
+                    consistent = False
+                continue
+            self._fold(series, item, 1)
+            tracked[row["id"]] = item
+        return consistent
+
+    def _prune(self, tracked: Dict[str, Optional[Contribution]], now: int) -> None:
+        """
+        Forget contributions older than the count ring; later updates to them trigger a rebuild.
+
+        Rows without a contribution (unclassified or undated) are kept so
+        their classification is folded in as an update.
+        """
+        cutoff = now - self._ring * 86400
+        for news_id in [k for k, item in tracked.items() if item is not None and item[0] < cutoff]:
+            del tracked[news_id]
+
+    # ------------------------------------------------------------------
+    # Refresh, rebuild and persistence
+    # ------------------------------------------------------------------
+
+    def mark_stale(self) -> None:
+        """Pull writes on the next read."""
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """Rebuild from the news table on the next read."""
+        self._needs_rebuild = True
+        self._stale = True
+
+    def notify(self, change: "NewsChange") -> None:
+        """Invalidation bus subscriber: deletes force a rebuild, other writes a refresh."""
+        if change.op in ("delete", "truncate"):
+            self.invalidate()
+        else:
+            self.mark_stale()
+
+    def refresh(self) -> int:
+        """
+        Fold in the rows written since the last refresh and save when due.
+
+        Loads the saved state first if needed. While a rebuild is pending or
+        running nothing is read (the rebuild catches up on its own).
+
+        Returns:
+            Number of rows read
+        """
+        with self._lock:
+            self._stale = False
+            self._load()
+            if self._needs_rebuild or time.time() - self._rebuilt_at > self.rebuild_hours * 3600:
+                self._start_rebuild()
+                return 0
+            if self._rebuild_thread is not None:
+                return 0
+            read = self._pull(self._series, self._tracked)
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+            if self._dirty and time.monotonic() - self._saved_at > self.snapshot_seconds:
+                self.save()
+            return read
+
+    def _pull(self, series, tracked) -> int:
+        """Page through the change feed from the watermark, folding each page."""
+        now = int(time.time())
+        updated_after, after_id = self._watermark or (None, None)
+        read = 0
+        while True:
+            rows = self.repo.get_changed_since(updated_after, after_id, None, self.page_size, INDEX_COLUMNS)
+            if not rows:
+                break
+            if not self._apply(rows, series, tracked, now):
+                self._needs_rebuild = True
+            read += len(rows)
+            updated_after, after_id = rows[-1]["updated_at"], rows[-1]["id"]
+            self._watermark = (updated_after, after_id)
+            self._dirty = True
+            if len(rows) < self.page_size:
+                break
+        self.articles += read
+        if read:
+            self._prune(tracked, now)
+        return read
+
+    def rebuild(self) -> int:
+        """
+        Recompute the index from the articles of the replay window.
+
+        The replay reads without holding the lock, so reads keep serving the
+        previous state; the result is swapped in and caught up with the
+        writes made meanwhile.
+
+        Returns:
+            Number of rows replayed
+        """
+        now = int(time.time())
+        published_after = datetime.fromtimestamp(now - self._replay_seconds, timezone.utc).isoformat()
+        series: Dict[Tuple[str, str], IndexSeries] = {}
+        tracked: Dict[str, Optional[Contribution]] = {}
+        updated_after = after_id = None
+        read = 0
+        while True:
+            rows = self.repo.get_changed_since(updated_after, after_id, published_after, self.page_size, INDEX_COLUMNS)
+            if not rows:
+                break
+            for row in rows:
+                item = self._contribution(row, now)
+                self._fold(series, item, 1)
+                tracked[row["id"]] = item
+            read += len(rows)
+            updated_after, after_id = rows[-1]["updated_at"], rows[-1]["id"]
+            if len(rows) < self.page_size:
+                break
+        self._prune(tracked, now)
+
+        with self._lock:
+            self._loaded = True
+            self._series, self._tracked = series, tracked
+            self._watermark = (updated_after, after_id) if updated_after else None
+            self._needs_rebuild = False
+            self._pull(self._series, self._tracked)
+            self._rebuilt_at = time.time()
+            self._dirty = True
+            self.rebuilds += 1
+            self.save()
+        logger.info(f"Sentiment index rebuilt from {read} articles ({len(series)} series)")
+        return read
+
+    def _start_rebuild(self) -> None:
+        """Run a rebuild inline or, in background mode, in a thread if none is running."""
+        if not self.background:
+            self.rebuild()
+            return
+        if self._rebuild_thread is not None:
+            return
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"Sentiment index rebuild failed: {e}")
+            finally:
+                self._rebuild_thread = None
+
+        self._rebuild_thread = threading.Thread(target=run, name="sentiment-index-rebuild", daemon=True)
+        self._rebuild_thread.start()
+
+    def to_state(self) -> Dict:
+        """JSON document with everything needed to resume (tracked rows are not kept)."""
+        with self._lock:
+            return {
+                "version": STATE_VERSION,
+                "half_lives": list(self.half_lives),
+                "timezone": self.tz,
+                "watermark": list(self._watermark) if self._watermark else None,
+                "rebuilt_at": self._rebuilt_at,
+                "needs_rebuild": self._needs_rebuild,
+                "series": [[scope, name, *s.to_list()] for (scope, name), s in self._series.items()],
+            }
+
+    def save(self) -> None:
+        """Write the state to app_state (failures are logged, the next save retries)."""
+        if not self._loaded:
+            return          # nothing read yet: keep the saved state
+        try:
+            self.repo.put_state(STATE_KEY, self.to_state())
+            self._saved_at = time.monotonic()
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save sentiment index: {e}")
+
+    def _load(self) -> None:
+        """Restore the saved state once; a missing or incompatible one schedules a rebuild."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            state = self.repo.get_state(STATE_KEY)
+        except Exception as e:
+            logger.error(f"Failed to load sentiment index: {e}")
+            state = None
+        if (
+            not state or state.get("version") != STATE_VERSION
+            or state.get("half_lives") != list(self.half_lives) or state.get("timezone") != self.tz
+            or any(len(s[6]) != self._ring for s in state["series"])
+        ):
+            self._needs_rebuild = True
+            return
+        self._series = {(s[0], s[1]): IndexSeries.from_list(s[2:]) for s in state["series"]}
+        self._watermark = tuple(state["watermark"]) if state["watermark"] else None
+        self._rebuilt_at = state["rebuilt_at"]
+        self._needs_rebuild = bool(state.get("needs_rebuild"))
+        logger.info(f"Sentiment index restored ({len(self._series)} series)")
+
+    def _refresh_if_due(self) -> None:
+        if not (self._stale or not self._loaded or time.monotonic() - self._refreshed_at > self.refresh_seconds):
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the current state; the next read retries
+            logger.error(f"Sentiment index refresh failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read(self, commodity: Optional[str] = None, source: Optional[str] = None) -> Dict:
+        """
+        The index as of now: market-wide, per commodity and per source.
+
+        Args:
+            commodity: Only this commodity (any spelling parse_commodities accepts)
+            source: Only this source name
+
+        Returns:
+            Dict with "overall", "commodities" and "sources", each series
+            holding "score" (-1..1, None without weight), "weight" (decayed
+            confidence mass) and "counts" (articles in the last N local days)
+            per half-life
+        """
+        with self._lock:
+            self._refresh_if_due()
+            now = int(time.time())
+            today = datetime.fromtimestamp(now, self._zone).toordinal()
+
+            def view(key):
+                series = self._series.get(key)
+                return (series or IndexSeries(len(self._rates), self._ring)).read(
+                    now, today, self.half_lives, self._rates, self._windows
+                )
+
+            commodities = sorted(name for scope, name in self._series if scope == "commodity")
+            sources = sorted(name for scope, name in self._series if scope == "source")
+            if commodity:
+                labels = parse_commodities(commodity)
+                commodities = [c for c in commodities if c in labels]
+            if source:
+                sources = [s for s in sources if s == source]
+            return {
+                "as_of": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                "half_lives": list(self.half_lives),
+                "timezone": self.tz,
+                "rebuilding": self._rebuild_thread is not None or self._needs_rebuild,
+                "overall": view(OVERALL),
+                "commodities": {name: view(("commodity", name)) for name in commodities},
+                "sources": {name: view(("source", name)) for name in sources},
+            }
+
+    def stats(self) -> Dict:
+        """Series count and refresh counters."""
+        return {
+            "series": len(self._series),
+            "tracked": len(self._tracked),
+            "half_lives": list(self.half_lives),
+            "articles_folded": self.articles,
+            "refreshes": self.refreshes,
+            "rebuilds": self.rebuilds,
+            "watermark": self._watermark[0] if self._watermark else None,
+        }
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_index: Optional[SentimentIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_sentiment_index() -> SentimentIndex:
+    """
+    Get or create the process-wide index over the shared news repository.
+
+    AGROMATE_INDEX_HALF_LIVES sets the half-lives (comma-separated, default
+    "1d,7d,30d").
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                spec = os.getenv("AGROMATE_INDEX_HALF_LIVES")
+                half_lives = [h.strip() for h in spec.split(",") if h.strip()] if spec else DEFAULT_HALF_LIVES
+                _index = SentimentIndex(half_lives=half_lives)
+    return _index
+
+
+def reset_sentiment_index() -> None:
+    """Forget the shared index (tests, backend switches)."""
+    global _index
+    _index = None
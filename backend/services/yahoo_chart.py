@@ -0,0 +1,250 @@
+"""
+Minimal async client for Yahoo Finance daily closes.
+
+The API only needs daily closes of a few CBOT futures, but yfinance imports
+pandas (and numpy) on first use, which costs tens of MB of RSS and seconds of
+cold start on the free-tier instance, and it blocks, so every download ran
+in a worker thread. This client calls the same v8 chart endpoint yfinance
+uses over one pooled httpx client and parses the JSON into compact arrays.
+`python bench_yahoo.py` compares both against recorded responses.
+"""
+
+import asyncio
+import logging
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart"
+
+# Yahoo answers 429 to clients without a browser-like user agent
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+DEFAULT_TIMEOUT_SECONDS = 10.0
+MAX_CONNECTIONS = 8
+
+
+class YahooChartError(Exception):
+    """Yahoo answered without usable chart data."""
+
+
+@dataclass(frozen=True)
+class DailyCloses:
+    """
+    Daily closes of one symbol, oldest first.
+
+    Attributes:
+        symbol: Yahoo symbol ("ZS=F")
+        days: Exchange-local trading days (YYYY-MM-DD)
+        closes: Close of each day, in the quote currency
+        currency: Quote currency ("USX" is US cents)
+    """
+
+    symbol: str
+    days: Tuple[str, ...]
+    closes: array
+    currency: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        """(day, close) pairs."""
+        return zip(self.days, self.closes)
+
+    def change_pct(self, lookback: int = 1) -> float:
+        """
+        Change of the last close over the one `lookback` days before it
+        (the first close when the series is shorter), in percent.
+        """
+        if len(self.closes) < 2:
+            return 0.0
+        base = self.closes[max(0, len(self.closes) - 1 - lookback)]
+        return ((self.closes[-1] - base) / base) * 100 if base else 0.0
+
+
+def parse_chart(symbol: str, payload: Dict[str, Any]) -> DailyCloses:
+    """
+    Daily closes from a v8 chart response.
+
+    Bars without a close (holidays, partial rows) are skipped; when the
+    live bar repeats the last session's day it replaces it.
+
+    Raises:
+        YahooChartError: If the response holds an error or no result
+    """
+    chart = payload.get("chart") or {}
+    if chart.get("error"):
+        error = chart["error"]
+        raise YahooChartError(f"{symbol}: {error.get('code')} - {error.get('description')}")
+    results = chart.get("result") or []
+    if not results:
+        raise YahooChartError(f"{symbol}: empty chart result")
+
+    result = results[0]
+    meta = result.get("meta") or {}
+    timestamps = result.get("timestamp") or []
+    quotes = (result.get("indicators") or {}).get("quote") or [{}]
+    raw_closes = quotes[0].get("close") or []
+
+    try:
+        tz: Any = ZoneInfo(meta["exchangeTimezoneName"])
+    except Exception:
+        tz = timezone(timedelta(seconds=meta.get("gmtoffset") or 0))
+
+    days = []
+    closes = array("d")
+    for ts, close in zip(timestamps, raw_closes):
+        if close is None:
+            continue
+        day = datetime.fromtimestamp(ts, tz).date().isoformat()
+        if days and days[-1] == day:
+            closes[-1] = close
+            continue
+        days.append(day)
+        closes.append(close)
+    return DailyCloses(meta.get("symbol") or symbol, tuple(days), closes, meta.get("currency"))
+
+
+async def _close_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close a client opened on another event loop, on that loop while it still runs."""
+    try:
+        if loop is not None and loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+        else:
+            await client.aclose()
+    except Exception as e:
+        # A closed loop can no longer close its transports; nothing else holds them
+        logger.debug(f"Yahoo chart: closing the previous client failed ({e})")
+
+
+class YahooChartClient:
+    """
+    Daily closes over a pooled httpx client.
+
+    The client is created on first use and recreated when called from
+    another event loop (httpx pools are bound to the loop that opened them);
+    the previous one is closed then.
+    """
+
+    def __init__(
+        self,
+        base_url: str = CHART_URL,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            base_url: Chart endpoint, without the symbol
+            timeout: Request timeout in seconds
+            transport: httpx transport override (tests and benchmarks)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+        self.errors = 0
+
+    async def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            previous, previous_loop = self._client, self._loop
+            self._client = self._loop = None
+            await _close_client(previous, previous_loop)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+                transport=self.transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def daily_closes(self, symbol: str, range_: str = "5d", start: Optional[str] = None) -> DailyCloses:
+        """
+        Fetch the daily closes of one symbol.
+
+        Args:
+            symbol: Yahoo symbol
+            range_: Yahoo range ("5d", "1mo", "3mo", "1y", ...), ignored with `start`
+            start: First day (YYYY-MM-DD) to fetch up to now instead of a range
+
+        Raises:
+            httpx.HTTPError: On transport errors and non-2xx answers
+            YahooChartError: If the answer has no chart data
+        """
+        params: Dict[str, Any] = {"interval": "1d", "includePrePost": "false", "events": "div,splits"}
+        if start:
+            first = datetime.combine(date.fromisoformat(start), datetime.min.time(), timezone.utc)
+            params.update(period1=int(first.timestamp()), period2=int(time.time()))
+        else:
+            params["range"] = range_
+
+        self.requests += 1
+        try:
+            http = await self._http()
+            resp = await http.get(f"{self.base_url}/{symbol}", params=params)
+            if resp.status_code == 404:
+                return parse_chart(symbol, resp.json())       # chart.error says why
+            resp.raise_for_status()
+            return parse_chart(symbol, resp.json())
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def daily_closes_many(
+        self,
+        symbols: Sequence[str],
+        range_: str = "5d",
+        start: Optional[str] = None
+    ) -> Dict[str, DailyCloses]:
+        """
+        Fetch several symbols concurrently.
+
+        Returns:
+            {symbol: closes}; symbols that fail are logged and left out
+        """
+        answers = await asyncio.gather(
+            *(self.daily_closes(s, range_, start) for s in symbols), return_exceptions=True
+        )
+        result = {}
+        for symbol, answer in zip(symbols, answers):
+            if isinstance(answer, BaseException):
+                logger.warning(f"Yahoo chart error for {symbol}: {answer}")
+            else:
+                result[symbol] = answer
+        return result
+
+    async def aclose(self) -> None:
+        """Close the pooled client (app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors}
+
+
+# ----------------------------------------------------------------------
+# Shared instance
+# ----------------------------------------------------------------------
+
+_client: Optional[YahooChartClient] = None
+
+
+def get_yahoo_client() -> YahooChartClient:
+    """Get or create the process-wide chart client."""
+    global _client
+    if _client is None:
+        _client = YahooChartClient()
+    return _client
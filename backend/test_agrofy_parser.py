@@ -0,0 +1,123 @@
+"""
+Tests for the Agrofy Pizarra Rosario parser (scrapers/market_scraper.py).
+
+Uses the repository's agrofy_dump.html fixture, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import time
+
+import httpx
+
+from scrapers import market_scraper
+from scrapers.market_scraper import AgrofyMarketScraper
+
+DUMP = backend_dir.parent / "agrofy_dump.html"
+
+PIZARRA_TABLE = """
+<table class="granos-table"><thead><tr><th>Grano</th><th>Mercado</th><th>Plaza</th><th>Cotización</th><th>Variación</th></tr></thead>
+<tbody>
+<tr><td>Soja</td><td>Pizarra</td><td>Bahía Blanca</td><td>$ 455.000</td><td>0,50 %</td></tr>
+<tr><td><a href="/granos/precio-soja">Soja</a></td><td>Pizarra</td><td>Rosario</td><td>$ <b>470.000</b></td><td>-1,26 %</td></tr>
+<tr><td>Maíz</td><td>Pizarra</td><td>Rosario</td><td>$ 265.000</td><td>-3,01 %</td></tr>
+<tr><td>Trigo</td><td>Pizarra</td><td>Rosario</td><td>$ 259.560</td><td>0,28 %</td></tr>
+<tr><td>Soja</td><td>CBOT</td><td>Chicago</td><td>US$ 389,6</td><td>0,10 %</td></tr>
+<tr><td>Girasol</td><td>Pizarra</td><td>Rosario</td><td>$ 533.540</td><td>0,28 %</td></tr>
+</tbody></table>
+"""
+
+
+def load_dump() -> str:
+    """The fixture was saved by PowerShell as UTF-16; decode by its BOM."""
+    raw = DUMP.read_bytes()
+    return raw.decode("utf-16") if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else raw.decode("utf-8")
+
+
+def with_table(html: str, table: str = PIZARRA_TABLE) -> str:
+    """The dump with a Pizarra table where the page renders the grain widgets."""
+    at = html.index('<section id="section-template"')
+    return html[:at] + table + html[at:]
+
+
+def test_checked_in_dump():
+    """The dump is the client-rendered shell: no tables, nothing to parse."""
+    print("\n🌾 Agrofy parser: checked-in dump")
+    html = load_dump()
+    assert len(html) > 150_000 and "<table" not in html
+    start = time.perf_counter()
+    assert AgrofyMarketScraper.parse_prices(html) == {}
+    assert (time.perf_counter() - start) * 1000 < 20
+    print("   ✅ no Pizarra rows, no full parse")
+
+
+def test_pizarra_rows():
+    """Rosario rows of each grain, first match wins, decoys ignored."""
+    print("\n🌾 Agrofy parser: Pizarra Rosario rows")
+    html = with_table(load_dump())
+    prices = AgrofyMarketScraper.parse_prices(html)
+    assert prices == {
+        "soja_rosario": {"price": 470000.0, "currency": "ARS", "change_percent": -1.26, "symbol": "Rosario", "name": "Soja Rosario"},
+        "maiz_rosario": {"price": 265000.0, "currency": "ARS", "change_percent": -3.01, "symbol": "Rosario", "name": "Maíz Rosario"},
+        "trigo_rosario": {"price": 259560.0, "currency": "ARS", "change_percent": 0.28, "symbol": "Rosario", "name": "Trigo Rosario"},
+        "girasol_rosario": {"price": 533540.0, "currency": "ARS", "change_percent": 0.28, "symbol": "Rosario", "name": "Girasol Rosario"},
+    }
+
+    # Once every grain is found the rest of the page is not parsed
+    tail = "<table>" + "<tr><td>Soja</td><td>Pizarra</td><td>Rosario</td><td>x</td><td>y</td></tr>" * 20000 + "</table>"
+    fed = []
+    feed = market_scraper._PizarraParser.feed
+    market_scraper._PizarraParser.feed = lambda self, data: fed.append(len(data)) or feed(self, data)
+    try:
+        assert AgrofyMarketScraper.parse_prices(html.replace("</body>", tail + "</body>")) == prices
+    finally:
+        market_scraper._PizarraParser.feed = feed
+    assert sum(fed) <= market_scraper.FEED_CHUNK
+
+    # A malformed row is skipped, the others still parse
+    partial = with_table(load_dump(), PIZARRA_TABLE.replace("$ 265.000", "s/c"))
+    assert "maiz_rosario" not in AgrofyMarketScraper.parse_prices(partial)
+    print("   ✅ rows, decoys, early stop and malformed rows OK")
+
+
+def test_cached_between_refreshes():
+    """Unchanged pages (304 or same body) are not parsed again."""
+    print("\n🌾 Agrofy parser: caching")
+    page = with_table(load_dump()).encode("utf-8")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"' and len(requests) > 2:
+            return httpx.Response(304)
+        return httpx.Response(200, content=page, headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+    parses = []
+    original = AgrofyMarketScraper.parse_prices.__func__
+    AgrofyMarketScraper.transport = httpx.MockTransport(handler)
+    AgrofyMarketScraper.parse_prices = classmethod(lambda cls, html: parses.append(1) or original(cls, html))
+    try:
+        first = asyncio.run(AgrofyMarketScraper.get_prices())
+        second = asyncio.run(AgrofyMarketScraper.get_prices())     # 200, same digest
+        third = asyncio.run(AgrofyMarketScraper.get_prices())      # 304
+        assert first == second == third and len(first) == 4
+        assert len(parses) == 1 and requests[1].headers["if-none-match"] == '"v1"'
+    finally:
+        AgrofyMarketScraper.transport = None
+        AgrofyMarketScraper.parse_prices = classmethod(original)
+        AgrofyMarketScraper._etag = AgrofyMarketScraper._digest = None
+        AgrofyMarketScraper._cached = {}
+    print("   ✅ ETag and digest reuse OK")
+
+
+if __name__ == "__main__":
+    test_checked_in_dump()
+    test_pizarra_rows()
+    test_cached_between_refreshes()
+    print("\n✅ All Agrofy parser tests passed\n")
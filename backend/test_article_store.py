@@ -0,0 +1,133 @@
+"""
+Tests for the columnar analytics store (services/article_store.py).
+
+Runs against an in-memory SQLite repository, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+
+from database import SQLiteNewsRepository
+from services.article_store import (
+    ArticleStore, bucket_sentiment_counts, bucket_weighted_scores,
+    source_sentiment_counts, sentiment_counts, commodity_counts
+)
+from services.bucketing import bucket_grid
+
+
+def make_article_store(articles, **options) -> ArticleStore:
+    """
+    Store over a fresh in-memory repository (``store.repo``) holding `articles`.
+
+    Args:
+        articles: (slug, source, published, sentiment, confidence, commodity) tuples
+        options: ArticleStore arguments; refreshes on every read by default
+    """
+    repo = SQLiteNewsRepository(":memory:")
+    repo.create_batch([
+        {"title": slug, "source": source, "url": f"https://test.agromate.com/{slug}",
+         "published_at": published, "sentiment": sentiment, "confidence": confidence, "commodity": commodity}
+        for slug, source, published, sentiment, confidence, commodity in articles
+    ])
+    return ArticleStore(repo, **{"refresh_seconds": 0, "overlap": timedelta(0), **options})
+
+
+def make_store():
+    """Store with articles on two days and one outside the horizon."""
+    day = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+    store = make_article_store([
+        ("soja-1", "Bichos de Campo", day, "ALCISTA", 0.9, "SOJA"),
+        ("soja-2", "Bichos de Campo", day, "BAJISTA", 0.3, "SOJA, MAIZ"),
+        ("trigo-1", "Clarín Rural", day - timedelta(days=1), "alcista", None, "TRIGO"),
+        ("general-1", "Clarín Rural", day - timedelta(days=1), None, None, "GENERAL"),
+        ("viejo-1", "Clarín Rural", day - timedelta(days=200), "BAJISTA", 0.8, "SOJA"),
+    ], horizon_days=90, refresh_seconds=3600)
+    return store, day
+
+
+def test_kernels():
+    """Kernels reproduce the endpoints' row-by-row results."""
+    print("\n📊 Analytics store: kernels")
+    store, day = make_store()
+    articles = store.select()
+    assert len(articles) == 4                     # viejo-1 is outside the horizon
+
+    today, yesterday = day.strftime("%Y-%m-%d"), (day - timedelta(days=1)).strftime("%Y-%m-%d")
+    grid = bucket_grid(day - timedelta(days=2), day + timedelta(hours=1), "day", "UTC")
+    assert bucket_sentiment_counts(articles, grid) == [
+        {"date": yesterday, "alcista": 1, "bajista": 0, "neutral": 1},   # NULL counts as neutral
+        {"date": today, "alcista": 1, "bajista": 1, "neutral": 0},
+    ]
+    today_only = bucket_grid(day, day + timedelta(hours=1), "day", "UTC")
+    assert bucket_sentiment_counts(articles, today_only) == [bucket_sentiment_counts(articles, grid)[1]]
+
+    # (0.9 - 0.3) / 1.2; a missing confidence weighs 0.5
+    assert bucket_weighted_scores(articles, grid) == [
+        {"date": yesterday, "sentiment_score": 1.0},
+        {"date": today, "sentiment_score": 0.5},
+    ]
+    # The grid starts two days back: the empty first bucket only shows up filled
+    assert len(bucket_sentiment_counts(articles, grid, fill_gaps=True)) == 3
+    assert bucket_weighted_scores(articles, grid, fill_gaps=True)[0]["sentiment_score"] is None
+
+    assert source_sentiment_counts(articles) == [
+        {"source": "Bichos de Campo", "alcista": 1, "bajista": 1, "neutral": 0, "total": 2},
+        {"source": "Clarín Rural", "alcista": 1, "bajista": 0, "neutral": 1, "total": 2},
+    ]
+    assert source_sentiment_counts(articles, grid)[1]["series"] == [
+        {"date": yesterday, "alcista": 1, "bajista": 0, "neutral": 1},
+    ]
+    assert sentiment_counts(articles) == {"ALCISTA": 2, "BAJISTA": 1, "NEUTRAL": 0, "NULL": 1}
+    assert commodity_counts(articles) == {"SOJA": 2, "MAÍZ": 1, "TRIGO": 1, "GENERAL": 1}
+
+    # Filters follow get_filtered
+    assert len(store.select(commodity="maiz")) == 1
+    assert len(store.select(commodity="SOJA, MAÍZ")) == 1
+    assert len(store.select(commodity="cafe")) == 0
+    assert len(store.select(source=["Clarín Rural"], sentiment="alcista")) == 1
+    assert len(store.select(date_from=day.isoformat())) == 2
+    assert len(store.select(date_to=day - timedelta(hours=1))) == 2
+    assert len(store.select().newest(3)) == 3
+    assert len(store.select(source="Desconocida")) == 0
+    print("   ✅ bucket counts, weighted scores, group-bys and filters OK")
+
+
+def test_refresh():
+    """Incremental refreshes apply writes; deletes are picked up by a rebuild."""
+    print("\n📊 Analytics store: refresh")
+    store, day = make_store()
+    repo = store.repo
+    assert store.refresh(full=True) == 4
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+
+    repo.bulk_update_sentiment([(ids["general-1"], "BAJISTA", 0.7, None)])
+    repo.create_batch([{"title": "nueva", "source": "Infocampo", "url": "https://test.agromate.com/nueva",
+                        "published_at": day, "sentiment": "ALCISTA", "confidence": 0.6, "commodity": "SOJA"}])
+    assert store.refresh() == 2                   # only the two writes are read
+    assert sentiment_counts(store.select()) == {"ALCISTA": 3, "BAJISTA": 2, "NEUTRAL": 0, "NULL": 0}
+    assert len(store) == 5
+
+    # An incremental refresh cannot see deletes; the bus (or the rebuild timer) forces a reload
+    repo.delete(ids["soja-1"])
+    store.mark_stale()
+    assert len(store.select()) == 5
+    store.invalidate()
+    assert len(store.select()) == 4 and store.rebuilds == 2
+
+    # A failed reload keeps serving the previous data
+    store.invalidate()
+    repo.conn.close()
+    assert len(store.select()) == 4 and store._needs_rebuild
+    print("   ✅ incremental refresh, rebuild and failure handling OK")
+
+
+if __name__ == "__main__":
+    test_kernels()
+    test_refresh()
+    print("\n✅ All analytics store tests passed\n")
@@ -0,0 +1,114 @@
+"""
+Tests for the divergence signal backtests (services/backtest.py).
+
+Synthetic series plus an in-memory SQLite repository and price store, no
+network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+
+import services.daily_sentiment as daily_sentiment
+import services.price_store as price_store
+from services.backtest import BacktestGrid, backtest, run_backtest
+from services.daily_sentiment import DailySentiment
+from services.divergence import DIVERGENCE_TYPES, classify_divergence
+from services.price_store import PriceStore
+from test_divergence import make_store
+
+
+def replay(counts, closes, s, p, window, horizon):
+    """Day-by-day loop with the single-commodity endpoint's rules."""
+    signals, hits, returns, equity, peak, drawdown, position = 0, 0, [], 1.0, 1.0, 0.0, 0
+    for t in range(len(closes)):
+        if t > 0 and position:
+            equity *= 1 + position * (closes[t] / closes[t - 1] - 1)
+            peak = max(peak, equity)
+            drawdown = max(drawdown, 1 - equity / peak)
+        alcista, bajista = counts[max(0, t + 1 - window):t + 1].sum(axis=0)
+        score = (alcista - bajista) / (alcista + bajista) if alcista + bajista else 0.0
+        change = (closes[t] - closes[t - window]) / closes[t - window] * 100 if t >= window else np.nan
+        kind = DIVERGENCE_TYPES[int(classify_divergence(score, change, s, p)[0])]
+        position = {"BULLISH_DIVERGENCE": 1, "BEARISH_DIVERGENCE": -1}.get(kind, 0)
+        if position and t + horizon < len(closes):
+            signed = position * (closes[t + horizon] / closes[t] - 1)
+            signals += 1
+            hits += signed > 0
+            returns.append(signed)
+    return signals, hits, np.mean(returns) if returns else np.nan, equity - 1, drawdown
+
+
+def test_grid_matches_replay():
+    """Every cell of the vectorized sweep equals the day-by-day replay."""
+    print("\n🧪 Backtest: grid vs replay")
+    rng = np.random.default_rng(11)
+    counts = rng.poisson(2, size=(400, 2))
+    closes = 1000 * np.cumprod(1 + rng.normal(scale=0.015, size=400))
+    grid = BacktestGrid((0.1, 0.3), (0.5, 2.0), (3, 10), (1, 7))
+    result = backtest(counts, closes, grid)
+
+    for i, s in enumerate(grid.sentiment_thresholds):
+        for j, p in enumerate(grid.price_thresholds):
+            for k, w in enumerate(grid.windows):
+                for h, horizon in enumerate(grid.horizons):
+                    signals, hits, mean, total, drawdown = replay(counts, closes, s, p, w, horizon)
+                    assert result["signals"][i, j, k, h] == signals and result["hits"][i, j, k, h] == hits
+                    assert abs(result["mean_return"][i, j, k, h] - mean) < 1e-12
+                assert abs(result["total_return"][i, j, k] - total) < 1e-9
+                assert abs(result["max_drawdown"][i, j, k] - drawdown) < 1e-12
+    assert result["signals"].sum() > 0
+    print("   ✅ signals, hits, returns and drawdown OK")
+
+
+def test_grid_validation():
+    """Malformed or oversized grids are rejected."""
+    assert BacktestGrid.parse("0.3,0.1,0.1", "1", "7", "5").sentiment_thresholds == (0.1, 0.3)
+    for args in (("x", "1", "7", "5"), ("", "1", "7", "5"), ("1.5", "1", "7", "5"),
+                 ("0.1", "1", "0", "5"), ("0.1", ",".join(str(i) for i in range(200)), "1,2,3,4,5", "1,2,3,4,5,6")):
+        try:
+            BacktestGrid.parse(*args)
+        except ValueError:
+            continue
+        raise AssertionError(f"{args} should fail")
+
+
+def test_service_data_and_cache():
+    """Counts from the daily table and closes from the price store, cached by revision."""
+    print("\n🧪 Backtest: service")
+    store = make_store()
+    table = DailySentiment(store=store, history_days=60)
+    prices = PriceStore()
+    days = table.table().days
+    prices.append("ZS=F", [(day, 1000.0 - i * 2) for i, day in enumerate(days)])
+    daily_sentiment._daily, price_store._store = table, prices
+    grid = BacktestGrid((0.25,), (0.1,), (3, 7), (1,))
+    try:
+        result = run_backtest(["soja", "trigo"], grid, years=1)
+        soja, trigo = result["commodities"]
+        assert soja["days"] == len(days) and soja["priced_days"] == len(days) and soja["articles"] == 3
+        assert soja["baseline"][0]["up_rate"] == 0.0                          # the price only falls
+        # Bullish news on falling prices: long signals that lose every day
+        week = next(r for r in soja["results"] if r["window_days"] == 7)
+        assert week["bullish_days"] > 0 and week["bearish_days"] == 0
+        assert week["hit_rate"] == 0.0 and week["total_return_pct"] < 0 < week["max_drawdown_pct"]
+        assert trigo["priced_days"] == 0 and all(r["signals"] == 0 and r["hit_rate"] is None for r in trigo["results"])
+
+        assert run_backtest(["soja", "trigo"], grid, years=1) is result
+        prices.append("ZS=F", [(days[-1], 990.0)])
+        assert run_backtest(["soja", "trigo"], grid, years=1) is not result
+    finally:
+        daily_sentiment._daily, price_store._store = None, None
+    print("   ✅ daily data, results and cache OK")
+
+
+if __name__ == "__main__":
+    test_grid_matches_replay()
+    test_grid_validation()
+    test_service_data_and_cache()
+    print("\n✅ All backtest tests passed\n")
@@ -0,0 +1,83 @@
+"""
+Tests for the time bucketing engine (services/bucketing.py).
+
+Pure computation, no database or network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.bucketing import bucket_grid, epoch_seconds
+
+
+def ts(*values):
+    return np.array([epoch_seconds(v) for v in values], dtype=np.int64)
+
+
+def test_local_boundaries():
+    """Days, weeks and months start at local midnight."""
+    print("\n🗓️  Bucketing: local boundaries")
+    grid = bucket_grid("2024-03-04T12:00:00Z", "2024-03-07T12:00:00Z")   # Buenos Aires, days
+    assert grid.labels == ("2024-03-04", "2024-03-05", "2024-03-06", "2024-03-07")
+    assert grid.edges[0] == epoch_seconds("2024-03-04T03:00:00Z") and grid.width == 86400
+
+    # 23:30 in Buenos Aires is already the next day in UTC
+    late = ts("2024-03-05T02:30:00Z", "2024-03-05T03:00:00Z", "2024-03-08T03:00:00Z", "2024-03-01T00:00:00Z")
+    assert grid.assign(late).tolist() == [0, 1, -1, -1]
+
+    weeks = bucket_grid("2024-03-06T12:00:00Z", "2024-03-20T12:00:00Z", "week")
+    assert weeks.labels == ("2024-03-04", "2024-03-11", "2024-03-18")            # Mondays
+
+    months = bucket_grid("2023-12-15T12:00:00Z", "2024-03-01T12:00:00Z", "month")
+    assert months.labels == ("2023-12", "2024-01", "2024-02", "2024-03") and months.width == 0
+    assert months.assign(ts("2024-02-29T23:00:00-03:00", "2024-03-01T00:00:00-03:00")).tolist() == [2, 3]
+
+    hours = bucket_grid("2024-03-05T10:20:00-03:00", "2024-03-05T12:00:00-03:00", "hour")
+    assert hours.labels == ("2024-03-05T10:00-03:00", "2024-03-05T11:00-03:00")
+    print("   ✅ hour/day/week/month boundaries OK")
+
+
+def test_dst_and_ranges():
+    """DST days are 23/25 hours long; grids are cached and validated."""
+    print("\n🗓️  Bucketing: DST, cache and validation")
+    grid = bucket_grid("2024-03-30T12:00:00Z", "2024-04-01T12:00:00Z", "day", "Europe/Madrid")
+    assert np.diff(grid.edges).tolist() == [86400, 82800, 86400] and grid.width == 0
+    assert grid.assign(ts("2024-03-31T22:30:00Z")).tolist() == [2]                 # 00:30 CEST, April 1st
+
+    hours = bucket_grid("2024-10-27T00:00:00Z", "2024-10-27T02:00:00Z", "hour", "Europe/Madrid")
+    assert hours.labels == ("2024-10-27T02:00+02:00", "2024-10-27T02:00+01:00")  # the repeated hour
+
+    # Same bucket, same grid object
+    assert bucket_grid("2024-03-04T12:00:00Z", "2024-03-07T12:00:00Z") is \
+        bucket_grid("2024-03-04T13:00:00Z", "2024-03-07T13:00:00Z")
+
+    # Multi-year ranges stay cheap
+    start = datetime.now(timezone.utc)
+    months = bucket_grid("2015-01-01T12:00:00Z", "2024-12-31T12:00:00Z", "month")
+    days = bucket_grid("2015-01-01T12:00:00Z", "2024-12-31T12:00:00Z", "day")
+    assert len(months) == 120 and len(days) == 3653
+    assert (datetime.now(timezone.utc) - start).total_seconds() < 1
+
+    for args in (("2024-01-01", "2024-02-01", "minute"), ("2024-01-01", "2024-02-01", "day", "Mars/Olympus"),
+                 ("2000-01-01", "2024-01-01", "hour"), ("ayer", "2024-01-01")):
+        try:
+            bucket_grid(*args)
+        except ValueError:
+            continue
+        raise AssertionError(f"bucket_grid{args} should fail")
+    assert len(bucket_grid("2024-01-02", "2024-01-01")) == 0
+    print("   ✅ DST, caching, multi-year ranges and validation OK")
+
+
+if __name__ == "__main__":
+    test_local_boundaries()
+    test_dst_and_ranges()
+    print("\n✅ All bucketing tests passed\n")
@@ -0,0 +1,93 @@
+"""
+Tests for the sentiment/price correlation engine (services/correlation.py).
+
+Synthetic series plus an in-memory SQLite repository and price store, no
+network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+
+import services.daily_sentiment as daily_sentiment
+import services.price_store as price_store
+from services.correlation import (
+    daily_returns, lagged_correlations, rolling_correlation, sentiment_price_correlation, shift
+)
+from services.daily_sentiment import DailySentiment
+from services.price_store import PriceStore
+from test_divergence import make_store
+
+
+def reference(x, y):
+    mask = np.isfinite(x) & np.isfinite(y)
+    return np.corrcoef(x[mask], y[mask])[0, 1], int(mask.sum())
+
+
+def test_lagged_and_rolling_match_reference():
+    """Vectorized lags and prefix-sum windows equal np.corrcoef on each slice."""
+    print("\n📈 Correlation: kernels")
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=500)
+    y = 0.6 * shift(x, -3) + rng.normal(scale=0.5, size=500)     # y follows x three days later
+    x[rng.random(500) < 0.3] = np.nan                             # days without news
+    y[rng.random(500) < 0.25] = np.nan                            # days without a close
+
+    lags = list(range(-10, 11))
+    correlations, counts = lagged_correlations(x, y, lags)
+    for lag, c, n in zip(lags, correlations, counts):
+        expected, pairs = reference(x, shift(y, lag))
+        assert n == pairs and abs(c - expected) < 1e-10
+    assert lags[int(np.nanargmax(np.abs(correlations)))] == 3 and correlations[lags.index(3)] > 0.6
+
+    rolling, n = rolling_correlation(x, y, 60)
+    for t in (100, 250, 499):
+        expected, pairs = reference(x[t - 59:t + 1], y[t - 59:t + 1])
+        assert n[t] == pairs and abs(rolling[t] - expected) < 1e-9
+    assert np.isnan(rolling[5])                                  # too few pairs
+    print("   ✅ lag profile and rolling windows OK")
+
+
+def test_daily_returns_alignment():
+    """Returns land on their close's day; weekends and gaps stay missing."""
+    days = ["2024-03-01", "2024-03-02", "2024-03-03", "2024-03-04", "2024-03-05"]
+    returns = daily_returns(days, ["2024-02-29", "2024-03-01", "2024-03-04", "2024-03-05"], [100.0, 110.0, 99.0, None])
+    assert np.isnan(returns[[1, 2, 4]]).all()
+    assert abs(returns[0] - 0.1) < 1e-12 and abs(returns[3] + 0.1) < 1e-12
+
+
+def test_endpoint_data_and_cache():
+    """Commodities from the daily table and the price store, cached by revision."""
+    print("\n📈 Correlation: service")
+    store = make_store()
+    table = DailySentiment(store=store, history_days=60)
+    prices = PriceStore()
+    days = table.table().days
+    prices.append("ZS=F", [(day, 1000.0 + (i % 7) * 3) for i, day in enumerate(days)])
+    daily_sentiment._daily, price_store._store = table, prices
+    try:
+        result = sentiment_price_correlation(["soja", "trigo"], max_lag=5, window=20, months=2)
+        soja, trigo = result["commodities"]
+        assert soja["commodity"] == "SOJA" and [p["lag"] for p in soja["lags"]] == list(range(-5, 6))
+        assert soja["sentiment_days"] == 3 and soja["return_days"] == 60        # two months, every day closes
+        assert soja["best_lag"] is None                          # three news days: not enough pairs
+        assert trigo["return_days"] == 0 and len(trigo["rolling"]) == 60
+
+        assert sentiment_price_correlation(["soja", "trigo"], max_lag=5, window=20, months=2) is result
+        prices.append("ZS=F", [(days[-1], 990.0)])
+        assert sentiment_price_correlation(["soja", "trigo"], max_lag=5, window=20, months=2) is not result
+    finally:
+        daily_sentiment._daily, price_store._store = None, None
+    print("   ✅ alignment, null results and cache OK")
+
+
+if __name__ == "__main__":
+    test_lagged_and_rolling_match_reference()
+    test_daily_returns_alignment()
+    test_endpoint_data_and_cache()
+    print("\n✅ All correlation tests passed\n")
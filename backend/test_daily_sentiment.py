@@ -0,0 +1,72 @@
+"""
+Tests for the daily sentiment table (services/daily_sentiment.py).
+
+Runs against an in-memory SQLite repository, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+
+from services.article_store import SENTIMENT_CODES
+from services.bucketing import bucket_grid
+from services.daily_sentiment import DailySentiment
+from test_article_store import make_article_store
+
+ALCISTA, BAJISTA = SENTIMENT_CODES["ALCISTA"], SENTIMENT_CODES["BAJISTA"]
+
+
+def local_day(moment):
+    return bucket_grid(moment, moment + timedelta(seconds=1), "day").labels[0]
+
+
+def test_archive_and_recent_days():
+    """Days past the store horizon come from the archive scan, the rest from the store."""
+    print("\n📅 Daily sentiment: archive and recent days")
+    now = datetime.now(timezone.utc)
+    store = make_article_store([
+        ("viejo-1", "Bichos de Campo", now - timedelta(days=40), "ALCISTA", None, "SOJA"),
+        ("viejo-2", "Bichos de Campo", now - timedelta(days=40, hours=1), "BAJISTA", None, "SOJA, MAIZ"),
+        ("muy-viejo", "Bichos de Campo", now - timedelta(days=90), "ALCISTA", None, "SOJA"),   # before the table starts
+        ("nuevo-1", "Bichos de Campo", now - timedelta(days=1), "ALCISTA", None, "TRIGO"),
+    ], horizon_days=10)
+    daily = DailySentiment(store=store, history_days=60)
+    table = daily.table()
+
+    assert table.days[-1] == local_day(now) and 60 <= len(table) <= 62
+    assert len(set(table.days)) == len(table)
+    assert daily.archive_builds == 1 and daily.archive_rows == 2
+
+    soja = table.commodity("soja")
+    old = table.days.index(local_day(now - timedelta(days=40)))
+    assert soja[old, ALCISTA] + soja[old - 1, ALCISTA] == 1
+    assert soja[:, BAJISTA].sum() == 1 and table.commodity("maiz").sum() == 1
+    assert soja.sum() == 2                                               # muy-viejo is not counted
+    assert table.commodity("trigo")[table.days.index(local_day(now - timedelta(days=1))), ALCISTA] == 1
+
+    # Unchanged store: the same table; a new article: only the recent part is recounted
+    assert daily.table() is table
+    store.repo.create_batch([{"title": "nuevo-2", "source": "Bichos de Campo", "url": "https://test.agromate.com/nuevo-2",
+                              "published_at": now, "sentiment": "BAJISTA", "commodity": "TRIGO"}])
+    updated = daily.table()
+    assert updated.revision == table.revision + 1 and daily.archive_builds == 1
+    assert updated.commodity("trigo")[-1, BAJISTA] == 1
+    assert (updated.counts[:-2] == table.counts[:-2]).all()
+
+    try:
+        table.commodity("cafe")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown commodity should fail")
+    print("   ✅ archive scan, recent recount and revisions OK")
+
+
+if __name__ == "__main__":
+    test_archive_and_recent_days()
+    print("\n✅ All daily sentiment tests passed\n")
@@ -0,0 +1,205 @@
+"""
+Tests for the divergence board (services/divergence.py).
+
+Runs against an in-memory SQLite repository and a fake Yahoo provider,
+no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import services.article_store as article_store
+import services.daily_sentiment as daily_sentiment
+import services.divergence as divergence
+import services.market_data as market_data
+import services.price_store as price_store
+from services.daily_sentiment import DailySentiment
+from services.divergence import (
+    DIVERGENCE_TYPES, RollingDivergence, classify_divergence, compute_board, divergence_board, divergence_history
+)
+from services.market_data import MarketProviders
+from services.price_store import PriceStore
+from services.yahoo_chart import DailyCloses
+from test_article_store import make_article_store
+from test_market_providers import FakeProvider
+
+
+def closes(symbol, *values):
+    return DailyCloses(symbol, tuple(f"2024-03-{i + 1:02d}" for i in range(len(values))), array("d", values))
+
+
+def make_store():
+    """Soja bullish this week, maíz bearish two weeks ago, trigo without news."""
+    now = datetime.now(timezone.utc)
+    return make_article_store([
+        ("soja-1", "Bichos de Campo", now - timedelta(days=1), "ALCISTA", 0.8, "SOJA"),
+        ("soja-2", "Bichos de Campo", now - timedelta(days=2), "ALCISTA", 0.8, "SOJA, MAIZ"),
+        ("soja-3", "Bichos de Campo", now - timedelta(days=5), "BAJISTA", 0.8, "SOJA"),
+        ("maiz-1", "Bichos de Campo", now - timedelta(days=14), "BAJISTA", 0.8, "MAIZ"),
+        ("maiz-2", "Bichos de Campo", now - timedelta(days=15), "NEUTRAL", 0.8, "MAIZ"),
+    ])
+
+
+def test_classify():
+    """Thresholds match the single-commodity endpoint, elementwise."""
+    print("\n🔀 Divergence: classification")
+    kinds, strengths = classify_divergence([0.8, -0.6, 0.5, 0.1, 0.5], [-4.0, 2.0, 0.2, -5.0, 1.5])
+    assert [DIVERGENCE_TYPES[k] for k in kinds] == [
+        "BULLISH_DIVERGENCE", "BEARISH_DIVERGENCE", "NEUTRAL_PRICE", "NONE", "NONE"
+    ]
+    assert list(strengths) == [3, 2, 0, 0, 0]       # min(3, int(|s*3| + |p/3|))
+    kind, strength = classify_divergence(0.3, -1.6)
+    assert DIVERGENCE_TYPES[kind] == "BULLISH_DIVERGENCE" and int(strength) == 1
+    print("   ✅ types and signal strength OK")
+
+
+def test_board_matches_single_queries():
+    """Each board cell equals a select + change_pct over its own window."""
+    print("\n🔀 Divergence: board")
+    store = make_store()
+    charts = {
+        "ZS=F": closes("ZS=F", *[1000.0] * 20, 990.0, 980.0, 960.0),
+        "ZC=F": closes("ZC=F", 400.0, 410.0),
+    }
+    windows = (3, 7, 30)
+    board = compute_board(store.select(date_from=datetime.now(timezone.utc) - timedelta(days=30)), charts, windows)
+    assert len(board) == 9
+    cells = {(row["commodity"], row["days_analyzed"]): row for row in board}
+
+    for (commodity, days), row in cells.items():
+        frame = store.select(commodity=commodity, date_from=datetime.now(timezone.utc) - timedelta(days=days))
+        assert row["news_count"] == len(frame)
+        series = charts.get(market_data.COMMODITIES[commodity.lower()]["symbol"])
+        expected = series.change_pct(lookback=days - 1) if series else 0.0
+        assert row["price_change_pct"] == round(expected, 2)
+
+    soja = cells[("SOJA", 7)]
+    assert soja["alcista_count"] == 2 and soja["bajista_count"] == 1 and soja["sentiment_score"] == 0.33
+    assert soja["divergence_type"] == "BULLISH_DIVERGENCE" and soja["price_change_pct"] == -4.0
+    assert cells[("SOJA", 3)]["sentiment_score"] == 1.0
+    assert cells[("MAIZ", 3)]["news_count"] == 1 and cells[("MAIZ", 30)]["news_count"] == 3
+    assert cells[("TRIGO", 30)]["news_count"] == 0 and cells[("TRIGO", 30)]["divergence_type"] == "NONE"
+    assert "No hay suficientes noticias" in cells[("TRIGO", 30)]["description"]
+    print("   ✅ counts, scores and price changes per window OK")
+
+
+def test_board_cache():
+    """Boards are reused until articles or prices change."""
+    print("\n🔀 Divergence: board cache")
+    store = make_store()
+    yahoo = FakeProvider("yahoo", {"ZS=F": closes("ZS=F", 1000.0, 960.0)}, ttl=3600)
+    market_data._providers = MarketProviders([yahoo])
+    article_store._store = store
+    try:
+        async def run():
+            first = await divergence_board([7, 3, 7])
+            assert first["windows"] == [3, 7] and len(first["results"]) == 6
+            assert await divergence_board([3, 7]) is first              # same revision and prices
+            assert len(yahoo.calls) == 1
+
+            # A new article bumps the store revision
+            store.repo.create_batch([{"title": "soja-4", "source": "Clarín Rural", "url": "https://test.agromate.com/soja-4",
+                                      "published_at": datetime.now(timezone.utc), "sentiment": "BAJISTA", "commodity": "SOJA"}])
+            second = await divergence_board([3, 7])
+            assert second is not first
+            assert second["results"][0]["news_count"] == first["results"][0]["news_count"] + 1
+            assert await divergence_board([3, 7]) is second
+            store.overlap = timedelta(hours=1)                           # re-reads unchanged rows
+            assert await divergence_board([3, 7]) is second
+
+            # So do refetched futures
+            await asyncio.sleep(0.01)
+            await market_data.get_market_providers().get("yahoo", "3mo", max_age=0)
+            assert await divergence_board([3, 7]) is not second and len(yahoo.calls) == 2
+
+        asyncio.run(run())
+    finally:
+        market_data._providers = None
+        article_store._store = None
+    print("   ✅ revision and price keyed caching OK")
+
+
+def naive_rolling(counts, closes, window):
+    """Row-by-row reference: sums over the window, change against the day before it."""
+    rows = []
+    for t in range(len(counts)):
+        alcista, bajista = counts[max(0, t + 1 - window):t + 1, :2].sum(axis=0)
+        score = (alcista - bajista) / (alcista + bajista) if alcista + bajista else 0.0
+        change = (closes[t] / closes[t - window] - 1) * 100 if t >= window else np.nan
+        rows.append((score, change))
+    return rows
+
+
+def test_rolling_matches_naive_and_updates_incrementally():
+    """Prefix-sum windows equal the loop; new days only recompute the tail."""
+    print("\n🔀 Divergence: rolling history")
+    rng = np.random.default_rng(7)
+    days = tuple(f"d{i:04d}" for i in range(400))
+    counts = rng.integers(0, 3, size=(400, 3))
+    counts[:, 2] = counts[:, 0] + counts[:, 1]
+    closes = 1000 * np.cumprod(1 + rng.normal(0, 0.01, 400))
+
+    rolling = RollingDivergence(7)
+    assert rolling.update(days[:390], counts[:390], closes[:390]) == 390
+    assert rolling.update(days, counts, closes) == 10                   # ten new days
+    for t, (score, change) in enumerate(naive_rolling(counts, closes, 7)):
+        assert abs(rolling.scores[t] - score) < 1e-12
+        assert (np.isnan(change) and np.isnan(rolling.changes[t])) or abs(rolling.changes[t] - change) < 1e-9
+
+    # A reclassified article on day 395 recomputes from there on
+    counts = counts.copy()
+    counts[395, :] += (1, 0, 1)
+    assert rolling.update(days, counts, closes) == 5
+    assert np.allclose(rolling.scores, [score for score, _ in naive_rolling(counts, closes, 7)])
+    assert rolling.news_counts()[-1] == counts[-7:, 2].sum()
+    print("   ✅ O(1) windows and incremental updates OK")
+
+
+def test_history_endpoint_data():
+    """Daily series and episodes from the daily table and the price store."""
+    print("\n🔀 Divergence: history")
+    store = make_store()
+    table = DailySentiment(store=store, history_days=40)
+    prices = PriceStore()
+    days = table.table().days
+    # Soja falls 1% a day over the last week, flat before
+    prices.append("ZS=F", [(day, 1000.0 * 0.99 ** max(0, i - (len(days) - 8))) for i, day in enumerate(days)])
+    daily_sentiment._daily, price_store._store = table, prices
+    divergence._histories.clear()
+    try:
+        report = divergence_history("SOJA", 7, 1)
+        assert report["commodity"] == "SOJA" and len(report["data"]) == 30
+        last = report["data"][-1]
+        assert last["date"] == days[-1] and last["news_count"] == 3 and last["sentiment_score"] == 0.33
+        assert last["divergence_type"] == "BULLISH_DIVERGENCE" and last["price_change_pct"] == -6.79
+        episode = report["episodes"][-1]
+        assert episode["divergence_type"] == "BULLISH_DIVERGENCE" and episode["end"] == days[-1]
+
+        # Cached until the inputs change
+        assert divergence_history("soja", 7, 1) == report
+        assert divergence.board_cache_stats()["histories"]["hits"] == 1
+        prices.append("ZS=F", [(days[-1], 1000.0)])
+        assert divergence_history("soja", 7, 1)["data"][-1]["divergence_type"] != "BULLISH_DIVERGENCE"
+    finally:
+        daily_sentiment._daily, price_store._store = None, None
+        divergence._histories.clear()
+    print("   ✅ daily series, episodes and cache OK")
+
+
+if __name__ == "__main__":
+    test_classify()
+    test_board_matches_single_queries()
+    test_board_cache()
+    test_rolling_matches_naive_and_updates_incrementally()
+    test_history_endpoint_data()
+    print("\n✅ All divergence tests passed\n")
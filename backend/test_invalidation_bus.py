@@ -0,0 +1,162 @@
+"""
+Test script for cross-worker cache invalidation (LISTEN/NOTIFY + polling).
+
+The Postgres tests need a local server; they are skipped unless
+AGROMATE_TEST_DATABASE_URL points at a maintenance database, e.g.:
+
+    AGROMATE_TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres python -m pytest test_invalidation_bus.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from database import CachedNewsRepository
+from database.invalidation import InvalidationBus, NewsChange
+from explain_hot_queries import MIGRATIONS_DIR, UUID_SHIM_SQL, with_database
+from test_sqlite_repository import make_repo
+
+TEST_DSN = os.getenv("AGROMATE_TEST_DATABASE_URL")
+SCRATCH_DB = "agromate_bus_test"
+
+INSERT_SQL = """
+INSERT INTO news (title, source, url, published_at, commodity)
+VALUES ('Trigo en alza', 'Infocampo', 'https://test.agromate.com/bus-1', '2026-03-10T12:00:00Z', 'TRIGO')
+"""
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll `condition` until it is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture(scope="module")
+def scratch_dsn():
+    """Scratch database with every migration applied."""
+    if not TEST_DSN:
+        pytest.skip("AGROMATE_TEST_DATABASE_URL not set")
+    asyncpg = pytest.importorskip("asyncpg")
+
+    async def setup():
+        admin = await asyncpg.connect(TEST_DSN)
+        await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        await admin.execute(f"CREATE DATABASE {SCRATCH_DB}")
+        await admin.close()
+
+        conn = await asyncpg.connect(with_database(TEST_DSN, SCRATCH_DB))
+        await conn.execute(UUID_SHIM_SQL)
+        for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            sql = migration.read_text(encoding="utf-8")
+            await conn.execute("\n".join(line for line in sql.splitlines() if "uuid-ossp" not in line))
+        await conn.close()
+
+    async def teardown():
+        admin = await asyncpg.connect(TEST_DSN)
+        await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB} WITH (FORCE)")
+        await admin.close()
+
+    asyncio.run(setup())
+    yield with_database(TEST_DSN, SCRATCH_DB)
+    asyncio.run(teardown())
+
+
+def execute(dsn: str, sql: str):
+    """Run SQL on a short-lived connection (another 'worker')."""
+    import asyncpg
+
+    async def run():
+        conn = await asyncpg.connect(dsn)
+        try:
+            return await conn.fetchval(sql)
+        finally:
+            await conn.close()
+    return asyncio.run(run())
+
+
+def test_change_matching():
+    """Filtered cache entries survive changes that provably miss them."""
+    print("\n📣 Invalidation: selective eviction")
+    repo = CachedNewsRepository(make_repo())
+    repo.get_filtered(source=["Clarín Rural"])
+    repo.get_filtered(commodity="SOJA")
+    repo.get_filtered(commodity="TRIGO", date_from="2026-01-01", date_to="2026-01-31")
+    repo.get_filtered(commodity="TRIGO", date_from="2026-03-01")
+    repo.count_by_sentiment()
+
+    change = NewsChange(
+        op="insert", days=frozenset({"2026-03-10"}),
+        sources=frozenset({"Infocampo"}), commodities=frozenset({"TRIGO"})
+    )
+    # Dropped: TRIGO since March and the unfiltered count
+    assert repo.invalidate_change(change) == 2
+    assert repo.cache.stats()["entries"] == 3
+
+    assert repo.invalidate_change(NewsChange.everything()) == 3
+    print("   ✅ only affected entries dropped")
+
+
+def test_notify_payload(scratch_dsn):
+    """A write in another connection reaches a listening worker."""
+    print("\n📣 Invalidation: LISTEN/NOTIFY")
+    received = []
+    bus = InvalidationBus(dsn=scratch_dsn)
+    bus.subscribe(received.append)
+    bus.start()
+    try:
+        assert wait_for(lambda: bus.mode == "listen" and received)
+        assert received[0].is_everything  # resync on (re)connect
+
+        execute(scratch_dsn, INSERT_SQL)
+        assert wait_for(lambda: len(received) == 2)
+        change = received[1]
+        assert change.op == "insert"
+        assert change.days == {"2026-03-10"}
+        assert change.sources == {"Infocampo"}
+        assert change.commodities == {"TRIGO"}
+
+        execute(scratch_dsn, "UPDATE news SET sentiment = 'NEUTRAL' WHERE sentiment IS NULL")
+        assert wait_for(lambda: len(received) == 3)
+        assert received[2].op == "update"
+    finally:
+        bus.stop()
+    print(f"   ✅ {received[1]}")
+
+
+def test_polling_fallback(scratch_dsn):
+    """Without LISTEN, the revision counter is polled."""
+    print("\n📣 Invalidation: polling fallback")
+    received = []
+    bus = InvalidationBus(
+        revision_loader=lambda: execute(scratch_dsn, "SELECT revision FROM news_revision"),
+        poll_seconds=0.1
+    )
+    bus.subscribe(received.append)
+    bus.start()
+    try:
+        assert wait_for(lambda: bus.stats()["revision"] is not None)
+        assert received == []  # first poll only sets the baseline
+
+        execute(scratch_dsn, "DELETE FROM news")
+        assert wait_for(lambda: received)
+        assert bus.mode == "poll" and received[0].is_everything
+    finally:
+        bus.stop()
+    print(f"   ✅ {bus.stats()}")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", "-s"]))
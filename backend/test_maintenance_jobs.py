@@ -0,0 +1,91 @@
+"""Test script for chunked maintenance jobs (SQLite, no network needed)."""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+
+from database import SQLiteNewsRepository
+from services.maintenance import MaintenanceJob
+
+
+def make_repo(n: int = 25) -> SQLiteNewsRepository:
+    """In-memory repository with n SOJA articles, every fifth from a test source."""
+    repo = SQLiteNewsRepository(":memory:")
+    now = datetime.now(timezone.utc)
+    repo.create_batch([
+        {
+            "title": f"Noticia {i}",
+            "source": "Test Source" if i % 5 == 0 else "Infocampo",
+            "url": f"https://test.agromate.com/job-{i}",
+            "published_at": now - timedelta(hours=i),
+            "sentiment": "NEUTRAL",
+            "confidence": 0.5,
+            "commodity": "SOJA",
+        }
+        for i in range(n)
+    ])
+    return repo
+
+
+def test_dry_run_and_update(tmp_path):
+    """Dry runs only count; real runs update every chunk and keep labels in sync."""
+    print("\n🧹 Maintenance: dry run and chunked update")
+    repo = make_repo()
+    job = MaintenanceJob(
+        "soja_to_general", repo, filters={"commodity": "SOJA"}, values={"commodity": "GENERAL"},
+        chunk_size=10, dry_run=True, checkpoint_dir=tmp_path
+    )
+    assert job.run()["matched"] == 25
+    assert repo.count_by("commodity") == {"SOJA": 25}
+
+    job.dry_run = False
+    result = job.run()
+    assert (result["matched"], result["changed"], result["chunks"]) == (25, 25, 3)
+    assert repo.count_by("commodity") == {"GENERAL": 25}
+    assert len(repo.get_filtered(commodity="GENERAL", limit=100)) == 25
+    assert not job.checkpoint_path.exists()
+    print(f"   ✅ {result}")
+
+
+def test_delete_resumes_from_checkpoint(tmp_path):
+    """An interrupted job continues after the last finished chunk."""
+    print("\n🧹 Maintenance: checkpoint and resume")
+    repo = make_repo()
+    job = MaintenanceJob("clean", repo, filters={"source": "Test Source"}, chunk_size=2, checkpoint_dir=tmp_path)
+
+    calls = []
+    delete_range = repo.delete_range
+
+    def flaky_delete_range(filters, after_id, last_id):
+        calls.append(last_id)
+        if len(calls) == 2:
+            raise ConnectionError("connection reset")
+        return delete_range(filters, after_id, last_id)
+
+    repo.delete_range = flaky_delete_range
+    try:
+        job.run()
+        raise AssertionError("expected the second chunk to fail")
+    except ConnectionError:
+        pass
+    assert job.checkpoint_path.exists()
+
+    repo.delete_range = delete_range
+    result = job.run()
+    assert result["resumed"] and result["changed"] == 5
+    assert repo.count_by("source") == {"Infocampo": 20}
+    print(f"   ✅ {result}")
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_dry_run_and_update(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_delete_resumes_from_checkpoint(Path(tmp))
+    print("\n✅ All maintenance job tests passed\n")
@@ -0,0 +1,141 @@
+"""
+Tests for the market provider hub (services/market_data.py).
+
+Providers are in-process fakes, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import time
+from array import array
+
+import services.market_data as market_data
+from services.market_data import MarketProvider, MarketProviders, ProviderError, grain_quotes
+from services.yahoo_chart import DailyCloses
+
+
+class FakeProvider(MarketProvider):
+    """Returns queued answers (or raises queued exceptions) after `delay`."""
+
+    def __init__(self, name, *answers, delay=0.0, ttl=60.0, deadline=1.0):
+        self.name = name
+        self.answers = list(answers)
+        self.delay = delay
+        self.ttl = ttl
+        self.deadline = deadline
+        self.calls = []
+
+    async def fetch(self, key):
+        self.calls.append(key)
+        await asyncio.sleep(self.delay)
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def quote(price, name="q"):
+    return {"price": price, "currency": "ARS", "change_percent": 0.0, "symbol": name, "name": name}
+
+
+def closes(*values):
+    return DailyCloses("X", tuple(f"2024-03-0{i + 1}" for i in range(len(values))), array("d", values))
+
+
+def test_cache_and_coalescing():
+    """Fresh keys come from the cache; concurrent misses share one call."""
+    print("\n🛰️  Market providers: cache and coalescing")
+    dollar = FakeProvider("dolarapi", {"dolar": quote(1000)}, {"dolar": quote(1050)}, delay=0.05, ttl=0.2)
+    hub = MarketProviders([dollar])
+
+    async def run():
+        results = await asyncio.gather(*(hub.get("dolarapi") for _ in range(20)))
+        assert len(dollar.calls) == 1 and all(r.value["dolar"]["price"] == 1000 for r in results)
+        assert (await hub.get("dolarapi")).value["dolar"]["price"] == 1000      # cache hit
+
+        # Keys are cached separately; max_age forces a refetch
+        await hub.get("dolarapi", "other")
+        assert dollar.calls == ["latest", "other"]
+        assert (await hub.get("dolarapi", max_age=0)).value["dolar"]["price"] == 1050
+
+        stats = hub.stats()["dolarapi"]
+        assert stats["coalesced"] == 19 and stats["hits"] == 1 and stats["fetches"] == 3
+
+    asyncio.run(run())
+    print("   ✅ TTL hits, per-key entries and request coalescing OK")
+
+
+def test_deadlines_and_fallbacks():
+    """Slow or failing providers fall back to their last good value."""
+    print("\n🛰️  Market providers: deadlines and fallbacks")
+    slow = FakeProvider("yahoo", {"ZS=F": closes(100.0, 101.0)}, {"ZS=F": closes(1.0)}, ttl=0, deadline=0.1)
+    broken = FakeProvider("agrofy", ConnectionError("down"))
+    hub = MarketProviders([slow, broken])
+
+    async def run():
+        first = await hub.get("yahoo")
+        assert first.error is None and first.value_or_raise()["ZS=F"].closes[-1] == 101.0
+
+        # Past the deadline: the last good value with the error attached
+        slow.delay = 0.5
+        start = time.perf_counter()
+        late, missing = await hub.get_many([("yahoo", "latest"), ("agrofy", "latest")])
+        assert time.perf_counter() - start < 0.3                     # fan-out bounded by the deadline
+        assert late.value["ZS=F"].closes[-1] == 101.0 and "timeout" in late.error
+        assert missing.value is None and "ConnectionError" in missing.error
+        try:
+            missing.value_or_raise()
+        except ProviderError:
+            pass
+        else:
+            raise AssertionError("value_or_raise should fail")
+        assert hub.stats()["yahoo"]["timeouts"] == 1 and hub.stats()["agrofy"]["failures"] == 1
+
+    asyncio.run(run())
+    print("   ✅ deadlines, last-good fallbacks and error reporting OK")
+
+
+def test_grain_quotes_and_snapshot_fetch():
+    """Pizarra Rosario wins over the CBOT conversion; either source alone is enough."""
+    print("\n🛰️  Market providers: grain quotes")
+    charts = {"ZS=F": closes(1000.0, 1010.0), "ZC=F": closes(450.0)}
+    pizarra = {"soja_rosario": quote(470000, "Rosario"), "girasol_rosario": quote(533540, "Rosario")}
+
+    quotes = grain_quotes(charts, pizarra, 1000)
+    assert quotes["soja_rosario"]["price"] == 470000 and quotes["soja_cbot"]["price"] == 10100.0
+    assert quotes["soja_cbot"]["change_percent"] == 1.0
+    assert quotes["maiz_rosario"] is quotes["maiz_cbot"] and "girasol_rosario" in quotes
+    assert "trigo_cbot" not in quotes
+
+    from services.market_snapshot import fetch_grains
+    yahoo = FakeProvider("yahoo", charts)
+    agrofy = FakeProvider("agrofy", {})                          # empty answer: a failure
+    market_data._providers = MarketProviders([yahoo, agrofy])
+    try:
+        fields = asyncio.run(fetch_grains({"dolar": quote(1000)}))
+        assert fields["soja_rosario"]["symbol"] == "ZS=F"
+
+        yahoo.answers = [RuntimeError("down")]
+        market_data._providers = MarketProviders([yahoo, agrofy])
+        try:
+            asyncio.run(fetch_grains({}))
+        except ProviderError as e:
+            assert "yahoo" in str(e) and "agrofy" in str(e)
+        else:
+            raise AssertionError("fetch_grains should fail when both providers fail")
+    finally:
+        market_data._providers = None
+    print("   ✅ pizarra precedence, CBOT fallback and snapshot fetch OK")
+
+
+if __name__ == "__main__":
+    test_cache_and_coalescing()
+    test_deadlines_and_fallbacks()
+    test_grain_quotes_and_snapshot_fetch()
+    print("\n✅ All market provider tests passed\n")
@@ -0,0 +1,107 @@
+"""
+Tests for the background market snapshot (services/market_snapshot.py).
+
+Upstreams are replaced by in-process fetchers, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import time
+
+from services.market_snapshot import MarketSnapshot, SnapshotGroup
+
+
+class FakeUpstream:
+    """Returns queued answers (or raises queued exceptions) and counts calls."""
+
+    def __init__(self, *answers, delay=0.0):
+        self.answers = list(answers)
+        self.delay = delay
+        self.calls = 0
+        self.seen = []
+
+    async def __call__(self, current):
+        self.calls += 1
+        self.seen.append(dict(current))
+        await asyncio.sleep(self.delay)
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def quote(price):
+    return {"price": price, "currency": "ARS", "change_percent": 0.0}
+
+
+def test_serving_and_failures():
+    """Reads come from memory; failures keep the last good values and are reported."""
+    print("\n💹 Market snapshot: serving and failures")
+    dollar = FakeUpstream({"dolar": quote(1000), "dolar_blue": quote(1200)}, ConnectionError("down"))
+    grains = FakeUpstream({"soja_rosario": quote(400000)}, {}, delay=0.05)
+    snapshot = MarketSnapshot([SnapshotGroup("dollar", dollar, 60), SnapshotGroup("grains", grains, 300)])
+
+    async def run():
+        first = await snapshot.get()              # cold start waits for the first refresh
+        assert first["data"]["dolar"]["price"] == 1000 and first["data"]["soja_rosario"]["price"] == 400000
+        assert grains.seen[0]["dolar"]["price"] == 1000    # grains convert with the fresh dollar
+        assert first["stale"] is False and first["errors"] == {}
+
+        # Fresh data: reads touch no upstream and take microseconds
+        start = time.perf_counter()
+        for _ in range(1000):
+            await snapshot.get()
+        per_read_us = (time.perf_counter() - start) * 1000
+        assert dollar.calls == 1 and grains.calls == 1
+        assert per_read_us < 200, per_read_us
+
+        # Both upstreams fail (exception / empty answer): last good values stay
+        assert await snapshot.refresh(force=True) == []
+        view = snapshot.view()
+        assert view["data"]["dolar"]["price"] == 1000 and view["data"]["soja_rosario"]["price"] == 400000
+        assert set(view["errors"]) == {"dollar", "grains"}
+        assert snapshot.stats()["groups"]["dollar"]["failures"] == 1
+
+    asyncio.run(run())
+    print("   ✅ memory reads, last-good-value retention and error reporting OK")
+
+
+def test_stale_while_revalidate():
+    """Due groups are refreshed in the background while the old snapshot is served."""
+    print("\n💹 Market snapshot: stale-while-revalidate")
+    dollar = FakeUpstream({"dolar": quote(1000)}, {"dolar": quote(1050)}, delay=0.05)
+    group = SnapshotGroup("dollar", dollar, ttl=0.1)
+    snapshot = MarketSnapshot([group])
+
+    async def run():
+        await snapshot.refresh()
+        await asyncio.sleep(0.15)                 # the group is now due
+
+        # Served immediately with the old value; one refresh runs behind it
+        views = [await snapshot.get() for _ in range(5)]
+        assert all(v["data"]["dolar"]["price"] == 1000 for v in views)
+        await asyncio.sleep(0.1)
+        assert dollar.calls == 2
+        assert (await snapshot.get())["data"]["dolar"]["price"] == 1050
+
+        # Per-field staleness after STALE_AFTER_TTLS without a success
+        snapshot._fields["dolar"].updated_at -= 1.0
+        view = snapshot.view()
+        assert view["data"]["dolar"]["stale"] is True and view["stale"] is True
+        assert view["data"]["dolar"]["age_seconds"] >= 1.0
+        await snapshot.stop()
+
+    asyncio.run(run())
+    print("   ✅ background revalidation and staleness flags OK")
+
+
+if __name__ == "__main__":
+    test_serving_and_failures()
+    test_stale_while_revalidate()
+    print("\n✅ All market snapshot tests passed\n")
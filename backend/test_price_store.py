@@ -0,0 +1,169 @@
+"""
+Tests for the local price history store (services/price_store.py).
+
+Upstreams are replaced by in-process fetchers, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+from services.dollar_history import LocalDollarProvider, brecha_closes, dollar_source
+from services.price_store import HistorySource, OVERLAP_DAYS, PriceHistoryUpdater, PriceStore
+
+
+def business_days(start, count):
+    day, days = date.fromisoformat(start), []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+class FakeHistory:
+    """Serves closes from a fixed table, from `since` on, and records the calls."""
+
+    def __init__(self, table, fail=False):
+        self.table = table
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, since):
+        self.calls.append(since)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return {s: [(d, v) for d, v in closes if since is None or d >= since] for s, closes in self.table.items()}
+
+
+def test_backfill_and_append():
+    """First run backfills everything, later runs only fetch the tail."""
+    print("\n📈 Price store: backfill and incremental append")
+    store = PriceStore()
+    days = business_days("2020-01-01", 300)
+    grains = FakeHistory({"ZS=F": [(d, 1000.0 + i) for i, d in enumerate(days)]})
+    dollar = FakeHistory({"dolar_oficial": [(d, 100.0) for d in days[:-10]]})
+    updater = PriceHistoryUpdater(store, [
+        HistorySource("grains", ("ZS=F",), grains),
+        HistorySource("dollar", ("dolar_oficial",), dollar),
+    ])
+
+    written = asyncio.run(updater.update())
+    assert written == {"ZS=F": 300, "dolar_oficial": 290}
+    assert grains.calls == [None] and store.last_day("dolar_oficial") == days[-11]
+
+    # Next run starts a few days before the last stored close; revised closes replace old ones
+    dollar.table["dolar_oficial"] = [(d, 200.0) for d in days]
+    asyncio.run(updater.update())
+    since = (date.fromisoformat(days[-11]) - timedelta(days=OVERLAP_DAYS)).isoformat()
+    assert dollar.calls == [None, since]
+    closes = store.closes(["dolar_oficial"], days[0], days[-1])
+    assert len(closes) == 300 and closes[-1] == (days[-1], "dolar_oficial", 200.0)
+    assert closes[0][2] == 100.0
+
+    rows = store.closes(["ZS=F", "dolar_oficial"], days[100], days[104])
+    assert [r[0] for r in rows] == sorted(r[0] for r in rows) and len(rows) == 10
+    assert store.stats()["ZS=F"]["first_day"] == days[0]
+    print("   ✅ backfill, overlap re-fetch and range reads OK")
+
+
+def test_failures_keep_rows():
+    """A failing upstream leaves the stored history untouched."""
+    print("\n📈 Price store: upstream failures")
+    store = PriceStore()
+    days = business_days("2024-01-01", 20)
+    upstream = FakeHistory({"ZC=F": [(d, 450.0) for d in days]})
+    updater = PriceHistoryUpdater(store, [HistorySource("grains", ("ZC=F",), upstream)])
+    asyncio.run(updater.update())
+
+    upstream.fail = True
+    assert asyncio.run(updater.update()) == {}
+    assert len(store.closes(["ZC=F"], days[0], days[-1])) == 20
+    source = updater.stats()["sources"]["grains"]
+    assert source["failures"] == 1 and "upstream down" in source["last_error"]
+    print("   ✅ failures recorded, rows kept")
+
+
+def test_dollar_history():
+    """Dollar quotes per casa from a local provider, with precomputed brechas."""
+    print("\n📈 Price store: dollar history and brecha")
+    import json
+    import tempfile
+
+    days = business_days("2024-01-01", 30)
+    records = [{"casa": "oficial", "fecha": d, "compra": 800.0, "venta": 800.0 + i} for i, d in enumerate(days)]
+    records += [{"casa": "blue", "fecha": d, "venta": 1200.0} for d in days]
+    records += [{"casa": "bolsa", "fecha": d, "venta": 1000.0} for d in days[10:]]
+    records += [{"casa": "contadoconliqui", "fecha": d, "venta": 1040.0} for d in days]
+    records += [{"casa": "cripto", "fecha": d, "venta": 1300.0} for d in days]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dolares.json"
+        path.write_text(json.dumps(records), encoding="utf-8")
+        provider = LocalDollarProvider.from_file(path)
+
+    store = PriceStore()
+    updater = PriceHistoryUpdater(store, [dollar_source(provider)])
+    written = asyncio.run(updater.update())
+    assert written["dolar_oficial"] == 30 and written["dolar_mep"] == 20 and written["brecha_mep_pct"] == 20
+    assert "cripto" not in str(store.stats())
+
+    _, columns = store.table(["brecha_pct", "brecha_mep_pct", "brecha_ccl_pct"], days[0], days[-1])
+    assert columns["brecha_pct"][0] == 50.0 and columns["brecha_ccl_pct"][0] == 30.0
+    assert columns["brecha_mep_pct"][:10] == [None] * 10 and columns["brecha_mep_pct"][10] == round(190 / 810 * 100, 2)
+
+    # New quotes only recompute the brechas from the overlap on
+    provider.records.append({"casa": "oficial", "fecha": "2024-02-12", "venta": 1000.0})
+    provider.records.append({"casa": "blue", "fecha": "2024-02-12", "venta": 1500.0})
+    written = asyncio.run(updater.update())
+    assert written["brecha_pct"] < 10 and store.last_day("brecha_pct") == "2024-02-12"
+    assert store.table(["brecha_pct"], "2024-02-12", "2024-02-12")[1]["brecha_pct"] == [50.0]
+    print("   ✅ casas, brecha series and incremental recompute OK")
+
+
+def test_history_endpoint():
+    """/api/market/history reads multi-year ranges from the store."""
+    print("\n📈 Price store: /api/market/history")
+    import services.price_store as price_store
+    from routers.history import get_market_history
+
+    store = PriceStore()
+    days = business_days((date.today() - timedelta(days=5 * 365 - 7)).isoformat(), 1290)
+    store.append("ZS=F", [(d, 1000.0) for d in days])
+    store.append("ZC=F", [(d, 450.0) for d in days])
+    store.append("dolar_oficial", [(d, 1000.0) for d in days])
+    store.append("dolar_blue", [(d, 1250.0) for d in days])
+    for series, closes in brecha_closes(store, None).items():
+        store.append(series, closes)
+    price_store._store = store
+    try:
+        start = time.perf_counter()
+        result = asyncio.run(get_market_history(days=1825, commodity="soja,maiz"))
+        elapsed = (time.perf_counter() - start) * 1000
+        assert [c["key"] for c in result["commodities"]] == ["soja", "maiz"]
+        assert len(result["data"]) == 1290
+        first = result["data"][0]
+        assert first["soja_usd"] == 367.44 and first["maiz_usd"] == 177.16
+        assert first["brecha_pct"] == 25.0 and first["dolar_blue"] == 1250.0 and "trigo_usd" not in first
+
+        recent = asyncio.run(get_market_history(days=30, commodity="trigo"))
+        assert recent["commodities"] == [{"key": "trigo", "name": "Trigo (CBOT)"}]
+        assert all(row["date"] >= (date.today() - timedelta(days=29)).isoformat() for row in recent["data"])
+    finally:
+        price_store.reset_price_store()
+    print(f"   ✅ 5 years served in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_backfill_and_append()
+    test_failures_keep_rows()
+    test_dollar_history()
+    test_history_endpoint()
+    print("\n✅ All price store tests passed\n")
@@ -0,0 +1,94 @@
+"""Test script for the read-through query cache (no network needed)."""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import time
+from datetime import datetime
+
+from models.news import News
+from database import CachedNewsRepository, QueryCache
+from test_sqlite_repository import make_repo
+
+
+def test_hits_and_normalized_keys():
+    """Equivalent filters share one entry; repeated reads skip the backend."""
+    print("\n🧠 Query cache: hits and key normalization")
+    repo = CachedNewsRepository(make_repo())
+
+    first = repo.get_filtered(source=["Clarín Rural", "Bichos de Campo"], commodity="maiz", sentiment="alcista")
+    again = repo.get_filtered(source=["Bichos de Campo", "Clarín Rural"], commodity="MAÍZ", sentiment="ALCISTA")
+    assert first is again
+
+    repo.get_all(limit=10)
+    repo.get_all(limit=10)
+    repo.get_all(limit=10, columns=("id",))
+
+    stats = repo.cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 3 and stats["entries"] == 3
+    print(f"   ✅ {stats}")
+
+
+def test_writes_invalidate():
+    """upsert_news, update_sentiment and delete clear cached results."""
+    print("\n🧠 Query cache: write-driven invalidation")
+    repo = CachedNewsRepository(make_repo())
+
+    assert repo.count_by_sentiment()["NEUTRAL"] == 0
+    written = repo.upsert_news(
+        [News(title="Mercado estable", source="Infocampo", url="https://test.agromate.com/x", published_at=datetime.now())],
+        {"https://test.agromate.com/x": {"sentiment": "NEUTRAL", "confidence": 0.7, "commodity": "SOJA"}}
+    )
+    assert repo.count_by_sentiment()["NEUTRAL"] == 1
+
+    repo.update_sentiment(written[0]["id"], "ALCISTA", 0.9)
+    assert repo.count_by_sentiment()["ALCISTA"] == 2
+
+    assert len(repo.get_all()) == 4
+    repo.delete(written[0]["id"])
+    assert len(repo.get_all()) == 3
+    assert repo.cache.stats()["invalidations"] == 4  # entries dropped
+    print("   ✅ cache follows writes")
+
+
+def test_lru_and_ttl():
+    """Size bound evicts the least recently used entry; TTL expires entries."""
+    print("\n🧠 Query cache: LRU eviction and TTL")
+    cache = QueryCache(ttl_seconds=0.05, max_entries=2)
+    cache.get_or_load("a", lambda: 1)
+    cache.get_or_load("b", lambda: 2)
+    cache.get_or_load("a", lambda: 1)      # a is now most recent
+    cache.get_or_load("c", lambda: 3)      # evicts b
+    assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+    assert cache.stats()["evictions"] == 2
+
+    time.sleep(0.06)
+    assert cache.get_or_load("c", lambda: "fresh") == "fresh"
+    assert cache.stats()["expirations"] == 1
+    print(f"   ✅ {cache.stats()}")
+
+
+def test_racing_write_is_not_cached():
+    """A load that overlaps an invalidation is returned but not stored."""
+    print("\n🧠 Query cache: read racing a write")
+    cache = QueryCache()
+
+    def stale_loader():
+        cache.invalidate()   # a write commits while the read is in flight
+        return "stale"
+
+    assert cache.get_or_load("k", stale_loader) == "stale"
+    assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+    print("   ✅ stale result not cached")
+
+
+if __name__ == "__main__":
+    test_hits_and_normalized_keys()
+    test_writes_invalidate()
+    test_lru_and_ttl()
+    test_racing_write_is_not_cached()
+    print("\n✅ All query cache tests passed\n")
@@ -0,0 +1,160 @@
+"""
+Tests for the streaming sentiment index (services/sentiment_index.py).
+
+Runs against an in-memory SQLite repository, no network needed. Every
+check compares the incrementally maintained index with the index computed
+from scratch over the same articles.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from database import SQLiteNewsRepository
+from services.sentiment_index import SentimentIndex, duration_seconds
+
+HALF_LIVES = ("1d", "7d", "30d")
+
+
+def expected_scores(repo, commodity=None, source=None):
+    """Decayed scores computed from every article (the definition the index maintains)."""
+    now = datetime.now(timezone.utc)
+    scores = {}
+    for half_life in HALF_LIVES:
+        bull = bear = 0.0
+        for row in repo.get_all(limit=1000, columns=("source", "published_at", "sentiment", "confidence", "commodities")):
+            if commodity and commodity not in row["commodities"]:
+                continue
+            if source and row["source"] != source:
+                continue
+            age = (now - datetime.fromisoformat(row["published_at"])).total_seconds()
+            weight = (row["confidence"] if row["confidence"] is not None else 0.5) * 0.5 ** (age / duration_seconds(half_life))
+            if row["sentiment"] == "ALCISTA":
+                bull += weight
+            elif row["sentiment"] == "BAJISTA":
+                bear += weight
+        scores[half_life] = round((bull - bear) / (bull + bear), 4) if bull + bear else None
+    return scores
+
+
+def expected_counts(repo, days):
+    """Classified articles of the last `days` Buenos Aires calendar days."""
+    zone = ZoneInfo("America/Argentina/Buenos_Aires")
+    today = datetime.now(zone).date()
+    counts = {"alcista": 0, "bajista": 0, "neutral": 0}
+    for row in repo.get_all(limit=1000, columns=("published_at", "sentiment")):
+        day = datetime.fromisoformat(row["published_at"]).astimezone(zone).date()
+        if row["sentiment"] and (today - day).days < days:
+            counts[row["sentiment"].lower()] += 1
+    return counts
+
+
+def make_repo():
+    repo = SQLiteNewsRepository(":memory:")
+    now = datetime.now(timezone.utc)
+    articles = [
+        ("soja-hoy", "Bichos de Campo", now - timedelta(hours=2), "ALCISTA", 0.9, "SOJA"),
+        ("soja-ayer", "Clarín Rural", now - timedelta(days=1, hours=3), "BAJISTA", 0.8, "SOJA, MAIZ"),
+        ("trigo-semana", "Clarín Rural", now - timedelta(days=6), "ALCISTA", None, "TRIGO"),
+        ("soja-mes", "Infocampo", now - timedelta(days=25), "BAJISTA", 0.95, "SOJA"),
+        ("neutral", "Infocampo", now - timedelta(hours=5), "NEUTRAL", 0.7, "MAIZ"),
+        ("sin-clasificar", "Infocampo", now - timedelta(hours=1), None, None, "SOJA"),
+    ]
+    repo.create_batch([
+        {"title": slug, "source": source, "url": f"https://test.agromate.com/{slug}",
+         "published_at": published, "sentiment": sentiment, "confidence": confidence, "commodity": commodity}
+        for slug, source, published, sentiment, confidence, commodity in articles
+    ])
+    return repo
+
+
+def assert_matches(index, repo):
+    result = index.read()
+    assert result["overall"]["score"] == expected_scores(repo), result["overall"]
+    for label, series in result["commodities"].items():
+        assert series["score"] == expected_scores(repo, commodity=label), label
+    for name, series in result["sources"].items():
+        assert series["score"] == expected_scores(repo, source=name), name
+    return result
+
+
+def test_incremental_updates():
+    """Inserts and reclassifications fold in without a rebuild."""
+    print("\n📈 Sentiment index: incremental updates")
+    repo = make_repo()
+    index = SentimentIndex(repo, HALF_LIVES, refresh_seconds=3600, background=False)
+
+    result = assert_matches(index, repo)            # first read: nothing saved, full rebuild
+    assert index.rebuilds == 1
+    assert set(result["commodities"]) == {"SOJA", "MAÍZ", "TRIGO"}
+    for label, days in (("1d", 1), ("7d", 7), ("30d", 30)):
+        assert result["overall"]["counts"][label] == expected_counts(repo, days), label
+    assert result["overall"]["weight"]["1d"] < result["overall"]["weight"]["30d"]
+
+    repo.create_batch([{"title": "nueva", "source": "Infocampo", "url": "https://test.agromate.com/nueva",
+                        "published_at": datetime.now(timezone.utc), "sentiment": "BAJISTA",
+                        "confidence": 0.6, "commodity": "TRIGO"}])
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+    repo.bulk_update_sentiment([(ids["soja-ayer"], "ALCISTA", 0.7, None), (ids["sin-clasificar"], "BAJISTA", 0.5, None)])
+    assert index.refresh() == 3
+    assert_matches(index, repo)
+    assert index.rebuilds == 1
+    print("   ✅ inserts and reclassifications match the from-scratch index")
+
+
+def test_persistence():
+    """A new instance resumes from app_state; unknown updates and config changes rebuild."""
+    print("\n📈 Sentiment index: persistence")
+    repo = make_repo()
+    first = SentimentIndex(repo, HALF_LIVES, refresh_seconds=3600, background=False)
+    saved = first.read()
+
+    second = SentimentIndex(repo, HALF_LIVES, refresh_seconds=3600, background=False)
+    restored = second.read()
+    assert second.rebuilds == 0
+    assert restored["overall"] == saved["overall"] and restored["sources"] == saved["sources"]
+
+    # The restored instance never saw soja-mes: its reclassification needs a rebuild
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+    repo.bulk_update_sentiment([(ids["soja-mes"], "ALCISTA", 0.95, None)])
+    second.refresh()
+    second.refresh()
+    assert second.rebuilds == 1
+    assert_matches(second, repo)
+
+    # Different half-lives cannot reuse the saved masses
+    other = SentimentIndex(repo, ("12h", "3d"), refresh_seconds=3600, background=False)
+    assert set(other.read()["overall"]["score"]) == {"12h", "3d"} and other.rebuilds == 1
+    print("   ✅ restore, rebuild on unknown updates and on config changes OK")
+
+
+def test_updates_before_the_replay_window():
+    """Reclassifying an article older than the replay window does not rebuild again and again."""
+    print("\n📈 Sentiment index: updates past the replay window")
+    repo = make_repo()
+    repo.create_batch([{"title": "viejo", "source": "Infocampo", "url": "https://test.agromate.com/viejo",
+                        "published_at": datetime.now(timezone.utc) - timedelta(days=400), "sentiment": "NEUTRAL",
+                        "confidence": 0.5, "commodity": "SOJA"}])
+    index = SentimentIndex(repo, HALF_LIVES, refresh_seconds=3600, background=False)
+    index.read()
+    assert index.rebuilds == 1
+
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+    repo.bulk_update_sentiment([(ids["viejo"], "ALCISTA", 0.9, None)])
+    for _ in range(3):
+        index.refresh()
+    assert index.rebuilds == 1 and not index._needs_rebuild
+    print("   ✅ old reclassifications are skipped")
+
+
+if __name__ == "__main__":
+    test_incremental_updates()
+    test_persistence()
+    test_updates_before_the_replay_window()
+    print("\n✅ All sentiment index tests passed\n")
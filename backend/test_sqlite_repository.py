@@ -0,0 +1,195 @@
+"""Test script for the embedded SQLite storage backend (no network needed)."""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+
+from models.news import News
+from database import SQLiteNewsRepository
+
+
+def make_repo() -> SQLiteNewsRepository:
+    """Fresh in-memory repository with a few articles."""
+    repo = SQLiteNewsRepository(":memory:")
+    now = datetime.now(timezone.utc)
+    repo.create_batch([
+        {
+            "title": "Soja sube en Chicago",
+            "source": "Bichos de Campo",
+            "url": "https://test.agromate.com/soja-1",
+            "published_at": now - timedelta(hours=1),
+            "sentiment": "ALCISTA",
+            "confidence": 0.9,
+            "commodity": "SOJA",
+        },
+        {
+            "title": "Heladas afectan al trigo y la cebada",
+            "source": "Clarín Rural",
+            "url": "https://test.agromate.com/trigo-1",
+            "published_at": now - timedelta(hours=5),
+            "sentiment": "BAJISTA",
+            "confidence": 0.8,
+            "commodity": "TRIGO, CEBADA",
+        },
+        {
+            "title": "Sin novedades en el mercado",
+            "source": "Bichos de Campo",
+            "url": "https://test.agromate.com/general-1",
+            "published_at": now - timedelta(days=3),
+            "sentiment": None,
+            "confidence": None,
+            "commodity": "GENERAL",
+        },
+    ])
+    return repo
+
+
+def test_crud_and_filters():
+    """Inserts, projections and filters return the same shapes as Supabase."""
+    print("\n🗄️  SQLite repository: CRUD and filters")
+    repo = make_repo()
+
+    rows = repo.get_all(limit=10)
+    assert [r["title"] for r in rows][0] == "Soja sube en Chicago"
+    assert rows[1]["commodities"] == ["TRIGO", "CEBADA"]
+
+    assert [r["url"] for r in repo.get_filtered(commodity="CEBADA")] == ["https://test.agromate.com/trigo-1"]
+    assert len(repo.get_filtered(source=["Bichos de Campo"])) == 2
+    assert len(repo.get_filtered(sentiment="alcista")) == 1
+    assert len(repo.get_recent(hours=24)) == 2
+    assert [r["title"] for r in repo.get_unclassified()] == ["Sin novedades en el mercado"]
+
+    sparse = repo.get_all(columns=("id", "sentiment"))
+    assert set(sparse[0]) == {"id", "sentiment"}
+
+    assert repo.count_by_sentiment() == {"ALCISTA": 1, "BAJISTA": 1, "NEUTRAL": 0, "NULL": 1}
+    print("   ✅ filters, projections and counts OK")
+
+
+def test_upsert_and_registry():
+    """Upserts merge by URL and the source registry follows writes."""
+    print("\n🗄️  SQLite repository: upsert and source registry")
+    repo = make_repo()
+
+    written = repo.upsert_news(
+        [
+            News(title="Soja sube fuerte en Chicago", source="Bichos de Campo",
+                 url="https://test.agromate.com/soja-1", published_at=datetime.now()),
+            News(title="Nueva fuente", source="Infocampo",
+                 url="https://test.agromate.com/maiz-1", published_at=datetime.now()),
+        ],
+        {"https://test.agromate.com/maiz-1": {"sentiment": "NEUTRAL", "confidence": 0.7, "commodity": "MAIZ"}}
+    )
+    assert len(written) == 2
+
+    updated = repo.get_by_url("https://test.agromate.com/soja-1")
+    assert updated["title"] == "Soja sube fuerte en Chicago"
+    assert updated["sentiment"] == "ALCISTA"  # untouched: not part of the upsert
+    assert repo.get_by_url("https://test.agromate.com/maiz-1")["commodities"] == ["MAÍZ"]
+
+    sources = {s["source"]: s["article_count"] for s in repo.get_sources()}
+    assert sources == {"Bichos de Campo": 2, "Clarín Rural": 1, "Infocampo": 1}
+
+    assert repo.delete(written[1]["id"])
+    assert not repo.exists("https://test.agromate.com/maiz-1")
+    assert "Infocampo" not in [s["source"] for s in repo.get_sources()]
+    print("   ✅ upsert merge and registry OK")
+
+
+def test_unchanged_upserts_are_skipped():
+    """Re-upserting identical content writes nothing and keeps updated_at."""
+    print("\n🗄️  SQLite repository: unchanged upserts")
+    repo = make_repo()
+    before = repo.get_by_url("https://test.agromate.com/soja-1")
+    news = News(title="Soja sube en Chicago", source="Bichos de Campo", url=before["url"],
+                published_at=datetime.fromisoformat(before["published_at"]))
+    analysis = {news.url: {"sentiment": "ALCISTA", "confidence": 0.9, "commodity": "SOJA"}}
+
+    assert repo.upsert_news([news], analysis) == []
+    assert repo.last_upsert_stats == {"written": 0, "skipped": 1}
+    assert repo.get_by_url(news.url)["updated_at"] == before["updated_at"]
+
+    analysis[news.url]["sentiment"] = "NEUTRAL"
+    assert len(repo.upsert_news([news], analysis)) == 1
+    assert repo.last_upsert_stats == {"written": 1, "skipped": 0}
+    print("   ✅ unchanged rows skipped")
+
+
+def test_bulk_update_sentiment():
+    """Bulk updates apply per chunk, skip no-ops and report failed chunks."""
+    print("\n🗄️  SQLite repository: bulk sentiment updates")
+    repo = make_repo()
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+
+    report = repo.bulk_update_sentiment([
+        (ids["soja-1"], "ALCISTA", 0.9, None),          # unchanged
+        (ids["trigo-1"], "NEUTRAL", 0.6, None),
+        (ids["general-1"], "ALCISTA", 0.75, "MAIZ"),
+        ("missing-id", "BAJISTA", 0.5, None),
+    ], chunk_size=2)
+    assert (report["updated"], report["unchanged"], report["failed"]) == (2, 2, 0)
+    assert [c["updated"] for c in report["chunks"]] == [1, 1]
+
+    general = repo.get_by_id(ids["general-1"])
+    assert (general["sentiment"], general["commodity"], general["commodities"]) == ("ALCISTA", "MAIZ", ["MAÍZ"])
+    assert repo.get_by_id(ids["trigo-1"])["commodities"] == ["TRIGO", "CEBADA"]  # labels kept
+    assert [r["url"] for r in repo.get_filtered(commodity="MAÍZ")] == ["https://test.agromate.com/general-1"]
+
+    # The single-row path rounds the confidence like the bulk path: no-op
+    before = repo.get_by_id(ids["soja-1"])["updated_at"]
+    assert repo.update_sentiment(ids["soja-1"], "ALCISTA", 0.901)["updated_at"] == before
+
+    # A bad row fails its own chunk only
+    report = repo.bulk_update_sentiment([
+        (ids["soja-1"], "BAJISTA", 0.7, None),
+        (ids["trigo-1"], "NEUTRAL", "not-a-number", None),
+    ], chunk_size=1)
+    assert report["chunks"][0]["error"] is None and report["chunks"][1]["error"]
+    assert (report["updated"], report["failed"]) == (1, 1)
+    print("   ✅ chunked updates and per-chunk errors OK")
+
+
+def test_search():
+    """Headline search stems Spanish words, applies filters and follows writes."""
+    print("\n🗄️  SQLite repository: headline search")
+    repo = make_repo()
+    ids = {r["url"].rsplit("/", 1)[-1]: r["id"] for r in repo.get_all(columns=("id", "url"))}
+
+    def urls(query, **filters):
+        return [r["url"].rsplit("/", 1)[-1] for r in repo.search(query, **filters)]
+
+    assert urls("helada TRIGO") == ["trigo-1"]                  # stemmed, case-insensitive
+    assert urls("soja OR mercado") == ["soja-1", "general-1"]    # newest first on equal rank
+    assert urls("mercado OR soja -chicago") == ["general-1"]  # AND binds tighter than OR
+    assert urls('"afectan al trigo"') == ["trigo-1"]
+    assert urls('"trigo afectan"') == []
+    assert urls("soja", sentiment="BAJISTA") == []
+    assert urls("heladas", commodity="CEBADA", source=["Clarín Rural"]) == ["trigo-1"]
+    assert urls("   ") == []
+
+    hit = repo.search("heladas")[0]
+    assert hit["headline"] == "<b>Heladas</b> afectan al trigo y la cebada" and hit["rank"] > 0
+
+    # The index follows updates, inserts and deletes
+    repo.bulk_update_sentiment([(ids["soja-1"], "BAJISTA", 0.7, None)])
+    assert urls("soja", sentiment="BAJISTA") == ["soja-1"]
+    repo.create_batch([{"title": "Exportaciones de maíz en alza", "source": "Infocampo",
+                        "url": "https://test.agromate.com/maiz-1", "commodity": "MAIZ"}])
+    assert urls("exportación maiz") == ["maiz-1"]
+    repo.delete(ids["trigo-1"])
+    assert urls("heladas") == []
+    print("   ✅ stemming, operators, filters and index refresh OK")
+
+
+if __name__ == "__main__":
+    test_crud_and_filters()
+    test_upsert_and_registry()
+    test_unchanged_upserts_are_skipped()
+    test_bulk_update_sentiment()
+    test_search()
+    print("\n✅ All SQLite repository tests passed\n")
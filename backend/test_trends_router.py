@@ -0,0 +1,90 @@
+"""
+Tests for the trends endpoints (routers/trends.py) over the analytics store.
+
+Runs the router on an in-memory SQLite repository, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import services.article_store as article_store
+from routers.trends import router
+from services.bucketing import bucket_grid
+from test_article_store import make_article_store
+
+
+def make_client():
+    """Store with a 30-day horizon over a recent article and one older than that."""
+    now = datetime.now(timezone.utc)
+    article_store._store = make_article_store([
+        (slug, "Bichos de Campo", published, "ALCISTA", 0.8, "SOJA")
+        for slug, published in (("reciente", now - timedelta(days=2)), ("viejo", now - timedelta(days=45)))
+    ], horizon_days=30)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app), now
+
+
+def test_ranges_past_the_horizon():
+    """Ranges older than the store's horizon are read from the repository."""
+    print("\n📊 Trends: store horizon")
+    client, now = make_client()
+    try:
+        old = (now - timedelta(days=45)).isoformat()
+        for path in ("/api/trends/daily", "/api/trends/timeline"):
+            assert client.get(path, params={"date_from": "ayer"}).status_code == 400
+            body = client.get(path, params={"days": 30, "granularity": "month"}).json()
+            assert body["period"] == "30d"
+
+        def alcista(params):
+            return sum(row["alcista"] for row in client.get("/api/trends/daily", params=params).json()["data"])
+
+        assert alcista({"days": 30}) == 1                                            # only the recent one
+        assert alcista({"days": 60}) == alcista({"date_from": old}) == 2
+        assert alcista({"days": 60, "source": "Clarín Rural"}) == 0
+        scores = client.get("/api/trends/timeline", params={"days": 60}).json()["data"]
+        assert len(scores) == 2 and all(row["sentiment_score"] == 1.0 for row in scores)
+
+        def by_source(params):
+            return [(s["source"], s["alcista"]) for s in client.get("/api/trends/by-source", params=params).json()["data"]]
+
+        assert by_source({}) == [("Bichos de Campo", 1)]
+        assert by_source({"date_from": old}) == by_source({"date_from": old, "granularity": "week"}) == [("Bichos de Campo", 2)]
+        assert client.get("/api/trends/by-source", params={"date_from": "ayer"}).status_code == 400
+
+        # The repository scan is cached until the store changes
+        store = article_store.get_article_store()
+        scans = store._history.misses
+        alcista({"date_from": old})
+        assert store._history.misses == scans
+        print("   ✅ recent ranges from the store, older ones from the repository")
+    finally:
+        article_store.reset_article_store()
+
+
+def test_period_of_explicit_ranges():
+    """An explicit range reports the buckets it covered, not the default window."""
+    client, now = make_client()
+    try:
+        date_from = (now - timedelta(days=10)).date().isoformat()
+        date_to = (now - timedelta(days=3)).date().isoformat()
+        body = client.get("/api/trends/daily", params={"date_from": date_from, "date_to": date_to}).json()
+        grid = bucket_grid(date_from, date_to, "day")
+        assert body["period"] == f"{grid.labels[0]}/{grid.labels[-1]}"
+    finally:
+        article_store.reset_article_store()
+
+
+if __name__ == "__main__":
+    test_ranges_past_the_horizon()
+    test_period_of_explicit_ranges()
+    print("\n✅ All trends router tests passed\n")
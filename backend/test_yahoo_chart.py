@@ -0,0 +1,85 @@
+"""
+Tests for the Yahoo Finance chart client (services/yahoo_chart.py).
+
+Responses are served by an httpx mock transport, no network needed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+import asyncio
+
+import httpx
+
+from services.yahoo_chart import YahooChartClient, YahooChartError, parse_chart
+
+
+def chart(symbol, timestamps, closes):
+    return {"chart": {"result": [{
+        "meta": {"currency": "USX", "symbol": symbol, "exchangeTimezoneName": "America/Chicago", "gmtoffset": -18000},
+        "timestamp": timestamps,
+        "indicators": {"quote": [{"close": closes, "open": closes}]},
+    }], "error": None}}
+
+
+NOT_FOUND = {"chart": {"result": None, "error": {"code": "Not Found", "description": "No data found, symbol may be delisted"}}}
+
+
+def test_parse_chart():
+    """Exchange-local days, skipped gaps and the live bar."""
+    print("\n📉 Yahoo chart: parsing")
+    # 2024-03-04..06 00:00 CST (06:00 UTC), then a live bar at 13:35 CST on the 6th
+    payload = chart("ZS=F", [1709532000, 1709618400, 1709704800, 1709753700], [1150.25, None, 1160.5, 1162.0])
+    series = parse_chart("ZS=F", payload)
+    assert series.days == ("2024-03-04", "2024-03-06") and list(series.closes) == [1150.25, 1162.0]
+    assert series.currency == "USX" and len(series) == 2
+    assert round(series.change_pct(), 4) == round((1162.0 - 1150.25) / 1150.25 * 100, 4)
+    assert series.change_pct(lookback=30) == series.change_pct()
+
+    for bad in (NOT_FOUND, {"chart": {"result": [], "error": None}}):
+        try:
+            parse_chart("XX=F", bad)
+        except YahooChartError:
+            continue
+        raise AssertionError("parse_chart should fail")
+    print("   ✅ days, gaps, live bar and errors OK")
+
+
+def test_client():
+    """Ranges, concurrent symbols, failures and event-loop changes."""
+    print("\n📉 Yahoo chart: client")
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        symbol = request.url.path.rsplit("/", 1)[-1]
+        if symbol == "XX=F":
+            return httpx.Response(404, json=NOT_FOUND)
+        return httpx.Response(200, json=chart(symbol, [1709532000, 1709618400], [100.0, 110.0]))
+
+    client = YahooChartClient(transport=httpx.MockTransport(handler))
+
+    series = asyncio.run(client.daily_closes("ZC=F", range_="1mo"))
+    assert series.symbol == "ZC=F" and series.change_pct() == 10.0
+    assert seen[0].url.params["range"] == "1mo" and seen[0].url.params["interval"] == "1d"
+    assert "Mozilla" in seen[0].headers["user-agent"]
+
+    # A second event loop gets a fresh pool and the first one is closed
+    first = client._client
+    charts = asyncio.run(client.daily_closes_many(["ZS=F", "XX=F", "ZW=F"], start="2024-03-01"))
+    assert first.is_closed and client._client is not first
+    assert sorted(charts) == ["ZS=F", "ZW=F"]
+    assert seen[-1].url.params["period1"] == "1709251200" and "range" not in seen[-1].url.params
+    assert client.stats() == {"requests": 4, "errors": 1}
+    asyncio.run(client.aclose())
+    print("   ✅ ranges, start dates, failures and pooling OK")
+
+
+if __name__ == "__main__":
+    test_parse_chart()
+    test_client()
+    print("\n✅ All Yahoo chart tests passed\n")
@@ -1,46 +1,56 @@
 """
 Cambiar el default de todas las noticias de SOJA a GENERAL.
 Esto es más correcto porque la mayoría de noticias NO son específicas de soja.
+
+Corre en lotes (ver services/maintenance.py): --dry-run para ver cuántas
+noticias cambiarían, --chunk-size/--pause para limitar la carga y, si se
+interrumpe, la próxima corrida sigue desde el último lote.
 """
 
-import os
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
 from dotenv import load_dotenv
-from supabase import create_client
 
 load_dotenv()
 
-# Conectar a Supabase
-supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_ANON_KEY")
-)
-
-print("🔄 Actualizando commodity default de SOJA a GENERAL...\n")
-
-# Obtener todas las noticias con commodity = SOJA
-result = supabase.table("news").select("id, title, commodity").eq("commodity", "SOJA").execute()
-news_with_soja = result.data
-
-print(f"📊 Encontradas {len(news_with_soja)} noticias con commodity=SOJA\n")
-
-if len(news_with_soja) > 0:
-    # Actualizar todas a GENERAL
-    response = supabase.table("news").update({
-        "commodity": "GENERAL"
-    }).eq("commodity", "SOJA").execute()
-    
-    print(f"✅ Actualizadas {len(news_with_soja)} noticias a commodity=GENERAL")
-    print("\n💡 Ahora cuando scrapeemos noticias nuevas, Groq detectará el commodity correcto.")
-    print("💡 Si querés, podés re-analizar todas las noticias con el script test_commodity_detection.py")
-else:
-    print("✅ No hay noticias con commodity=SOJA para actualizar")
-
-print("\n📊 Distribución actual por commodity:")
-all_news = supabase.table("news").select("commodity").execute()
-commodities = {}
-for row in all_news.data:
-    commodity = row.get('commodity', 'NULL')
-    commodities[commodity] = commodities.get(commodity, 0) + 1
-
-for commodity, count in sorted(commodities.items(), key=lambda x: x[1], reverse=True):
-    print(f"  {commodity}: {count} noticias")
+from database import get_news_repository
+from services.maintenance import add_job_arguments, job_from_args, print_distribution
+
+
+def main():
+    parser = add_job_arguments(argparse.ArgumentParser(description="Cambiar commodity SOJA → GENERAL"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    repo = get_news_repository()
+
+    print("🔄 Actualizando commodity default de SOJA a GENERAL...\n")
+
+    job = job_from_args(
+        "update_commodity_defaults", repo, args,
+        filters={"commodity": "SOJA"}, values={"commodity": "GENERAL"}
+    )
+    result = job.run()
+
+    if args.dry_run:
+        print(f"🔍 [dry-run] {result['matched']} noticias con commodity=SOJA se actualizarían")
+    elif result["matched"] > 0:
+        print(f"✅ Actualizadas {result['changed']} noticias a commodity=GENERAL ({result['chunks']} lotes)")
+        print("\n💡 Ahora cuando scrapeemos noticias nuevas, Groq detectará el commodity correcto.")
+        print("💡 Si querés, podés re-analizar todas las noticias con el script test_commodity_detection.py")
+    else:
+        print("✅ No hay noticias con commodity=SOJA para actualizar")
+
+    print("\n📊 Distribución actual por commodity:")
+    print_distribution(repo, "commodity")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ export interface Article {
     sentiment: 'ALCISTA' | 'BAJISTA' | 'NEUTRAL' | null;
     confidence: number | null;
     commodity: string;
+    commodities: string[];
     created_at: string;
     updated_at: string;
 }
@@ -53,6 +54,13 @@ export interface FilterState {
     dateTo: string | null;    // ISO format YYYY-MM-DD
 }
 
+export interface SourceDetail {
+    source: string;
+    article_count: number;
+    last_seen_at: string | null;
+}
+
 export interface SourcesResponse {
     sources: string[];
+    details: SourceDetail[];
 }
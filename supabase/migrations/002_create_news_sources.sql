@@ -0,0 +1,128 @@
+-- Agromate Database Schema
+-- Migration: 002_create_news_sources.sql
+--
+-- Source registry maintained on ingest: one row per news source with its
+-- article count and first/last publication timestamps. Replaces scanning the
+-- newest 1000 articles to compute the list of sources for GET /api/sources.
+
+CREATE TABLE IF NOT EXISTS news_sources (
+    source VARCHAR(100) PRIMARY KEY,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    first_seen_at TIMESTAMPTZ,
+    last_seen_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Statement-level triggers with transition tables: a batch upsert of N rows
+-- does one aggregate per source instead of N single-row updates.
+
+CREATE OR REPLACE FUNCTION news_sources_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO news_sources AS s (source, article_count, first_seen_at, last_seen_at, updated_at)
+    SELECT source, COUNT(*), MIN(published_at), MAX(published_at), NOW()
+    FROM new_rows
+    GROUP BY source
+    ON CONFLICT (source) DO UPDATE SET
+        article_count = s.article_count + EXCLUDED.article_count,
+        first_seen_at = LEAST(s.first_seen_at, EXCLUDED.first_seen_at),
+        last_seen_at = GREATEST(s.last_seen_at, EXCLUDED.last_seen_at),
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deletes and source/date changes recompute the affected sources from news
+-- (served by the source index), so first/last timestamps stay exact.
+CREATE OR REPLACE FUNCTION refresh_news_sources(sources TEXT[])
+RETURNS VOID AS $$
+BEGIN
+    UPDATE news_sources s SET
+        article_count = agg.article_count,
+        first_seen_at = agg.first_seen_at,
+        last_seen_at = agg.last_seen_at,
+        updated_at = NOW()
+    FROM (
+        SELECT src.source,
+               COUNT(n.id) AS article_count,
+               MIN(n.published_at) AS first_seen_at,
+               MAX(n.published_at) AS last_seen_at
+        FROM unnest(sources) AS src(source)
+        LEFT JOIN news n ON n.source = src.source
+        GROUP BY src.source
+    ) agg
+    WHERE s.source = agg.source;
+
+    INSERT INTO news_sources (source, article_count, first_seen_at, last_seen_at)
+    SELECT n.source, COUNT(*), MIN(n.published_at), MAX(n.published_at)
+    FROM news n
+    WHERE n.source = ANY(sources)
+    GROUP BY n.source
+    ON CONFLICT (source) DO NOTHING;
+
+    DELETE FROM news_sources WHERE source = ANY(sources) AND article_count <= 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_sources_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_news_sources(ARRAY(SELECT DISTINCT source FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_sources_on_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed TEXT[];
+BEGIN
+    SELECT ARRAY(
+        SELECT o.source FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.source IS DISTINCT FROM n.source OR o.published_at IS DISTINCT FROM n.published_at
+        UNION
+        SELECT n.source FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE o.source IS DISTINCT FROM n.source OR o.published_at IS DISTINCT FROM n.published_at
+    ) INTO changed;
+
+    IF array_length(changed, 1) > 0 THEN
+        PERFORM refresh_news_sources(changed);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS news_sources_insert ON news;
+CREATE TRIGGER news_sources_insert
+    AFTER INSERT ON news
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_sources_on_insert();
+
+DROP TRIGGER IF EXISTS news_sources_delete ON news;
+CREATE TRIGGER news_sources_delete
+    AFTER DELETE ON news
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_sources_on_delete();
+
+DROP TRIGGER IF EXISTS news_sources_update ON news;
+CREATE TRIGGER news_sources_update
+    AFTER UPDATE ON news
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_sources_on_update();
+
+-- Backfill from existing articles
+INSERT INTO news_sources (source, article_count, first_seen_at, last_seen_at)
+SELECT source, COUNT(*), MIN(published_at), MAX(published_at)
+FROM news
+GROUP BY source
+ON CONFLICT (source) DO UPDATE SET
+    article_count = EXCLUDED.article_count,
+    first_seen_at = EXCLUDED.first_seen_at,
+    last_seen_at = EXCLUDED.last_seen_at,
+    updated_at = NOW();
+
+COMMENT ON TABLE news_sources IS 'News source registry maintained by triggers on news (counts and last publication)';
+COMMENT ON COLUMN news_sources.last_seen_at IS 'Most recent published_at among the source''s articles';
@@ -0,0 +1,36 @@
+-- Agromate Database Schema
+-- Migration: 003_tune_news_indexes.sql
+--
+-- Indexes matched to the repository's query shapes. Every list query filters
+-- by at most one column and orders by published_at DESC with a LIMIT, so a
+-- composite (filter, published_at DESC) index lets Postgres read the first N
+-- rows in order instead of filtering and sorting.
+-- Verify with: python backend/explain_hot_queries.py --dsn postgresql://...
+
+-- get_filtered(commodity=...) / divergence
+CREATE INDEX IF NOT EXISTS idx_news_commodity_published_at
+    ON news (commodity, published_at DESC);
+
+-- get_filtered(source=[...]) / source registry refresh
+CREATE INDEX IF NOT EXISTS idx_news_source_published_at
+    ON news (source, published_at DESC);
+
+-- get_by_sentiment / get_filtered(sentiment=...) / count_by_sentiment
+CREATE INDEX IF NOT EXISTS idx_news_sentiment_published_at
+    ON news (sentiment, published_at DESC);
+
+-- Backlog of unclassified articles (get_unclassified). Partial: only the few
+-- rows still waiting for the LLM are indexed.
+CREATE INDEX IF NOT EXISTS idx_news_unclassified
+    ON news (published_at DESC)
+    WHERE sentiment IS NULL;
+
+-- Redundant indexes:
+-- * idx_news_url_unique duplicates the UNIQUE constraint's own index (news_url_key)
+-- * single-column indexes are left-prefixes of the composites above
+DROP INDEX IF EXISTS idx_news_url_unique;
+DROP INDEX IF EXISTS idx_news_commodity;
+DROP INDEX IF EXISTS idx_news_source;
+DROP INDEX IF EXISTS idx_news_sentiment;
+
+ANALYZE news;
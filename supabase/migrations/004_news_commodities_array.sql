@@ -0,0 +1,94 @@
+-- Agromate Database Schema
+-- Migration: 004_news_commodities_array.sql
+--
+-- Multi-commodity articles were stored as a display string ("MAÍZ, TRIGO"),
+-- so equality filters on commodity never matched them. commodities holds the
+-- normalized labels as an array, queried by containment (@>) through a GIN
+-- index and per-commodity partial indexes. The commodity column is kept as
+-- the display label.
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS commodities TEXT[] NOT NULL DEFAULT '{}';
+
+-- Same rules as models.commodity.parse_commodities
+CREATE OR REPLACE FUNCTION normalize_commodities(value TEXT)
+RETURNS TEXT[] AS $$
+    SELECT COALESCE(ARRAY(
+        SELECT label
+        FROM (
+            SELECT DISTINCT CASE btrim(part)
+                WHEN 'MAIZ' THEN 'MAÍZ'
+                WHEN 'SOYBEAN' THEN 'SOJA'
+                WHEN 'WHEAT' THEN 'TRIGO'
+                WHEN 'CORN' THEN 'MAÍZ'
+                WHEN 'SUNFLOWER' THEN 'GIRASOL'
+                WHEN 'SORGHUM' THEN 'SORGO'
+                WHEN 'BARLEY' THEN 'CEBADA'
+                ELSE btrim(part)
+            END AS label
+            FROM unnest(string_to_array(upper(value), ',')) AS part
+        ) labels
+        WHERE label IN ('SOJA', 'MAÍZ', 'TRIGO', 'GIRASOL', 'CEBADA', 'SORGO', 'GENERAL')
+        ORDER BY array_position(
+            ARRAY['SOJA', 'MAÍZ', 'TRIGO', 'GIRASOL', 'CEBADA', 'SORGO', 'GENERAL'], label
+        )
+    ), '{}');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Backfill existing comma strings
+UPDATE news
+SET commodities = normalize_commodities(commodity)
+WHERE commodities IS DISTINCT FROM normalize_commodities(commodity);
+
+-- Keep the array in sync for writers that only set commodity (scripts,
+-- older backends). Writers that send commodities explicitly win.
+CREATE OR REPLACE FUNCTION sync_news_commodities()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.commodities IS NULL OR NEW.commodities = '{}' THEN
+            NEW.commodities := normalize_commodities(NEW.commodity);
+        END IF;
+    ELSIF NEW.commodity IS DISTINCT FROM OLD.commodity
+          AND NEW.commodities IS NOT DISTINCT FROM OLD.commodities THEN
+        NEW.commodities := normalize_commodities(NEW.commodity);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sync_news_commodities ON news;
+CREATE TRIGGER sync_news_commodities
+    BEFORE INSERT OR UPDATE ON news
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_news_commodities();
+
+-- General containment (multi-commodity filters, aggregates)
+CREATE INDEX IF NOT EXISTS idx_news_commodities ON news USING GIN (commodities);
+
+-- There are only seven labels, each shared by a large fraction of rows, so a
+-- GIN lookup for one label has to build a bitmap of its whole posting list
+-- and then sort. The per-commodity filter (commodities @> '{X}' ORDER BY
+-- published_at DESC LIMIT n) is served by partial ordered indexes instead,
+-- which read only the first n matching entries.
+CREATE INDEX IF NOT EXISTS idx_news_soja_published_at
+    ON news (published_at DESC) WHERE commodities @> '{SOJA}';
+CREATE INDEX IF NOT EXISTS idx_news_maiz_published_at
+    ON news (published_at DESC) WHERE commodities @> '{MAÍZ}';
+CREATE INDEX IF NOT EXISTS idx_news_trigo_published_at
+    ON news (published_at DESC) WHERE commodities @> '{TRIGO}';
+CREATE INDEX IF NOT EXISTS idx_news_girasol_published_at
+    ON news (published_at DESC) WHERE commodities @> '{GIRASOL}';
+CREATE INDEX IF NOT EXISTS idx_news_cebada_published_at
+    ON news (published_at DESC) WHERE commodities @> '{CEBADA}';
+CREATE INDEX IF NOT EXISTS idx_news_sorgo_published_at
+    ON news (published_at DESC) WHERE commodities @> '{SORGO}';
+CREATE INDEX IF NOT EXISTS idx_news_general_published_at
+    ON news (published_at DESC) WHERE commodities @> '{GENERAL}';
+
+-- Commodity filters now use containment on the array
+DROP INDEX IF EXISTS idx_news_commodity_published_at;
+
+ANALYZE news;
+
+COMMENT ON COLUMN news.commodities IS 'Normalized commodity labels (filter with @>)';
+COMMENT ON COLUMN news.commodity IS 'Display label, comma-separated for multi-commodity articles';
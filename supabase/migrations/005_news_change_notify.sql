@@ -0,0 +1,128 @@
+-- Agromate Database Schema
+-- Migration: 005_news_change_notify.sql
+--
+-- Cross-worker cache invalidation. Every statement that writes news sends
+-- one NOTIFY on the news_changes channel describing what it touched (UTC
+-- publication days, sources, commodity labels), and bumps a single revision
+-- counter that workers poll when LISTEN is unavailable (e.g. behind a
+-- transaction-mode pooler).
+
+CREATE TABLE IF NOT EXISTS news_revision (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    revision BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO news_revision (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION notify_news_changes(op TEXT, days TEXT[], sources TEXT[], commodities TEXT[])
+RETURNS VOID AS $$
+DECLARE
+    rev BIGINT;
+    payload TEXT;
+BEGIN
+    UPDATE news_revision SET revision = revision + 1, changed_at = NOW()
+    RETURNING revision INTO rev;
+
+    payload := json_build_object(
+        'op', op, 'revision', rev, 'days', days, 'sources', sources, 'commodities', commodities
+    )::text;
+
+    -- NOTIFY payloads are limited to 8000 bytes: large backfills invalidate everything
+    IF days IS NULL OR octet_length(payload) > 7900 THEN
+        payload := json_build_object('op', op, 'revision', rev, 'all', TRUE)::text;
+    END IF;
+
+    PERFORM pg_notify('news_changes', payload);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_changes_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        PERFORM notify_news_changes(
+            'insert',
+            ARRAY(SELECT DISTINCT to_char(published_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') FROM new_rows),
+            ARRAY(SELECT DISTINCT source FROM new_rows),
+            ARRAY(SELECT DISTINCT unnest(commodities) FROM new_rows)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_changes_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM new_rows) THEN
+        PERFORM notify_news_changes(
+            'update',
+            ARRAY(
+                SELECT to_char(published_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') FROM old_rows
+                UNION
+                SELECT to_char(published_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') FROM new_rows
+            ),
+            ARRAY(SELECT source FROM old_rows UNION SELECT source FROM new_rows),
+            ARRAY(
+                SELECT unnest(commodities) FROM old_rows
+                UNION
+                SELECT unnest(commodities) FROM new_rows
+            )
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_changes_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM old_rows) THEN
+        PERFORM notify_news_changes(
+            'delete',
+            ARRAY(SELECT DISTINCT to_char(published_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') FROM old_rows),
+            ARRAY(SELECT DISTINCT source FROM old_rows),
+            ARRAY(SELECT DISTINCT unnest(commodities) FROM old_rows)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_changes_on_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM notify_news_changes('truncate', NULL, NULL, NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS news_changes_insert ON news;
+CREATE TRIGGER news_changes_insert
+    AFTER INSERT ON news
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_changes_on_insert();
+
+DROP TRIGGER IF EXISTS news_changes_update ON news;
+CREATE TRIGGER news_changes_update
+    AFTER UPDATE ON news
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_changes_on_update();
+
+DROP TRIGGER IF EXISTS news_changes_delete ON news;
+CREATE TRIGGER news_changes_delete
+    AFTER DELETE ON news
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_changes_on_delete();
+
+DROP TRIGGER IF EXISTS news_changes_truncate ON news;
+CREATE TRIGGER news_changes_truncate
+    AFTER TRUNCATE ON news
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION news_changes_on_truncate();
+
+COMMENT ON TABLE news_revision IS 'Single-row write counter for news, polled when LISTEN news_changes is unavailable';
@@ -0,0 +1,51 @@
+-- Agromate Database Schema
+-- Migration: 006_news_content_hash.sql
+--
+-- Re-scraping an article upserts it again by URL. Without a guard every
+-- conflict rewrote the row (new tuple, index entries, WAL) and bumped
+-- updated_at even when nothing changed. content_hash summarizes the
+-- analyzable content, and a BEFORE trigger drops updates that would not
+-- change the row, so PostgREST upserts skip them without client changes.
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Same canonical form as database.base.content_hash
+CREATE OR REPLACE FUNCTION news_content_hash(title TEXT, sentiment TEXT, confidence NUMERIC, commodity TEXT)
+RETURNS TEXT AS $$
+    SELECT md5(concat_ws('|',
+        title,
+        COALESCE(sentiment, ''),
+        COALESCE(to_char(confidence, 'FM0.00'), ''),
+        COALESCE(commodity, '')
+    ));
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Named to sort before sync_news_commodities and update_news_updated_at:
+-- returning NULL here also skips the updated_at bump.
+CREATE OR REPLACE FUNCTION news_skip_unchanged()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.content_hash := news_content_hash(NEW.title, NEW.sentiment, NEW.confidence, NEW.commodity);
+
+    IF TG_OP = 'UPDATE'
+       AND NEW.content_hash IS NOT DISTINCT FROM OLD.content_hash
+       AND (NEW.source, NEW.url, NEW.published_at, NEW.commodities)
+           IS NOT DISTINCT FROM (OLD.source, OLD.url, OLD.published_at, OLD.commodities) THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS news_content_hash_guard ON news;
+CREATE TRIGGER news_content_hash_guard
+    BEFORE INSERT OR UPDATE ON news
+    FOR EACH ROW
+    EXECUTE FUNCTION news_skip_unchanged();
+
+-- Backfill without touching updated_at (the guard computes the hash)
+ALTER TABLE news DISABLE TRIGGER update_news_updated_at;
+UPDATE news SET content_hash = NULL WHERE content_hash IS NULL;
+ALTER TABLE news ENABLE TRIGGER update_news_updated_at;
+
+COMMENT ON COLUMN news.content_hash IS 'md5 of title|sentiment|confidence|commodity; unchanged upserts are skipped';
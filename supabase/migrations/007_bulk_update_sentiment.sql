@@ -0,0 +1,33 @@
+-- Agromate Database Schema
+-- Migration: 007_bulk_update_sentiment.sql
+--
+-- Batched sentiment updates for reanalysis. PostgREST can only PATCH rows
+-- matching one filter, so updating N articles to N different values took N
+-- requests. bulk_update_sentiment applies a whole chunk in one statement:
+--
+--   POST /rest/v1/rpc/bulk_update_sentiment
+--   {"updates": [{"id": "...", "sentiment": "ALCISTA", "confidence": 0.9, "commodity": "SOJA"}, ...]}
+--
+-- A NULL commodity keeps the current one. Unchanged rows are not rewritten
+-- (IS DISTINCT FROM here, news_content_hash_guard for other writers).
+
+CREATE OR REPLACE FUNCTION bulk_update_sentiment(updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE news n SET
+        sentiment = u.sentiment,
+        confidence = u.confidence,
+        commodity = COALESCE(u.commodity, n.commodity)
+    FROM jsonb_to_recordset(updates) AS u(id UUID, sentiment TEXT, confidence NUMERIC, commodity TEXT)
+    WHERE n.id = u.id
+      AND (n.sentiment, n.confidence, n.commodity)
+          IS DISTINCT FROM (u.sentiment, round(u.confidence, 2), COALESCE(u.commodity, n.commodity));
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION bulk_update_sentiment(JSONB) IS 'Apply [{id, sentiment, confidence, commodity}] in one statement; returns rows changed';
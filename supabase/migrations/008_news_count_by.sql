@@ -0,0 +1,25 @@
+-- Agromate Database Schema
+-- Migration: 008_news_count_by.sql
+--
+-- Distribution reports for maintenance scripts. PostgREST has no GROUP BY
+-- (aggregates are disabled on Supabase), so the scripts downloaded a whole
+-- column to count it client-side. news_count_by aggregates in the database:
+--
+--   POST /rest/v1/rpc/news_count_by  {"column_name": "commodity"}
+--
+-- Only the columns in database.base.GROUP_BY_COLUMNS are accepted.
+
+CREATE OR REPLACE FUNCTION news_count_by(column_name TEXT)
+RETURNS TABLE (value TEXT, n BIGINT) AS $$
+BEGIN
+    IF column_name NOT IN ('source', 'sentiment', 'commodity') THEN
+        RAISE EXCEPTION 'news_count_by: column % not allowed', column_name;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %1$I::TEXT, COUNT(*) FROM news GROUP BY 1 ORDER BY 2 DESC', column_name
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION news_count_by(TEXT) IS 'Article count per source/sentiment/commodity value';
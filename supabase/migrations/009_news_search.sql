@@ -0,0 +1,69 @@
+-- Agromate Database Schema
+-- Migration: 009_news_search.sql
+--
+-- Keyword search over headlines. search_vector holds the Spanish-stemmed
+-- title ('heladas' -> 'hel', 'maíz' -> 'maiz'), kept current by Postgres as
+-- a generated column and indexed with GIN. search_news ranks matches and
+-- returns a highlighted snippet, combined with the same filters as
+-- /api/news:
+--
+--   POST /rest/v1/rpc/search_news  {"search_query": "heladas trigo", "max_results": 20}
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('spanish', title)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_news_search ON news USING GIN (search_vector);
+
+-- search_query uses web search syntax: words are ANDed, "quoted phrases",
+-- OR, and -word to exclude.
+CREATE OR REPLACE FUNCTION search_news(
+    search_query TEXT,
+    source_filter TEXT[] DEFAULT NULL,
+    sentiment_filter TEXT DEFAULT NULL,
+    commodity_filter TEXT[] DEFAULT NULL,
+    date_from TIMESTAMPTZ DEFAULT NULL,
+    date_to TIMESTAMPTZ DEFAULT NULL,
+    max_results INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    source VARCHAR,
+    url TEXT,
+    published_at TIMESTAMPTZ,
+    sentiment VARCHAR,
+    confidence NUMERIC,
+    commodity VARCHAR,
+    commodities TEXT[],
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    rank REAL,
+    headline TEXT
+) AS $$
+    WITH q AS (
+        SELECT websearch_to_tsquery('spanish', search_query) AS tsq
+    ),
+    hits AS (
+        SELECT n.id, n.title, n.source, n.url, n.published_at, n.sentiment, n.confidence,
+               n.commodity, n.commodities, n.created_at, n.updated_at,
+               ts_rank(n.search_vector, q.tsq) AS rank
+        FROM news n, q
+        WHERE n.search_vector @@ q.tsq
+          AND (source_filter IS NULL OR n.source = ANY(source_filter))
+          AND (sentiment_filter IS NULL OR n.sentiment = sentiment_filter)
+          AND (commodity_filter IS NULL OR n.commodities @> commodity_filter)
+          AND (date_from IS NULL OR n.published_at >= date_from)
+          AND (date_to IS NULL OR n.published_at <= date_to)
+        ORDER BY rank DESC, n.published_at DESC NULLS LAST
+        LIMIT max_results
+    )
+    -- Snippets only for the returned page
+    SELECT h.id, h.title, h.source, h.url, h.published_at, h.sentiment, h.confidence,
+           h.commodity, h.commodities, h.created_at, h.updated_at, h.rank,
+           ts_headline('spanish', h.title, q.tsq)
+    FROM hits h, q
+    ORDER BY h.rank DESC, h.published_at DESC NULLS LAST;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON COLUMN news.search_vector IS 'Spanish tsvector of the title (generated)';
+COMMENT ON FUNCTION search_news(TEXT, TEXT[], TEXT, TEXT[], TIMESTAMPTZ, TIMESTAMPTZ, INTEGER) IS 'Ranked full-text search over headlines with /api/news filters';
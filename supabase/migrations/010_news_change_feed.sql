@@ -0,0 +1,11 @@
+-- Agromate Database Schema
+-- Migration: 010_news_change_feed.sql
+--
+-- The in-memory analytics store (backend/services/article_store.py) keeps
+-- up to date by paging through rows written since its last refresh:
+--
+--   GET /rest/v1/news?or=(updated_at.gt.T,and(updated_at.eq.T,id.gt.ID))&order=updated_at,id
+--
+-- This index makes each page a range scan instead of a sort of the table.
+
+CREATE INDEX IF NOT EXISTS idx_news_updated_at_id ON news (updated_at, id);
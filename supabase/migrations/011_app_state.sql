@@ -0,0 +1,13 @@
+-- Agromate Database Schema
+-- Migration: 011_app_state.sql
+--
+-- Small JSON documents the API keeps across restarts, one row per key.
+-- The streaming sentiment index (backend/services/sentiment_index.py)
+-- stores its snapshot under 'sentiment_index' so a restarted worker serves
+-- it immediately instead of replaying the news table.
+
+CREATE TABLE IF NOT EXISTS app_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);